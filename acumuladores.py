@@ -0,0 +1,151 @@
+"""
+Acumuladores de métricas para conjuntos de avaliação que não cabem na memória.
+
+Cada acumulador recebe as previsões em blocos com `update(y_real, y_pred)`,
+pode ser combinado com outro acumulador (ex.: de outro processo) com
+`merge(outro)` e produz o resultado com `finalize()`. Apenas somas e momentos
+são mantidos, nunca os arrays completos:
+
+    acumulador = AcumuladorRegressao()
+    for y_real, y_pred in blocos:
+        acumulador.update(y_real, y_pred)
+
+    logger = ExperimentLogger('Regressao')
+    logger.preparar_modelo(acumulador=acumulador)
+    logger.salvando_relatorio('commit', 'versao')
+
+Mediana, quartis e moda não podem ser calculados a partir de somas: vêm de
+sketches de quantis KLL (ver sketch_quantis.py) com erro de rank `erro_quantis`
+(None desativa os sketches e essas estatísticas ficam como None no resumo).
+"""
+import numpy as np
+
+from classificacao import Classification
+from estastistica import AcumuladorResumo
+from limiares import HistogramaLimiares
+from matriz_confusao import combinar_matrizes, matriz_confusao
+from regressao import Regression
+from residuos import metricas_somas, somas_residuos
+
+
+class AcumuladorRegressao:
+    """
+    Acumula as somas dos erros (quadrático, absoluto e relativo) e o resumo
+    estatístico (momentos e sketches) de `y_real` e `y_pred`, suficientes para
+    todas as métricas de Regression.
+    """
+
+    def __init__(self, erro_quantis=0.01, dtype=np.float64):
+        self.n = 0
+        self.dtype = dtype
+        self.soma_erro_quadratico = 0.0
+        self.soma_erro_absoluto = 0.0
+        self.soma_erro_relativo = 0.0
+        self.estatisticas = AcumuladorResumo(erro_quantis)
+
+    def update(self, y_real, y_pred):
+        # Somas dos erros com o resíduo calculado uma única vez (ver residuos.py)
+        somas = somas_residuos(y_real, y_pred, self.dtype)
+        self.n += somas['n']
+        self.soma_erro_quadratico += somas['sse']
+        self.soma_erro_absoluto += somas['sae']
+        self.soma_erro_relativo += somas['sre']
+
+        self.estatisticas.update(y_real, y_pred)
+        return self
+
+    def merge(self, outro):
+        self.n += outro.n
+        self.soma_erro_quadratico += outro.soma_erro_quadratico
+        self.soma_erro_absoluto += outro.soma_erro_absoluto
+        self.soma_erro_relativo += outro.soma_erro_relativo
+        self.estatisticas.merge(outro.estatisticas)
+        return self
+
+    def metricas(self):
+        """
+        Métricas de erro com as mesmas definições de Regression.
+        """
+        if self.n == 0:
+            raise ValueError("Nenhum valor foi acumulado.")
+
+        # SST é a soma dos quadrados dos desvios de y_real (o momento m2)
+        return metricas_somas(self.n, self.soma_erro_quadratico, self.soma_erro_absoluto,
+                              self.soma_erro_relativo, self.estatisticas.momentos_real.m2)
+
+    def resumo(self):
+        return self.estatisticas.finalize()
+
+    @property
+    def sketches(self):
+        return self.estatisticas.sketches
+
+    def finalize(self):
+        """
+        Retorna um Regression com as métricas acumuladas (sem os arrays).
+        """
+        return Regression(acumulador=self)
+
+
+class AcumuladorClassificacao:
+    """
+    Acumula a matriz de confusão (e o resumo estatístico dos rótulos numéricos).
+    Rótulos novos em blocos posteriores ampliam a matriz. Com os scores da classe
+    positiva, acumula também o histograma das curvas de limiar (ver limiares.py),
+    com `bins_limiares` faixas em `faixa_scores`.
+    """
+
+    def __init__(self, erro_quantis=0.01, bins_limiares=1000, faixa_scores=(0.0, 1.0)):
+        self.rotulos = None
+        self.matriz_confusao = None
+        self.estatisticas = AcumuladorResumo(erro_quantis)
+        self.bins_limiares = bins_limiares
+        self.faixa_scores = faixa_scores
+        # Criado no primeiro bloco com scores
+        self.limiares = None
+
+    def _somar(self, cm, rotulos):
+        if self.rotulos is None:
+            self.matriz_confusao, self.rotulos = cm.copy(), rotulos
+            return
+        self.matriz_confusao, self.rotulos = combinar_matrizes(self.matriz_confusao, self.rotulos, cm, rotulos)
+
+    def update(self, y_real, y_pred, scores=None):
+        cm, rotulos = matriz_confusao(y_real, y_pred)
+        self._somar(cm, rotulos)
+
+        if scores is not None:
+            if self.limiares is None:
+                self.limiares = HistogramaLimiares(self.bins_limiares, self.faixa_scores)
+            self.limiares.update(y_real, scores)
+
+        # O resumo estatístico só faz sentido para rótulos numéricos
+        if rotulos.dtype.kind in 'biuf':
+            self.estatisticas.update(y_real, y_pred)
+        return self
+
+    def merge(self, outro):
+        if outro.rotulos is not None:
+            self._somar(outro.matriz_confusao, outro.rotulos)
+        if outro.limiares is not None:
+            if self.limiares is None:
+                self.limiares = HistogramaLimiares(outro.limiares.bins, outro.limiares.faixa)
+            self.limiares.merge(outro.limiares)
+        self.estatisticas.merge(outro.estatisticas)
+        return self
+
+    def resumo(self):
+        return self.estatisticas.finalize()
+
+    @property
+    def sketches(self):
+        return self.estatisticas.sketches
+
+    def finalize(self, custo_fp=1.0, custo_fn=1.0):
+        """
+        Retorna um Classification com as métricas da matriz acumulada (sem os arrays)
+        e, se houve scores, as curvas de limiar do histograma.
+        """
+        if self.rotulos is None:
+            raise ValueError("Nenhum valor foi acumulado.")
+        return Classification(acumulador=self, custo_fp=custo_fp, custo_fn=custo_fn)
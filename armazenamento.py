@@ -0,0 +1,257 @@
+"""
+Banco único de experimentos.
+
+Todas as execuções (classificação, regressão e séries temporais) ficam em um
+único arquivo SQLite, com a tabela EXECUCOES compartilhada, uma tabela de
+detalhes por tipo e as tabelas ARTEFATOS e METRICAS. O caminho do arquivo pode
+ser informado diretamente, pela variável de ambiente PAINEL_LOGS_BANCO ou, por
+padrão, é `dados/experimentos.db` na raiz do repositório.
+
+Os bancos antigos (um arquivo por tipo em `dados/banco_de_dados_*`) são
+importados automaticamente na primeira conexão de cada processo, ou pela
+linha de comando (os arquivos antigos são apenas lidos):
+    python armazenamento.py --origem ./dados --destino ./dados/experimentos.db
+"""
+import argparse
+import os
+import sqlite3
+import tempfile
+from datetime import datetime
+from functools import partial
+from pathlib import Path
+
+from esquema import migrar, migrar_banco_unico
+from gerenciador_conexao import GerenciadorConexao
+from metricas import preencher_metricas_classe
+
+
+# Variável de ambiente com o caminho do banco único
+VARIAVEL_AMBIENTE = 'PAINEL_LOGS_BANCO'
+
+RAIZ_REPOSITORIO = os.path.dirname(os.path.abspath(__file__))
+CAMINHO_PADRAO = os.path.join(RAIZ_REPOSITORIO, 'dados', 'experimentos.db')
+
+# Tipo do experimento -> tabela de detalhes
+TABELAS = {
+    'Classificacao': 'CLASSIFICACAO',
+    'Regressao': 'REGRESSAO',
+    'Series_Temporais': 'SERIES_TEMPORAIS',
+}
+
+# Bancos antigos: (tipo, arquivo relativo à pasta de dados, colunas de detalhes)
+BANCOS_ANTIGOS = [
+    ('Classificacao', os.path.join('banco_de_dados_classificacao', 'classificacao.db'), ['dados', 'avg_precision']),
+    ('Regressao', os.path.join('banco_de_dados_regressao', 'regressao.db'), ['dados']),
+    ('Series_Temporais', os.path.join('banco_de_dados_series_temporais', 'series_temporais.db'), []),
+]
+
+
+def caminho_banco(caminho=None):
+    """
+    Retorna o caminho absoluto do banco único: o informado, o da variável de
+    ambiente PAINEL_LOGS_BANCO ou o padrão `dados/experimentos.db` do repositório.
+    """
+    return os.path.abspath(caminho or os.environ.get(VARIAVEL_AMBIENTE) or CAMINHO_PADRAO)
+
+
+def conectar_banco(caminho=None, gerenciador=None, importar=True):
+    """
+    Retorna a conexão persistente (ver GerenciadorConexao) com o banco único.
+
+    Na primeira conexão do processo o esquema é criado ou migrado e, se
+    `importar` for True, os bancos antigos encontrados na mesma pasta são importados.
+
+    Parâmetros:
+    - caminho (str): Caminho do banco; None para usar caminho_banco().
+    - gerenciador (GerenciadorConexao): Gerenciador usado; None para um novo com a configuração padrão.
+    - importar (bool): Se True, importa os bancos antigos ainda não importados.
+    """
+    caminho = caminho_banco(caminho)
+    gerenciador = gerenciador or GerenciadorConexao()
+
+    conn = gerenciador.conectar(caminho)
+    gerenciador.preparar(conn, caminho, partial(
+        _preparar, pasta=os.path.dirname(caminho), importar=importar))
+    return conn
+
+
+def _preparar(conn, pasta, importar):
+    migrar_banco_unico(conn)
+    if importar:
+        importar_bancos_antigos(conn, pasta)
+
+
+def _novos_ids(conn, ids):
+    """
+    Mantém os IDs antigos sempre que possível; os que já existem em EXECUCOES
+    (IDs gerados a partir do mesmo horário em arquivos diferentes) são avançados
+    até o próximo ID livre.
+    """
+    usados = set()
+    mapa = []
+    for antigo in ids:
+        novo = antigo
+        while novo in usados or conn.execute(
+                "SELECT 1 FROM EXECUCOES WHERE id = ?", (novo,)).fetchone():
+            novo += 1
+        usados.add(novo)
+        mapa.append((antigo, novo))
+    return mapa
+
+
+def _copia_migrada(arquivo, tabela, pasta):
+    """
+    Copia o banco antigo, aberto apenas para leitura, para `pasta` e migra a cópia
+    para a versão mais recente do seu esquema (ver esquema.migrar). O arquivo
+    original não é alterado.
+
+    Retorna:
+    - str: Caminho da cópia migrada, ou None se o arquivo não tiver a tabela do tipo.
+    """
+    origem = sqlite3.connect(f'{Path(arquivo).as_uri()}?mode=ro', uri=True)
+    try:
+        if not origem.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (tabela,)).fetchone():
+            return None
+        copia = os.path.join(pasta, os.path.basename(arquivo))
+        destino = sqlite3.connect(copia)
+        try:
+            origem.backup(destino)
+            migrar(destino, tabela)
+        finally:
+            destino.close()
+        return copia
+    finally:
+        origem.close()
+
+
+def importar_banco_antigo(conn, arquivo, tipo, colunas):
+    """
+    Importa um banco antigo (um arquivo por tipo) para o banco único conectado.
+
+    Uma cópia temporária do arquivo antigo é migrada para a versão mais recente do
+    seu esquema (o original é apenas lido) e copiada com ATTACH + INSERT ... SELECT
+    em uma única transação. Arquivos já importados são ignorados.
+
+    Retorna:
+    - int: Número de execuções importadas (0 se o arquivo já foi importado ou não tem registros).
+    """
+    arquivo = os.path.abspath(arquivo)
+    tabela = TABELAS[tipo]
+
+    if conn.execute("SELECT 1 FROM IMPORTACOES WHERE caminho = ?", (arquivo,)).fetchone():
+        return 0
+
+    with tempfile.TemporaryDirectory() as pasta:
+        copia = _copia_migrada(arquivo, tabela, pasta)
+        if copia is None:
+            return 0
+        return _importar_copia(conn, arquivo, copia, tipo, tabela, colunas)
+
+
+def _importar_copia(conn, arquivo, copia, tipo, tabela, colunas):
+    """
+    Copia as execuções da cópia migrada `copia` do banco antigo `arquivo` para o
+    banco único (ver importar_banco_antigo).
+    """
+    # ATTACH não pode ser executado dentro de uma transação
+    conn.commit()
+    conn.execute("ATTACH DATABASE ? AS antigo", (copia,))
+    try:
+        conn.execute("BEGIN")
+        try:
+            ids = [id_antigo for (id_antigo,) in conn.execute(
+                f"SELECT id FROM antigo.{tabela} ORDER BY id").fetchall()]
+
+            conn.execute(
+                "CREATE TEMP TABLE IF NOT EXISTS mapa_ids (antigo INTEGER PRIMARY KEY, novo INTEGER)")
+            conn.execute("DELETE FROM temp.mapa_ids")
+            conn.executemany(
+                "INSERT INTO temp.mapa_ids (antigo, novo) VALUES (?, ?)", _novos_ids(conn, ids))
+
+            conn.execute(f'''
+                INSERT INTO main.EXECUCOES (id, tipo, id_commit, controle_de_versao, data, hora, criado_em)
+                SELECT m.novo, ?, t.id_commit, t.controle_de_versao, t.data, t.hora, t.criado_em
+                FROM antigo.{tabela} t
+                JOIN temp.mapa_ids m ON m.antigo = t.id
+                ORDER BY t.id
+            ''', (tipo,))
+
+            lista = ''.join(f', {coluna}' for coluna in colunas)
+            lista_origem = ''.join(f', t.{coluna}' for coluna in colunas)
+            conn.execute(f'''
+                INSERT INTO main.{tabela} (id{lista})
+                SELECT m.novo{lista_origem}
+                FROM antigo.{tabela} t
+                JOIN temp.mapa_ids m ON m.antigo = t.id
+            ''')
+
+            # Artefatos são endereçados pelo conteúdo: os repetidos entre arquivos ficam uma vez só
+            conn.execute('''
+                INSERT OR IGNORE INTO main.ARTEFATOS (chave, dados)
+                SELECT chave, dados FROM antigo.ARTEFATOS
+            ''')
+            conn.execute('''
+                INSERT OR IGNORE INTO main.ARTEFATOS_EXECUCAO (id, nome, chave)
+                SELECT m.novo, e.nome, e.chave
+                FROM antigo.ARTEFATOS_EXECUCAO e
+                JOIN temp.mapa_ids m ON m.antigo = e.id
+            ''')
+            conn.execute('''
+                INSERT OR IGNORE INTO main.METRICAS (id, metrica, valor)
+                SELECT m.novo, x.metrica, x.valor
+                FROM antigo.METRICAS x
+                JOIN temp.mapa_ids m ON m.antigo = x.id
+            ''')
+
+            # Os bancos antigos não têm métricas por classe: são calculadas a partir de y_test e y_pred
+            if tabela == 'CLASSIFICACAO':
+                preencher_metricas_classe(conn)
+
+            conn.execute(
+                "INSERT INTO IMPORTACOES (caminho, execucoes, importado_em) VALUES (?, ?, ?)",
+                (arquivo, len(ids), datetime.now().isoformat(sep=' ', timespec='seconds')))
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+    finally:
+        conn.execute("DETACH DATABASE antigo")
+
+    return len(ids)
+
+
+def importar_bancos_antigos(conn, pasta):
+    """
+    Importa os três bancos antigos encontrados em `pasta` (a antiga pasta `dados`).
+
+    Retorna:
+    - dict: {tipo: número de execuções importadas}.
+    """
+    importados = {}
+    for tipo, arquivo, colunas in BANCOS_ANTIGOS:
+        arquivo = os.path.join(pasta, arquivo)
+        if os.path.exists(arquivo):
+            importados[tipo] = importar_banco_antigo(conn, arquivo, tipo, colunas)
+
+    if any(importados.values()):
+        print(f"Bancos antigos importados para o banco único: {importados}")
+    return importados
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Importa os bancos antigos (um arquivo por tipo) para o banco único.')
+    parser.add_argument('--origem', default=os.path.join(RAIZ_REPOSITORIO, 'dados'),
+                        help='Pasta com as pastas banco_de_dados_* (padrão: dados/ do repositório).')
+    parser.add_argument('--destino', default=None,
+                        help=f'Banco único (padrão: ${VARIAVEL_AMBIENTE} ou {CAMINHO_PADRAO}).')
+    args = parser.parse_args()
+
+    conn = conectar_banco(args.destino, importar=False)
+    importados = importar_bancos_antigos(conn, args.origem)
+    print(f"Importação concluída em {caminho_banco(args.destino)}: {importados}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,149 @@
+import hashlib
+
+
+def criar_tabelas_artefatos(conn):
+    """
+    Cria as tabelas de artefatos (arrays grandes) no arquivo conectado.
+
+    - ARTEFATOS: um valor grande por linha (y_test, y_pred, curvas, séries...),
+      identificado por `chave`, o hash do conteúdo (ver chave_artefato).
+    - ARTEFATOS_EXECUCAO: liga cada execução (`id`) aos seus artefatos pelo nome
+      da antiga coluna (ex.: 'y_test').
+
+    Com os arrays fora das tabelas de execuções, as listagens do painel leem
+    apenas páginas pequenas, sem passar pelas páginas de overflow dos arrays.
+    """
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS ARTEFATOS (
+            chave TEXT PRIMARY KEY,
+            dados BLOB
+        )
+    ''')
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS ARTEFATOS_EXECUCAO (
+            id INTEGER,
+            nome TEXT,
+            chave TEXT,
+            PRIMARY KEY (id, nome)
+        ) WITHOUT ROWID
+    ''')
+    # Usado para encontrar artefatos sem nenhuma execução ao deletar registros
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_artefatos_execucao_chave ON ARTEFATOS_EXECUCAO (chave)")
+
+
+def chave_artefato(dados):
+    """
+    Retorna a chave de um artefato: o hash BLAKE2b (128 bits, em hexadecimal) do valor gravado.
+
+    Para arrays no formato binário o valor já contém o dtype e o shape no
+    cabeçalho (ver serializacao.codificar_array), então arrays iguais com dtype
+    ou shape diferentes recebem chaves diferentes.
+    """
+    if isinstance(dados, str):
+        dados = dados.encode('utf-8')
+    return hashlib.blake2b(dados, digest_size=16).hexdigest()
+
+
+def gravar_artefatos(conn, artefatos):
+    """
+    Grava os artefatos e as ligações com as execuções (sem fazer commit).
+
+    Os artefatos são endereçados pelo conteúdo: um array idêntico a outro já
+    gravado (ex.: o mesmo y_test usado por 50 modelos) não é gravado de novo,
+    apenas a ligação com a execução.
+
+    Parâmetros:
+    - conn (sqlite3.Connection): Conexão com o banco.
+    - artefatos (list): Tuplas (id, nome, dados); valores None são ignorados.
+    """
+    valores = []
+    ligacoes = []
+    for id_execucao, nome, dados in artefatos:
+        if dados is None:
+            continue
+        chave = chave_artefato(dados)
+        valores.append((chave, dados))
+        ligacoes.append((id_execucao, nome, chave))
+
+    conn.executemany(
+        "INSERT OR IGNORE INTO ARTEFATOS (chave, dados) VALUES (?, ?)", valores)
+    conn.executemany(
+        "INSERT INTO ARTEFATOS_EXECUCAO (id, nome, chave) VALUES (?, ?, ?)", ligacoes)
+
+
+def carregar_artefatos(conn, id_execucao, nomes=None):
+    """
+    Lê os artefatos de uma execução.
+
+    Parâmetros:
+    - conn (sqlite3.Connection): Conexão com o banco.
+    - id_execucao (int): ID da execução.
+    - nomes (list): Nomes dos artefatos desejados; None para todos.
+
+    Retorna:
+    - dict: {nome: valor gravado}, sem decodificar (ver serializacao.decodificar_array).
+      Artefatos ausentes não aparecem no dicionário.
+    """
+    query = '''
+        SELECT e.nome, a.dados
+        FROM ARTEFATOS_EXECUCAO e
+        JOIN ARTEFATOS a ON a.chave = e.chave
+        WHERE e.id = ?
+    '''
+    params = [id_execucao]
+
+    if nomes is not None:
+        query += f' AND e.nome IN ({", ".join("?" * len(nomes))})'
+        params.extend(nomes)
+
+    return dict(conn.execute(query, params).fetchall())
+
+
+def chaves_artefatos(conn, id_execucao, nomes=None):
+    """
+    Retorna as chaves dos artefatos de uma execução, sem ler os valores.
+
+    Retorna:
+    - dict: {nome: chave}.
+    """
+    query = 'SELECT nome, chave FROM ARTEFATOS_EXECUCAO WHERE id = ?'
+    params = [id_execucao]
+
+    if nomes is not None:
+        query += f' AND nome IN ({", ".join("?" * len(nomes))})'
+        params.extend(nomes)
+
+    return dict(conn.execute(query, params).fetchall())
+
+
+def ler_artefatos(conn, chaves):
+    """
+    Lê os valores dos artefatos pelas chaves.
+
+    Retorna:
+    - dict: {chave: valor gravado}.
+    """
+    chaves = list(chaves)
+    if not chaves:
+        return {}
+    return dict(conn.execute(
+        f'SELECT chave, dados FROM ARTEFATOS WHERE chave IN ({", ".join("?" * len(chaves))})',
+        chaves).fetchall())
+
+
+def remover_artefatos_orfaos(conn, tabela):
+    """
+    Remove as ligações de execuções que não existem mais em `tabela` e os
+    artefatos que ficaram sem nenhuma ligação (sem fazer commit).
+
+    Retorna:
+    - int: Número de artefatos removidos.
+    """
+    conn.execute(
+        f"DELETE FROM ARTEFATOS_EXECUCAO WHERE id NOT IN (SELECT id FROM {tabela})")
+    cursor = conn.execute('''
+        DELETE FROM ARTEFATOS
+        WHERE NOT EXISTS (SELECT 1 FROM ARTEFATOS_EXECUCAO e WHERE e.chave = ARTEFATOS.chave)
+    ''')
+    return cursor.rowcount
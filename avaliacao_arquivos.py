@@ -0,0 +1,278 @@
+"""
+Avaliação em blocos de previsões gravadas em arquivos (.npy, Parquet ou Arrow),
+sem carregar os arrays completos na memória.
+
+Os arquivos .npy são abertos com np.memmap, um bloco de cada vez (o mapeamento
+de cada bloco é desfeito antes do próximo, de modo que as páginas lidas não se
+acumulam na memória do processo). Arquivos Parquet são lidos em lotes de
+registros e arquivos Arrow/Feather são mapeados na memória com pyarrow (opcional,
+importado apenas quando necessário).
+
+Cada bloco é passado ao acumulador do tipo do experimento (ver acumuladores.py),
+cujo tamanho não depende da quantidade de linhas: o consumo de memória fica
+limitado por `memoria_mb`. O resultado é o mesmo dicionário de métricas gravado
+por ExperimentLogger.salvando_relatorio, com as estatísticas de posição
+(mediana, quartis e moda) aproximadas pelos sketches de quantis.
+
+    logger = ExperimentLogger('Regressao')
+    relatorio = logger.preparar_modelo_arquivos('y_test.npy', 'y_pred.npy')
+    print(relatorio['pico_rss_mb'])
+    logger.salvando_relatorio('commit', 'versao')
+"""
+import os
+import time
+
+import numpy as np
+
+
+# Memória padrão reservada para os blocos (MB)
+MEMORIA_PADRAO_MB = 256
+
+# Bytes por linha de um bloco: y_real e y_pred em float64 e os temporários dos
+# acumuladores (momentos, sketches e buffers), medidos com os tamanhos de bloco usuais
+BYTES_POR_LINHA = 96
+
+# Limites do tamanho do bloco
+TAMANHO_BLOCO_MINIMO = 1 << 14
+TAMANHO_BLOCO_MAXIMO = 1 << 24
+
+# Extensões lidas com pyarrow
+EXTENSOES_PARQUET = ('.parquet', '.pq')
+EXTENSOES_ARROW = ('.arrow', '.feather', '.ipc')
+
+
+def tamanho_bloco_memoria(memoria_mb=MEMORIA_PADRAO_MB):
+    """
+    Quantidade de linhas por bloco que cabe em `memoria_mb`.
+    """
+    linhas = int(memoria_mb * 2 ** 20 // BYTES_POR_LINHA)
+    return int(np.clip(linhas, TAMANHO_BLOCO_MINIMO, TAMANHO_BLOCO_MAXIMO))
+
+
+# ----------------------------------------------Memória do processo----------------------------------------------------------------
+
+class MonitorMemoria:
+    """
+    Mede o pico de memória residente (RSS) do processo durante a avaliação.
+
+    O pico é o maior RSS observado entre os blocos (`registrar`). No Linux, se o
+    pico do kernel (VmHWM) subiu desde a criação do monitor, ele foi atingido no
+    trecho medido e é o valor reportado; nos demais sistemas, o RSS vem do psutil
+    (se instalado).
+
+    Parâmetros:
+    - zerar_pico (bool): Se True, zera o VmHWM do processo na criação (Linux, ver
+      proc(5), clear_refs), para que o kernel registre o pico exato do trecho. O
+      VmHWM é do processo inteiro: isso apaga o pico que outro código esteja
+      acompanhando, por isso é opcional (usado pelos benchmarks).
+    """
+
+    def __init__(self, zerar_pico=False):
+        self.pico_observado = 0
+        self.linux = os.path.exists('/proc/self/status')
+        if self.linux and zerar_pico:
+            try:
+                # '5' zera o pico de RSS do processo
+                with open('/proc/self/clear_refs', 'w') as arquivo:
+                    arquivo.write('5')
+            except OSError:
+                pass
+        self.pico_inicial = self._status('VmHWM:') if self.linux else None
+        self.registrar()
+
+    @staticmethod
+    def _status(campo):
+        with open('/proc/self/status') as arquivo:
+            for linha in arquivo:
+                if linha.startswith(campo):
+                    return int(linha.split()[1]) * 1024
+        return None
+
+    def rss(self):
+        """
+        RSS atual em bytes (None se não for possível medir).
+        """
+        if self.linux:
+            return self._status('VmRSS:')
+        try:
+            import psutil
+        except ImportError:
+            return None
+        return psutil.Process().memory_info().rss
+
+    def registrar(self):
+        atual = self.rss()
+        if atual is not None:
+            self.pico_observado = max(self.pico_observado, atual)
+
+    def pico(self):
+        """
+        Pico de RSS em bytes desde a criação do monitor.
+        """
+        self.registrar()
+        if self.linux and self.pico_inicial is not None:
+            pico_processo = self._status('VmHWM:') or 0
+            # O pico do processo só sobe se for atingido durante a medição
+            if pico_processo > self.pico_inicial:
+                return pico_processo
+        return self.pico_observado or None
+
+
+# ----------------------------------------------Leitura em blocos------------------------------------------------------------------
+
+def _cabecalho_npy(caminho):
+    """
+    Formato, dtype e posição dos dados de um arquivo .npy.
+    """
+    with open(caminho, 'rb') as arquivo:
+        versao = np.lib.format.read_magic(arquivo)
+        if versao == (1, 0):
+            formato, _, dtype = np.lib.format.read_array_header_1_0(arquivo)
+        else:
+            formato, _, dtype = np.lib.format.read_array_header_2_0(arquivo)
+        inicio = arquivo.tell()
+
+    if dtype.hasobject:
+        raise ValueError(f"O arquivo {caminho} contém objetos Python e não pode ser mapeado.")
+    # Uma coluna (n, 1) ou linha (1, n) tem os mesmos bytes de um vetor
+    if len(formato) == 2 and 1 in formato:
+        formato = (formato[0] * formato[1],)
+    if len(formato) != 1:
+        raise ValueError(f"O arquivo {caminho} deve conter um vetor; formato {formato}.")
+    return formato, dtype, inicio
+
+
+def _bloco_npy(caminho, dtype, inicio_dados, inicio, quantidade):
+    """
+    Lê as linhas [inicio, inicio + quantidade) de um .npy por um np.memmap só do bloco.
+    """
+    mapa = np.memmap(caminho, dtype=dtype, mode='r', offset=inicio_dados + inicio * dtype.itemsize,
+                     shape=(quantidade,))
+    bloco = np.array(mapa)
+    # Desfaz o mapeamento: as páginas do bloco deixam de contar na memória do processo
+    del mapa
+    return bloco
+
+
+def blocos_npy(caminhos, tamanho_bloco):
+    """
+    Percorre vetores .npy de mesmo tamanho, um bloco de cada vez.
+
+    Parâmetros:
+    - caminhos (list[str]): Arquivos .npy com um vetor cada (ex.: y_real e y_pred).
+    - tamanho_bloco (int): Linhas por bloco.
+
+    Retorna:
+    - generator: Tuplas com o bloco de cada arquivo, na ordem de `caminhos`.
+    """
+    cabecalhos = [_cabecalho_npy(caminho) for caminho in caminhos]
+    tamanhos = {formato[0] for formato, _, _ in cabecalhos}
+    if len(tamanhos) != 1:
+        raise ValueError(
+            f"Os arquivos devem conter vetores de mesmo tamanho; formatos {[c[0] for c in cabecalhos]}.")
+    n = tamanhos.pop()
+
+    for inicio in range(0, n, tamanho_bloco):
+        quantidade = min(tamanho_bloco, n - inicio)
+        yield tuple(_bloco_npy(caminho, dtype, inicio_dados, inicio, quantidade)
+                    for caminho, (_, dtype, inicio_dados) in zip(caminhos, cabecalhos))
+
+
+def _pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.ipc  # noqa: F401
+        import pyarrow.parquet  # noqa: F401
+    except ImportError as erro:
+        raise ImportError(
+            "A leitura de arquivos Parquet e Arrow requer o pacote pyarrow (pip install pyarrow).") from erro
+    return pyarrow
+
+
+def _colunas_numpy(lote, colunas):
+    return tuple(lote.column(coluna).to_numpy(zero_copy_only=False) for coluna in colunas)
+
+
+def blocos_arrow(caminho, colunas, tamanho_bloco):
+    """
+    Percorre as colunas de um arquivo Parquet (em lotes de registros) ou Arrow/Feather
+    (mapeado na memória), um bloco de cada vez.
+
+    Retorna:
+    - generator: Tuplas com o bloco de cada coluna, na ordem de `colunas`.
+    """
+    pa = _pyarrow()
+    extensao = os.path.splitext(caminho)[1].lower()
+
+    if extensao in EXTENSOES_PARQUET:
+        arquivo = pa.parquet.ParquetFile(caminho)
+        for lote in arquivo.iter_batches(batch_size=tamanho_bloco, columns=list(colunas)):
+            yield _colunas_numpy(lote, colunas)
+        return
+
+    with pa.memory_map(caminho, 'r') as mapa:
+        leitor = pa.ipc.open_file(mapa)
+        for indice in range(leitor.num_record_batches):
+            lote = leitor.get_batch(indice).select(list(colunas))
+            for inicio in range(0, lote.num_rows, tamanho_bloco):
+                yield _colunas_numpy(lote.slice(inicio, tamanho_bloco), colunas)
+
+
+def blocos_arquivos(y_real, y_pred=None, scores=None, coluna_real='y_real', coluna_pred='y_pred',
+                    coluna_scores=None, tamanho_bloco=None):
+    """
+    Blocos (y_real, y_pred[, scores]) lidos de arquivos.
+
+    Parâmetros:
+    - y_real (str): Arquivo .npy com os valores reais ou arquivo Parquet/Arrow com
+      todas as colunas.
+    - y_pred (str): Arquivo .npy com as previsões (apenas com y_real em .npy).
+    - scores (str): Arquivo .npy opcional com os scores da classe positiva.
+    - coluna_real, coluna_pred, coluna_scores (str): Colunas do arquivo Parquet/Arrow.
+    - tamanho_bloco (int): Linhas por bloco (None para o padrão de tamanho_bloco_memoria).
+    """
+    tamanho_bloco = tamanho_bloco or tamanho_bloco_memoria()
+    extensao = os.path.splitext(str(y_real))[1].lower()
+
+    if extensao in EXTENSOES_PARQUET + EXTENSOES_ARROW:
+        colunas = [coluna_real, coluna_pred] + ([coluna_scores] if coluna_scores else [])
+        return blocos_arrow(y_real, colunas, tamanho_bloco)
+
+    if y_pred is None:
+        raise ValueError("Com arquivos .npy, informe os arquivos de y_real e de y_pred.")
+    caminhos = [y_real, y_pred] + ([scores] if scores is not None else [])
+    return blocos_npy(caminhos, tamanho_bloco)
+
+
+def avaliar_arquivos(acumulador, blocos):
+    """
+    Passa os blocos ao acumulador e mede o tempo e o pico de memória.
+
+    Parâmetros:
+    - acumulador: AcumuladorRegressao ou AcumuladorClassificacao.
+    - blocos (iterable): Tuplas (y_real, y_pred[, scores]) (ver blocos_arquivos).
+
+    Retorna:
+    - dict: 'linhas', 'blocos', 'tempo_s', 'pico_rss_mb' (None se não for possível
+      medir) e 'rss_inicial_mb'.
+    """
+    monitor = MonitorMemoria()
+    rss_inicial = monitor.rss()
+    inicio = time.perf_counter()
+
+    linhas = 0
+    quantidade_blocos = 0
+    for bloco in blocos:
+        acumulador.update(*bloco)
+        linhas += len(bloco[0])
+        quantidade_blocos += 1
+        monitor.registrar()
+
+    pico = monitor.pico()
+    return {
+        'linhas': linhas,
+        'blocos': quantidade_blocos,
+        'tempo_s': time.perf_counter() - inicio,
+        'pico_rss_mb': pico / 2 ** 20 if pico is not None else None,
+        'rss_inicial_mb': rss_inicial / 2 ** 20 if rss_inicial is not None else None,
+    }
@@ -0,0 +1,85 @@
+"""
+Benchmark da avaliação de previsões gravadas em arquivos .npy: arrays carregados
+na memória (np.load + preparar_modelo) x avaliação em blocos com memória limitada
+(preparar_modelo_arquivos, ver avaliacao_arquivos.py).
+
+Mede o tempo e o pico de memória residente (RSS) de cada modo e confere que as
+métricas de erro são as mesmas e que o dicionário de métricas tem as mesmas chaves.
+Os arquivos são gerados em blocos no diretório informado.
+
+Execução (a partir da raiz do repositório):
+    python benchmarks/benchmark_arquivos.py --amostras 50000000 --memoria 64 256
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from avaliacao_arquivos import MonitorMemoria  # noqa: E402
+from experiment_logger import ExperimentLogger  # noqa: E402
+
+
+def gerar_arquivos(diretorio, amostras, bloco=10_000_000):
+    rng = np.random.default_rng(42)
+    caminho_real = os.path.join(diretorio, 'y_real.npy')
+    caminho_pred = os.path.join(diretorio, 'y_pred.npy')
+    y_real = np.lib.format.open_memmap(caminho_real, 'w+', np.float64, (amostras,))
+    y_pred = np.lib.format.open_memmap(caminho_pred, 'w+', np.float64, (amostras,))
+    for inicio in range(0, amostras, bloco):
+        fim = min(inicio + bloco, amostras)
+        y_real[inicio:fim] = rng.normal(100, 20, fim - inicio)
+        y_pred[inicio:fim] = y_real[inicio:fim] + rng.normal(0, 5, fim - inicio)
+    y_real.flush()
+    y_pred.flush()
+    del y_real, y_pred
+    return caminho_real, caminho_pred
+
+
+def em_memoria(caminho_real, caminho_pred):
+    logger = ExperimentLogger('Regressao')
+    monitor = MonitorMemoria(zerar_pico=True)
+    inicio = time.perf_counter()
+    logger.preparar_modelo(y_real=np.load(caminho_real), y_pred=np.load(caminho_pred))
+    tempo = time.perf_counter() - inicio
+    return tempo, monitor.pico() / 2 ** 20, logger.modelo.metricas_regressao
+
+
+def em_blocos(caminho_real, caminho_pred, memoria):
+    logger = ExperimentLogger('Regressao')
+    # Zera o pico do processo, deixado alto pelo modo em memória
+    MonitorMemoria(zerar_pico=True)
+    relatorio = logger.preparar_modelo_arquivos(caminho_real, caminho_pred, memoria_mb=memoria)
+    return relatorio['tempo_s'], relatorio['pico_rss_mb'], logger.modelo.metricas_regressao
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--amostras', type=int, default=20_000_000)
+    parser.add_argument('--memoria', type=float, nargs='+', default=[64, 256])
+    parser.add_argument('--diretorio', default=None)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(dir=args.diretorio) as diretorio:
+        caminho_real, caminho_pred = gerar_arquivos(diretorio, args.amostras)
+
+        resultados = [('em memória', *em_memoria(caminho_real, caminho_pred))]
+        for memoria in args.memoria:
+            resultados.append((f'blocos {memoria:g} MB', *em_blocos(caminho_real, caminho_pred, memoria)))
+
+        referencia = resultados[0][3]
+        print(f'\n{"modo":>16} {"tempo (s)":>10} {"pico RSS (MB)":>14}')
+        for modo, tempo, pico, metricas in resultados:
+            # Mesmas chaves e mesmas métricas de erro (as de posição vêm dos sketches)
+            assert metricas.keys() == referencia.keys()
+            for nome in ('mse', 'rmse', 'mae', 'mre', 'mape', 'evs', 'r_squared'):
+                np.testing.assert_allclose(metricas[nome], referencia[nome], rtol=1e-9, err_msg=nome)
+            print(f'{modo:>16} {tempo:>10.2f} {pico:>14.0f}')
+
+
+if __name__ == '__main__':
+    main()
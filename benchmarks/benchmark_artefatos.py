@@ -0,0 +1,87 @@
+"""
+Benchmark da listagem de execuções do painel (consultar_modelos_*) com os
+arrays grandes na própria tabela de execuções e depois de movidos para a
+tabela ARTEFATOS (migração 3 de esquema.py).
+
+Execução (a partir da raiz do repositório):
+    python benchmarks/benchmark_artefatos.py --linhas 1000 5000
+"""
+import argparse
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from esquema import MIGRACOES, migrar  # noqa: E402
+from serializacao import codificar_array  # noqa: E402
+
+
+LISTAGEM = 'SELECT id, id_commit, controle_de_versao, data, hora FROM REGRESSAO ORDER BY id'
+
+
+def criar_banco_versao_2(caminho, linhas, tamanho_array):
+    """
+    Cria a tabela REGRESSAO no esquema da versão 2 (y_test e y_pred na própria tabela).
+    """
+    conn = sqlite3.connect(caminho)
+    conn.execute('''
+        CREATE TABLE REGRESSAO (id INTEGER, id_commit TEXT, controle_de_versao TEXT,
+                                data DATETIME, hora DATETIME, dados TEXT, y_test BLOB, y_pred BLOB)
+    ''')
+    rng = np.random.default_rng(0)
+    array = codificar_array(rng.normal(size=tamanho_array))
+    with conn:
+        conn.executemany('INSERT INTO REGRESSAO VALUES (?, ?, ?, ?, ?, ?, ?, ?)', (
+            (i, f'commit_{i % 100}', f'versao_{i % 7}', '01/01/2024', '00:00:00',
+             '{"mse": 0.1}', array, array)
+            for i in range(linhas)))
+
+    conn.execute('BEGIN')
+    for numero, migracao in MIGRACOES:
+        if numero <= 2:
+            migracao(conn, 'REGRESSAO')
+    conn.execute('PRAGMA user_version = 2')
+    conn.commit()
+    conn.close()
+
+
+def medir(caminho, repeticoes):
+    # Como no painel, cada listagem abre a sua própria conexão (cache frio)
+    inicio = time.perf_counter()
+    for _ in range(repeticoes):
+        conn = sqlite3.connect(caminho)
+        conn.execute(LISTAGEM).fetchall()
+        conn.close()
+    return 1000 * (time.perf_counter() - inicio) / repeticoes
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--linhas', type=int, nargs='+', default=[1000, 5000])
+    parser.add_argument('--repeticoes', type=int, default=20)
+    parser.add_argument('--tamanho-array', type=int, default=2000)
+    args = parser.parse_args()
+
+    print(f'{"linhas":>8s} {"arrays na tabela (ms)":>22s} {"ARTEFATOS (ms)":>16s} {"ganho":>8s}')
+    for linhas in args.linhas:
+        with tempfile.TemporaryDirectory() as pasta:
+            caminho = os.path.join(pasta, 'regressao.db')
+            criar_banco_versao_2(caminho, linhas, args.tamanho_array)
+            antes = medir(caminho, args.repeticoes)
+
+            conn = sqlite3.connect(caminho)
+            migrar(conn, 'REGRESSAO')
+            conn.close()
+
+            depois = medir(caminho, args.repeticoes)
+
+        print(f'{linhas:8d} {antes:22.3f} {depois:16.3f} {antes / depois:7.1f}x')
+
+
+if __name__ == '__main__':
+    main()
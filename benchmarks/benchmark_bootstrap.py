@@ -0,0 +1,75 @@
+"""
+Benchmark dos intervalos bootstrap: reamostragem ingênua (cópia de y_real[idx] e
+y_pred[idx] e cálculo das métricas a cada reamostragem) x contagens por bincount e
+produto matriz-vetor (bootstrap.py), no próprio processo e em um ProcessPoolExecutor.
+
+A versão ingênua roda só `--amostra-ingenua` reamostragens e o tempo é projetado
+para o total. Também confere que o resultado não depende do número de processos.
+
+Execução (a partir da raiz do repositório):
+    python benchmarks/benchmark_bootstrap.py --amostras 1000000 --reamostragens 1000 --processos 1 8
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from bootstrap import bootstrap_classificacao, bootstrap_regressao  # noqa: E402
+from classificacao import Classification  # noqa: E402
+from residuos import metricas_residuos  # noqa: E402
+
+
+def ingenuo(y_real, y_pred, reamostragens, metricas):
+    rng = np.random.default_rng(0)
+    for _ in range(reamostragens):
+        indices = rng.integers(0, len(y_real), len(y_real))
+        metricas(y_real[indices], y_pred[indices])
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--amostras', type=int, nargs='+', default=[100_000, 1_000_000])
+    parser.add_argument('--reamostragens', type=int, default=1000)
+    parser.add_argument('--processos', type=int, nargs='+', default=[1, os.cpu_count() or 1])
+    parser.add_argument('--amostra-ingenua', type=int, default=20)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(42)
+
+    print(f'{"tipo":>14} {"amostras":>9} {"ingênuo (s)":>12} {"processos":>10} {"vetorizado (s)":>15} {"ganho":>7}')
+    for amostras in args.amostras:
+        y_real = rng.normal(10, 3, amostras)
+        y_pred = y_real + rng.normal(0, 1, amostras)
+        rotulos = rng.integers(0, 2, amostras)
+        previstos = np.where(rng.random(amostras) < 0.8, rotulos, 1 - rotulos)
+
+        casos = [
+            ('Regressao', bootstrap_regressao, y_real, y_pred, metricas_residuos),
+            ('Classificacao', bootstrap_classificacao, rotulos, previstos, Classification),
+        ]
+        for tipo, funcao, real, previsto, metricas in casos:
+            inicio = time.perf_counter()
+            ingenuo(real, previsto, args.amostra_ingenua, metricas)
+            tempo_ingenuo = (time.perf_counter() - inicio) * args.reamostragens / args.amostra_ingenua
+
+            referencia = None
+            for processos in args.processos:
+                inicio = time.perf_counter()
+                intervalos = funcao(real, previsto, args.reamostragens, max_workers=processos)
+                tempo = time.perf_counter() - inicio
+
+                # Mesma semente, mesmos intervalos com qualquer número de processos
+                if referencia is None:
+                    referencia = intervalos
+                assert intervalos == referencia
+
+                print(f'{tipo:>14} {amostras:>9} {tempo_ingenuo:>12.1f} {processos:>10} {tempo:>15.2f} '
+                      f'{tempo_ingenuo / tempo:>6.1f}x')
+
+
+if __name__ == '__main__':
+    main()
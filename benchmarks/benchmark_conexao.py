@@ -0,0 +1,91 @@
+"""
+Benchmark do salvamento de relatórios: conexão aberta a cada salvamento
+(comportamento antigo) x conexão persistente do GerenciadorConexao.
+
+Execução (a partir da raiz do repositório):
+    python benchmarks/benchmark_conexao.py --execucoes 500
+"""
+import argparse
+import json
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from experiment_logger import ExperimentLogger  # noqa: E402
+from identificadores import gerar_id_execucao  # noqa: E402
+
+
+COLUNAS = ["id_commit", "controle_de_versao", "data", "hora", "dados", "y_test", "y_pred"]
+
+
+def salvar_conexao_por_execucao(caminho, dados, y_test, y_pred):
+    """
+    Reproduz o caminho antigo: connect, sqlite_master, um PRAGMA por coluna, insert, commit e close.
+    """
+    conn = sqlite3.connect(caminho)
+    cursor = conn.cursor()
+    cursor.execute(
+        "SELECT name FROM sqlite_master WHERE type='table' AND name='REGRESSAO'")
+    if cursor.fetchone() is None:
+        cursor.execute('''
+            CREATE TABLE REGRESSAO (id INTEGER, id_commit TEXT, controle_de_versao TEXT,
+                                    data DATETIME, hora DATETIME, dados TEXT, y_test TEXT, y_pred TEXT)
+        ''')
+    else:
+        for coluna in COLUNAS:
+            cursor.execute("PRAGMA table_info(REGRESSAO)")
+            coluna in [info[1] for info in cursor.fetchall()]
+    cursor.execute('INSERT INTO REGRESSAO VALUES (?, ?, ?, ?, ?, ?, ?, ?)', (
+        1, 'benchmark', 'v1', '01/01/2024', '00:00:00', dados,
+        json.dumps(y_test.tolist()), json.dumps(y_pred.tolist())))
+    conn.commit()
+    conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--execucoes', type=int, default=500)
+    parser.add_argument('--amostras', type=int, default=100)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(42)
+    y_test = rng.normal(size=args.amostras)
+    y_pred = y_test + rng.normal(scale=0.1, size=args.amostras)
+
+    with tempfile.TemporaryDirectory() as pasta:
+        caminho_banco = os.path.join(pasta, 'experimentos.db')
+
+        logger = ExperimentLogger('Regressao', caminho_banco=caminho_banco)
+        logger.preparar_modelo(y_real=y_test, y_pred=y_pred)
+        dados = json.dumps({k: float(np.ravel(v)[0]) for k, v in logger.modelo.metricas_regressao.items()})
+
+        # Comportamento antigo (journal em modo DELETE, conexão por salvamento)
+        caminho_antigo = os.path.join(pasta, 'antigo.db')
+        inicio = time.perf_counter()
+        for _ in range(args.execucoes):
+            salvar_conexao_por_execucao(caminho_antigo, dados, y_test, y_pred)
+        tempo_antigo = time.perf_counter() - inicio
+
+        # Conexão persistente em modo WAL
+        inicio = time.perf_counter()
+        for _ in range(args.execucoes):
+            logger.sqlite_regression(gerar_id_execucao(), 'benchmark', 'v1')
+        tempo_novo = time.perf_counter() - inicio
+
+        logger.fechar()
+        assert os.path.exists(caminho_banco)
+
+    print(f'Execuções: {args.execucoes} | amostras por execução: {args.amostras}')
+    print(f'Conexão por salvamento: {args.execucoes / tempo_antigo:10.1f} execuções/s')
+    print(f'Conexão persistente:    {args.execucoes / tempo_novo:10.1f} execuções/s')
+    print(f'Ganho: {tempo_antigo / tempo_novo:.1f}x')
+
+
+if __name__ == '__main__':
+    main()
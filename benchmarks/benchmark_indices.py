@@ -0,0 +1,89 @@
+"""
+Benchmark das consultas do painel antes e depois da migração de esquema
+(chave primária + índices em id, id_commit, controle_de_versao e criado_em).
+
+Execução (a partir da raiz do repositório):
+    python benchmarks/benchmark_indices.py --linhas 10000 100000
+"""
+import argparse
+import json
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from esquema import migrar  # noqa: E402
+
+
+CONSULTAS = {
+    'id = ?': ('SELECT dados FROM REGRESSAO WHERE id = ?', lambda i: (i,)),
+    'id_commit = ?': ('SELECT dados FROM REGRESSAO WHERE id_commit = ?', lambda i: (f'commit_{i % 1000}',)),
+    'id_commit + controle_de_versao': (
+        'SELECT dados FROM REGRESSAO WHERE id_commit = ? AND controle_de_versao = ?',
+        lambda i: (f'commit_{i % 1000}', f'versao_{i % 7}')),
+}
+
+
+def criar_banco_antigo(caminho, linhas, tamanho_array):
+    """
+    Cria a tabela REGRESSAO no formato antigo (sem chave primária e sem índices).
+    """
+    conn = sqlite3.connect(caminho)
+    conn.execute('''
+        CREATE TABLE REGRESSAO (id INTEGER, id_commit TEXT, controle_de_versao TEXT,
+                                data DATETIME, hora DATETIME, dados TEXT, y_test TEXT, y_pred TEXT)
+    ''')
+    rng = np.random.default_rng(0)
+    arrays = json.dumps(rng.normal(size=tamanho_array).tolist())
+    dados = json.dumps({'mse': 0.1, 'mae': 0.2})
+    with conn:
+        conn.executemany('INSERT INTO REGRESSAO VALUES (?, ?, ?, ?, ?, ?, ?, ?)', (
+            (i, f'commit_{i % 1000}', f'versao_{i % 7}', '01/01/2024', '00:00:00', dados, arrays, arrays)
+            for i in range(linhas)))
+    return conn
+
+
+def medir(conn, repeticoes, linhas):
+    rng = np.random.default_rng(1)
+    chaves = rng.integers(0, linhas, size=repeticoes)
+    tempos = {}
+    for nome, (sql, parametros) in CONSULTAS.items():
+        inicio = time.perf_counter()
+        for i in chaves:
+            conn.execute(sql, parametros(int(i))).fetchall()
+        tempos[nome] = 1000 * (time.perf_counter() - inicio) / repeticoes
+    return tempos
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--linhas', type=int, nargs='+', default=[10000, 100000])
+    parser.add_argument('--repeticoes', type=int, default=50)
+    parser.add_argument('--tamanho-array', type=int, default=100)
+    args = parser.parse_args()
+
+    for linhas in args.linhas:
+        with tempfile.TemporaryDirectory() as pasta:
+            conn = criar_banco_antigo(os.path.join(pasta, 'regressao.db'), linhas, args.tamanho_array)
+            antes = medir(conn, args.repeticoes, linhas)
+
+            inicio = time.perf_counter()
+            migrar(conn, 'REGRESSAO')
+            tempo_migracao = time.perf_counter() - inicio
+
+            depois = medir(conn, args.repeticoes, linhas)
+            conn.close()
+
+        print(f'\n{linhas} linhas (migração: {tempo_migracao:.2f} s)')
+        print(f'{"consulta":35s} {"antes (ms)":>12s} {"depois (ms)":>12s} {"ganho":>8s}')
+        for nome in CONSULTAS:
+            print(f'{nome:35s} {antes[nome]:12.3f} {depois[nome]:12.3f} {antes[nome] / depois[nome]:7.1f}x')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,68 @@
+"""
+Benchmark das curvas de limiar: roc_curve + precision_recall_curve +
+average_precision_score do scikit-learn (três ordenações dos scores) x
+varredura_limiares (uma ordenação e somas acumuladas, ver limiares.py) x modo
+histograma (O(n), sem ordenar).
+
+Confere que a varredura exata produz as mesmas curvas do scikit-learn e mostra a
+diferença de AUC do modo histograma.
+
+Execução (a partir da raiz do repositório):
+    python benchmarks/benchmark_limiares.py --amostras 1000000 10000000 --bins 1000
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+from sklearn.metrics import average_precision_score, precision_recall_curve, roc_curve
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from limiares import varredura_limiares  # noqa: E402
+
+
+def cronometrar(funcao, *args, **kwargs):
+    inicio = time.perf_counter()
+    resultado = funcao(*args, **kwargs)
+    return time.perf_counter() - inicio, resultado
+
+
+def curvas_sklearn(y_real, scores):
+    fpr, tpr, thresholds_roc = roc_curve(y_real, scores)
+    precision, recall, thresholds = precision_recall_curve(y_real, scores)
+    avg_precision = average_precision_score(y_real, scores)
+    return {'fpr': fpr, 'tpr': tpr, 'thresholds_roc': thresholds_roc, 'precision': precision,
+            'recall': recall, 'thresholds': thresholds, 'avg_precision': avg_precision}
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--amostras', type=int, nargs='+', default=[1_000_000, 10_000_000])
+    parser.add_argument('--bins', type=int, default=1000)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(42)
+
+    print(f'{"amostras":>11} {"sklearn (s)":>12} {"exata (s)":>10} {"ganho":>7} '
+          f'{"histograma (s)":>15} {"ganho":>7} {"erro AUC":>10}')
+    for amostras in args.amostras:
+        y_real = rng.integers(0, 2, amostras)
+        scores = np.clip(rng.normal(0.4 + 0.2 * y_real, 0.2), 0, 1)
+
+        tempo_sklearn, referencia = cronometrar(curvas_sklearn, y_real, scores)
+        tempo_exata, exata = cronometrar(varredura_limiares, y_real, scores)
+        tempo_histograma, histograma = cronometrar(varredura_limiares, y_real, scores, bins=args.bins)
+
+        # Mesmas curvas do scikit-learn
+        for nome, valor in referencia.items():
+            np.testing.assert_allclose(exata[nome], valor, rtol=1e-9, err_msg=nome)
+
+        print(f'{amostras:>11} {tempo_sklearn:>12.3f} {tempo_exata:>10.3f} {tempo_sklearn / tempo_exata:>6.1f}x '
+              f'{tempo_histograma:>15.3f} {tempo_sklearn / tempo_histograma:>6.1f}x '
+              f'{abs(histograma["auc_roc"] - exata["auc_roc"]):>10.2e}')
+
+
+if __name__ == '__main__':
+    main()
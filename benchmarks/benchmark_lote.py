@@ -0,0 +1,76 @@
+"""
+Benchmark da avaliação de vários modelos sobre o mesmo y_real: um
+Regression/Classification por modelo x avaliação em lote de uma matriz de
+previsões (n_modelos, n_amostras) com Regression.avaliar_lote e
+Classification.avaliar_lote.
+
+Também confere que as duas abordagens produzem os mesmos valores.
+
+Execução (a partir da raiz do repositório):
+    python benchmarks/benchmark_lote.py --modelos 10 100 --amostras 100000
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from classificacao import Classification  # noqa: E402
+from regressao import Regression  # noqa: E402
+
+
+def cronometrar(funcao, *args):
+    inicio = time.perf_counter()
+    resultado = funcao(*args)
+    return time.perf_counter() - inicio, resultado
+
+
+def individual(classe, y_real, y_pred):
+    return [classe(y_real, previsao) for previsao in y_pred]
+
+
+def conferir(individuais, lote, atributo):
+    for modelo, modelo_lote in zip(individuais, lote):
+        for nome, valor in getattr(modelo, atributo).items():
+            np.testing.assert_allclose(getattr(modelo_lote, atributo)[nome], valor, rtol=1e-9, err_msg=nome)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--modelos', type=int, nargs='+', default=[10, 100])
+    parser.add_argument('--amostras', type=int, nargs='+', default=[100_000])
+    parser.add_argument('--classes', type=int, default=5)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(42)
+
+    print(f'{"tipo":>14} {"modelos":>8} {"amostras":>9} {"individual (s)":>15} {"lote (s)":>9} {"ganho":>7}')
+    for amostras in args.amostras:
+        for modelos in args.modelos:
+            # Regressão: previsões com ruídos de intensidades diferentes
+            y_real = rng.normal(10, 3, amostras)
+            y_pred = y_real + rng.normal(0, 1, (modelos, amostras)) * rng.random((modelos, 1))
+
+            tempo_individual, individuais = cronometrar(individual, Regression, y_real, y_pred)
+            tempo_lote, lote = cronometrar(Regression.avaliar_lote, y_real, y_pred)
+            conferir(individuais, lote, 'metricas_regressao')
+            print(f'{"Regressao":>14} {modelos:>8} {amostras:>9} {tempo_individual:>15.3f} {tempo_lote:>9.3f} '
+                  f'{tempo_individual / tempo_lote:>6.1f}x')
+
+            # Classificação: 70% de acertos
+            y_real = rng.integers(0, args.classes, amostras)
+            y_pred = np.where(rng.random((modelos, amostras)) < 0.7, y_real,
+                              rng.integers(0, args.classes, (modelos, amostras)))
+
+            tempo_individual, individuais = cronometrar(individual, Classification, y_real, y_pred)
+            tempo_lote, lote = cronometrar(Classification.avaliar_lote, y_real, y_pred)
+            conferir(individuais, lote, 'classification_result')
+            print(f'{"Classificacao":>14} {modelos:>8} {amostras:>9} {tempo_individual:>15.3f} {tempo_lote:>9.3f} '
+                  f'{tempo_individual / tempo_lote:>6.1f}x')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,106 @@
+"""
+Benchmark das métricas de classificação: chamadas separadas do scikit-learn
+(comportamento antigo: confusion_matrix + accuracy_score + nove variantes de
+precision/recall/f1) x matriz de confusão única com bincount (matriz_confusao.py).
+
+Também confere que as duas abordagens produzem os mesmos valores.
+
+Execução (a partir da raiz do repositório):
+    python benchmarks/benchmark_matriz_confusao.py --amostras 100000 1000000 10000000
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+from sklearn.metrics import confusion_matrix, accuracy_score, precision_score, recall_score, f1_score
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from matriz_confusao import matriz_confusao, metricas_matriz_confusao  # noqa: E402
+
+
+def metricas_sklearn(y_real, y_pred):
+    """
+    Reproduz o caminho antigo de Classification.calculo_metricas_classificacao.
+    """
+    cm = confusion_matrix(y_real, y_pred)
+    binario = len(np.unique(y_real)) == 2
+    metricas = {
+        'cm': cm,
+        'acuracia': accuracy_score(y_real, y_pred),
+        'precision': precision_score(y_real, y_pred, average='binary' if binario else 'macro'),
+        'recall': recall_score(y_real, y_pred, average='binary' if binario else 'macro'),
+        'f1': f1_score(y_real, y_pred, average='binary' if binario else 'macro'),
+    }
+    for media, nome in [('macro', 'macro'), ('micro', 'micro'), ('weighted', 'ponderada')]:
+        metricas[f'precision_{nome}'] = precision_score(y_real, y_pred, average=media)
+        metricas[f'recall_{nome}'] = recall_score(y_real, y_pred, average=media)
+        metricas[f'f1_{nome}'] = f1_score(y_real, y_pred, average=media)
+    return metricas
+
+
+def metricas_bincount(y_real, y_pred):
+    cm, rotulos = matriz_confusao(y_real, y_pred)
+    resultado = metricas_matriz_confusao(cm, rotulos)
+    binario = np.count_nonzero(resultado['suporte']) == 2
+    resultado['cm'] = cm
+    for nome in ['precision', 'recall', 'f1']:
+        resultado[nome] = resultado[f'{nome}_binaria' if binario else f'{nome}_macro']
+    return resultado
+
+
+def gerar(rng, amostras, classes, tipo):
+    y_real = rng.integers(0, classes, amostras)
+    # 80% de acertos, erros distribuídos entre as demais classes
+    y_pred = np.where(rng.random(amostras) < 0.8, y_real, rng.integers(0, classes, amostras))
+    if tipo == 'str':
+        nomes = np.array([f'classe_{i:03d}' for i in range(classes)])
+        return nomes[y_real], nomes[y_pred]
+    return y_real, y_pred
+
+
+def cronometrar(funcao, *args, repeticoes=3):
+    melhor = float('inf')
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        resultado = funcao(*args)
+        melhor = min(melhor, time.perf_counter() - inicio)
+    return melhor, resultado
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--amostras', type=int, nargs='+', default=[100_000, 1_000_000])
+    parser.add_argument('--classes', type=int, nargs='+', default=[2, 10, 200])
+    parser.add_argument('--repeticoes', type=int, default=3)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(42)
+
+    print(f'{"amostras":>10} {"classes":>8} {"rótulos":>8} {"sklearn (s)":>12} {"bincount (s)":>13} {"ganho":>7}')
+    for amostras in args.amostras:
+        for classes in args.classes:
+            for tipo in ['int', 'str']:
+                if tipo == 'str' and classes == 2:
+                    # A média binária exige a classe positiva 1
+                    continue
+
+                y_real, y_pred = gerar(rng, amostras, classes, tipo)
+
+                tempo_antigo, antigo = cronometrar(metricas_sklearn, y_real, y_pred, repeticoes=args.repeticoes)
+                tempo_novo, novo = cronometrar(metricas_bincount, y_real, y_pred, repeticoes=args.repeticoes)
+
+                # Os dois caminhos devem produzir os mesmos números
+                np.testing.assert_array_equal(antigo['cm'], novo['cm'])
+                for nome, valor in antigo.items():
+                    if nome != 'cm':
+                        np.testing.assert_allclose(novo[nome], valor, rtol=1e-12, atol=1e-15, err_msg=nome)
+
+                print(f'{amostras:>10} {classes:>8} {tipo:>8} {tempo_antigo:>12.4f} {tempo_novo:>13.4f} '
+                      f'{tempo_antigo / tempo_novo:>6.1f}x')
+
+
+if __name__ == '__main__':
+    main()
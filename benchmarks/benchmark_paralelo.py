@@ -0,0 +1,97 @@
+"""
+Benchmark do cálculo paralelo das métricas (paralelo.py): Regression e
+Classification serial (threads=1) x o mesmo cálculo por faixas em 1, 2, 4, ...
+threads, com o resumo exato (estatísticas de ordem pela ordenação paralela).
+
+Mostra o tempo, o ganho em relação ao serial e a eficiência (ganho por thread em
+relação ao modo paralelo com uma thread; 100% é o ganho linear) e confere que
+as estatísticas de ordem e a matriz de confusão são iguais às do cálculo serial
+e as somas e os momentos iguais a menos de arredondamento. Parte do ganho sobre
+o serial não depende das threads: a ordenação única substitui as ordenações
+separadas de np.median, np.percentile e scipy.stats.mode. O ganho das threads
+só aparece com núcleos livres: com mais threads que CPUs, o tempo fica próximo
+ao de uma thread.
+
+Execução (a partir da raiz do repositório):
+    python benchmarks/benchmark_paralelo.py --amostras 100000000 --threads 1 2 4 8 16
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from classificacao import Classification  # noqa: E402
+from paralelo import avaliar_classificacao_paralelo, avaliar_regressao_paralelo  # noqa: E402
+from regressao import Regression  # noqa: E402
+
+# Estatísticas que devem ser idênticas às do cálculo serial
+EXATAS = ('mediana', 'moda', 'Q1', 'Q2', 'Q3', 'Acuracia', 'VP', 'FP', 'FN', 'VN')
+
+
+def conferir(referencia, metricas):
+    assert metricas.keys() == referencia.keys()
+    for nome, valor in referencia.items():
+        if valor is None or isinstance(valor, str):
+            continue
+        if any(nome.startswith(prefixo) for prefixo in EXATAS):
+            assert np.array_equal(metricas[nome], valor, equal_nan=True), nome
+        else:
+            np.testing.assert_allclose(metricas[nome], valor, rtol=1e-9, atol=1e-12, err_msg=nome)
+
+
+def medir(funcao):
+    inicio = time.perf_counter()
+    resultado = funcao()
+    return time.perf_counter() - inicio, resultado
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--amostras', type=int, default=20_000_000)
+    parser.add_argument('--threads', type=int, nargs='+', default=[1, 2, 4, 8, 16])
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(42)
+    n = args.amostras
+    y_real = rng.normal(100, 20, n)
+    y_pred = y_real + rng.normal(0, 5, n)
+    rotulos = rng.integers(0, 2, n)
+    previstos = np.where(rng.random(n) < 0.8, rotulos, 1 - rotulos)
+    del rng
+
+    def regressao_paralela(threads):
+        metricas, resumo, _ = avaliar_regressao_paralelo(y_real, y_pred, threads)
+        return {**metricas, **resumo}
+
+    def classificacao_paralela(threads):
+        (cm, classes), resumo, _ = avaliar_classificacao_paralelo(rotulos, previstos, threads)
+        metricas, _, _ = Classification.metricas_da_matriz(cm, classes)
+        return {**metricas, **resumo}
+
+    casos = [
+        ('Regressao', lambda: Regression(y_real, y_pred).metricas_regressao, regressao_paralela),
+        ('Classificacao', lambda: Classification(rotulos, previstos).metricas_classificacao,
+         classificacao_paralela),
+    ]
+
+    print(f'CPUs: {os.cpu_count()}, amostras: {n}')
+    print(f'{"tipo":>14} {"threads":>8} {"tempo (s)":>10} {"ganho":>7} {"eficiência":>11}')
+    for tipo, serial, paralelo in casos:
+        tempo_serial, referencia = medir(serial)
+        print(f'{tipo:>14} {"serial":>8} {tempo_serial:>10.2f} {1:>6.1f}x {"":>11}')
+
+        tempo_uma = None
+        for threads in args.threads:
+            tempo, metricas = medir(lambda: paralelo(threads))
+            conferir(referencia, metricas)
+            tempo_uma = tempo_uma or tempo
+            print(f'{tipo:>14} {threads:>8} {tempo:>10.2f} {tempo_serial / tempo:>6.1f}x '
+                  f'{tempo_uma / tempo / threads:>10.0%}')
+
+
+if __name__ == '__main__':
+    main()
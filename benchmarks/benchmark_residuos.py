@@ -0,0 +1,94 @@
+"""
+Benchmark das métricas de regressão: cálculo antigo de Regression (o resíduo
+`y_real - y_pred` recalculado em cada métrica, com um array temporário por
+operação) x resíduos calculados uma única vez em buffers reaproveitados
+(residuos.py), em float64 e float32.
+
+Mede o tempo e o pico de memória alocada pelo numpy durante o cálculo (com
+tracemalloc, sem contar os arrays de entrada) e confere que os valores são os mesmos.
+
+Execução (a partir da raiz do repositório):
+    python benchmarks/benchmark_residuos.py --amostras 1000000 10000000 100000000
+"""
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from residuos import metricas_residuos  # noqa: E402
+
+
+def metricas_antigas(y_real, y_pred):
+    """
+    Reproduz o cálculo antigo de Regression._calculo_metricas_regressao.
+    """
+    mse = np.mean((y_real - y_pred) ** 2)
+    rmse = np.sqrt(np.mean((y_real - y_pred) ** 2))
+    mae = np.mean(np.abs(y_real - y_pred))
+    mre = np.mean(np.abs((y_real - y_pred) / (y_real + 1e-10))) * 100
+    mape = np.mean(np.abs((y_real - y_pred) / (y_real + 1e-10))) * 100
+    mean_y_real = np.mean(y_real)
+    total_variance = np.sum((y_real - mean_y_real) ** 2)
+    error_variance = np.sum((y_real - y_pred) ** 2)
+    evs = 1 - (error_variance / total_variance)
+    sst = np.sum((y_real - mean_y_real) ** 2)
+    sse = np.sum((y_real - y_pred) ** 2)
+    r_squared = 1 - (sse / sst)
+    return {'mse': mse, 'rmse': rmse, 'mae': mae, 'mre': mre, 'mape': mape,
+            'evs': evs, 'r_squared': r_squared}
+
+
+def medir(funcao, *args, repeticoes=3):
+    """
+    Retorna (melhor tempo, pico de memória alocada em MB, resultado).
+    """
+    melhor = float('inf')
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        resultado = funcao(*args)
+        melhor = min(melhor, time.perf_counter() - inicio)
+
+    tracemalloc.start()
+    funcao(*args)
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return melhor, pico / 2 ** 20, resultado
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--amostras', type=int, nargs='+', default=[1_000_000, 10_000_000])
+    parser.add_argument('--repeticoes', type=int, default=3)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(42)
+
+    print(f'{"amostras":>11} {"cálculo":>16} {"tempo (s)":>10} {"pico (MB)":>10} {"ganho":>7}')
+    for amostras in args.amostras:
+        y_real = rng.normal(100, 20, amostras)
+        y_pred = y_real + rng.normal(0, 5, amostras)
+
+        tempo_antigo, pico_antigo, antigo = medir(
+            metricas_antigas, y_real, y_pred, repeticoes=args.repeticoes)
+        print(f'{amostras:>11} {"antigo":>16} {tempo_antigo:>10.4f} {pico_antigo:>10.1f} {"":>7}')
+
+        for dtype, tolerancia in [(np.float64, 1e-9), (np.float32, 1e-5)]:
+            tempo, pico, novo = medir(
+                metricas_residuos, y_real, y_pred, dtype, repeticoes=args.repeticoes)
+
+            # Mesmos valores do cálculo antigo (float32 dentro da precisão do tipo)
+            for nome, valor in antigo.items():
+                np.testing.assert_allclose(novo[nome], valor, rtol=tolerancia, err_msg=nome)
+
+            nome_calculo = f'resíduos {np.dtype(dtype).name}'
+            print(f'{amostras:>11} {nome_calculo:>16} {tempo:>10.4f} {pico:>10.1f} '
+                  f'{tempo_antigo / tempo:>6.1f}x')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,99 @@
+"""
+Benchmark do modo painel de séries temporais (ver series_painel.py): métricas de
+todas as séries com PainelSeries (bincount sobre o código da série) x um
+Series_Temporais por série (groupby com laço em Python), e a gravação de uma
+execução com os blocos colunares x a leitura de uma série pelo painel.
+
+Confere que as métricas por série são as mesmas e mostra o tamanho do banco.
+O laço por série só é medido em parte das séries (ver --laco) e extrapolado.
+
+Execução (a partir da raiz do repositório):
+    python benchmarks/benchmark_series_painel.py --series 20000 --pontos 100
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'painel')))
+
+from conexao_com_banco import Consulta  # noqa: E402
+from experiment_logger import ExperimentLogger  # noqa: E402
+from series_painel import PainelSeries  # noqa: E402
+from series_temporais import Series_Temporais  # noqa: E402
+
+METRICAS = ('mae', 'rmse', 'mase', 'smape', 'wape', 'vies')
+
+
+def gerar_painel(series, pontos):
+    rng = np.random.default_rng(42)
+    y_real = rng.gamma(2, 10, series * pontos)
+    dados = pd.DataFrame({
+        'series_id': np.repeat([f'SKU{i:06d}' for i in range(series)], pontos),
+        'timestamp': np.tile(pd.date_range('2024-01-01', periods=pontos, freq='D').values, series),
+        'y_real': y_real,
+        'y_pred': y_real + rng.normal(0, 3, len(y_real)),
+    })
+    # Linhas fora de ordem, como em uma saída de previsão em lote
+    return dados.sample(frac=1, random_state=1, ignore_index=True)
+
+
+def laco(dados, sazonalidade):
+    return pd.DataFrame({
+        serie: Series_Temporais(grupo['y_real'].to_numpy(), grupo['y_pred'].to_numpy(),
+                                sazonalidade=sazonalidade).metricas_series
+        for serie, grupo in dados.sort_values('timestamp').groupby('series_id')}).T
+
+
+def medir(funcao, *argumentos):
+    inicio = time.perf_counter()
+    resultado = funcao(*argumentos)
+    return time.perf_counter() - inicio, resultado
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--series', type=int, default=20_000)
+    parser.add_argument('--pontos', type=int, default=100)
+    parser.add_argument('--sazonalidade', type=int, default=7)
+    parser.add_argument('--laco', type=int, default=1000, help='Séries avaliadas no laço (extrapolado)')
+    args = parser.parse_args()
+
+    dados = gerar_painel(args.series, args.pontos)
+    print(f'séries: {args.series}, pontos por série: {args.pontos}')
+
+    tempo, painel = medir(PainelSeries, dados, 'series_id', 'timestamp', 'y_real', 'y_pred', args.sazonalidade)
+    print(f'{"PainelSeries":>28} {tempo:>8.2f} s')
+
+    amostra = dados[dados['series_id'].isin(painel.series[:args.laco])]
+    tempo, referencia = medir(laco, amostra, args.sazonalidade)
+    print(f'{"laço (estimado)":>28} {tempo * args.series / args.laco:>8.2f} s')
+    tabela = painel.tabela_series()
+    for nome in METRICAS:
+        np.testing.assert_allclose(tabela[nome].to_numpy()[:args.laco], referencia[nome].to_numpy(dtype=float),
+                                   rtol=1e-9, err_msg=nome)
+
+    with tempfile.TemporaryDirectory() as diretorio:
+        caminho = os.path.join(diretorio, 'experimentos.db')
+        logger = ExperimentLogger('Series_Temporais', caminho_banco=caminho)
+        logger.modelo = painel
+        tempo, _ = medir(logger.salvando_relatorio, 'painel', 'benchmark')
+        print(f'{"gravação (blocos colunares)":>28} {tempo:>8.2f} s, '
+              f'banco {os.path.getsize(caminho) / 2 ** 20:.1f} MB')
+
+        consulta = Consulta(caminho)
+        tempo, _ = medir(consulta.consultar_series_painel_st, logger.id_execucao)
+        print(f'{"métricas de todas as séries":>28} {tempo * 1000:>8.1f} ms')
+        tempo, serie = medir(consulta.consultar_serie_painel_st, logger.id_execucao, painel.series[-1])
+        assert len(serie) == args.pontos
+        print(f'{"leitura de uma série":>28} {tempo * 1000:>8.1f} ms')
+        logger.fechar()
+
+
+if __name__ == '__main__':
+    main()
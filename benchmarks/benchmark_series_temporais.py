@@ -0,0 +1,73 @@
+"""
+Benchmark dos erros em janelas móveis de Series_Temporais (ver series_temporais.py):
+média por somas acumuladas em blocos x laço em Python sobre as janelas x
+pandas.Series.rolling x sliding_window_view (soma de cada janela, O(n * janela)).
+
+Mostra o tempo de cada modo por tamanho de janela e confere que as médias são
+as mesmas (o laço em Python só é medido com séries pequenas, ver --laco).
+
+Execução (a partir da raiz do repositório):
+    python benchmarks/benchmark_series_temporais.py --pontos 10000000 --janelas 7 30 365
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from series_temporais import media_janela  # noqa: E402
+
+
+def laco(valores, janela):
+    return np.array([np.mean(valores[inicio:inicio + janela])
+                     for inicio in range(len(valores) - janela + 1)])
+
+
+def rolling(valores, janela):
+    return pd.Series(valores).rolling(janela).mean().to_numpy()[janela - 1:]
+
+
+def strided(valores, janela):
+    return sliding_window_view(valores, janela).mean(axis=1)
+
+
+def medir(funcao, *argumentos):
+    inicio = time.perf_counter()
+    resultado = funcao(*argumentos)
+    return time.perf_counter() - inicio, resultado
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--pontos', type=int, default=2_000_000)
+    parser.add_argument('--janelas', type=int, nargs='+', default=[7, 30, 365])
+    parser.add_argument('--laco', type=int, default=200_000,
+                        help='Pontos usados no laço em Python (extrapolado para --pontos)')
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(42)
+    erros = np.abs(rng.normal(0, 5, args.pontos))
+
+    print(f'pontos: {args.pontos}')
+    print(f'{"janela":>7} {"modo":>20} {"tempo (s)":>10}')
+    for janela in args.janelas:
+        tempo, referencia = medir(media_janela, erros, janela)
+        print(f'{janela:>7} {"somas acumuladas":>20} {tempo:>10.3f}')
+
+        for nome, funcao in (('pandas rolling', rolling), ('sliding_window_view', strided)):
+            tempo, medias = medir(funcao, erros, janela)
+            np.testing.assert_allclose(medias, referencia, rtol=1e-9, err_msg=nome)
+            print(f'{janela:>7} {nome:>20} {tempo:>10.3f}')
+
+        tempo, medias = medir(laco, erros[:args.laco], janela)
+        np.testing.assert_allclose(medias, referencia[:len(medias)], rtol=1e-9, err_msg='laço')
+        print(f'{janela:>7} {"laço (estimado)":>20} {tempo * args.pontos / args.laco:>10.3f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,74 @@
+"""
+Benchmark do resumo estatístico: Statistic.summary exato (np.median,
+np.percentile e stats.mode sobre os arrays completos) x resumo aproximado em uma
+passagem com sketches de quantis KLL (erro_quantis, ver sketch_quantis.py).
+
+Também mede o maior erro de rank dos quantis aproximados (deve ficar próximo de
+`erro_quantis`) e o tamanho do sketch gravado com a execução.
+
+Execução (a partir da raiz do repositório):
+    python benchmarks/benchmark_sketch_quantis.py --amostras 1000000 10000000 --erros 0.01 0.001
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from estastistica import Statistic  # noqa: E402
+from serializacao import codificar_array  # noqa: E402
+
+
+def cronometrar(funcao, *args, repeticoes=3):
+    melhor = float('inf')
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        resultado = funcao(*args)
+        melhor = min(melhor, time.perf_counter() - inicio)
+    return melhor, resultado
+
+
+def erro_rank(valores_ordenados, sketch):
+    """
+    Maior diferença entre o quantil pedido e o rank real do valor retornado pelo sketch.
+    """
+    qs = np.linspace(0.01, 0.99, 99)
+    ranks = np.searchsorted(valores_ordenados, sketch.quantis(qs), side='right') / len(valores_ordenados)
+    return np.abs(ranks - qs).max()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--amostras', type=int, nargs='+', default=[100_000, 1_000_000, 10_000_000])
+    parser.add_argument('--erros', type=float, nargs='+', default=[0.01, 0.001])
+    parser.add_argument('--repeticoes', type=int, default=3)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(42)
+
+    print(f'{"amostras":>10} {"erro":>7} {"exato (s)":>10} {"sketch (s)":>11} {"ganho":>7} '
+          f'{"erro rank":>10} {"sketch (KB)":>12}')
+    for amostras in args.amostras:
+        y_real = rng.lognormal(3, 1, amostras)
+        y_pred = y_real + rng.normal(0, 2, amostras)
+        ordenados = np.sort(y_real)
+
+        tempo_exato, _ = cronometrar(
+            lambda: Statistic(y_real, y_pred).summary(), repeticoes=args.repeticoes)
+
+        for erro in args.erros:
+            estatistica = Statistic(y_real, y_pred, erro_quantis=erro)
+            tempo_sketch, _ = cronometrar(estatistica.summary, repeticoes=args.repeticoes)
+
+            sketch = estatistica.sketches['y_test']
+            tamanho = len(codificar_array(sketch.para_array())) / 1024
+
+            print(f'{amostras:>10} {erro:>7} {tempo_exato:>10.4f} {tempo_sketch:>11.4f} '
+                  f'{tempo_exato / tempo_sketch:>6.1f}x {erro_rank(ordenados, sketch):>10.4f} {tamanho:>12.1f}')
+
+
+if __name__ == '__main__':
+    main()
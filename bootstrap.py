@@ -0,0 +1,210 @@
+"""
+Intervalos de confiança bootstrap (percentil) das métricas de Regression e
+Classification.
+
+Cada reamostragem é uma linha de uma matriz de índices sorteados com reposição.
+Em vez de copiar os dados reamostrados, as reamostragens de um bloco são
+convertidas em contagens (quantas vezes cada amostra foi sorteada) com um único
+bincount, e as somas das reamostragens saem de uma multiplicação de matrizes:
+
+- regressão: contagens @ termos por amostra (erro quadrático, absoluto, relativo
+  e y_real centrado), dos quais derivam MSE, RMSE, MAE, MRE, MAPE, EVS e R²
+  (ver residuos.metricas_somas);
+- classificação: um bincount dos códigos `K * real + previsto` ponderado pelas
+  contagens, que dá a matriz de confusão de cada reamostragem, da qual derivam
+  todas as métricas globais (ver Classification.metricas_da_matriz).
+
+As reamostragens são divididas em tarefas de tamanho fixo, cada uma com a sua
+semente derivada de `semente` (np.random.SeedSequence.spawn); com muitas
+reamostragens, as tarefas rodam em um ProcessPoolExecutor. O resultado é o mesmo
+qualquer que seja o número de processos.
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from classificacao import Classification
+from matriz_confusao import codificar_rotulos
+from residuos import EPSILON_RELATIVO, metricas_somas
+
+
+# Método gravado na coluna `metodo` de INTERVALOS_METRICAS para os intervalos bootstrap
+METODO_BOOTSTRAP = 'bootstrap'
+
+# Índices sorteados por bloco (limita a memória da matriz de índices e das contagens)
+TAMANHO_BLOCO_BOOTSTRAP = 1 << 20
+
+# Reamostragens por tarefa (cada tarefa tem a sua semente)
+REAMOSTRAGENS_POR_TAREFA = 25
+
+# Abaixo deste total de índices sorteados (reamostragens * n), tudo roda no próprio processo
+LIMITE_PARALELO = 1 << 26
+
+# Dados compartilhados com os processos do pool (enviados uma vez por processo)
+_DADOS_PROCESSO = None
+
+
+def _contagens(rng, n, reamostragens):
+    """
+    Contagens (reamostragens, n) de cada amostra, a partir de uma matriz de índices.
+    """
+    indices = rng.integers(0, n, (reamostragens, n))
+    if reamostragens > 1:
+        # Um único bincount para o bloco: cada reamostragem ocupa a sua faixa de n posições
+        indices += (np.arange(reamostragens) * n)[:, None]
+    contagens = np.bincount(indices.ravel(), minlength=reamostragens * n)
+    return contagens.reshape(reamostragens, n).astype(np.float64)
+
+
+def _somas_tarefa(dados, semente, reamostragens):
+    """
+    Estatísticas suficientes de `reamostragens` reamostragens: somas dos termos
+    (regressão) ou matrizes de confusão achatadas (classificação).
+    """
+    rng = np.random.default_rng(semente)
+    n = dados['n']
+    bloco = max(1, TAMANHO_BLOCO_BOOTSTRAP // n)
+
+    resultados = []
+    for inicio in range(0, reamostragens, bloco):
+        quantidade = min(bloco, reamostragens - inicio)
+        contagens = _contagens(rng, n, quantidade)
+
+        if dados['tipo'] == 'Regressao':
+            # termos tem formato (k, n): k produtos matriz-vetor contíguos
+            resultados.append((dados['termos'] @ contagens.T).T)
+        else:
+            # Matriz de confusão de cada reamostragem: um bincount dos códigos deslocados
+            celulas = dados['celulas']
+            codigos = dados['codigos'] + (np.arange(quantidade) * celulas)[:, None]
+            matrizes = np.bincount(codigos.ravel(), weights=contagens.ravel(), minlength=quantidade * celulas)
+            resultados.append(matrizes.reshape(quantidade, celulas))
+    return np.concatenate(resultados)
+
+
+def _iniciar_processo(dados):
+    global _DADOS_PROCESSO
+    _DADOS_PROCESSO = dados
+
+
+def _tarefa_processo(semente, reamostragens):
+    return _somas_tarefa(_DADOS_PROCESSO, semente, reamostragens)
+
+
+def _reamostrar(dados, reamostragens, semente, max_workers):
+    """
+    Distribui as reamostragens em tarefas (no próprio processo ou em um pool).
+    """
+    tamanhos = [REAMOSTRAGENS_POR_TAREFA] * (reamostragens // REAMOSTRAGENS_POR_TAREFA)
+    if reamostragens % REAMOSTRAGENS_POR_TAREFA:
+        tamanhos.append(reamostragens % REAMOSTRAGENS_POR_TAREFA)
+    sementes = np.random.SeedSequence(semente).spawn(len(tamanhos))
+
+    if max_workers is None:
+        max_workers = os.cpu_count() or 1
+    max_workers = min(max_workers, len(tamanhos))
+
+    if max_workers <= 1 or reamostragens * dados['n'] < LIMITE_PARALELO:
+        return np.concatenate([_somas_tarefa(dados, s, t) for s, t in zip(sementes, tamanhos)])
+
+    with ProcessPoolExecutor(max_workers=max_workers, initializer=_iniciar_processo,
+                             initargs=(dados,)) as executor:
+        return np.concatenate(list(executor.map(_tarefa_processo, sementes, tamanhos)))
+
+
+def resumir_reamostragens(metricas, nivel=0.95):
+    """
+    Intervalo percentil de cada métrica a partir dos seus valores nas reamostragens.
+
+    Parâmetros:
+    - metricas (dict): {metrica: array com um valor por reamostragem}.
+
+    Retorna:
+    - dict: {metrica: {'nivel', 'n', 'media', 'desvio', 'inferior', 'superior'}}, no
+      formato de validacao_cruzada.agregar_folds (ver metricas.linhas_intervalos);
+      `n` é o número de reamostragens válidas e `desvio` o erro padrão bootstrap.
+    """
+    alfa = (1 - nivel) / 2
+    intervalos = {}
+    for nome, valores in metricas.items():
+        valores = np.asarray(valores, dtype=np.float64)
+        valores = valores[np.isfinite(valores)]
+        if len(valores) == 0:
+            continue
+
+        inferior, superior = np.quantile(valores, [alfa, 1 - alfa])
+        intervalos[nome] = {
+            'nivel': nivel,
+            'n': len(valores),
+            'media': valores.mean(),
+            'desvio': valores.std(ddof=1) if len(valores) > 1 else np.nan,
+            'inferior': inferior,
+            'superior': superior,
+        }
+    return intervalos
+
+
+def bootstrap_regressao(y_real, y_pred, reamostragens=1000, nivel=0.95, semente=0, max_workers=None):
+    """
+    Intervalos bootstrap de MSE, RMSE, MAE, MRE, MAPE, EVS e R².
+
+    Parâmetros:
+    - reamostragens (int): Número de reamostragens (B).
+    - nivel (float): Nível de confiança dos intervalos.
+    - semente (int): Semente das reamostragens (resultados reprodutíveis).
+    - max_workers (int): Processos usados com muitas reamostragens; None para o
+      número de CPUs e 1 para calcular no próprio processo.
+
+    Retorna:
+    - dict: Intervalos de cada métrica (ver resumir_reamostragens).
+    """
+    y_real = np.asarray(y_real, dtype=np.float64).ravel()
+    y_pred = np.asarray(y_pred, dtype=np.float64).ravel()
+    n = len(y_real)
+    if n == 0 or len(y_pred) != n:
+        raise ValueError(f"y_real e y_pred devem ter o mesmo tamanho, não nulo: {n} e {len(y_pred)}.")
+
+    # Termos por amostra; y_real é centrado na média original para que a soma dos
+    # quadrados dos desvios de cada reamostragem não perca precisão
+    residuo = y_real - y_pred
+    centrado = y_real - y_real.mean()
+    termos = np.stack([
+        residuo * residuo,
+        np.abs(residuo),
+        np.abs(residuo) / np.abs(y_real + EPSILON_RELATIVO),
+        centrado,
+        centrado * centrado,
+    ])
+
+    somas = _reamostrar({'tipo': 'Regressao', 'n': n, 'termos': termos}, reamostragens, semente, max_workers)
+    sse, sae, sre, soma_centrado, soma_quadrados = somas.T
+    sst = soma_quadrados - soma_centrado ** 2 / n
+
+    return resumir_reamostragens(metricas_somas(n, sse, sae, sre, sst), nivel)
+
+
+def bootstrap_classificacao(y_real, y_pred, reamostragens=1000, nivel=0.95, semente=0, max_workers=None):
+    """
+    Intervalos bootstrap de todas as métricas globais e detalhadas de Classification
+    (mesmos parâmetros e retorno de bootstrap_regressao).
+    """
+    codigos_real, codigos_pred, rotulos = codificar_rotulos(y_real, y_pred)
+    n = len(codigos_real)
+    if n == 0:
+        raise ValueError("y_real e y_pred estão vazios.")
+    k = len(rotulos)
+
+    dados = {'tipo': 'Classificacao', 'n': n, 'celulas': k * k, 'codigos': codigos_real * k + codigos_pred}
+    matrizes = _reamostrar(dados, reamostragens, semente, max_workers).reshape(-1, k, k).astype(np.int64)
+
+    # A escolha entre as médias binária e macro segue a amostra original
+    quantidade_classes = np.count_nonzero(np.bincount(codigos_real, minlength=k))
+
+    metricas = {}
+    for cm in matrizes:
+        globais, detalhadas, _ = Classification.metricas_da_matriz(cm, rotulos, quantidade_classes)
+        for nome, valor in {**globais, **detalhadas}.items():
+            metricas.setdefault(nome, []).append(valor)
+
+    return resumir_reamostragens(metricas, nivel)
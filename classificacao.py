@@ -3,18 +3,48 @@ import pandas as pd
 from scipy import stats
 import os
 from estastistica import Statistic
-from sklearn.metrics import confusion_matrix, accuracy_score, precision_score, recall_score, f1_score
+from matriz_confusao import matriz_confusao, matriz_confusao_lote, metricas_matriz_confusao, metricas_por_classe
+from limiares import curvas_limiares, varredura_limiares
+from paralelo import avaliar_classificacao_paralelo, numero_threads
 from sklearn.metrics import roc_curve, auc, precision_recall_curve
 
 
 class Classification(Statistic):
 
-    def __init__(self, y_real, y_pred):
+    def __init__(self, y_real=None, y_pred=None, acumulador=None, erro_quantis=None, matriz=None, resumo_real=None,
+                 scores=None, bins_limiares=None, custo_fp=1.0, custo_fn=1.0, threads=1):
+        """
+        Calcula as métricas a partir de `y_real` e `y_pred` ou, sem os arrays, a partir
+        de um AcumuladorClassificacao (ver acumuladores.py) que já recebeu todos os blocos.
+        Com `erro_quantis`, o resumo estatístico usa sketches de quantis (ver Statistic).
+        `matriz` ((cm, rotulos)) e `resumo_real` são a matriz de confusão e as estatísticas
+        de y_real já calculadas na avaliação em lote (ver avaliar_lote).
+
+        Com os `scores` da classe positiva (classificação binária), as curvas ROC,
+        Precision-Recall, F1 e custo por limiar e os limiares ótimos (Youden, F1 e
+        custo com `custo_fp` e `custo_fn`) são calculados com uma única ordenação, ou
+        com um histograma de `bins_limiares` faixas (ver limiares.py), e ficam em
+        self.curvas.
+
+        Com `threads` (None para o número de CPUs), a matriz de confusão e o resumo de
+        rótulos numéricos de arrays grandes são calculados por faixas em várias threads
+        (ver paralelo.py).
+        """
         # Passa os argumentos para a classe pai
-        super().__init__(y_real, y_pred)
+        super().__init__(y_real, y_pred, erro_quantis, resumo_real)
 
         self.y_real = y_real
         self.y_pred = y_pred
+        self.acumulador = acumulador
+        self.matriz = matriz
+        self.scores = scores
+        self.bins_limiares = bins_limiares
+        self.custo_fp = custo_fp
+        self.custo_fn = custo_fn
+        self.threads = threads
+
+        # Curvas de limiar (None sem scores)
+        self.curvas = None
 
         self.metricas = {}
         self.metricas_classificacao = {}
@@ -26,86 +56,178 @@ class Classification(Statistic):
         # Chama a função de cálculo das métricas de regressão
         self.calculo_metricas_classificacao()
 
-        # np.array para transformar em uma array
-        self.classes = list(np.unique(np.array(y_real)))
+        # Classes presentes em y_real (as linhas de self.metricas_por_classe seguem self.rotulos,
+        # que inclui também as classes que só aparecem em y_pred)
+        self.classes = list(self.rotulos[self.metricas_por_classe['Suporte'] > 0])
 
     def calculo_metricas_classificacao(self):
 
-        # Confusion Matrix
-        cm = confusion_matrix(self.y_real, self.y_pred)
-        VP = cm[1, 1]  # Verdadeiros Positivos
-        VN = cm[0, 0]  # Verdadeiros Negativos
-        FP = cm[0, 1]  # Falsos Positivos
-        FN = cm[1, 0]  # Falsos Negativos
+        # Matriz de confusão calculada uma única vez (um bincount sobre os rótulos
+        # codificados); todas as métricas abaixo são derivadas dela (ver matriz_confusao.py)
+        resumo = None
+        threads = self._threads_paralelas()
+        if self.acumulador is not None:
+            # Matriz somada bloco a bloco pelo acumulador
+            cm, rotulos = self.acumulador.matriz_confusao, self.acumulador.rotulos
+        elif self.matriz is not None:
+            # Matriz calculada junto com as dos outros modelos do lote
+            cm, rotulos = self.matriz
+        elif threads > 1:
+            # Matriz e resumo calculados por faixas em várias threads
+            (cm, rotulos), resumo, self.sketches = avaliar_classificacao_paralelo(
+                self.y_real, self.y_pred, threads, self.erro_quantis)
+        else:
+            cm, rotulos = matriz_confusao(self.y_real, self.y_pred)
+        self.matriz_confusao = cm
+        self.rotulos = rotulos
+
+        self.metricas, self.metricas_detalhada, self.metricas_por_classe = \
+            self.metricas_da_matriz(cm, rotulos)
 
-        # Para binarios ou multiclasses
-        valores_unicos = np.unique(self.y_real)
+        # Armazenando as métricas globais
+        if self.acumulador is not None:
+            resumo = self.acumulador.resumo()
+            self.sketches = self.acumulador.sketches
+        elif resumo is None:
+            resumo = self.summary()
+        self.metricas_classificacao = {**self.metricas, **resumo}
 
-        if len(valores_unicos) > 2:
+        # Curvas de limiar a partir dos scores (ou do histograma acumulado)
+        self.calculo_curvas_limiares()
+
+    def _threads_paralelas(self):
+        """
+        Threads do cálculo paralelo (1 para arrays pequenos, rótulos não numéricos ou
+        matriz e resumo de y_real já calculados).
+        """
+        if self.acumulador is not None or self.matriz is not None or self.resumo_real is not None:
+            return 1
+        y_real, y_pred = np.asarray(self.y_real), np.asarray(self.y_pred)
+        if y_real.dtype.kind not in 'biuf' or y_pred.dtype.kind not in 'biuf':
+            return 1
+        return numero_threads(self.threads, y_real.size)
+
+    def calculo_curvas_limiares(self):
+        """
+        Calcula self.curvas e acrescenta a área sob a curva ROC, a precisão média e
+        os limiares ótimos às métricas de classificação.
+        """
+        if self.acumulador is not None and getattr(self.acumulador, 'limiares', None) is not None:
+            if self.acumulador.limiares.n == 0:
+                return
+            self.curvas = curvas_limiares(*self.acumulador.limiares.contagens(),
+                                          custo_fp=self.custo_fp, custo_fn=self.custo_fn)
+        elif self.scores is not None:
+            if len(self.rotulos) > 2:
+                raise ValueError(
+                    f"As curvas de limiar são binárias; os rótulos {list(self.rotulos)} têm mais de duas classes.")
+            self.curvas = varredura_limiares(self.y_real, self.scores, self.bins_limiares,
+                                             custo_fp=self.custo_fp, custo_fn=self.custo_fn)
+        else:
+            return
+
+        self.metricas_limiares = {
+            'AUC_ROC': self.curvas['auc_roc'],
+            'Precisao_media(AP)': self.curvas['avg_precision'],
+            'Youden_J': self.curvas['youden_j'],
+            'Limiar_Youden': self.curvas['limiar_youden'],
+            'F1_maximo': self.curvas['f1_maximo'],
+            'Limiar_F1': self.curvas['limiar_f1'],
+            'Custo_minimo': self.curvas['custo_minimo'],
+            'Limiar_custo': self.curvas['limiar_custo'],
+        }
+        self.metricas_classificacao.update(self.metricas_limiares)
+
+    @staticmethod
+    def metricas_da_matriz(cm, rotulos, quantidade_classes=None):
+        """
+        Deriva as métricas globais, as detalhadas (macro, micro e ponderada) e as
+        métricas um-contra-todos de cada classe de uma matriz de confusão.
+
+        Parâmetros:
+        - cm (np.ndarray): Matriz de confusão (K, K) na ordem de `rotulos`.
+        - quantidade_classes (int): Classes presentes em y_real, que decide entre as
+          médias binária e macro; None para contar pelo suporte de `cm` (o bootstrap
+          informa a quantidade da amostra original).
+
+        Retorna:
+        - tuple: (metricas, metricas_detalhada, metricas_por_classe).
+        """
+        resultado = metricas_matriz_confusao(cm, rotulos)
+
+        # Para binarios ou multiclasses (classes presentes em y_real)
+        if quantidade_classes is None:
+            quantidade_classes = np.count_nonzero(resultado['suporte'])
+
+        acuracia = resultado['acuracia']  # Acurácia
+        if quantidade_classes > 2:
             # Calculando as métricas (com agregação)
-            acuracia = accuracy_score(self.y_real, self.y_pred)  # Acurácia
-            precision = precision_score(
-                self.y_real, self.y_pred, average='macro')
-            recall = recall_score(self.y_real, self.y_pred, average='macro')
-            f1 = f1_score(self.y_real, self.y_pred, average='macro')
-        elif len(valores_unicos) == 2:
+            precision = resultado['precision_macro']
+            recall = resultado['recall_macro']
+            f1 = resultado['f1_macro']
+        else:
+            if 'precision_binaria' not in resultado:
+                raise ValueError(
+                    f"Média binária indefinida: os rótulos {list(rotulos)} não são binários com a classe positiva 1.")
             # Calculando as métricas
-            acuracia = accuracy_score(self.y_real, self.y_pred)  # Acurácia
-            precision = precision_score(
-                self.y_real, self.y_pred, average='binary')  # Precisão
-            recall = recall_score(self.y_real, self.y_pred,
-                                  average='binary')  # Recall
-            f1 = f1_score(self.y_real, self.y_pred,
-                          average='binary')  # F1-Score
+            precision = resultado['precision_binaria']  # Precisão
+            recall = resultado['recall_binaria']  # Recall
+            f1 = resultado['f1_binaria']  # F1-Score
 
         # Calculando as métricas (com agregação)
-        precision_macro = precision_score(
-            self.y_real, self.y_pred, average='macro')
-        recall_macro = recall_score(self.y_real, self.y_pred, average='macro')
-        f1_macro = f1_score(self.y_real, self.y_pred, average='macro')
-
-        precision_micro = precision_score(
-            self.y_real, self.y_pred, average='micro')
-        recall_micro = recall_score(self.y_real, self.y_pred, average='micro')
-        f1_micro = f1_score(self.y_real, self.y_pred, average='micro')
-
-        precision_weighted = precision_score(
-            self.y_real, self.y_pred, average='weighted')
-        recall_weighted = recall_score(
-            self.y_real, self.y_pred, average='weighted')
-        f1_weighted = f1_score(self.y_real, self.y_pred, average='weighted')
+        precision_macro = resultado['precision_macro']
+        recall_macro = resultado['recall_macro']
+        f1_macro = resultado['f1_macro']
+
+        precision_micro = resultado['precision_micro']
+        recall_micro = resultado['recall_micro']
+        f1_micro = resultado['f1_micro']
+
+        precision_weighted = resultado['precision_ponderada']
+        recall_weighted = resultado['recall_ponderada']
+        f1_weighted = resultado['f1_ponderada']
+
+        # Métricas um-contra-todos de cada classe, calculadas de uma vez a partir da
+        # matriz K×K completa (arrays na ordem de `rotulos`, ver matriz_confusao.py)
+        por_classe = metricas_por_classe(cm)
+
+        def taxa_global(nome):
+            # Binário: taxa da classe positiva (segunda classe); multiclasse: média
+            # simples (macro) das taxas de todas as classes
+            valores = por_classe[nome]
+            if len(valores) == 2:
+                return valores[1]
+            return valores.mean() if len(valores) else 0.0
 
         # FDR - Taxa de falsa descoberta
-        fdr = FP / (FP + VP) if (FP + VP) > 0 else 0
+        fdr = taxa_global('Taxa_falsa_descoberta(FDR)')
 
         # NPU - Valor preditivo negativo
-        npu = VN / (VN + FN) if (VN + FN) > 0 else 0
+        npu = taxa_global('Valor_preditivo_negativo(NPU)')
 
         # Prevalência
-        prevalencia = (VP + FP) / (VP + VN + FP +
-                                   FN) if (VP + VN + FP + FN) > 0 else 0
+        prevalencia = taxa_global('Prevalencia')
 
         # Taxa de falsa Omissão
-        For = FN / (FN + VN) if (FN + VN) > 0 else 0
+        For = taxa_global('Taxa_falsa_Omissao(for)')
 
         # TPR - Taxa de verdadeiro positivo (Sensibilidade)
-        tpr = VP / (VP + FN) if (VP + FN) > 0 else 0
+        tpr = taxa_global('Sensibilidade(TPR)')
 
         # FNR - Taxa de falso negativo
-        fnr = FN / (FN + VP) if (FN + VP) > 0 else 0
+        fnr = taxa_global('Taxa_falso_negativo')
 
         # FPR - Taxa de falso positivo
-        fpr = FP / (FP + VN) if (FP + VN) > 0 else 0
+        fpr = taxa_global('Taxa_falso_positivo')
 
         # Especificidade (TNR - True Negative Rate)
-        especificidade = VN / (VN + FP) if (VN + FP) > 0 else 0
+        especificidade = taxa_global('Especificidade')
 
         # LR+ - Teste da razão de verossimilhança positiva
-        lr_positivo = tpr / (1 - especificidade) if (1 -
-                                                     especificidade) > 0 else 0
+        lr_positivo = taxa_global('Teste_razao_verossimilhanca_positiva(LR+)')
 
         # LR- - Teste de razão de verossimilhança negativa
-        lr_negativo = (1 - tpr) / especificidade if especificidade > 0 else 0
+        lr_negativo = taxa_global('Teste_razao_verossimilhanca_negativa(LR-)')
 
         # --------------------------métricas globais--------------------------------------------------
 
@@ -169,17 +291,58 @@ class Classification(Statistic):
 
         ]
 
+        metricas = {}
+        metricas_detalhada = {}
+
         # Loop para calcular cada métrica ponderada e adicionar ao dicionário
         for nome, valores in zip(nomes_metricas, lista_metricas):
-            self.metricas[nome] = np.sum(np.array(valores))
+            metricas[nome] = np.sum(np.array(valores))
+
+        if len(por_classe['Prevalencia']) > 2:
+            # A prevalência de cada classe é a taxa de previsões da classe: as K taxas
+            # somam 1 e a média seria sempre 1/K. Fica apenas por classe (METRICAS_CLASSE)
+            del metricas['Prevalencia']
 
         for nome_detalhada, valores_detalhada in zip(nomes_metricas_detalhada, lista_metricas_detalhada):
-            self.metricas_detalhada[nome_detalhada] = np.sum(
+            metricas_detalhada[nome_detalhada] = np.sum(
                 np.array(valores_detalhada))
 
-        # Armazenando as métricas globais
-        self.metricas_classificacao = {**self.metricas, **self.summary()}
-        # self.
+        return metricas, metricas_detalhada, por_classe
+
+
+    @classmethod
+    def avaliar_lote(cls, y_real, y_pred, erro_quantis=None, scores=None, bins_limiares=None):
+        """
+        Avalia vários modelos sobre o mesmo `y_real` de uma só vez.
+
+        Parâmetros:
+        - y_real: Rótulos reais (vetor de n valores).
+        - y_pred: Matriz (n_modelos, n) com os rótulos previstos por cada modelo.
+        - scores: Matriz (n_modelos, n) opcional com os scores da classe positiva de
+          cada modelo (curvas de limiar, ver limiares.py).
+
+        As matrizes de confusão de todos os modelos saem de um único bincount (ver
+        matriz_confusao.matriz_confusao_lote), na mesma ordem de rótulos, e as
+        estatísticas de `y_real` do resumo são calculadas uma vez e compartilhadas.
+
+        Retorna:
+        - list[Classification]: Um objeto por linha de `y_pred`.
+        """
+        cms, rotulos = matriz_confusao_lote(y_real, y_pred)
+        resumo_real = cls.estatisticas(y_real, 'real') if erro_quantis is None else None
+
+        y_pred = np.asarray(y_pred)
+        scores = [None] * len(y_pred) if scores is None else np.asarray(scores)
+
+        modelos = []
+        for cm, previsao, scores_modelo in zip(cms, y_pred, scores):
+            # Cada modelo fica só com os rótulos presentes em y_real ou nas suas próprias
+            # previsões (as médias macro e binária são as mesmas da avaliação individual)
+            presentes = (cm.sum(axis=0) + cm.sum(axis=1)) > 0
+            matriz = (cm[np.ix_(presentes, presentes)], rotulos[presentes])
+            modelos.append(cls(y_real, previsao, erro_quantis=erro_quantis, matriz=matriz,
+                               resumo_real=resumo_real, scores=scores_modelo, bins_limiares=bins_limiares))
+        return modelos
 
     @property
     def classification_result(self):
@@ -0,0 +1,302 @@
+import atexit
+import queue
+import threading
+import time
+
+from gerenciador_conexao import GerenciadorConexao
+
+
+class ErroGravacaoAssincrona(RuntimeError):
+    """
+    Relatórios que o escritor assíncrono não conseguiu gravar.
+
+    Atributos:
+    - pendentes (list): Tuplas (tipo, id, montar, gravar, erro) de cada relatório não
+      gravado; `id` é o ID da execução (None se o próprio relatório não pôde ser
+      montado). `gravar(tipo, [montar()])` tenta a gravação novamente.
+    """
+
+    def __init__(self, pendentes):
+        self.pendentes = pendentes
+        ids = [id_execucao for _, id_execucao, *_ in pendentes]
+        super().__init__(
+            f"{len(pendentes)} relatório(s) não foram gravados em segundo plano (IDs: {ids}): "
+            f"{pendentes[-1][-1]!r}")
+
+
+class EscritorAssincrono:
+    """
+    Grava os relatórios do ExperimentLogger em uma thread em segundo plano.
+
+    O processo de treino apenas coloca o relatório em uma fila limitada e segue
+    em frente; a thread retira os relatórios em lotes, faz a serialização
+    (JSON e arrays binários) e grava cada lote com um único commit.
+
+    Quando a fila está cheia, `enfileirar` bloqueia até haver espaço, o que
+    limita a memória usada quando a gravação não acompanha o treino.
+
+    Se a gravação de um lote falha, os relatórios do lote são gravados novamente
+    um a um, para que um relatório com problema não impeça a gravação dos demais.
+    Os que ainda falham não são descartados: ficam em `falhas`, separados por
+    dono (o logger cujo método `gravar` foi enfileirado), até o próximo
+    `flush(dono)` desse logger ou `fechar()`, que lança ErroGravacaoAssincrona
+    com eles.
+
+    Parâmetros:
+    - tamanho_fila (int): Número máximo de relatórios aguardando gravação.
+    - tamanho_lote (int): Número máximo de relatórios gravados por commit.
+
+    Exemplo de uso:
+        >>> escritor = EscritorAssincrono.compartilhado()
+        >>> escritor.estatisticas()['profundidade_fila']
+        0
+    """
+
+    _compartilhado = None
+    _trava_compartilhado = threading.Lock()
+
+    # Marca usada para encerrar a thread
+    _FIM = object()
+
+    def __init__(self, tamanho_fila=1000, tamanho_lote=256):
+        self.tamanho_lote = tamanho_lote
+
+        self.fila = queue.Queue(maxsize=tamanho_fila)
+
+        # Contadores expostos por estatisticas()
+        self._trava = threading.Lock()
+        # Avisa flush(dono) quando os relatórios de um dono terminam de ser gravados
+        self._gravados = threading.Condition(self._trava)
+        self.itens_gravados = 0
+        self.lotes_gravados = 0
+        self.latencia_total = 0.0   # enfileiramento -> commit, somada por item
+        self.latencia_maxima = 0.0
+        self.tempo_escrita_total = 0.0   # serialização + commit, somado por lote
+        self.profundidade_maxima = 0
+        self.itens_com_falha = 0
+
+        # {dono: relatórios na fila ou sendo gravados} (ver flush)
+        self.pendentes = {}
+
+        # {dono: relatórios não gravados}, entregues no próximo flush(dono) ou fechar()
+        self.falhas = {}
+
+        self._encerrado = False
+        self._thread = threading.Thread(
+            target=self._executar, name='EscritorAssincrono', daemon=True)
+        self._thread.start()
+
+        atexit.register(self.fechar)
+
+    @classmethod
+    def compartilhado(cls):
+        """
+        Retorna o escritor único do processo, criando-o na primeira chamada.
+        """
+        with cls._trava_compartilhado:
+            if cls._compartilhado is None or cls._compartilhado._encerrado:
+                cls._compartilhado = cls()
+            return cls._compartilhado
+
+    def enfileirar(self, tipo, montar, gravar):
+        """
+        Coloca um relatório na fila de gravação.
+
+        Parâmetros:
+        - tipo (str): Tipo do experimento, usado para agrupar os lotes por tabela.
+        - montar (callable): Função sem argumentos que serializa o relatório e
+          retorna o registro a ser gravado (executada na thread).
+        - gravar (callable): Função `gravar(tipo, registros)` que grava os
+          registros em uma única transação.
+        """
+        if self._encerrado:
+            raise RuntimeError("O escritor assíncrono já foi encerrado.")
+
+        dono = self._dono(gravar)
+        with self._trava:
+            self.pendentes[dono] = self.pendentes.get(dono, 0) + 1
+
+        self.fila.put((tipo, montar, gravar, time.perf_counter()))
+
+        with self._trava:
+            profundidade = self.fila.qsize()
+            if profundidade > self.profundidade_maxima:
+                self.profundidade_maxima = profundidade
+
+    @staticmethod
+    def _dono(gravar):
+        """
+        Dono de um relatório: o objeto do método `gravar` (o logger) ou a própria função.
+        """
+        return getattr(gravar, '__self__', gravar)
+
+    def _executar(self):
+        try:
+            self._consumir()
+        finally:
+            # As conexões desta thread só podem ser fechadas por ela mesma
+            GerenciadorConexao().fechar()
+
+    def _consumir(self):
+        while True:
+            item = self.fila.get()
+            if item is self._FIM:
+                self.fila.task_done()
+                return
+
+            # Junta o que já está na fila, até o tamanho do lote, sem esperar por novos itens
+            lote = [item]
+            fim = False
+            while len(lote) < self.tamanho_lote:
+                try:
+                    item = self.fila.get_nowait()
+                except queue.Empty:
+                    break
+                if item is self._FIM:
+                    fim = True
+                    break
+                lote.append(item)
+
+            self._gravar_lote(lote)
+
+            for _ in lote:
+                self.fila.task_done()
+
+            if fim:
+                self.fila.task_done()
+                return
+
+    def _gravar_lote(self, lote):
+        inicio = time.perf_counter()
+
+        # Agrupa por logger e tipo: cada logger grava no seu banco (`gravar` é o método
+        # do logger) e cada tabela é gravada com um único executemany
+        grupos = {}
+        for tipo, montar, gravar, _ in lote:
+            grupos.setdefault((gravar, tipo), []).append(montar)
+
+        falhas = []
+        for (gravar, tipo), montagens in grupos.items():
+            try:
+                gravar(tipo, [montar() for montar in montagens])
+            except Exception:  # A thread não pode morrer; as falhas são repassadas no flush()
+                # Grava um a um para separar os relatórios que falham dos demais
+                falhas.extend(self._gravar_individualmente(tipo, montagens, gravar))
+
+        fim = time.perf_counter()
+        falhos = {id(montar) for _, _, montar, _, _ in falhas}
+        with self._trava:
+            for falha in falhas:
+                self.falhas.setdefault(self._dono(falha[3]), []).append(falha)
+            self.itens_com_falha += len(falhas)
+            self.lotes_gravados += 1
+            self.itens_gravados += len(lote) - len(falhas)
+            self.tempo_escrita_total += fim - inicio
+            for _, montar, _, enfileirado in lote:
+                if id(montar) in falhos:
+                    continue
+                latencia = fim - enfileirado
+                self.latencia_total += latencia
+                if latencia > self.latencia_maxima:
+                    self.latencia_maxima = latencia
+
+            for _, _, gravar, _ in lote:
+                dono = self._dono(gravar)
+                self.pendentes[dono] -= 1
+                if not self.pendentes[dono]:
+                    del self.pendentes[dono]
+            self._gravados.notify_all()
+
+    @staticmethod
+    def _gravar_individualmente(tipo, montagens, gravar):
+        """
+        Grava cada relatório em uma transação própria.
+
+        Retorna:
+        - list: Tuplas (tipo, id, montar, gravar, erro) dos relatórios que falharam.
+        """
+        falhas = []
+        for montar in montagens:
+            id_execucao = None
+            try:
+                registro = montar()
+                # O ID da execução é a primeira coluna da linha de EXECUCOES
+                id_execucao = registro[0][0]
+                gravar(tipo, [registro])
+            except Exception as erro:
+                falhas.append((tipo, id_execucao, montar, gravar, erro))
+        return falhas
+
+    def estatisticas(self):
+        """
+        Retorna os contadores do escritor.
+
+        Retorna:
+        - dict: com as chaves
+            - `profundidade_fila`: relatórios aguardando gravação agora;
+            - `profundidade_maxima`: maior profundidade observada;
+            - `itens_gravados` e `lotes_gravados`;
+            - `itens_com_falha`: relatórios que não puderam ser gravados (ver flush);
+            - `latencia_media_ms` e `latencia_maxima_ms`: tempo entre o
+              enfileiramento e o commit de cada relatório;
+            - `escrita_media_ms`: tempo médio de serialização + commit por lote.
+        """
+        with self._trava:
+            itens = self.itens_gravados
+            lotes = self.lotes_gravados
+            return {
+                'profundidade_fila': self.fila.qsize(),
+                'profundidade_maxima': self.profundidade_maxima,
+                'itens_gravados': itens,
+                'lotes_gravados': lotes,
+                'itens_com_falha': self.itens_com_falha,
+                'latencia_media_ms': 1000 * self.latencia_total / itens if itens else 0.0,
+                'latencia_maxima_ms': 1000 * self.latencia_maxima,
+                'escrita_media_ms': 1000 * self.tempo_escrita_total / lotes if lotes else 0.0,
+            }
+
+    def flush(self, dono=None):
+        """
+        Bloqueia até que os relatórios enfileirados tenham sido gravados.
+
+        Parâmetros:
+        - dono: Se informado (o logger que enfileirou os relatórios), aguarda e
+          verifica apenas os relatórios dele; senão, os de todos os loggers.
+
+        Lança:
+        - ErroGravacaoAssincrona: Com os relatórios que não puderam ser gravados
+          (atributo `pendentes`), que deixam de ficar guardados no escritor.
+        """
+        if dono is None:
+            self.fila.join()
+        else:
+            with self._gravados:
+                self._gravados.wait_for(lambda: dono not in self.pendentes)
+        self._lancar_falhas(dono)
+
+    def _lancar_falhas(self, dono=None):
+        with self._trava:
+            if dono is None:
+                falhas = [falha for falhas_dono in self.falhas.values() for falha in falhas_dono]
+                self.falhas = {}
+            else:
+                falhas = self.falhas.pop(dono, [])
+        if falhas:
+            raise ErroGravacaoAssincrona(falhas) from falhas[-1][-1]
+
+    def fechar(self):
+        """
+        Grava o que estiver pendente e encerra a thread.
+        Chamado automaticamente na saída do processo.
+
+        Lança:
+        - ErroGravacaoAssincrona: Se algum relatório não pôde ser gravado (ver flush).
+        """
+        if self._encerrado:
+            self._lancar_falhas()
+            return
+        self._encerrado = True
+
+        self.fila.put(self._FIM)
+        self._thread.join()
+        self._lancar_falhas()
@@ -0,0 +1,462 @@
+import json
+from datetime import datetime
+
+from artefatos import chave_artefato, criar_tabelas_artefatos, gravar_artefatos
+from identificadores import EPOCA_MS, MAXIMO_SEQUENCIA, montar_id
+from metricas import criar_tabela_intervalos_metricas, criar_tabela_metricas, criar_tabela_metricas_classe, \
+    gravar_metricas, linhas_metricas, preencher_metricas_classe
+
+
+# Colunas com arrays grandes que passam a ser gravadas na tabela ARTEFATOS
+COLUNAS_ARTEFATOS = {
+    'CLASSIFICACAO': ['y_test', 'y_pred', 'fpr', 'tpr', 'thresholds_roc', 'precision', 'recall', 'thresholds'],
+    'REGRESSAO': ['y_test', 'y_pred'],
+    'SERIES_TEMPORAIS': ['observed', 'trend', 'seasonal', 'resid', 'y_test', 'y_pred'],
+}
+
+# Valores vazios gravados pelas versões anteriores, que não viram artefatos
+_VALORES_VAZIOS = ('[]', '{"index": [], "values": []}')
+
+
+def _colunas(conn, tabela):
+    return [info[1] for info in conn.execute(f"PRAGMA table_info({tabela})").fetchall()]
+
+
+def _expressao_criado_em():
+    """
+    Expressão SQL que monta 'AAAA-MM-DD HH:MM:SS' a partir das colunas `data` e `hora`,
+    aceitando os formatos 'DD/MM/AAAA' (classificação e regressão) e
+    'AAAA-MM-DD HH:MM:SS' (séries temporais).
+    """
+    return '''
+        CASE
+            WHEN data LIKE '__/__/____'
+                THEN substr(data, 7, 4) || '-' || substr(data, 4, 2) || '-' || substr(data, 1, 2) || ' ' || hora
+            WHEN data LIKE '____-__-__%'
+                THEN substr(data, 1, 10) || ' ' || hora
+        END
+    '''
+
+
+def _criar_chave_primaria_e_indices(conn, tabela):
+    """
+    Versão 1: chave primária autoincremental, coluna `criado_em` e índices
+    nas colunas usadas pelos filtros do painel.
+    """
+    colunas = _colunas(conn, tabela)
+
+    if 'criado_em' not in colunas:
+        conn.execute(f"ALTER TABLE {tabela} ADD COLUMN criado_em TEXT")
+        colunas.append('criado_em')
+
+    # Preenche a coluna nos registros antigos a partir de `data` e `hora`
+    conn.execute(
+        f"UPDATE {tabela} SET criado_em = {_expressao_criado_em()} WHERE criado_em IS NULL")
+
+    # SERIES_TEMPORAIS já nasce com `id INTEGER PRIMARY KEY`; as outras tabelas são recriadas
+    chave = [info[1] for info in conn.execute(
+        f"PRAGMA table_info({tabela})").fetchall() if info[5]]
+
+    if not chave:
+        tipos = {info[1]: info[2] for info in conn.execute(
+            f"PRAGMA table_info({tabela})").fetchall()}
+        definicao = ',\n'.join(
+            f'{coluna} {tipos[coluna]}'.strip() for coluna in colunas)
+        lista = ', '.join(colunas)
+
+        conn.execute(f'''
+            CREATE TABLE {tabela}_migracao (
+                id_registro INTEGER PRIMARY KEY AUTOINCREMENT,
+                {definicao}
+            )
+        ''')
+        # Mantém a ordem original de inserção
+        conn.execute(f'''
+            INSERT INTO {tabela}_migracao ({lista})
+            SELECT {lista} FROM {tabela} ORDER BY rowid
+        ''')
+        conn.execute(f"DROP TABLE {tabela}")
+        conn.execute(f"ALTER TABLE {tabela}_migracao RENAME TO {tabela}")
+
+    for coluna in ['id', 'controle_de_versao', 'criado_em']:
+        if coluna in chave:
+            continue
+        conn.execute(
+            f"CREATE INDEX IF NOT EXISTS idx_{tabela.lower()}_{coluna} ON {tabela} ({coluna})")
+
+    # O painel filtra quase sempre por commit e versão juntos; o índice composto
+    # também atende os filtros só por id_commit
+    conn.execute(
+        f"CREATE INDEX IF NOT EXISTS idx_{tabela.lower()}_id_commit ON {tabela} (id_commit, controle_de_versao)")
+
+    # Estatísticas para o planejador escolher o índice mais seletivo
+    conn.execute(f"ANALYZE {tabela}")
+
+
+def _ids_unicos(conn, tabela):
+    """
+    Versão 2: substitui os IDs antigos (endereço de memória de `id(tipo)`, repetido
+    entre execuções) por IDs únicos e ordenáveis, gerados a partir de `criado_em`,
+    e torna o índice de `id` único.
+    """
+    registros = conn.execute(
+        f"SELECT rowid, criado_em FROM {tabela} ORDER BY rowid").fetchall()
+
+    novos = []
+    anterior = (-1, -1)
+    for rowid, criado_em in registros:
+        try:
+            momento = datetime.fromisoformat(criado_em)
+        except (TypeError, ValueError):
+            momento = datetime.now()
+        milissegundos = int(momento.timestamp() * 1000) - EPOCA_MS
+
+        # Mantém os IDs crescentes na ordem de inserção, mesmo com horários repetidos
+        ultimo_ms, sequencia = anterior
+        if milissegundos <= ultimo_ms:
+            milissegundos, sequencia = ultimo_ms, sequencia + 1
+            if sequencia > MAXIMO_SEQUENCIA:
+                milissegundos, sequencia = milissegundos + 1, 0
+        else:
+            sequencia = 0
+        anterior = (milissegundos, sequencia)
+
+        novos.append((montar_id(milissegundos, 0, sequencia), rowid))
+
+    conn.executemany(f"UPDATE {tabela} SET id = ? WHERE rowid = ?", novos)
+
+    conn.execute(f"DROP INDEX IF EXISTS idx_{tabela.lower()}_id")
+    chave = [info[1] for info in conn.execute(
+        f"PRAGMA table_info({tabela})").fetchall() if info[5]]
+    if 'id' not in chave:
+        conn.execute(
+            f"CREATE UNIQUE INDEX idx_{tabela.lower()}_id ON {tabela} (id)")
+
+
+def _separar_artefatos(conn, tabela, tamanho_lote=500):
+    """
+    Versão 3: move os arrays grandes (y_test, y_pred, curvas e séries) para a
+    tabela ARTEFATOS e remove essas colunas da tabela de execuções.
+    """
+    criar_tabelas_artefatos(conn)
+
+    existentes = _colunas(conn, tabela)
+    colunas = [coluna for coluna in COLUNAS_ARTEFATOS.get(tabela, []) if coluna in existentes]
+    if not colunas:
+        return
+
+    cursor = conn.execute(f"SELECT id, {', '.join(colunas)} FROM {tabela} ORDER BY rowid")
+    while True:
+        registros = cursor.fetchmany(tamanho_lote)
+        if not registros:
+            break
+
+        gravar_artefatos(conn, [
+            (registro[0], nome, valor)
+            for registro in registros
+            for nome, valor in zip(colunas, registro[1:])
+            if valor not in _VALORES_VAZIOS
+        ])
+
+    _recriar_tabela_sem(conn, tabela, colunas)
+
+
+def _artefatos_por_conteudo(conn, tabela, tamanho_lote=500):
+    """
+    Versão 4: troca as chaves aleatórias dos artefatos pelo hash do conteúdo
+    (ver artefatos.chave_artefato), unificando arrays repetidos entre execuções.
+    """
+    criar_tabelas_artefatos(conn)
+
+    trocas = []
+    cursor = conn.execute("SELECT chave, dados FROM ARTEFATOS")
+    while True:
+        registros = cursor.fetchmany(tamanho_lote)
+        if not registros:
+            break
+        for chave, dados in registros:
+            nova = chave_artefato(dados)
+            if nova != chave:
+                trocas.append((chave, nova))
+
+    for chave, nova in trocas:
+        conn.execute(
+            "INSERT OR IGNORE INTO ARTEFATOS (chave, dados) SELECT ?, dados FROM ARTEFATOS WHERE chave = ?",
+            (nova, chave))
+        conn.execute("UPDATE ARTEFATOS_EXECUCAO SET chave = ? WHERE chave = ?", (nova, chave))
+        conn.execute("DELETE FROM ARTEFATOS WHERE chave = ?", (chave,))
+
+
+def _tabela_metricas(conn, tabela, tamanho_lote=500):
+    """
+    Versão 5: cria a tabela METRICAS (uma linha por métrica de cada execução) e
+    a preenche a partir do JSON da coluna `dados` dos registros existentes.
+    """
+    criar_tabela_metricas(conn)
+
+    if 'dados' not in _colunas(conn, tabela):
+        return
+
+    # O JSON é lido pelo Python porque o json.dumps grava NaN e Infinity,
+    # que as funções JSON do SQLite não aceitam
+    cursor = conn.execute(f"SELECT id, dados FROM {tabela} WHERE dados IS NOT NULL")
+    while True:
+        registros = cursor.fetchmany(tamanho_lote)
+        if not registros:
+            break
+
+        linhas = []
+        for id_execucao, dados in registros:
+            try:
+                metricas = json.loads(dados)
+            except (TypeError, ValueError):
+                continue
+            if isinstance(metricas, dict):
+                linhas.extend(linhas_metricas(id_execucao, metricas))
+        gravar_metricas(conn, linhas)
+
+
+def _recriar_tabela_sem(conn, tabela, removidas):
+    """
+    Recria a tabela sem as colunas `removidas`, mantendo a chave primária, os
+    índices e a ordem das linhas.
+
+    Ao contrário de `ALTER TABLE ... DROP COLUMN`, que reescreve cada linha no
+    mesmo lugar, a cópia deixa as linhas (agora pequenas) juntas em poucas páginas.
+    """
+    criacao = conn.execute(
+        "SELECT sql FROM sqlite_master WHERE type = 'table' AND name = ?", (tabela,)).fetchone()[0]
+    indices = [sql for (sql,) in conn.execute(
+        "SELECT sql FROM sqlite_master WHERE type = 'index' AND tbl_name = ? AND sql IS NOT NULL",
+        (tabela,)).fetchall()]
+
+    definicoes = []
+    colunas = []
+    for _, coluna, tipo, _, _, chave in conn.execute(f"PRAGMA table_info({tabela})").fetchall():
+        if coluna in removidas:
+            continue
+        colunas.append(coluna)
+        if chave:
+            autoincremento = ' AUTOINCREMENT' if 'AUTOINCREMENT' in criacao.upper() else ''
+            definicoes.append(f'{coluna} INTEGER PRIMARY KEY{autoincremento}')
+        else:
+            definicoes.append(f'{coluna} {tipo}'.strip())
+
+    lista = ', '.join(colunas)
+    conn.execute(f"CREATE TABLE {tabela}_migracao ({', '.join(definicoes)})")
+    # Mantém a ordem original de inserção
+    conn.execute(f'''
+        INSERT INTO {tabela}_migracao ({lista})
+        SELECT {lista} FROM {tabela} ORDER BY rowid
+    ''')
+    conn.execute(f"DROP TABLE {tabela}")
+    conn.execute(f"ALTER TABLE {tabela}_migracao RENAME TO {tabela}")
+
+    for sql in indices:
+        conn.execute(sql)
+    conn.execute(f"ANALYZE {tabela}")
+
+
+def _aplicar_migracoes(conn, migracoes, *argumentos):
+    """
+    Aplica as migrações com versão maior que `PRAGMA user_version`, em ordem e
+    dentro de uma única transação, e atualiza a versão do arquivo.
+    """
+    versao_final = migracoes[-1][0]
+
+    versao = conn.execute("PRAGMA user_version").fetchone()[0]
+    if versao >= versao_final:
+        return versao
+
+    # BEGIN explícito para que os comandos DDL também fiquem dentro da transação
+    conn.execute("BEGIN")
+    try:
+        for numero, migracao in migracoes:
+            if numero > versao:
+                migracao(conn, *argumentos)
+        conn.execute(f"PRAGMA user_version = {versao_final}")
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+
+    return versao_final
+
+
+# -------------------------------------Bancos antigos (um arquivo por tipo)-------------------------------------------------------------
+
+# (versão, função) na ordem em que devem ser aplicadas
+MIGRACOES = [
+    (1, _criar_chave_primaria_e_indices),
+    (2, _ids_unicos),
+    (3, _separar_artefatos),
+    (4, _artefatos_por_conteudo),
+    (5, _tabela_metricas),
+]
+
+VERSAO_ESQUEMA = MIGRACOES[-1][0]
+
+
+def migrar(conn, tabela):
+    """
+    Aplica as migrações pendentes na tabela de um banco antigo (um arquivo por tipo).
+
+    A versão do esquema de cada arquivo é guardada em `PRAGMA user_version`; as
+    migrações pendentes são aplicadas em ordem, dentro de uma única transação.
+    A importação para o banco único (ver armazenamento.importar_bancos_antigos)
+    chama esta função antes de copiar os registros.
+
+    Parâmetros:
+    - conn (sqlite3.Connection): Conexão com o banco.
+    - tabela (str): Nome da tabela ('CLASSIFICACAO', 'REGRESSAO' ou 'SERIES_TEMPORAIS').
+
+    Retorna:
+    - int: Versão do esquema após a migração.
+    """
+    return _aplicar_migracoes(conn, MIGRACOES, tabela)
+
+
+# -------------------------------------Banco único------------------------------------------------------------------------------------
+
+def _criar_banco_unico(conn):
+    """
+    Versão 1 do banco único: tabela EXECUCOES compartilhada por todos os tipos,
+    uma tabela de detalhes por tipo (mesmo `id` da execução) e as tabelas
+    ARTEFATOS e METRICAS.
+    """
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS EXECUCOES (
+            id INTEGER PRIMARY KEY,
+            tipo TEXT NOT NULL,
+            id_commit TEXT,
+            controle_de_versao TEXT,
+            data DATETIME,
+            hora DATETIME,
+            criado_em TEXT
+        )
+    ''')
+    # Os filtros do painel são sempre por tipo, commit e versão
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_execucoes_tipo ON EXECUCOES (tipo, id_commit, controle_de_versao)")
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_execucoes_id_commit ON EXECUCOES (id_commit, controle_de_versao)")
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_execucoes_controle_de_versao ON EXECUCOES (controle_de_versao)")
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_execucoes_criado_em ON EXECUCOES (criado_em)")
+
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS CLASSIFICACAO (
+            id INTEGER PRIMARY KEY,
+            dados TEXT,
+            avg_precision REAL
+        )
+    ''')
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS REGRESSAO (
+            id INTEGER PRIMARY KEY,
+            dados TEXT
+        )
+    ''')
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS SERIES_TEMPORAIS (
+            id INTEGER PRIMARY KEY
+        )
+    ''')
+
+    criar_tabelas_artefatos(conn)
+    criar_tabela_metricas(conn)
+
+    # Bancos antigos já importados (ver armazenamento.importar_bancos_antigos)
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS IMPORTACOES (
+            caminho TEXT PRIMARY KEY,
+            execucoes INTEGER,
+            importado_em TEXT
+        )
+    ''')
+
+
+def _tabela_metricas_classe(conn):
+    """
+    Versão 2 do banco único: tabela METRICAS_CLASSE com as métricas um-contra-todos
+    de cada classe, preenchida para as execuções de classificação já gravadas.
+    """
+    criar_tabela_metricas_classe(conn)
+    preencher_metricas_classe(conn)
+
+
+def _validacao_cruzada(conn):
+    """
+    Versão 3 do banco único: execuções filhas (folds de uma validação cruzada)
+    ligadas à execução pai pelas colunas `id_pai` e `fold` de EXECUCOES, e a
+    tabela INTERVALOS_METRICAS com os agregados (média, desvio e intervalo).
+    """
+    conn.execute("ALTER TABLE EXECUCOES ADD COLUMN id_pai INTEGER")
+    conn.execute("ALTER TABLE EXECUCOES ADD COLUMN fold INTEGER")
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_execucoes_id_pai ON EXECUCOES (id_pai, fold)")
+    criar_tabela_intervalos_metricas(conn)
+
+
+def _metricas_series_temporais(conn):
+    """
+    Versão 4 do banco único: coluna `dados` de SERIES_TEMPORAIS com as métricas de
+    previsão em JSON, como em REGRESSAO (ver series_temporais.py). Execuções que
+    gravaram apenas a decomposição ficam com NULL.
+    """
+    conn.execute("ALTER TABLE SERIES_TEMPORAIS ADD COLUMN dados TEXT")
+
+
+def _remover_prevalencia_multiclasse(conn, tamanho_lote=500):
+    """
+    Versão 5 do banco único: remove a 'Prevalencia' global das execuções de
+    classificação multiclasse (mais de duas classes em METRICAS_CLASSE). A média
+    das prevalências das classes é sempre 1/K e deixou de ser gravada; o valor de
+    cada classe continua em METRICAS_CLASSE.
+    """
+    multiclasse = '''
+        SELECT id FROM METRICAS_CLASSE WHERE metrica = 'Prevalencia'
+        GROUP BY id HAVING COUNT(*) > 2
+    '''
+    conn.execute(f"DELETE FROM METRICAS WHERE metrica = 'Prevalencia' AND id IN ({multiclasse})")
+    conn.execute(
+        f"DELETE FROM INTERVALOS_METRICAS WHERE metrica = 'Prevalencia' AND id IN ({multiclasse})")
+
+    # O JSON é lido pelo Python porque o json.dumps grava NaN e Infinity,
+    # que as funções JSON do SQLite não aceitam (ver _tabela_metricas)
+    ids = [id_execucao for (id_execucao,) in conn.execute(multiclasse)]
+    for inicio in range(0, len(ids), tamanho_lote):
+        lote = ids[inicio:inicio + tamanho_lote]
+        linhas = []
+        for id_execucao, dados in conn.execute(
+                f"SELECT id, dados FROM CLASSIFICACAO WHERE dados IS NOT NULL "
+                f"AND id IN ({', '.join('?' * len(lote))})", lote):
+            try:
+                metricas = json.loads(dados)
+            except (TypeError, ValueError):
+                continue
+            if isinstance(metricas, dict) and 'Prevalencia' in metricas:
+                del metricas['Prevalencia']
+                linhas.append((json.dumps(metricas), id_execucao))
+        conn.executemany("UPDATE CLASSIFICACAO SET dados = ? WHERE id = ?", linhas)
+
+
+# (versão, função) na ordem em que devem ser aplicadas
+MIGRACOES_BANCO_UNICO = [
+    (1, _criar_banco_unico),
+    (2, _tabela_metricas_classe),
+    (3, _validacao_cruzada),
+    (4, _metricas_series_temporais),
+    (5, _remover_prevalencia_multiclasse),
+]
+
+
+def migrar_banco_unico(conn):
+    """
+    Cria ou atualiza o esquema do banco único (ver armazenamento.py).
+
+    Retorna:
+    - int: Versão do esquema após a migração.
+    """
+    return _aplicar_migracoes(conn, MIGRACOES_BANCO_UNICO)
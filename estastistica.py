@@ -3,14 +3,206 @@ import pandas as pd
 import numpy as np
 from scipy import stats
 
+from sketch_quantis import SketchKLL
+
+
+# Tamanho dos blocos do resumo aproximado (limita os arrays temporários da passagem única)
+TAMANHO_BLOCO_RESUMO = 1_000_000
+
+
+class AcumuladorMomentos:
+    """
+    Quantidade, média e momentos centrais de 2ª a 4ª ordem de uma variável.
+
+    Cada bloco é resumido com numpy e combinado com o acumulado pelas fórmulas de
+    Chan/Pébay (a versão em blocos do algoritmo de Welford), numericamente
+    estáveis mesmo com centenas de milhões de valores.
+    """
+
+    def __init__(self):
+        self.n = 0
+        self.media = 0.0
+        self.m2 = 0.0
+        self.m3 = 0.0
+        self.m4 = 0.0
+        self.minimo = np.inf
+        self.maximo = -np.inf
+
+    def update(self, valores):
+        valores = np.asarray(valores, dtype=np.float64).ravel()
+        if len(valores) == 0:
+            return self
+
+        media = valores.mean()
+        desvio = valores - media
+        quadrado = desvio * desvio
+
+        bloco = AcumuladorMomentos()
+        bloco.n = len(valores)
+        bloco.media = media
+        bloco.m2 = quadrado.sum()
+        bloco.m3 = (quadrado * desvio).sum()
+        bloco.m4 = (quadrado * quadrado).sum()
+        bloco.minimo = valores.min()
+        bloco.maximo = valores.max()
+
+        return self.merge(bloco)
+
+    def merge(self, outro):
+        if outro.n == 0:
+            return self
+        if self.n == 0:
+            self.__dict__.update(outro.__dict__)
+            return self
+
+        na, nb = self.n, outro.n
+        n = na + nb
+        delta = outro.media - self.media
+        delta2 = delta * delta
+
+        # Os momentos de ordem maior usam os de ordem menor antes da atualização
+        m4 = (self.m4 + outro.m4
+              + delta2 * delta2 * na * nb * (na * na - na * nb + nb * nb) / n ** 3
+              + 6 * delta2 * (na * na * outro.m2 + nb * nb * self.m2) / n ** 2
+              + 4 * delta * (na * outro.m3 - nb * self.m3) / n)
+        m3 = (self.m3 + outro.m3
+              + delta * delta2 * na * nb * (na - nb) / n ** 2
+              + 3 * delta * (na * outro.m2 - nb * self.m2) / n)
+        m2 = self.m2 + outro.m2 + delta2 * na * nb / n
+
+        self.n = n
+        self.media = self.media + delta * nb / n
+        self.m2, self.m3, self.m4 = m2, m3, m4
+        self.minimo = min(self.minimo, outro.minimo)
+        self.maximo = max(self.maximo, outro.maximo)
+        return self
+
+    def finalize(self):
+        """
+        Retorna média, desvio padrão e variância populacionais, assimetria e
+        curtose (de Fisher, sem correção de viés, como scipy.stats.skew/kurtosis).
+        """
+        if self.n == 0:
+            return {'n': 0, 'media': None, 'desvio_padrao': None, 'variancia': None,
+                    'skewness': None, 'kurtosis': None, 'minimo': None, 'maximo': None}
+
+        variancia = self.m2 / self.n
+        return {
+            'n': self.n,
+            'media': self.media,
+            'desvio_padrao': np.sqrt(variancia),
+            'variancia': variancia,
+            'skewness': self.n ** 0.5 * self.m3 / self.m2 ** 1.5 if self.m2 > 0 else np.nan,
+            'kurtosis': self.n * self.m4 / self.m2 ** 2 - 3 if self.m2 > 0 else np.nan,
+            'minimo': self.minimo,
+            'maximo': self.maximo,
+        }
+
+
+class AcumuladorResumo:
+    """
+    Resumo estatístico de `y_real` e `y_pred` em uma única passagem, bloco a bloco.
+
+    Média, desvio padrão, assimetria e curtose vêm dos momentos (exatos); mediana,
+    quartis e moda vêm de sketches de quantis KLL (ver sketch_quantis.py), com erro
+    de rank `erro_quantis`. Também é mantido o sketch do resíduo (`y_real - y_pred`),
+    gravado junto com a execução para desenhar boxplots sem os arrays completos.
+    Com `erro_quantis=None`, apenas os momentos são acumulados e as estatísticas de
+    ordem ficam como None.
+    """
+
+    NOMES_SKETCHES = ('y_test', 'y_pred', 'residuo')
+
+    def __init__(self, erro_quantis=0.01, semente=None):
+        self.momentos_real = AcumuladorMomentos()
+        self.momentos_pred = AcumuladorMomentos()
+        self.sketches = {}
+        if erro_quantis is not None:
+            self.sketches = {nome: SketchKLL(erro=erro_quantis, semente=semente)
+                             for nome in self.NOMES_SKETCHES}
+
+    def update(self, y_real, y_pred):
+        y_real = np.asarray(y_real, dtype=np.float64).ravel()
+        y_pred = np.asarray(y_pred, dtype=np.float64).ravel()
+
+        self.momentos_real.update(y_real)
+        self.momentos_pred.update(y_pred)
+        if self.sketches:
+            self.sketches['y_test'].update(y_real)
+            self.sketches['y_pred'].update(y_pred)
+            self.sketches['residuo'].update(y_real - y_pred)
+        return self
+
+    def merge(self, outro):
+        self.momentos_real.merge(outro.momentos_real)
+        self.momentos_pred.merge(outro.momentos_pred)
+        for nome, sketch in outro.sketches.items():
+            if nome in self.sketches:
+                self.sketches[nome].merge(sketch)
+        return self
+
+    def finalize(self):
+        """
+        Resumo com as mesmas chaves de Statistic.summary.
+        """
+        momentos = {'real': self.momentos_real.finalize(), 'pred': self.momentos_pred.finalize()}
+        sketches = {'real': self.sketches.get('y_test'), 'pred': self.sketches.get('y_pred')}
+
+        resultado = {}
+        for sufixo in ('real', 'pred'):
+            valores = momentos[sufixo]
+            sketch = sketches[sufixo]
+            if sketch is not None and sketch.n:
+                q1, q2, q3 = (float(q) for q in sketch.quantis([0.25, 0.5, 0.75]))
+                moda = sketch.moda()
+            else:
+                q1 = q2 = q3 = moda = None
+
+            resultado.update({
+                f'media_{sufixo}': valores['media'],
+                f'mediana_{sufixo}': q2,
+                f'moda_{sufixo}': moda,
+                f'desvio_padrao_{sufixo}': valores['desvio_padrao'],
+                f'Q1_{sufixo}': q1,
+                f'Q2_{sufixo}': q2,
+                f'Q3_{sufixo}': q3,
+                f'skewness_{sufixo}': valores['skewness'],
+                f'kurtosis_{sufixo}': valores['kurtosis'],
+            })
+
+        def diferenca(nome):
+            real, pred = resultado[f'{nome}_real'], resultado[f'{nome}_pred']
+            if real is None or pred is None:
+                return None
+            return real - pred
+
+        resultado.update({
+            'media_diff': diferenca('media'),
+            'mediana_diff': diferenca('mediana'),
+            'moda_diff': diferenca('moda'),
+            'desvio_padrao_diff': diferenca('desvio_padrao'),
+            'skewness_diff': diferenca('skewness'),
+            'kurtosis_diff': diferenca('kurtosis'),
+        })
+        return resultado
+
 
 class Statistic:
 
-    def __init__(self, y_real, y_pred):
+    def __init__(self, y_real, y_pred, erro_quantis=None, resumo_real=None):
         self.y_real = y_real
         self.y_pred = y_pred
         #self.X_real = X_real
 
+        # Estatísticas de y_real já calculadas (Statistic.estatisticas(y_real, 'real')),
+        # compartilhadas entre modelos avaliados em lote sobre o mesmo y_real
+        self.resumo_real = resumo_real
+
+        # Com erro_quantis (ex.: 0.01), summary é calculado em uma passagem com sketches
+        # de quantis (mediana, quartis e moda aproximados, ver AcumuladorResumo)
+        self.erro_quantis = erro_quantis
+        self.sketches = {}
+
     def summary(self):
         """
         Gera um resumo estatístico abrangente para os valores reais (`y_real`), valores previstos (`y_pred`) 
@@ -56,6 +248,8 @@ class Statistic:
             - A moda retorna um array com o(s) valor(es) mais frequente(s). Caso haja múltiplos valores 
             com a mesma frequência, todos serão retornados.
             - As diferenças (`diff`) são calculadas como `y_real - y_pred`.
+            - Com `erro_quantis`, mediana, quartis e moda são aproximados (erro de rank
+            `erro_quantis`) e a moda é um único valor; os sketches ficam em `self.sketches`.
 
         Exemplo de Uso:
             >>> y_real = np.array([10, 20, 30, 40, 50])
@@ -67,67 +261,41 @@ class Statistic:
             >>> print(resumo['media_diff'])  # Exibe a média das diferenças.
             -0.4
         """
+        if self.erro_quantis is not None:
+            return self._summary_aproximado()
 
-
-        # valores
-        # Valores real
-        media_real = np.mean(self.y_real)  # 1. Média
-        mediana_real = np.median(self.y_real)  # 2. Mediana
-        # O valor mais frequente # 3. Moda
-        moda_real = stats.mode(self.y_real)[0]
-        desvio_padrao_real = np.std(self.y_real)  # 4. Desvio Padrão
-        # 5. Quartis (Q1, Q2, Q3)
-        Q1_real = np.percentile(self.y_real, 25)  # 25% (primeiro quartil)
-        # 50% (mediana, ou segundo quartil)
-        Q2_real = np.percentile(self.y_real, 50)
-        Q3_real = np.percentile(self.y_real, 75)  # 75% (terceiro quartil)
-        skewness_real = stats.skew(self.y_real)  # 6. Skewness (Assimetria)
-        kurtosis_real = stats.kurtosis(self.y_real)  # 7. Kurtosis
+        # Valores real (calculados uma única vez e compartilhados quando vários
+        # modelos são avaliados sobre o mesmo y_real, ver resumo_real)
+        if self.resumo_real is not None:
+            real = self.resumo_real
+        else:
+            real = self.estatisticas(self.y_real, 'real')
 
         # Valores Previstos
-        media_pred = np.mean(self.y_pred)  # 1. Média
-        mediana_pred = np.median(self.y_pred)  # 2. Mediana
-        # O valor mais frequente # 3. Moda
-        moda_pred = stats.mode(self.y_pred)[0]
-        desvio_padrao_pred = np.std(self.y_pred)  # 4. Desvio Padrão
-        # 5. Quartis (Q1, Q2, Q3)
-        Q1_pred = np.percentile(self.y_pred, 25)  # 25% (primeiro quartil)
-        # 50% (mediana, ou segundo quartil)
-        Q2_pred = np.percentile(self.y_pred, 50)
-        Q3_pred = np.percentile(self.y_pred, 75)  # 75% (terceiro quartil)
-        skewness_pred = stats.skew(self.y_pred)  # 6. Skewness (Assimetria)
-        kurtosis_pred = stats.kurtosis(self.y_pred)  # 7. Kurtosis
+        pred = self.estatisticas(self.y_pred, 'pred')
 
+        return self.resumo_diferencas(real, pred)
+
+    @staticmethod
+    def resumo_diferencas(real, pred):
+        """
+        Junta as estatísticas de y_real e y_pred (ver estatisticas) e acrescenta as
+        diferenças (real - previsto).
+        """
         # Valores da diferenças
-        media_diff = media_real - media_pred  # 1. Média
-        mediana_diff = mediana_real - mediana_pred  # 2. Mediana
-        moda_diff = moda_real - moda_pred  # O valor mais frequente # 3. Moda
-        desvio_padrao_diff = desvio_padrao_real - desvio_padrao_pred  # 4. Desvio Padrão
+        media_diff = real['media_real'] - pred['media_pred']  # 1. Média
+        mediana_diff = real['mediana_real'] - pred['mediana_pred']  # 2. Mediana
+        moda_diff = real['moda_real'] - pred['moda_pred']  # O valor mais frequente # 3. Moda
+        desvio_padrao_diff = real['desvio_padrao_real'] - pred['desvio_padrao_pred']  # 4. Desvio Padrão
         # 5. Quartis (Q1, Q2, Q3)
         #Q1_diff = Q1_real - Q1_pred  # 25% (primeiro quartil)
         #Q2_diff = Q2_real - Q2_pred  # 50% (mediana, ou segundo quartil)
         #Q3_diff = Q3_real - Q3_pred  # 75% (terceiro quartil)
-        skewness_diff = skewness_real - skewness_pred  # 6. Skewness (Assimetria)
-        kurtosis_diff = kurtosis_real - kurtosis_pred  # 7. Kurtosis
-
-        resultado = {'media_real': media_real,
-                     'mediana_real': mediana_real,
-                     'moda_real': moda_real,
-                     'desvio_padrao_real': desvio_padrao_real,
-                     'Q1_real': Q1_real,
-                     'Q2_real': Q2_real,
-                     'Q3_real': Q3_real,
-                     'skewness_real': skewness_real,
-                     'kurtosis_real': kurtosis_real,
-                     'media_pred': media_pred,
-                     'mediana_pred': mediana_pred,
-                     'moda_pred': moda_pred,
-                     'desvio_padrao_pred': desvio_padrao_pred,
-                     'Q1_pred': Q1_pred,
-                     'Q2_pred': Q2_pred,
-                     'Q3_pred': Q3_pred,
-                     'skewness_pred': skewness_pred,
-                     'kurtosis_pred': kurtosis_pred,
+        skewness_diff = real['skewness_real'] - pred['skewness_pred']  # 6. Skewness (Assimetria)
+        kurtosis_diff = real['kurtosis_real'] - pred['kurtosis_pred']  # 7. Kurtosis
+
+        resultado = {**real,
+                     **pred,
                      'media_diff': media_diff,
                      'mediana_diff': mediana_diff,
                      'moda_diff': moda_diff,
@@ -139,3 +307,116 @@ class Statistic:
                      'kurtosis_diff': kurtosis_diff}
 
         return resultado
+
+    @staticmethod
+    def estatisticas(valores, sufixo):
+        """
+        Estatísticas descritivas exatas de uma variável, com as chaves de summary
+        terminadas em `sufixo` ('real' ou 'pred'). Com arrays (n, n_saidas), cada
+        estatística tem um valor por saída (ver estatisticas_saidas).
+        """
+        valores = np.asarray(valores)
+        if valores.ndim == 2 and valores.shape[1] == 1:
+            # Uma coluna (n, 1) é uma única saída
+            valores = valores.ravel()
+        if valores.ndim == 2:
+            return Statistic.estatisticas_saidas(valores, sufixo)
+
+        media = np.mean(valores)  # 1. Média
+        mediana = np.median(valores)  # 2. Mediana
+        # O valor mais frequente # 3. Moda
+        moda = stats.mode(valores)[0]
+        desvio_padrao = np.std(valores)  # 4. Desvio Padrão
+        # 5. Quartis (Q1, Q2, Q3)
+        Q1 = np.percentile(valores, 25)  # 25% (primeiro quartil)
+        # 50% (mediana, ou segundo quartil)
+        Q2 = np.percentile(valores, 50)
+        Q3 = np.percentile(valores, 75)  # 75% (terceiro quartil)
+        skewness = stats.skew(valores)  # 6. Skewness (Assimetria)
+        kurtosis = stats.kurtosis(valores)  # 7. Kurtosis
+
+        return {f'media_{sufixo}': media,
+                f'mediana_{sufixo}': mediana,
+                f'moda_{sufixo}': moda,
+                f'desvio_padrao_{sufixo}': desvio_padrao,
+                f'Q1_{sufixo}': Q1,
+                f'Q2_{sufixo}': Q2,
+                f'Q3_{sufixo}': Q3,
+                f'skewness_{sufixo}': skewness,
+                f'kurtosis_{sufixo}': kurtosis}
+
+    @staticmethod
+    def estatisticas_saidas(valores, sufixo):
+        """
+        Estatísticas de estatisticas para cada coluna de um array (n, n_saidas), com
+        uma única ordenação ao longo do eixo 0: mediana e quartis são lidos das linhas
+        ordenadas (interpolação linear de np.percentile), a moda é o menor valor da
+        sequência de valores iguais mais longa de cada coluna (como scipy.stats.mode)
+        e média, desvio, assimetria e curtose vêm dos momentos centrais de cada coluna.
+        """
+        n = len(valores)
+        ordenado = np.sort(valores, axis=0)
+        if ordenado.dtype.kind in 'fc' and np.isnan(ordenado[-1]).any():
+            # Com NaN (ordenados no fim), as colunas seguem o cálculo de uma saída
+            colunas = [Statistic.estatisticas(coluna, sufixo) for coluna in valores.T]
+            return {nome: np.array([coluna[nome] for coluna in colunas]) for nome in colunas[0]}
+
+        # Quartis como np.percentile (mesma fórmula de interpolação)
+        virtuais = (n - 1) * (np.array([25.0, 50.0, 75.0]) / 100)
+        anteriores = np.floor(virtuais).astype(np.int64)
+        gama = (virtuais - anteriores)[:, None]
+        a = ordenado[anteriores]
+        b = ordenado[np.minimum(anteriores + 1, n - 1)]
+        diferenca = b - a
+        quartis = np.add(a, diferenca * gama, dtype=np.float64)
+        np.subtract(b, diferenca * (1 - gama), out=quartis, where=gama >= 0.5, casting='unsafe')
+
+        centrais = [n // 2 - 1, n // 2] if n % 2 == 0 else [(n - 1) // 2]
+        mediana = np.mean(ordenado[centrais], axis=0)
+
+        # Moda: tamanho da sequência de valores iguais até cada posição; o primeiro
+        # máximo de cada coluna é o fim da sequência mais longa de menor valor
+        posicoes = np.arange(n)[:, None]
+        inicio_sequencia = np.zeros(ordenado.shape, dtype=np.int64)
+        inicio_sequencia[1:] = np.where(ordenado[1:] != ordenado[:-1], posicoes[1:], 0)
+        np.maximum.accumulate(inicio_sequencia, axis=0, out=inicio_sequencia)
+        fim_moda = np.argmax(posicoes - inicio_sequencia, axis=0)
+        moda = ordenado[fim_moda, np.arange(ordenado.shape[1])]
+        del ordenado, inicio_sequencia
+
+        # Momentos centrais (mesmas definições de np.std, stats.skew e stats.kurtosis)
+        media = np.mean(valores, axis=0)
+        desvio = valores - media
+        quadrado = desvio * desvio
+        m2 = quadrado.mean(axis=0)
+        m3 = (quadrado * desvio).mean(axis=0)
+        m4 = (quadrado * quadrado).mean(axis=0)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            skewness = m3 / m2 ** 1.5
+            kurtosis = m4 / m2 ** 2 - 3
+
+        return {f'media_{sufixo}': media,
+                f'mediana_{sufixo}': mediana,
+                f'moda_{sufixo}': moda,
+                f'desvio_padrao_{sufixo}': np.sqrt(m2),
+                f'Q1_{sufixo}': quartis[0],
+                f'Q2_{sufixo}': quartis[1],
+                f'Q3_{sufixo}': quartis[2],
+                f'skewness_{sufixo}': skewness,
+                f'kurtosis_{sufixo}': kurtosis}
+
+    def _summary_aproximado(self):
+        """
+        Resumo em uma única passagem (blocos de TAMANHO_BLOCO_RESUMO valores), sem
+        ordenar os arrays completos.
+        """
+        y_real = np.asarray(self.y_real).ravel()
+        y_pred = np.asarray(self.y_pred).ravel()
+
+        resumo = AcumuladorResumo(self.erro_quantis)
+        for inicio in range(0, len(y_real), TAMANHO_BLOCO_RESUMO):
+            fim = inicio + TAMANHO_BLOCO_RESUMO
+            resumo.update(y_real[inicio:fim], y_pred[inicio:fim])
+
+        self.sketches = resumo.sketches
+        return resumo.finalize()
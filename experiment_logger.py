@@ -8,10 +8,26 @@ import numpy as np
 from regressao import Regression
 from classificacao import Classification
 from series_temporais import Series_Temporais
+from series_painel import PainelSeries, layout_colunar
 import hashlib
 import uuid
 import sqlite3
 import json
+from functools import partial
+from gerenciador_conexao import GerenciadorConexao
+from serializacao import codificar_array
+from artefatos import gravar_artefatos
+from metricas import gravar_intervalos, gravar_metricas, gravar_metricas_classe, linhas_intervalos, linhas_metricas, \
+    linhas_metricas_classe
+from escritor_assincrono import EscritorAssincrono
+from avaliacao_arquivos import MEMORIA_PADRAO_MB, avaliar_arquivos, blocos_arquivos, tamanho_bloco_memoria
+from bootstrap import METODO_BOOTSTRAP, bootstrap_classificacao, bootstrap_regressao
+from simplificacao_curvas import MAX_PONTOS_CURVAS, TOLERANCIA_AUC, simplificar_curvas_classificacao
+from armazenamento import conectar_banco
+from identificadores import TENTATIVAS_ID, gerar_id_execucao
+from acumuladores import AcumuladorClassificacao, AcumuladorRegressao
+from validacao_cruzada import METODO_FOLDS, agregar_folds, avaliar_folds, normalizar_fold
+
 
 
 class ExperimentLogger():
@@ -23,7 +39,9 @@ class ExperimentLogger():
     Pode ser utilizada para experimentos de classificação ou regressão.
     """
 
-    def __init__(self, tipo):
+    def __init__(self, tipo, comprimir_arrays=False, assincrono=False, caminho_banco=None, erro_quantis=None,
+                 max_pontos_curvas=MAX_PONTOS_CURVAS, tolerancia_auc=TOLERANCIA_AUC,
+                 reamostragens_bootstrap=None, semente_bootstrap=0, threads=1):
         """
         Inicializa a classe ExperimentLogger.
 
@@ -32,6 +50,26 @@ class ExperimentLogger():
         - y_real (array-like): Valores reais das saídas.
         - y_pred (array-like): Valores previstos pelo modelo.
         - X_real (array-like): Dados de entrada usados no experimento.
+        - comprimir_arrays (bool): Se True, os arrays (`y_test`, `y_pred` e curvas) são gravados comprimidos com zlib.
+        - assincrono (bool): Se True, os relatórios são colocados em uma fila e gravados por
+          uma thread em segundo plano (ver EscritorAssincrono). Use flush() para aguardar a
+          gravação. Os arrays passados não devem ser alterados até serem gravados.
+        - caminho_banco (str): Caminho do banco único; None para usar a variável de ambiente
+          PAINEL_LOGS_BANCO ou o padrão `dados/experimentos.db` (ver armazenamento.caminho_banco).
+        - erro_quantis (float): Se informado (ex.: 0.01), mediana, quartis e moda do resumo são
+          aproximados por sketches de quantis em uma passagem (ver sketch_quantis.py), e na
+          regressão os sketches são gravados para o painel desenhar os boxplots sem os arrays.
+          Os acumuladores usam 0.01 quando não informado.
+        - max_pontos_curvas (int): Máximo de pontos gravados por curva ROC ou Precision-Recall;
+          curvas maiores são simplificadas mantendo a AUC dentro de `tolerancia_auc` (ver
+          simplificacao_curvas.py). None grava as curvas completas.
+        - reamostragens_bootstrap (int): Se informado (ex.: 1000), cada execução gravada com
+          `y_real` e `y_pred` recebe intervalos de confiança bootstrap (95%) de todas as
+          métricas, gravados na tabela INTERVALOS_METRICAS com metodo 'bootstrap' (ver
+          bootstrap.py). `semente_bootstrap` torna os intervalos reprodutíveis.
+        - threads (int): Threads usadas no cálculo das métricas e do resumo de arrays grandes
+          em preparar_modelo e salvando_relatorio (ver paralelo.py); None para o número de
+          CPUs e 1 para o cálculo serial.
 
         Lança:
         - ValueError: Caso o tipo informado não seja 'Classificacao' ou 'Regressao'.
@@ -46,10 +84,9 @@ class ExperimentLogger():
         # self.endereco = id(tipo)
         self.endereco = None
 
-        # Inicializando o contador de IDs para classificação e regressão
-        self.contador_id_classificacao = id(tipo)
-        self.contador_id_regressao = id(tipo)
-        self.contador_id_series_temporais = id(tipo)
+        # ID do último relatório salvo; cada salvamento gera um novo ID único e
+        # ordenável pelo momento de criação (ver identificadores.gerar_id_execucao)
+        self.id_execucao = None
 
         # Configuração inicial
         self.dados = pd.DataFrame()
@@ -61,28 +98,182 @@ class ExperimentLogger():
 
         self.commit_id = None  # Inicia com None, que pode ser atribuído mais tarde
 
+        # Modelo com as métricas calculadas por preparar_modelo
+        self.modelo = None
+
+        # y_test, y_pred e curvas são gravados em formato binário (ver serializacao.codificar_array)
+        self.comprimir_arrays = comprimir_arrays
+
+        # Erro de rank dos sketches de quantis do resumo estatístico (None = cálculo exato)
+        self.erro_quantis = erro_quantis
+
+        # Limite de pontos das curvas gravadas (None = curvas completas)
+        self.max_pontos_curvas = max_pontos_curvas
+        self.tolerancia_auc = tolerancia_auc
+
+        # Intervalos bootstrap das métricas (None = não calculados)
+        self.reamostragens_bootstrap = reamostragens_bootstrap
+        self.semente_bootstrap = semente_bootstrap
+
+        # Threads do cálculo das métricas (1 = serial)
+        self.threads = threads
+
+        # Todos os tipos de experimento são gravados no mesmo banco (ver armazenamento.py)
+        self.caminho_banco = caminho_banco
+
+        # Conexões persistentes (uma por arquivo de banco), reaproveitadas entre os salvamentos
+        self.gerenciador = GerenciadorConexao()
+
+        # Escritor em segundo plano, compartilhado por todos os loggers assíncronos do processo
+        self.escritor = EscritorAssincrono.compartilhado() if assincrono else None
+
         # self._ajustar_contador_ids()
 
+    # Opções das curvas de limiar aceitas por preparar_modelo e pelos registros em lote
+    OPCOES_LIMIARES = ('scores', 'bins_limiares', 'custo_fp', 'custo_fn')
+
+    # Opções das métricas de previsão de séries temporais (ver Series_Temporais)
+    OPCOES_SERIES = ('y_treino', 'sazonalidade', 'janela')
+
     def preparar_modelo(self, **kwargs):
+        """
+        Calcula as métricas a partir de `y_real` e `y_pred` ou, para dados processados
+        em blocos, de um `acumulador` (ver criar_acumulador), sem os arrays completos.
+
+        Na classificação binária, `scores` (score da classe positiva) faz o modelo
+        calcular as curvas ROC, Precision-Recall, F1 e custo por limiar (ver
+        limiares.py), gravadas no salvamento sem precisar informar `fpr`, `tpr` etc.
+        `bins_limiares` usa o histograma em O(n) e `custo_fp`/`custo_fn` definem a
+        curva de custo.
+
+        Em 'Series_Temporais', `y_real` e `y_pred` são vetores ou matrizes (n_origens,
+        horizonte) e `y_treino`, `sazonalidade` e `janela` definem a escala do MASE e
+        as janelas móveis dos erros (ver series_temporais.py). As métricas são gravadas
+        junto com a decomposição informada em salvando_relatorio.
+        """
+        modelo = self._criar_modelo(kwargs.get('y_real'), kwargs.get('y_pred'), kwargs.get('acumulador'),
+                                    **self._opcoes_limiares(kwargs), **self._opcoes_series(kwargs))
+        # Em 'Series_Temporais', None (sem previsões) descarta o modelo do relatório
+        # anterior: apenas a decomposição é gravada no próximo salvamento
+        if modelo is not None or self.tipo == 'Series_Temporais':
+            self.modelo = modelo
+
+    def preparar_modelo_arquivos(self, y_real, y_pred=None, scores=None, coluna_real='y_real',
+                                 coluna_pred='y_pred', coluna_scores=None, memoria_mb=MEMORIA_PADRAO_MB,
+                                 tamanho_bloco=None):
+        """
+        Calcula as métricas de previsões gravadas em arquivos, em blocos e com memória
+        limitada (ver avaliacao_arquivos.py), para 'Classificacao' e 'Regressao'.
+
+        Parâmetros:
+        - y_real, y_pred, scores (str): Arquivos .npy (np.memmap) com cada vetor, ou
+          `y_real` com um arquivo Parquet/Arrow que contém as colunas `coluna_real`,
+          `coluna_pred` e, opcionalmente, `coluna_scores`.
+        - memoria_mb (float): Memória reservada para os blocos; define o tamanho do bloco
+          quando `tamanho_bloco` não é informado.
+
+        O modelo preparado tem o mesmo dicionário de métricas gravado por
+        salvando_relatorio (sem gravar `y_test` e `y_pred`, como nos acumuladores).
+
+        Retorna:
+        - dict: Linhas e blocos lidos, tempo e pico de memória residente ('pico_rss_mb').
+        """
+        if self.tipo not in ('Classificacao', 'Regressao'):
+            raise ValueError(
+                "A avaliação de arquivos está disponível apenas para 'Classificacao' e 'Regressao'."
+            )
+
+        blocos = blocos_arquivos(y_real, y_pred, scores, coluna_real, coluna_pred, coluna_scores,
+                                 tamanho_bloco or tamanho_bloco_memoria(memoria_mb))
+        acumulador = self.criar_acumulador()
+        relatorio = avaliar_arquivos(acumulador, blocos)
+        self.preparar_modelo(acumulador=acumulador)
+
+        pico = relatorio['pico_rss_mb']
+        print(f"{relatorio['linhas']} linhas avaliadas em {relatorio['blocos']} blocos "
+              f"({relatorio['tempo_s']:.1f} s, pico de memória "
+              f"{f'{pico:.0f} MB' if pico is not None else 'indisponível'})")
+        return relatorio
+
+    def preparar_modelo_painel(self, dados, coluna_serie='series_id', coluna_tempo='timestamp',
+                               coluna_real='y_real', coluna_pred='y_pred', sazonalidade=1):
+        """
+        Calcula as métricas de previsão de muitas séries de uma vez ('Series_Temporais'),
+        a partir de um DataFrame longo com uma linha por (série, instante) (ver
+        series_painel.py).
+
+        No salvamento, a execução recebe as métricas de todos os pontos (com o MASE
+        médio das séries); as métricas de cada série e os valores, em blocos colunares
+        comprimidos indexados pela série, ficam na tabela ARTEFATOS, e o painel lê
+        uma série sem carregar as demais.
+        """
+        if self.tipo != 'Series_Temporais':
+            raise ValueError("O modo painel está disponível apenas para 'Series_Temporais'.")
+
+        self.modelo = PainelSeries(dados, coluna_serie, coluna_tempo, coluna_real, coluna_pred, sazonalidade)
+        print(f"{len(self.modelo.series)} séries avaliadas ({len(self.modelo.y_real)} pontos)")
+
+    def criar_acumulador(self):
+        """
+        Retorna um acumulador vazio para o tipo do experimento. As previsões são
+        passadas em blocos com `update(y_real, y_pred)`, acumuladores de outros
+        processos podem ser combinados com `merge` e o resultado é informado em
+        `preparar_modelo(acumulador=...)`.
+        """
+        erro_quantis = self.erro_quantis if self.erro_quantis is not None else 0.01
+        if self.tipo == 'Classificacao':
+            return AcumuladorClassificacao(erro_quantis)
+        elif self.tipo == 'Regressao':
+            return AcumuladorRegressao(erro_quantis)
+        raise ValueError(
+            "Acumuladores estão disponíveis apenas para 'Classificacao' e 'Regressao'."
+        )
+
+    def _opcoes_limiares(self, valores):
+        """
+        Seleciona as opções das curvas de limiar informadas (apenas na classificação).
+        """
+        if self.tipo != 'Classificacao':
+            return {}
+        return {nome: valores[nome] for nome in self.OPCOES_LIMIARES if valores.get(nome) is not None}
+
+    def _opcoes_series(self, valores):
+        """
+        Seleciona as opções das métricas de previsão informadas (apenas em séries temporais).
+        """
+        if self.tipo != 'Series_Temporais':
+            return {}
+        return {nome: valores[nome] for nome in self.OPCOES_SERIES if valores.get(nome) is not None}
+
+    def _criar_modelo(self, y_real, y_pred, acumulador=None, **opcoes_modelo):
+        """
+        Instancia a classe de métricas correspondente ao tipo do experimento.
+        """
+        if acumulador is not None and self.tipo == 'Classificacao':
+            # Matriz e histograma de limiares acumulados; y_test e y_pred não são gravados
+            opcoes_modelo.pop('scores', None)
+            opcoes_modelo.pop('bins_limiares', None)
+            return acumulador.finalize(**opcoes_modelo)
+
+        if acumulador is not None and self.tipo == 'Regressao':
+            # Métricas calculadas a partir das somas acumuladas; y_test e y_pred não são gravados
+            return acumulador.finalize()
 
         if self.tipo == 'Classificacao':
             # Instancia Classification
-            self.modelo = Classification(
-                kwargs.get('y_real'), kwargs.get(
-                    'y_pred')
-            )
+            return Classification(y_real, y_pred, erro_quantis=self.erro_quantis, threads=self.threads,
+                                  **opcoes_modelo)
 
         elif self.tipo == 'Regressao':
             # Instancia Regression
-            self.modelo = Regression(
-                kwargs.get('y_real'), kwargs.get(
-                    'y_pred')
-            )
+            return Regression(y_real, y_pred, erro_quantis=self.erro_quantis, threads=self.threads)
 
         elif self.tipo == 'Series_Temporais':
-            # Instancia Regression
-            # self.modelo = Series_Temporais(kwargs.get('y_real'), kwargs.get('y_pred'), kwargs.get('tipo'))
-            pass
+            # Sem previsões, apenas a decomposição é gravada
+            if y_real is None or y_pred is None:
+                return None
+            # Instancia Series_Temporais
+            return Series_Temporais(y_real, y_pred, **opcoes_modelo)
         else:
             raise ValueError(
                 "Tipo inválido. Escolha entre 'Classificacao', 'Regressao',  ou 'Series_Temporais'."
@@ -111,13 +302,13 @@ class ExperimentLogger():
             métricas associadas.
 
             Para problemas de 'Classificação', a função realiza o seguinte:
-            - Gera um ID sequencial para o relatório de classificação.
+            - Gera um ID único para o relatório de classificação.
             - Recupera as métricas de classificação do modelo.
             - Salva as métricas em um arquivo CSV global de classificação.
             - Gera um relatório por classe e o salva em outro arquivo CSV.
 
             Para problemas de 'Regressão', a função realiza o seguinte:
-            - Gera um ID sequencial para o relatório de regressão.
+            - Gera um ID único para o relatório de regressão.
             - Recupera as métricas de regressão do modelo.
             - Salva as métricas em um arquivo CSV global de regressão.
 
@@ -133,12 +324,12 @@ class ExperimentLogger():
             - Para problemas de classificação, dois arquivos CSV são salvos:
             um para as métricas globais e outro por classe.
             - Para problemas de regressão, apenas um arquivo CSV é gerado.
-            - O ID sequencial é gerado e incrementado com base no tipo de problema
-            (Classificação ou Regressão).
+            - Cada salvamento recebe um ID único e crescente no tempo, disponível
+            em `self.id_execucao` após a chamada.
         """
+        id_atual = self.id_execucao = gerar_id_execucao()
+
         if self.tipo == 'Classificacao':
-            id_atual = self.contador_id_classificacao
-            # self.contador_id_classificacao += 1
             # dados = self.modelo.metricas_classificacao
             self.sqlite_classification(
                 id_atual,
@@ -154,16 +345,12 @@ class ExperimentLogger():
             )
 
         elif self.tipo == 'Regressao':
-            id_atual = self.contador_id_regressao
-            # self.contador_id_regressao += 1
             # dados = self.modelo.metricas_regressao
 
             self.sqlite_regression(
                 id_atual, commit_id, endereco)
 
         elif self.tipo == 'Series_Temporais':
-            id_atual = self.contador_id_series_temporais
-            # self.contador_id_series_temporais += 1
             # dados = self.modelo.decomposicao
 
             self.sqlite_seriestemporais(
@@ -175,7 +362,256 @@ class ExperimentLogger():
                 seasonal=kwargs.get('seasonal'),
                 resid=kwargs.get('resid')
             )
-        print("Salvamento concluído")
+
+        if self.escritor is not None:
+            print("Relatório enfileirado para gravação")
+        else:
+            print("Salvamento concluído")
+
+    def salvando_relatorios_em_lote(self, registros):
+        """
+            Calcula as métricas e salva vários relatórios de uma só vez, com um
+            único `executemany` dentro de uma única transação.
+
+            Útil para validação cruzada e buscas de hiperparâmetros, em que
+            salvar um relatório por vez significaria um commit por execução.
+
+            PARÂMETROS:
+            -----------
+            registros : list[dict]
+                Um dicionário por execução, com as chaves:
+                - 'commit_id' e 'endereco' (obrigatórias);
+                - 'y_real' e 'y_pred' (ou 'acumulador', ou 'modelo' já calculado) para
+                  'Classificacao' e 'Regressao';
+                - 'scores', 'bins_limiares', 'custo_fp' e 'custo_fn' (opcionais,
+                  'Classificacao': curvas de limiar calculadas pelo modelo, ver preparar_modelo);
+                - 'fpr', 'tpr', 'thresholds_roc', 'precision', 'recall',
+                  'thresholds' e 'avg_precision' (opcionais, 'Classificacao'; têm
+                  prioridade sobre as curvas calculadas a partir de 'scores');
+                - 'observed', 'trend', 'seasonal' e 'resid' ('Series_Temporais'), além de
+                  'y_real', 'y_pred', 'y_treino', 'sazonalidade' e 'janela' (opcionais)
+                  para as métricas de previsão.
+
+            EXEMPLO DE USO:
+            ---------------
+            logger = ExperimentLogger('Regressao')
+            logger.salvando_relatorios_em_lote([
+                {'commit_id': 'Ridge', 'endereco': 'alpha=0.1', 'y_real': y_test, 'y_pred': pred_1},
+                {'commit_id': 'Ridge', 'endereco': 'alpha=1.0', 'y_real': y_test, 'y_pred': pred_2},
+            ])
+
+            RETORNA:
+            --------
+            list[int] : IDs dos relatórios salvos, na ordem de `registros`.
+        """
+        montagens = []
+        ids = []
+        for registro in registros:
+            commit_id = registro['commit_id']
+            endereco = registro['endereco']
+            id_atual = gerar_id_execucao()
+            ids.append(id_atual)
+
+            if registro.get('modelo') is not None:
+                # Modelo já avaliado (ex.: por salvando_relatorios_modelos)
+                modelo = registro['modelo']
+            else:
+                modelo = self._criar_modelo(
+                    registro.get('y_real'), registro.get('y_pred'), registro.get('acumulador'),
+                    **self._opcoes_limiares(registro), **self._opcoes_series(registro))
+
+            if self.tipo == 'Classificacao':
+                montagens.append(partial(
+                    self._linha_classificacao,
+                    modelo,
+                    id_atual,
+                    commit_id,
+                    endereco,
+                    fpr=registro.get('fpr'),
+                    tpr=registro.get('tpr'),
+                    thresholds_roc=registro.get('thresholds_roc'),
+                    precision=registro.get('precision'),
+                    recall=registro.get('recall'),
+                    thresholds=registro.get('thresholds'),
+                    avg_precision=registro.get('avg_precision')
+                ))
+
+            elif self.tipo == 'Regressao':
+                montagens.append(partial(
+                    self._linha_regressao, modelo, id_atual, commit_id, endereco))
+
+            elif self.tipo == 'Series_Temporais':
+                montagens.append(partial(
+                    self._linha_series_temporais,
+                    modelo,
+                    id_atual,
+                    commit_id,
+                    endereco,
+                    observed=registro.get('observed'),
+                    trend=registro.get('trend'),
+                    seasonal=registro.get('seasonal'),
+                    resid=registro.get('resid')
+                ))
+
+        # Definido antes da gravação, que o troca se houver colisão de IDs (ver _gravar_linhas)
+        if ids:
+            self.id_execucao = ids[-1]
+
+        if self.escritor is not None:
+            for montar in montagens:
+                self.escritor.enfileirar(self.tipo, montar, self._gravar_linhas)
+            print(f"{len(montagens)} relatórios enfileirados para gravação")
+        else:
+            if montagens:
+                # IDs trocados em caso de colisão com outro processo
+                novos = self._gravar_linhas(self.tipo, [montar() for montar in montagens])
+                ids = [novos.get(id_atual, id_atual) for id_atual in ids]
+            print(f"Salvamento concluído ({len(montagens)} relatórios)")
+
+        return ids
+
+    def salvando_relatorios_modelos(self, commit_id, enderecos, y_real, y_pred, scores=None):
+        """
+            Avalia e salva, em uma única chamada, vários modelos comparados sobre o
+            mesmo `y_real` (ex.: candidatos de uma busca de hiperparâmetros).
+
+            PARÂMETROS:
+            -----------
+            commit_id : str
+                Commit associado a todas as execuções.
+            enderecos : list[str]
+                Controle de versão de cada modelo (um por linha de `y_pred`).
+            y_real : array-like
+                Valores ou rótulos reais (vetor de n valores).
+            y_pred : array-like
+                Matriz (n_modelos, n) com as previsões de cada modelo.
+            scores : array-like
+                Matriz (n_modelos, n) opcional com os scores da classe positiva de cada
+                modelo ('Classificacao'), para as curvas de limiar.
+
+            As métricas de todos os modelos são calculadas em uma passagem vetorizada
+            (Regression.avaliar_lote / Classification.avaliar_lote), as estatísticas de
+            `y_real` uma única vez, e as execuções são gravadas em uma única transação
+            (ver salvando_relatorios_em_lote). O `y_test` é gravado uma vez só, pois os
+            artefatos são endereçados pelo conteúdo.
+
+            RETORNA:
+            --------
+            list[int] : IDs dos relatórios salvos, na ordem das linhas de `y_pred`.
+        """
+        y_pred = np.asarray(y_pred)
+        if len(enderecos) != len(y_pred):
+            raise ValueError(
+                f"São necessários {len(y_pred)} endereços (um por modelo); recebidos {len(enderecos)}.")
+
+        if self.tipo == 'Classificacao':
+            modelos = Classification.avaliar_lote(y_real, y_pred, erro_quantis=self.erro_quantis, scores=scores)
+        elif self.tipo == 'Regressao':
+            modelos = Regression.avaliar_lote(y_real, y_pred, erro_quantis=self.erro_quantis)
+        else:
+            raise ValueError(
+                "A avaliação em lote está disponível apenas para 'Classificacao' e 'Regressao'."
+            )
+
+        if modelos:
+            self.modelo = modelos[-1]
+        return self.salvando_relatorios_em_lote([
+            {'commit_id': commit_id, 'endereco': endereco, 'modelo': modelo}
+            for endereco, modelo in zip(enderecos, modelos)
+        ])
+
+
+    def salvando_validacao_cruzada(self, commit_id, endereco, folds, nivel=0.95, max_workers=None):
+        """
+            Avalia e salva os folds de uma validação cruzada sob uma execução pai.
+
+            PARÂMETROS:
+            -----------
+            commit_id, endereco : str
+                Commit e controle de versão da execução pai e de todos os folds.
+            folds : list
+                Previsões de cada fold: dicionários com 'y_real' e 'y_pred' (e, na
+                classificação, 'scores' e as chaves opcionais de curvas de
+                salvando_relatorios_em_lote),
+                tuplas (y_real, y_pred) ou Futures de um ProcessPoolExecutor que resultem
+                em um deles.
+            nivel : float
+                Nível de confiança do intervalo das métricas.
+            max_workers : int
+                Processos usados para calcular as métricas dos folds em paralelo
+                (None = um por fold, até o número de CPUs; 1 = no próprio processo).
+
+            DESCRIÇÃO:
+            -----------
+            As métricas de cada fold são calculadas em paralelo (ver validacao_cruzada.py)
+            e resumidas em média, desvio padrão e intervalo de confiança t. Em uma única
+            transação são gravados:
+            - a execução pai, com a média de cada métrica (em `dados` e em METRICAS) e os
+              agregados na tabela INTERVALOS_METRICAS (metodo 't');
+            - uma execução por fold, ligada à pai pelas colunas `id_pai` e `fold` de EXECUCOES.
+
+            A gravação é sempre imediata, mesmo em um logger assíncrono.
+
+            EXEMPLO DE USO:
+            ---------------
+            folds = [(y[teste], modelo.fit(X[treino], y[treino]).predict(X[teste]))
+                     for treino, teste in StratifiedKFold(10).split(X, y)]
+            logger.salvando_validacao_cruzada('commit', 'RandomForest', folds)
+
+            RETORNA:
+            --------
+            int : ID da execução pai (os IDs dos folds são filhos dela).
+        """
+        if self.tipo not in ('Classificacao', 'Regressao'):
+            raise ValueError(
+                "A validação cruzada está disponível apenas para 'Classificacao' e 'Regressao'."
+            )
+
+        folds = [normalizar_fold(fold) for fold in folds]
+        if not folds:
+            raise ValueError("Nenhum fold informado.")
+
+        # Métricas de todos os folds, calculadas em paralelo
+        modelos = avaliar_folds(self.tipo, folds, self.erro_quantis, max_workers)
+
+        id_pai = gerar_id_execucao()
+        registros = []
+        vinculos = []
+        for numero, (fold, modelo) in enumerate(zip(folds, modelos)):
+            id_fold = gerar_id_execucao()
+            if self.tipo == 'Classificacao':
+                curvas = {chave: fold.get(chave) for chave in (
+                    'fpr', 'tpr', 'thresholds_roc', 'precision', 'recall', 'thresholds', 'avg_precision')}
+                registros.append(self._linha_classificacao(modelo, id_fold, commit_id, endereco, **curvas))
+            else:
+                registros.append(self._linha_regressao(modelo, id_fold, commit_id, endereco))
+            vinculos.append((id_pai, numero, id_fold))
+
+        # Agregados das métricas gravadas de cada fold (o 4º item de cada registro)
+        intervalos = agregar_folds([registro[3] for registro in registros], nivel)
+        medias = {nome: intervalo['media'] for nome, intervalo in intervalos.items()}
+
+        execucao = (id_pai, self.tipo, commit_id, endereco, self.data_atual, self.hora_atual, self._criado_em())
+        if self.tipo == 'Classificacao':
+            # avg_precision gravada em cada fold (informada ou calculada a partir dos scores)
+            precisoes = [registro[1][2] for registro in registros]
+            avg_precision = float(np.mean(precisoes)) if all(p is not None for p in precisoes) else None
+            detalhe = (id_pai, json.dumps(medias), avg_precision)
+        else:
+            detalhe = (id_pai, json.dumps(medias))
+
+        # A execução pai vem primeiro; nenhum artefato ou métrica por classe é gravado nela
+        novos = self._gravar_linhas(
+            self.tipo,
+            [(execucao, detalhe, {}, medias, [], []), *registros],
+            vinculos=vinculos,
+            intervalos=linhas_intervalos(id_pai, intervalos, METODO_FOLDS),
+        )
+
+        self.id_execucao = id_pai = novos.get(id_pai, id_pai)
+        self.modelo = modelos[-1]
+        print(f"Salvamento concluído (validação cruzada com {len(folds)} folds)")
+        return id_pai
 
 
 # ================================================ Parte Banco de dados ==================================================================
@@ -190,19 +626,60 @@ class ExperimentLogger():
         colunas = [info[1]
                    for info in cursor.fetchall()]  # Obtém os nomes das colunas
         return coluna in colunas
+# -------------------------------------Salvando no banco único----------------------------------------------------------------------------
+
+    # Colunas gravadas na tabela EXECUCOES (compartilhada por todos os tipos), na ordem do INSERT
+    COLUNAS_EXECUCOES = ["id", "tipo", "id_commit", "controle_de_versao", "data", "hora", "criado_em"]
+
 # -------------------------------------Salvando em um Banco de dados para classificação---------------------------------------------------
 
-    def sqlite_classification(self, id_atual, commit_id, endereco, fpr=None, tpr=None, thresholds_roc=None, precision=None, recall=None, thresholds=None, avg_precision=None):
+    def _intervalos_bootstrap(self, modelo, id_atual):
+        """
+        Linhas de INTERVALOS_METRICAS com os intervalos bootstrap das métricas do
+        modelo; vazias sem `reamostragens_bootstrap`, sem os arrays (acumuladores) ou
+        em modelos com várias saídas (o bootstrap reamostra vetores).
+        """
+        if not self.reamostragens_bootstrap or modelo.y_real is None or modelo.y_pred is None:
+            return []
+        if getattr(modelo, 'multi_saida', False):
+            return []
 
-        # Conectando ao banco de dados SQLite
-        conn = sqlite3.connect(
-            './dados/banco_de_dados_classificacao/classificacao.db')
-        cursor = conn.cursor()
+        calcular = bootstrap_classificacao if self.tipo == 'Classificacao' else bootstrap_regressao
+        intervalos = calcular(modelo.y_real, modelo.y_pred, self.reamostragens_bootstrap,
+                              semente=self.semente_bootstrap)
+        return linhas_intervalos(id_atual, intervalos, METODO_BOOTSTRAP)
 
+    # Colunas gravadas na tabela de detalhes CLASSIFICACAO, na ordem do INSERT
+    # (y_test, y_pred e as curvas ficam na tabela ARTEFATOS, ver artefatos.py)
+    COLUNAS_CLASSIFICACAO = ["id", "dados", "avg_precision"]
+
+    def _linha_classificacao(self, modelo, id_atual, commit_id, endereco, fpr=None, tpr=None, thresholds_roc=None, precision=None, recall=None, thresholds=None, avg_precision=None):
+        """
+        Monta as tuplas das tabelas EXECUCOES e CLASSIFICACAO, o dicionário de
+        artefatos {nome: valor codificado}, o dicionário de métricas da
+        execução (gravado também na tabela METRICAS), as linhas da tabela
+        METRICAS_CLASSE com as métricas um-contra-todos de cada classe e as
+        linhas dos intervalos bootstrap (ver _intervalos_bootstrap).
+        """
         # Dados para salvar (exemplo: métrica de classificação)
-        dados = self.modelo.metricas_classificacao
-        y_test = self.modelo.y_real
-        y_pred = self.modelo.y_pred
+        dados = modelo.metricas_classificacao
+        y_test = modelo.y_real
+        y_pred = modelo.y_pred
+
+        # Curvas não informadas vêm da varredura de limiares do modelo (ver limiares.py)
+        calculadas = modelo.curvas or {}
+        informadas = {'fpr': fpr, 'tpr': tpr, 'thresholds_roc': thresholds_roc,
+                      'precision': precision, 'recall': recall, 'thresholds': thresholds}
+        curvas = {nome: informadas.get(nome) if informadas.get(nome) is not None else calculadas.get(nome)
+                  for nome in (*informadas, 'f1_limiares', 'custo_limiares')}
+        avg_precision = avg_precision if avg_precision is not None else calculadas.get('avg_precision')
+        if thresholds is not None:
+            # F1 e custo por limiar só acompanham os limiares calculados pelo modelo
+            curvas['f1_limiares'] = curvas['custo_limiares'] = None
+
+        if self.max_pontos_curvas is not None:
+            # Tamanho gravado limitado, independente do tamanho dos dados
+            curvas = simplificar_curvas_classificacao(curvas, self.max_pontos_curvas, self.tolerancia_auc)
 
         # Convertendo os valores para tipos padrão (int ou float)
         dados_convertidos = {key: float(value) if isinstance(
@@ -210,105 +687,71 @@ class ExperimentLogger():
 
         metricas = json.dumps(dados_convertidos)  # Convertendo para JSON
 
-        # Convertendo as métricas para JSON para armazenar no banco
-        # parametros = json.dumps(dados)
-
-        # Obtendo a data e hora atual para salvar
-        data_atual = self.data_atual
-        hora_atual = self.hora_atual
-
-        # Verificando se fpr, tpr, e thresholds_roc são None e convertendo para JSON se não forem
-        # Para curva roc
-        fpr_str = json.dumps(fpr.tolist()) if fpr is not None else None
-        tpr_str = json.dumps(tpr.tolist()) if tpr is not None else None
-        thresholds_roc_str = json.dumps(
-            thresholds_roc.tolist()) if thresholds_roc is not None else None
-        # Para average Precision Score
-        precision_str = json.dumps(
-            precision.tolist()) if precision is not None else None
-        recall_str = json.dumps(
-            recall.tolist()) if recall is not None else None
-        thresholds_str = json.dumps(
-            thresholds.tolist()) if thresholds is not None else None
-
-        # Excluindo a tabela "CLASSIFICACAO"
-        # cursor.execute('DROP TABLE IF EXISTS CLASSIFICACAO')
-        # Nome da tabela e coluna a adicionar
-        # Verifica se a tabela CLASSIFICACAO existe
-        cursor.execute(
-            "SELECT name FROM sqlite_master WHERE type='table' AND name='CLASSIFICACAO'")
-        tabela_existe = cursor.fetchone() is not None
-
-        # Se a tabela não existir, cria com todas as colunas
-        if not tabela_existe:
-            cursor.execute('''
-                CREATE TABLE CLASSIFICACAO (
-                    id INTEGER,
-                    id_commit TEXT,
-                    controle_de_versao TEXT,
-                    data DATETIME,
-                    hora DATETIME,
-                    dados TEXT,
-                    y_test TEXT,
-                    y_pred TEXT,
-                    fpr TEXT,
-                    tpr TEXT,
-                    thresholds_roc TEXT,
-                    precision TEXT,
-                    recall TEXT,
-                    thresholds TEXT,
-                    avg_precision REAL
-
-                )
-            ''')
-        else:
-            # Adiciona colunas extras se necessário
-            for coluna in ["id_commit", "controle_de_versao", "data", "hora", "dados", "y_test", "y_pred", "fpr", "tpr", "thresholds_roc", "precision", "recall", "thresholds", "avg_precision"]:
-                if not self.coluna_existe("CLASSIFICACAO", coluna, cursor):
-                    cursor.execute(
-                        f"ALTER TABLE CLASSIFICACAO ADD COLUMN {coluna} TEXT")
-
-        # Inserindo dados do modelo
-        cursor.execute('''
-            INSERT INTO CLASSIFICACAO (id, id_commit, controle_de_versao, data, hora, dados, y_test, y_pred, fpr, tpr, thresholds_roc, precision, recall, thresholds, avg_precision)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        ''', (
+        execucao = (
             id_atual,                      # Exemplo de ID
+            'Classificacao',
             commit_id,                     # Exemplo de ID de commit
             endereco,                     # Controle de versão
-            data_atual,                 # Data atual
-            hora_atual,                 # Hora atual
+            self.data_atual,                 # Data atual
+            self.hora_atual,                 # Hora atual
+            self._criado_em()                # Data e hora para ordenação dos registros
+        )
+
+        detalhe = (
+            id_atual,
             metricas,   # Dados do modelo, armazenados em formato JSON
-            json.dumps(y_test.tolist()),  # y_test convertido para JSON
-            json.dumps(y_pred.tolist()),  # y_pred convertido para JSON
-            fpr_str,                     # fpr convertido para JSON ou None
-            tpr_str,                     # tpr convertido para JSON ou None
-            thresholds_roc_str,           # thresholds_roc convertido para JSON ou None
-            precision_str,
-            recall_str,
-            thresholds_str,
-            avg_precision
-
-        ))
-
-        # Comitando as mudanças
-        conn.commit()
-
-        # Fechando a conexão
-        conn.close()
-# -------------------------------------Salvando em um Banco de dados para Regressão-------------------------------------------------------
+            avg_precision,
+        )
+
+        # Arrays em formato binário; curvas não informadas (None) não são gravadas
+        artefatos = {
+            'y_test': codificar_array(y_test, self.comprimir_arrays),
+            'y_pred': codificar_array(y_pred, self.comprimir_arrays),
+            # Curva roc
+            'fpr': codificar_array(curvas['fpr'], self.comprimir_arrays),
+            'tpr': codificar_array(curvas['tpr'], self.comprimir_arrays),
+            'thresholds_roc': codificar_array(curvas['thresholds_roc'], self.comprimir_arrays),
+            # Curva precision-recall
+            'precision': codificar_array(curvas['precision'], self.comprimir_arrays),
+            'recall': codificar_array(curvas['recall'], self.comprimir_arrays),
+            'thresholds': codificar_array(curvas['thresholds'], self.comprimir_arrays),
+            # F1 e custo por limiar (mesma ordem de `thresholds`)
+            'f1_limiares': codificar_array(curvas['f1_limiares'], self.comprimir_arrays),
+            'custo_limiares': codificar_array(curvas['custo_limiares'], self.comprimir_arrays),
+        }
+
+        # Métricas por classe já calculadas pelo modelo (ver Classification.metricas_por_classe)
+        metricas_classe = linhas_metricas_classe(id_atual, modelo.rotulos, modelo.metricas_por_classe)
+
+        return execucao, detalhe, artefatos, dados_convertidos, metricas_classe, \
+            self._intervalos_bootstrap(modelo, id_atual)
 
-    def sqlite_regression(self, id_atual, commit_id, endereco):
+    def sqlite_classification(self, id_atual, commit_id, endereco, fpr=None, tpr=None, thresholds_roc=None, precision=None, recall=None, thresholds=None, avg_precision=None):
+
+        self._salvar('Classificacao', partial(
+            self._linha_classificacao,
+            self.modelo, id_atual, commit_id, endereco,
+            fpr=fpr, tpr=tpr, thresholds_roc=thresholds_roc,
+            precision=precision, recall=recall, thresholds=thresholds,
+            avg_precision=avg_precision))
 
-        # Conectando ao banco de dados SQLite
-        conn = sqlite3.connect(
-            './dados/banco_de_dados_regressao/regressao.db')
-        cursor = conn.cursor()
+# -------------------------------------Salvando em um Banco de dados para Regressão-------------------------------------------------------
+
+    # Colunas gravadas na tabela de detalhes REGRESSAO, na ordem do INSERT
+    # (y_test e y_pred ficam na tabela ARTEFATOS, ver artefatos.py)
+    COLUNAS_REGRESSAO = ["id", "dados"]
 
+    def _linha_regressao(self, modelo, id_atual, commit_id, endereco):
+        """
+        Monta as tuplas das tabelas EXECUCOES e REGRESSAO, o dicionário de
+        artefatos {nome: valor codificado}, o dicionário de métricas da
+        execução (gravado também na tabela METRICAS), as linhas de métricas
+        por classe (vazias na regressão) e as dos intervalos bootstrap.
+        """
         # Dados para salvar (exemplo: métrica de classificação)
-        dados = self.modelo.metricas_regressao
-        y_test = self.modelo.y_real
-        y_pred = self.modelo.y_pred
+        dados = modelo.metricas_regressao
+        y_test = modelo.y_real
+        y_pred = modelo.y_pred
 
         # Convertendo os valores para tipos padrão (int ou float)
         dados_convertidos = {key: float(value) if isinstance(
@@ -316,186 +759,317 @@ class ExperimentLogger():
 
         metricas = json.dumps(dados_convertidos)  # Convertendo para JSON
 
-        # Convertendo as métricas para JSON para armazenar no banco
-        # parametros = json.dumps(dados)
-
-        # Obtendo a data e hora atual para salvar
-        data_atual = self.data_atual
-        hora_atual = self.hora_atual
-
-        cursor.execute(
-            "SELECT name FROM sqlite_master WHERE type='table' AND name='REGRESSAO'")
-        tabela_existe = cursor.fetchone() is not None
-
-        # Se a tabela não existir, cria com todas as colunas
-        if not tabela_existe:
-            cursor.execute('''
-                CREATE TABLE REGRESSAO (
-                    id INTEGER,
-                    id_commit TEXT,
-                    controle_de_versao TEXT,
-                    data DATETIME,
-                    hora DATETIME,
-                    dados TEXT,
-                    y_test TEXT,
-                    y_pred TEXT
-
-                )
-            ''')
-        else:
-            # Adiciona colunas extras se necessário
-            for coluna in ["id_commit", "controle_de_versao", "data", "hora", "dados", "y_test", "y_pred"]:
-                if not self.coluna_existe("REGRESSAO", coluna, cursor):
-                    cursor.execute(
-                        f"ALTER TABLE REGRESSAO ADD COLUMN {coluna} TEXT")
-
-        # Inserindo dados do modelo
-        cursor.execute('''
-            INSERT INTO REGRESSAO (id, id_commit, controle_de_versao, data, hora, dados, y_test, y_pred)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-        ''', (
+        execucao = (
             id_atual,                      # Exemplo de ID
+            'Regressao',
             commit_id,                     # Exemplo de ID de commit
             endereco,                     # Controle de versão
-            data_atual,                 # Data atual
-            hora_atual,                 # Hora atual
+            self.data_atual,                 # Data atual
+            self.hora_atual,                 # Hora atual
+            self._criado_em()                # Data e hora para ordenação dos registros
+        )
+
+        detalhe = (
+            id_atual,
             metricas,   # Dados do modelo, armazenados em formato JSON
-            json.dumps(y_test.tolist()),  # y_test convertido para JSON
-            json.dumps(y_pred.tolist())  # y_pred convertido para JSON
+        )
 
-        ))
+        artefatos = {
+            'y_test': codificar_array(y_test, self.comprimir_arrays),  # y_test em formato binário
+            'y_pred': codificar_array(y_pred, self.comprimir_arrays),  # y_pred em formato binário
+        }
 
-        # Comitando as mudanças
-        conn.commit()
+        # Sketches de quantis de y_test, y_pred e do resíduo (resumo aproximado ou
+        # acumulado em blocos): o painel desenha os boxplots a partir deles
+        for nome, sketch in modelo.sketches.items():
+            if sketch.n:
+                artefatos[f'sketch_{nome}'] = codificar_array(sketch.para_array(), self.comprimir_arrays)
 
-        # Fechando a conexão
-        conn.close()
+        # Modelos com várias saídas: um array por métrica, com um valor por saída (os
+        # agregados ficam em `dados` e na tabela METRICAS)
+        for nome, valores in modelo.metricas_saidas.items():
+            artefatos[f'saida_{nome}'] = codificar_array(np.asarray(valores, dtype=np.float64),
+                                                         self.comprimir_arrays)
+
+        return execucao, detalhe, artefatos, dados_convertidos, [], self._intervalos_bootstrap(modelo, id_atual)
+
+    def sqlite_regression(self, id_atual, commit_id, endereco):
+
+        self._salvar('Regressao', partial(
+            self._linha_regressao, self.modelo, id_atual, commit_id, endereco))
 
 # -------------------------------------Salvando em um Banco de dados para Séries temporais------------------------------------------------
-    def sqlite_seriestemporais(self, id_atual, commit_id, endereco, observed=None, trend=None, seasonal=None, resid=None):
-        # Conectando ao banco de dados SQLite
-        conn = sqlite3.connect(
-            './dados/banco_de_dados_series_temporais/series_temporais.db')
-        cursor = conn.cursor()
 
+    # Colunas gravadas na tabela de detalhes SERIES_TEMPORAIS, na ordem do INSERT
+    # (observed, trend, seasonal, resid, y_test, y_pred e os erros por horizonte e em
+    # janelas móveis ficam na tabela ARTEFATOS, ver artefatos.py)
+    COLUNAS_SERIES_TEMPORAIS = ["id", "dados"]
+
+    def _linha_series_temporais(self, modelo, id_atual, commit_id, endereco, observed=None, trend=None, seasonal=None, resid=None):
+        """
+        Monta as tuplas das tabelas EXECUCOES e SERIES_TEMPORAIS, o dicionário
+        de artefatos {nome: valor codificado}, o dicionário de métricas de
+        previsão da execução (vazio sem `modelo`, quando apenas a decomposição é
+        gravada), as linhas de métricas por classe e as de intervalos (vazias).
+        `modelo` é um Series_Temporais ou, no modo painel, um PainelSeries.
+        """
         # Obtendo a data e hora atual para salvar
         data_atual = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
         hora_atual = datetime.now().strftime('%H:%M:%S')
 
-        cursor.execute(
-            "SELECT name FROM sqlite_master WHERE type='table' AND name='SERIES_TEMPORAIS'")
-        tabela_existe = cursor.fetchone() is not None
-
-        # Se a tabela não existir, cria com todas as colunas
-        if not tabela_existe:
-            cursor.execute(''' 
-                CREATE TABLE SERIES_TEMPORAIS (
-                    id INTEGER PRIMARY KEY,
-                    id_commit TEXT,
-                    controle_de_versao TEXT,
-                    data DATETIME,
-                    hora DATETIME,
-                    observed TEXT,
-                    trend TEXT,
-                    seasonal TEXT,
-                    resid TEXT,
-                    y_test TEXT,
-                    y_pred TEXT
-                )
-            ''')
-        else:
-            # Adiciona colunas extras se necessário
-            for coluna in ["id_commit", "controle_de_versao", "data", "hora", "observed", "trend", "seasonal", "resid", "y_test", "y_pred"]:
-                if not self.coluna_existe("SERIES_TEMPORAIS", coluna, cursor):
-                    cursor.execute(
-                        f"ALTER TABLE SERIES_TEMPORAIS ADD COLUMN {coluna} TEXT")
-
         def serie_para_json(serie):
             if serie is not None:
+                # Datas (ex.: decomposição de séries com DatetimeIndex) são gravadas como texto
+                indice = serie.index.astype(str) if isinstance(serie.index, pd.DatetimeIndex) else serie.index
                 return json.dumps({
-                    "index": serie.index.tolist(),  # Índice convertido diretamente para lista
+                    "index": indice.tolist(),  # Índice convertido diretamente para lista
                     "values": serie.values.tolist()  # Valores da série
                 })
-            # Retorna vazio se a série for None
-            return json.dumps({"index": [], "values": []})
-
-        # Inserindo dados do modelo
-        cursor.execute(''' 
-            INSERT INTO SERIES_TEMPORAIS (id, id_commit, controle_de_versao, data, hora, observed, trend, seasonal, resid, y_test, y_pred)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        ''', (
+            # Séries não informadas não são gravadas
+            return None
+
+        execucao = (
             id_atual,
+            'Series_Temporais',
             commit_id,
             endereco,
             data_atual,
             hora_atual,
-            # json.dumps(observed.tolist() if observed is not None else []),
-            # json.dumps(trend.tolist() if trend is not None else []),
-            # json.dumps(seasonal.tolist() if seasonal is not None else []),
-            # json.dumps(resid.tolist() if resid is not None else []),
-            serie_para_json(observed),  # Observed com índice
-            serie_para_json(trend),     # Trend com índice
-            serie_para_json(seasonal),  # Seasonal com índice
-            serie_para_json(resid),     # Resid com índice
-            json.dumps([]),  # y_test vazio para agora
-            json.dumps([])   # y_pred vazio para agora
-        ))
-
-        # Comitando as mudanças
-        conn.commit()
-
-        # Fechando a conexão
-        conn.close()
+            self._criado_em()  # Data e hora para ordenação dos registros
+        )
+
+        artefatos = {
+            'observed': serie_para_json(observed),  # Observed com índice
+            'trend': serie_para_json(trend),     # Trend com índice
+            'seasonal': serie_para_json(seasonal),  # Seasonal com índice
+            'resid': serie_para_json(resid),     # Resid com índice
+        }
+
+        if modelo is None:
+            return execucao, (id_atual, None), artefatos, {}, [], []
+
+        # Convertendo os valores para tipos padrão (int ou float)
+        dados_convertidos = {key: float(value) if isinstance(
+            value, (np.int32, np.float32, np.int64, np.float64)) else value
+            for key, value in modelo.metricas_series.items()}
+
+        detalhe = (
+            id_atual,
+            json.dumps(dados_convertidos),   # Métricas de previsão em formato JSON
+        )
+
+        if isinstance(modelo, PainelSeries):
+            # Métricas por série (um valor por série, na ordem de `series_ids`) e os
+            # valores em blocos colunares, sempre comprimidos (ver series_painel.layout_colunar)
+            for nome, valores in modelo.metricas_por_serie.items():
+                artefatos[f'serie_{nome}'] = codificar_array(valores, self.comprimir_arrays)
+            for nome, valores in layout_colunar(modelo).items():
+                artefatos[nome] = codificar_array(valores, comprimir=True)
+            return execucao, detalhe, artefatos, dados_convertidos, [], []
+
+        artefatos['y_test'] = codificar_array(np.asarray(modelo.y_real), self.comprimir_arrays)
+        artefatos['y_pred'] = codificar_array(np.asarray(modelo.y_pred), self.comprimir_arrays)
+
+        # Um array por métrica: um valor por passo do horizonte e um por janela móvel
+        for nome, valores in modelo.erros_horizonte.items():
+            artefatos[f'horizonte_{nome}'] = codificar_array(valores, self.comprimir_arrays)
+        for nome, valores in modelo.erros_janela.items():
+            artefatos[f'janela_{nome}'] = codificar_array(valores, self.comprimir_arrays)
+
+        return execucao, detalhe, artefatos, dados_convertidos, [], []
+
+    def sqlite_seriestemporais(self, id_atual, commit_id, endereco, observed=None, trend=None, seasonal=None, resid=None):
+
+        self._salvar('Series_Temporais', partial(
+            self._linha_series_temporais,
+            self.modelo, id_atual, commit_id, endereco,
+            observed=observed, trend=trend, seasonal=seasonal, resid=resid))
+
+# -------------------------------------Gravação das linhas------------------------------------------------------------------------------
+
+    @staticmethod
+    def _criado_em():
+        """
+        Data e hora no formato 'AAAA-MM-DD HH:MM:SS.fff', que ordena corretamente como texto
+        (coluna indexada `criado_em`).
+        """
+        return datetime.now().isoformat(sep=' ', timespec='milliseconds')
+
+    def _salvar(self, tipo, montar):
+        """
+        Grava a linha imediatamente ou, no modo assíncrono, coloca na fila do escritor.
+
+        Parâmetros:
+        - tipo (str): Tipo do experimento.
+        - montar (callable): Função sem argumentos que retorna as tuplas das tabelas
+          EXECUCOES e de detalhes, o dicionário de artefatos e o dicionário de métricas.
+        """
+        if self.escritor is not None:
+            self.escritor.enfileirar(tipo, montar, self._gravar_linhas)
+        else:
+            self._gravar_linhas(tipo, [montar()])
+
+    def _tabela_detalhes(self, tipo):
+        """
+        Retorna a tabela de detalhes do tipo e as suas colunas.
+        """
+        if tipo == 'Classificacao':
+            return 'CLASSIFICACAO', self.COLUNAS_CLASSIFICACAO
+        elif tipo == 'Regressao':
+            return 'REGRESSAO', self.COLUNAS_REGRESSAO
+        elif tipo == 'Series_Temporais':
+            return 'SERIES_TEMPORAIS', self.COLUNAS_SERIES_TEMPORAIS
+        raise ValueError(
+            "Tipo inválido. Escolha entre 'Classificacao', 'Regressao',  ou 'Series_Temporais'."
+        )
+
+    def _gravar_linhas(self, tipo, registros, vinculos=(), intervalos=()):
+        """
+        Grava as execuções na tabela EXECUCOES, os detalhes na tabela do tipo
+        informado, os artefatos na tabela ARTEFATOS e as métricas nas tabelas
+        METRICAS e METRICAS_CLASSE usando `executemany` dentro de uma única
+        transação (um único commit para todas as linhas).
+
+        Parâmetros:
+        - tipo (str): 'Classificacao', 'Regressao' ou 'Series_Temporais'.
+        - registros (list): Tuplas (execucao, detalhe, artefatos, metricas, metricas_classe, intervalos) montadas por
+          `_linha_classificacao`, `_linha_regressao` ou `_linha_series_temporais`.
+        - vinculos (list): Tuplas (id_pai, fold, id) das execuções filhas (folds de uma validação cruzada).
+        - intervalos (list): Linhas da tabela INTERVALOS_METRICAS (ver metricas.linhas_intervalos).
+
+        Se o ID de alguma execução já existir no banco (outro processo gerou o mesmo
+        ID, ver identificadores.gerar_id_execucao), a transação é desfeita e gravada
+        novamente com novos IDs para essas execuções; `self.id_execucao` é atualizado.
+
+        Retorna:
+        - dict: {ID montado: ID gravado} das execuções que receberam um novo ID (vazio
+          quando não há colisão).
+        """
+        tabela, colunas = self._tabela_detalhes(tipo)
+
+        # Conexão persistente com o banco único (o esquema é preparado uma vez por processo)
+        conn = conectar_banco(self.caminho_banco, self.gerenciador)
+
+        # O ID da execução é a primeira coluna de cada linha
+        execucoes = [execucao for execucao, *_ in registros]
+        detalhes = [detalhe for _, detalhe, *_ in registros]
+        artefatos = [(execucao[0], nome, dados)
+                     for execucao, _, artefatos_linha, *_ in registros
+                     for nome, dados in artefatos_linha.items()]
+        metricas = [valor
+                    for execucao, _, _, metricas_linha, *_ in registros
+                    for valor in linhas_metricas(execucao[0], metricas_linha)]
+        metricas_classe = [linha
+                           for _, _, _, _, linhas_classe, _ in registros
+                           for linha in linhas_classe]
+        # Intervalos das execuções (bootstrap) e os informados (agregados dos folds)
+        intervalos = [linha
+                      for *_, linhas_intervalos_execucao in registros
+                      for linha in linhas_intervalos_execucao] + list(intervalos)
+
+        linhas = {
+            'execucoes': execucoes, 'detalhes': detalhes, 'artefatos': artefatos, 'metricas': metricas,
+            'metricas_classe': metricas_classe, 'intervalos': intervalos, 'vinculos': list(vinculos),
+        }
+        # {ID montado: ID atual} de cada execução
+        atuais = {execucao[0]: execucao[0] for execucao in execucoes}
+        for tentativa in range(TENTATIVAS_ID):
+            try:
+                self._inserir_linhas(conn, tabela, colunas, linhas)
+                break
+            except sqlite3.IntegrityError:
+                repetidos = self._ids_existentes(conn, list(atuais.values()))
+                if not repetidos or tentativa == TENTATIVAS_ID - 1:
+                    raise
+                # Colisão com um ID gravado por outro processo: gera novos IDs e tenta de novo
+                trocas = {id_repetido: gerar_id_execucao() for id_repetido in repetidos}
+                linhas = self._trocar_ids(linhas, trocas)
+                atuais = {original: trocas.get(atual, atual) for original, atual in atuais.items()}
+
+        novos = {original: atual for original, atual in atuais.items() if original != atual}
+        if self.id_execucao in novos:
+            self.id_execucao = novos[self.id_execucao]
+        return novos
+
+    def _inserir_linhas(self, conn, tabela, colunas, linhas):
+        """
+        Insere as linhas montadas por `_gravar_linhas` em uma única transação.
+        """
+        # Inserindo dados dos modelos (o bloco with faz o commit da transação)
+        with conn:
+            conn.executemany(
+                f'INSERT INTO EXECUCOES ({", ".join(self.COLUNAS_EXECUCOES)}) '
+                f'VALUES ({", ".join("?" * len(self.COLUNAS_EXECUCOES))})',
+                linhas['execucoes'])
+            conn.executemany(
+                f'INSERT INTO {tabela} ({", ".join(colunas)}) VALUES ({", ".join("?" * len(colunas))})',
+                linhas['detalhes'])
+            gravar_artefatos(conn, linhas['artefatos'])
+            gravar_metricas(conn, linhas['metricas'])
+            gravar_metricas_classe(conn, linhas['metricas_classe'])
+            conn.executemany("UPDATE EXECUCOES SET id_pai = ?, fold = ? WHERE id = ?", linhas['vinculos'])
+            gravar_intervalos(conn, linhas['intervalos'])
+
+    @staticmethod
+    def _trocar_ids(linhas, trocas):
+        """
+        Troca os IDs das execuções em todas as linhas montadas por `_gravar_linhas`
+        (a primeira coluna de cada linha e, nos vínculos, também o ID da execução pai).
+        """
+        def trocar(linha, *posicoes):
+            linha = list(linha)
+            for posicao in posicoes:
+                linha[posicao] = trocas.get(linha[posicao], linha[posicao])
+            return tuple(linha)
+
+        return {
+            nome: [trocar(linha, 0, 2) if nome == 'vinculos' else trocar(linha, 0) for linha in lista]
+            for nome, lista in linhas.items()
+        }
+
+    @staticmethod
+    def _ids_existentes(conn, ids):
+        """
+        IDs de `ids` que já estão na tabela EXECUCOES.
+        """
+        existentes = []
+        for inicio in range(0, len(ids), 500):
+            lote = ids[inicio:inicio + 500]
+            existentes.extend(id_execucao for (id_execucao,) in conn.execute(
+                f'SELECT id FROM EXECUCOES WHERE id IN ({", ".join("?" * len(lote))})', lote))
+        return existentes
 
     def consultar_modelos(self, id_atual=None, commit_id=None, endereco=None):
-        # Conectando ao banco de dados SQLite
-        if self.tipo == 'Classificacao':
-            conn = sqlite3.connect(
-                './dados/banco_de_dados_classificacao/classificacao.db')
-            cursor = conn.cursor()
-            # Montando a consulta SQL dinamicamente
-            query = 'SELECT * FROM CLASSIFICACAO WHERE 1=1'
+        tabela, _ = self._tabela_detalhes(self.tipo)
 
-        if self.tipo == 'Regressao':
-            conn = sqlite3.connect(
-                './dados/banco_de_dados_regressao/regressao.db')
-            cursor = conn.cursor()
-            # Montando a consulta SQL dinamicamente
-            query = 'SELECT * FROM  REGRESSAO WHERE 1=1'
-        if self.tipo == 'Series_Temporais':
-            conn = sqlite3.connect(
-                './dados/banco_de_dados_series_temporais/series_temporais.db')
-            cursor = conn.cursor()
-            # Montando a consulta SQL dinamicamente
-            query = 'SELECT * FROM SERIES_TEMPORAIS WHERE 1=1'
+        # Conexão persistente com o banco único
+        conn = conectar_banco(self.caminho_banco, self.gerenciador)
 
-        params = []
+        # Montando a consulta SQL dinamicamente
+        query = f'SELECT * FROM EXECUCOES e JOIN {tabela} d ON d.id = e.id WHERE e.tipo = ?'
+        params = [self.tipo]
 
         if id_atual is not None:
-            query += ' AND id = ?'
+            query += ' AND e.id = ?'
             params.append(id_atual)
 
         if commit_id is not None:
-            query += ' AND id_commit = ?'
+            query += ' AND e.id_commit = ?'
             params.append(commit_id)
 
         if endereco is not None:
-            query += ' AND controle_de_versao = ?'
+            query += ' AND e.controle_de_versao = ?'
             params.append(endereco)
 
-        # Executando a consulta com os parâmetros passados
-        cursor.execute(query, params)
+        query += ' ORDER BY e.id'
 
-        # Recuperando os resultados
-        modelos = cursor.fetchall()
+        # Executando a consulta com os parâmetros passados
+        modelos = conn.execute(query, params).fetchall()
 
         # Exibindo os dados
         for modelo in modelos:
             print(modelo)
 
-        # Fechando a conexão
-        conn.close()
-
 
 # --------------------------------------------------------------------------------------------------------------------------------
 
@@ -529,4 +1103,33 @@ class ExperimentLogger():
     def get_metric(self, metric_name):
         return self.modelo.get_metric(metric_name)
 
+    def flush(self):
+        """
+        No modo assíncrono, aguarda a gravação dos relatórios enfileirados por este
+        logger (o escritor é compartilhado com os demais loggers do processo).
+
+        Lança ErroGravacaoAssincrona (ver escritor_assincrono.py) com os relatórios deste
+        logger que não puderam ser gravados e os IDs das execuções correspondentes.
+        """
+        if self.escritor is not None:
+            self.escritor.flush(self)
+
+    def estatisticas_escrita(self):
+        """
+        Retorna os contadores do escritor assíncrono (profundidade da fila e
+        latências de gravação), ou None fora do modo assíncrono.
+        """
+        if self.escritor is not None:
+            return self.escritor.estatisticas()
+        return None
+
+    def fechar(self):
+        """
+        Grava os relatórios pendentes (modo assíncrono) e fecha as conexões com
+        os bancos de dados abertas pela thread atual. Elas são reabertas
+        automaticamente no próximo salvamento.
+        """
+        self.flush()
+        self.gerenciador.fechar()
+
 # --------------------------------------------------------------------------------------------------------------------------------
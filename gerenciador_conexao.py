@@ -0,0 +1,121 @@
+import atexit
+import os
+import sqlite3
+import threading
+
+
+class GerenciadorConexao:
+    """
+    Mantém uma conexão SQLite aberta por arquivo de banco de dados durante toda a
+    vida do processo, evitando o custo de abrir, configurar e fechar o banco a
+    cada relatório salvo.
+
+    As conexões são abertas em modo WAL, com `synchronous=NORMAL` e `mmap_size`
+    configurado, e a preparação do esquema (criação e migrações) é feita uma
+    única vez por processo para cada arquivo.
+
+    Como o módulo sqlite3 não permite usar uma conexão em uma thread diferente
+    da que a criou, cada thread recebe a sua própria conexão para o mesmo arquivo.
+
+    Parâmetros:
+    - synchronous (str): Nível de sincronização do SQLite ('OFF', 'NORMAL' ou 'FULL').
+    - mmap_size (int): Tamanho em bytes da região de memória mapeada.
+    - cache_size (int): Tamanho do cache de páginas (negativo = em KiB).
+    - busy_timeout (int): Tempo em ms aguardando o banco quando ele está bloqueado.
+    """
+
+    # Conexões abertas por thread: {caminho_absoluto: sqlite3.Connection}
+    _local = threading.local()
+
+    # Todas as conexões abertas no processo, usadas para o fechamento no atexit
+    _conexoes = []
+    _trava = threading.Lock()
+
+    # Arquivos cujo esquema já foi preparado neste processo: {caminho_absoluto}
+    _esquemas_verificados = set()
+    _trava_preparacao = threading.Lock()
+
+    def __init__(self, synchronous='NORMAL', mmap_size=268435456, cache_size=-65536, busy_timeout=5000):
+        self.synchronous = synchronous
+        self.mmap_size = mmap_size
+        self.cache_size = cache_size
+        self.busy_timeout = busy_timeout
+
+    def conectar(self, caminho):
+        """
+        Retorna a conexão aberta para o arquivo `caminho`, criando-a na primeira chamada.
+        """
+        caminho = os.path.abspath(caminho)
+
+        conexoes = getattr(self._local, 'conexoes', None)
+        if conexoes is None:
+            conexoes = self._local.conexoes = {}
+
+        conn = conexoes.get(caminho)
+        if conn is None:
+            os.makedirs(os.path.dirname(caminho), exist_ok=True)
+
+            conn = sqlite3.connect(caminho)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute(f'PRAGMA synchronous={self.synchronous}')
+            conn.execute(f'PRAGMA mmap_size={int(self.mmap_size)}')
+            conn.execute(f'PRAGMA cache_size={int(self.cache_size)}')
+            conn.execute(f'PRAGMA busy_timeout={int(self.busy_timeout)}')
+            conn.execute('PRAGMA temp_store=MEMORY')
+
+            conexoes[caminho] = conn
+            with self._trava:
+                self._conexoes.append(conn)
+
+        return conn
+
+    def preparar(self, conn, caminho, preparacao):
+        """
+        Executa `preparacao(conn)` (ex.: criação e migração do esquema) apenas uma
+        vez por processo para cada arquivo; as chamadas seguintes retornam imediatamente.
+
+        Parâmetros:
+        - conn (sqlite3.Connection): Conexão com o banco.
+        - caminho (str): Caminho do arquivo do banco.
+        - preparacao (callable): Função `preparacao(conn)`.
+        """
+        chave = os.path.abspath(caminho)
+        if chave in self._esquemas_verificados:
+            return
+
+        with self._trava_preparacao:
+            if chave in self._esquemas_verificados:
+                return
+
+            preparacao(conn)
+
+            self._esquemas_verificados.add(chave)
+
+    def fechar(self):
+        """
+        Fecha as conexões abertas pela thread atual.
+        """
+        conexoes = getattr(self._local, 'conexoes', {})
+        for conn in conexoes.values():
+            with self._trava:
+                if conn in self._conexoes:
+                    self._conexoes.remove(conn)
+            conn.close()
+        conexoes.clear()
+
+    @classmethod
+    def fechar_todas(cls):
+        """
+        Fecha todas as conexões abertas no processo (chamado automaticamente na saída).
+        """
+        with cls._trava:
+            conexoes, cls._conexoes = cls._conexoes, []
+        for conn in conexoes:
+            try:
+                conn.close()
+            except sqlite3.ProgrammingError:
+                # Conexões de outras threads podem já ter sido fechadas
+                pass
+
+
+atexit.register(GerenciadorConexao.fechar_todas)
@@ -0,0 +1,82 @@
+import os
+import random
+import threading
+import time
+from datetime import datetime
+
+
+# Início da contagem dos IDs (2024-01-01 00:00:00 UTC, em milissegundos)
+EPOCA_MS = 1704067200000
+
+# Divisão dos 63 bits do ID: | 41 bits de milissegundos | 10 bits do processo | 12 bits de sequência |
+BITS_PROCESSO = 10
+BITS_SEQUENCIA = 12
+MAXIMO_SEQUENCIA = (1 << BITS_SEQUENCIA) - 1
+
+# Tentativas de gravação com novos IDs quando um ID já existe no banco (ver
+# ExperimentLogger._gravar_linhas)
+TENTATIVAS_ID = 5
+
+_trava = threading.Lock()
+_estado = {'pid': None, 'processo': 0, 'ultimo_ms': -1, 'sequencia': 0}
+
+
+def _processo_atual():
+    # Sorteia novamente após um fork, para que processos filhos não repitam IDs
+    pid = os.getpid()
+    if _estado['pid'] != pid:
+        _estado['pid'] = pid
+        _estado['processo'] = random.SystemRandom().getrandbits(BITS_PROCESSO)
+        _estado['ultimo_ms'] = -1
+        _estado['sequencia'] = 0
+    return _estado['processo']
+
+
+def montar_id(milissegundos, processo, sequencia):
+    """
+    Monta um ID a partir dos milissegundos desde EPOCA_MS, do número do processo e da sequência.
+    """
+    return (milissegundos << (BITS_PROCESSO + BITS_SEQUENCIA)) | (processo << BITS_SEQUENCIA) | sequencia
+
+
+def gerar_id_execucao():
+    """
+    Gera um ID inteiro único e ordenável pelo momento de criação (estilo Snowflake).
+
+    O ID cabe em um INTEGER do SQLite (63 bits) e é composto por:
+    - 41 bits com os milissegundos desde 2024-01-01 (suficiente até 2093);
+    - 10 bits sorteados por processo, reduzindo colisões entre processos paralelos;
+    - 12 bits de sequência, permitindo 4096 IDs por milissegundo em cada processo.
+
+    Dentro de um processo os IDs são estritamente crescentes, mesmo que o
+    relógio do sistema volte no tempo. Entre processos, dois podem sortear o
+    mesmo número (cerca de 11% de chance com 16 processos) e gerar o mesmo ID
+    no mesmo milissegundo; por isso a gravação confere a colisão e troca o ID
+    (ver ExperimentLogger._gravar_linhas).
+
+    Retorna:
+    - int: O novo ID.
+    """
+    with _trava:
+        processo = _processo_atual()
+
+        agora = int(time.time() * 1000) - EPOCA_MS
+        if agora > _estado['ultimo_ms']:
+            _estado['ultimo_ms'] = agora
+            _estado['sequencia'] = 0
+        else:
+            # Mesmo milissegundo (ou relógio atrasado): avança a sequência
+            _estado['sequencia'] += 1
+            if _estado['sequencia'] > MAXIMO_SEQUENCIA:
+                _estado['ultimo_ms'] += 1
+                _estado['sequencia'] = 0
+
+        return montar_id(_estado['ultimo_ms'], processo, _estado['sequencia'])
+
+
+def momento_do_id(id_execucao):
+    """
+    Retorna o datetime (horário local) em que o ID foi gerado.
+    """
+    milissegundos = (id_execucao >> (BITS_PROCESSO + BITS_SEQUENCIA)) + EPOCA_MS
+    return datetime.fromtimestamp(milissegundos / 1000)
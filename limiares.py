@@ -0,0 +1,248 @@
+"""
+Varredura de limiares de decisão para classificação binária a partir dos scores.
+
+Para cada limiar distinto t, a previsão é positiva quando `score >= t`. As
+contagens de verdadeiros positivos (VP) e falsos positivos (FP) de todos os
+limiares saem de uma única ordenação dos scores seguida de somas acumuladas
+(contagens_limiares). Dessas contagens derivam, com aritmética vetorizada, as
+curvas ROC e Precision-Recall (nos mesmos formatos de `roc_curve` e
+`precision_recall_curve` do scikit-learn), o F1, a estatística J de Youden e o
+custo esperado de cada limiar (curvas_limiares).
+
+Para entradas muito grandes, HistogramaLimiares conta positivos e negativos em
+`bins` faixas de score, em blocos e sem ordenar: O(n), memória constante e
+combinável entre blocos e processos (`merge`). Os limiares passam a ser as bordas
+das faixas, e as curvas são exatas nessas bordas.
+"""
+import numpy as np
+
+
+# Quantidade de scores processados por vez pelo histograma
+TAMANHO_BLOCO_LIMIARES = 1 << 20
+
+
+def _positivos(y_real, classe_positiva):
+    y_real = np.asarray(y_real).ravel()
+    return y_real == classe_positiva
+
+
+def _scores(scores):
+    """
+    Score da classe positiva: um vetor, ou a segunda coluna de uma matriz (n, 2)
+    de probabilidades (formato de `predict_proba`).
+    """
+    scores = np.asarray(scores, dtype=np.float64)
+    if scores.ndim == 2 and scores.shape[1] == 2:
+        return scores[:, 1]
+    if scores.ndim == 2 and scores.shape[1] == 1:
+        return scores.ravel()
+    if scores.ndim != 1:
+        raise ValueError(
+            f"As curvas de limiar são binárias: os scores devem ser um vetor ou uma matriz (n, 2); "
+            f"recebido um array de formato {scores.shape}.")
+    return scores
+
+
+def contagens_limiares(y_real, scores, classe_positiva=1):
+    """
+    VP e FP acumulados para cada limiar distinto, com uma única ordenação.
+
+    Parâmetros:
+    - y_real (array-like): Rótulos reais.
+    - scores (array-like): Score da classe positiva de cada amostra (ver _scores).
+    - classe_positiva: Rótulo considerado positivo.
+
+    Retorna:
+    - tuple: (limiares, vp, fp), com os limiares distintos em ordem decrescente e
+      as contagens de positivos e negativos com `score >= limiar`.
+    """
+    positivos = _positivos(y_real, classe_positiva)
+    scores = _scores(scores)
+    if len(positivos) != len(scores):
+        raise ValueError(
+            f"y_real e scores têm tamanhos diferentes: {len(positivos)} e {len(scores)}.")
+
+    # Ordenação estável decrescente dos scores
+    ordem = np.argsort(scores, kind='mergesort')[::-1]
+    scores = scores[ordem]
+    positivos = positivos[ordem]
+
+    # Última posição de cada score distinto (os empates entram juntos no limiar)
+    ultimos = np.r_[np.flatnonzero(np.diff(scores)), len(scores) - 1]
+
+    vp = np.cumsum(positivos, dtype=np.int64)[ultimos]
+    fp = (ultimos + 1) - vp
+    return scores[ultimos], vp, fp
+
+
+class HistogramaLimiares:
+    """
+    Contagens de positivos e negativos por faixa de score, para a varredura de
+    limiares em O(n) e memória constante. Scores fora de `faixa` entram na
+    primeira ou na última faixa.
+
+        histograma = HistogramaLimiares(bins=1000)
+        for y_real, scores in blocos:
+            histograma.update(y_real, scores)
+        curvas = curvas_limiares(*histograma.contagens())
+    """
+
+    def __init__(self, bins=1000, faixa=(0.0, 1.0), classe_positiva=1):
+        self.bins = int(bins)
+        self.faixa = (float(faixa[0]), float(faixa[1]))
+        self.classe_positiva = classe_positiva
+        self.positivos = np.zeros(self.bins, dtype=np.int64)
+        self.negativos = np.zeros(self.bins, dtype=np.int64)
+
+    @property
+    def n(self):
+        return int(self.positivos.sum() + self.negativos.sum())
+
+    def update(self, y_real, scores):
+        positivos = _positivos(y_real, self.classe_positiva)
+        scores = _scores(scores)
+        if len(positivos) != len(scores):
+            raise ValueError(
+                f"y_real e scores têm tamanhos diferentes: {len(positivos)} e {len(scores)}.")
+
+        inicio_faixa, fim_faixa = self.faixa
+        escala = self.bins / (fim_faixa - inicio_faixa) if fim_faixa > inicio_faixa else 0.0
+
+        for inicio in range(0, len(scores), TAMANHO_BLOCO_LIMIARES):
+            bloco = scores[inicio:inicio + TAMANHO_BLOCO_LIMIARES]
+            positivos_bloco = positivos[inicio:inicio + TAMANHO_BLOCO_LIMIARES]
+
+            # Índice da faixa de cada score (sem ordenar)
+            indices = np.subtract(bloco, inicio_faixa)
+            np.multiply(indices, escala, out=indices)
+            np.clip(indices, 0, self.bins - 1, out=indices)
+            indices = indices.astype(np.intp)
+
+            total = np.bincount(indices, minlength=self.bins)
+            acertos = np.bincount(indices, weights=positivos_bloco, minlength=self.bins).astype(np.int64)
+            self.positivos += acertos
+            self.negativos += total - acertos
+        return self
+
+    def merge(self, outro):
+        if outro.bins != self.bins or outro.faixa != self.faixa:
+            raise ValueError("Só é possível combinar histogramas com as mesmas faixas.")
+        self.positivos += outro.positivos
+        self.negativos += outro.negativos
+        return self
+
+    def contagens(self):
+        """
+        Mesmo formato de contagens_limiares: limiares (borda inferior das faixas
+        não vazias, em ordem decrescente), VP e FP acumulados.
+        """
+        bordas = np.linspace(self.faixa[0], self.faixa[1], self.bins + 1)[:-1]
+        ocupadas = np.flatnonzero(self.positivos + self.negativos)[::-1]
+
+        vp = np.cumsum(self.positivos[::-1])[::-1]
+        fp = np.cumsum(self.negativos[::-1])[::-1]
+        return bordas[ocupadas], vp[ocupadas], fp[ocupadas]
+
+
+def curvas_limiares(limiares, vp, fp, custo_fp=1.0, custo_fn=1.0):
+    """
+    Curvas e limiares ótimos a partir das contagens de contagens_limiares ou de
+    HistogramaLimiares.contagens.
+
+    Parâmetros:
+    - custo_fp, custo_fn (float): Custo de um falso positivo e de um falso negativo
+      na curva de custo esperado por amostra.
+
+    Retorna:
+    - dict: Arrays 'fpr', 'tpr' e 'thresholds_roc' (formato de roc_curve, com os
+      pontos colineares removidos); 'precision', 'recall' e 'thresholds' (formato de
+      precision_recall_curve); 'f1_limiares' e 'custo_limiares' (alinhados com
+      'thresholds'); e os escalares 'avg_precision', 'auc_roc', 'limiar_youden',
+      'youden_j', 'limiar_f1', 'f1_maximo', 'limiar_custo' e 'custo_minimo'.
+    """
+    limiares = np.asarray(limiares, dtype=np.float64)
+    vp = np.asarray(vp, dtype=np.float64)
+    fp = np.asarray(fp, dtype=np.float64)
+    if len(limiares) == 0:
+        raise ValueError("Nenhum score informado.")
+
+    total_positivos = vp[-1]
+    total_negativos = fp[-1]
+    n = total_positivos + total_negativos
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        tpr = vp / total_positivos
+        fpr = fp / total_negativos
+        preditos = vp + fp
+        precisao = np.divide(vp, preditos, out=np.zeros_like(vp), where=preditos != 0)
+        recall = tpr if total_positivos else np.ones_like(vp)
+
+        # F1 = 2·VP / (2·VP + FP + FN), com FN = P - VP
+        denominador_f1 = vp + fp + total_positivos
+        f1 = np.divide(2 * vp, denominador_f1, out=np.zeros_like(vp), where=denominador_f1 != 0)
+
+    # Custo esperado por amostra: FP e FN ponderados pelos seus custos
+    custo = (custo_fp * fp + custo_fn * (total_positivos - vp)) / n
+
+    # Youden J = TPR - FPR = sensibilidade + especificidade - 1
+    youden = tpr - fpr
+
+    # ROC: remove os pontos intermediários colineares e começa em (0, 0)
+    if len(fp) > 2:
+        mantidos = np.flatnonzero(np.r_[True, np.logical_or(np.diff(fp, 2), np.diff(vp, 2)), True])
+    else:
+        mantidos = np.arange(len(fp))
+    fpr_roc = np.r_[0.0, fpr[mantidos]]
+    tpr_roc = np.r_[0.0, tpr[mantidos]]
+    thresholds_roc = np.r_[np.inf, limiares[mantidos]]
+
+    # Precision-Recall em ordem crescente de limiar, terminando em (recall 0, precisão 1)
+    precision_curva = np.r_[precisao[::-1], 1.0]
+    recall_curva = np.r_[recall[::-1], 0.0]
+    avg_precision = -np.sum(np.diff(recall_curva) * precision_curva[:-1])
+
+    # Área sob a curva ROC pela regra do trapézio
+    auc_roc = np.sum(np.diff(fpr_roc) * (tpr_roc[1:] + tpr_roc[:-1]) / 2)
+
+    indice_youden = np.nanargmax(youden) if total_positivos and total_negativos else 0
+    indice_f1 = np.argmax(f1)
+    indice_custo = np.argmin(custo)
+
+    return {
+        # Curva ROC
+        'fpr': fpr_roc,
+        'tpr': tpr_roc,
+        'thresholds_roc': thresholds_roc,
+        # Curva precision-recall
+        'precision': precision_curva,
+        'recall': recall_curva,
+        'thresholds': limiares[::-1].copy(),
+        # Curvas por limiar (mesma ordem de 'thresholds')
+        'f1_limiares': f1[::-1].copy(),
+        'custo_limiares': custo[::-1].copy(),
+        # Resumos
+        'avg_precision': float(avg_precision),
+        'auc_roc': float(auc_roc),
+        'limiar_youden': float(limiares[indice_youden]),
+        'youden_j': float(youden[indice_youden]),
+        'limiar_f1': float(limiares[indice_f1]),
+        'f1_maximo': float(f1[indice_f1]),
+        'limiar_custo': float(limiares[indice_custo]),
+        'custo_minimo': float(custo[indice_custo]),
+    }
+
+
+def varredura_limiares(y_real, scores, bins=None, classe_positiva=1, custo_fp=1.0, custo_fn=1.0):
+    """
+    Curvas de limiar de `scores` (ver curvas_limiares): exatas, com uma ordenação,
+    ou, com `bins`, aproximadas por um histograma entre o menor e o maior score.
+    """
+    if bins is None:
+        contagens = contagens_limiares(y_real, scores, classe_positiva)
+    else:
+        valores = _scores(scores)
+        if len(valores) == 0:
+            raise ValueError("Nenhum score informado.")
+        histograma = HistogramaLimiares(bins, (valores.min(), valores.max()), classe_positiva)
+        contagens = histograma.update(y_real, valores).contagens()
+    return curvas_limiares(*contagens, custo_fp=custo_fp, custo_fn=custo_fn)
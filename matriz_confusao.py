@@ -0,0 +1,278 @@
+"""
+Métricas de classificação a partir de uma única matriz de confusão.
+
+Os rótulos são codificados como inteiros 0..K-1 e a matriz K×K é montada com um
+único `np.bincount` sobre `K * real + previsto`. Todas as métricas (acurácia,
+precisão, recall e F1 nas médias binária, macro, micro e ponderada, além das
+taxas derivadas de VP, VN, FP e FN) são calculadas com aritmética vetorizada
+sobre a matriz, sem percorrer os rótulos novamente. Os valores são os mesmos do
+scikit-learn (com `zero_division` resultando em 0).
+"""
+import numpy as np
+
+
+# Rótulos inteiros com amplitude até este valor são codificados por deslocamento
+# (y - mínimo), sem ordenar os dados; acima disso usa-se np.unique
+LIMITE_AMPLITUDE_INTEIROS = 2048
+
+# Quantidade máxima de posições (n_modelos * K * K) contadas em um único bincount
+# por matriz_confusao_lote; acima disso, um bincount por modelo
+LIMITE_MATRIZES_LOTE = 1 << 24
+
+
+def _vetor(y):
+    y = np.asarray(y)
+    if y.ndim == 2 and y.shape[1] == 1:
+        y = y.ravel()
+    if y.ndim != 1:
+        raise ValueError(f"Os rótulos devem ser um vetor; recebido um array de formato {y.shape}.")
+    if y.dtype == bool:
+        y = y.astype(np.int8)
+    return y
+
+
+def codificar_rotulos(y_real, y_pred):
+    """
+    Codifica os rótulos reais e previstos como inteiros 0..K-1.
+
+    Retorna:
+    - tuple: (codigos_real, codigos_pred, rotulos), em que `rotulos` é o array
+      ordenado com os K rótulos presentes em `y_real` ou `y_pred`.
+    """
+    y_real = _vetor(y_real)
+    y_pred = _vetor(y_pred)
+
+    if len(y_real) != len(y_pred):
+        raise ValueError(
+            f"y_real e y_pred têm tamanhos diferentes: {len(y_real)} e {len(y_pred)}.")
+
+    return _codificar(y_real, y_pred)
+
+
+def _codificar(y_real, y_pred):
+    """
+    Codifica dois vetores (de tamanhos quaisquer) com os mesmos códigos 0..K-1.
+    """
+    if len(y_real) == 0 and len(y_pred) == 0:
+        return y_real.astype(np.intp), y_pred.astype(np.intp), np.array([], dtype=y_real.dtype)
+
+    if np.issubdtype(y_real.dtype, np.integer) and np.issubdtype(y_pred.dtype, np.integer):
+        minimo = int(min(y_real.min(), y_pred.min()))
+        amplitude = int(max(y_real.max(), y_pred.max())) - minimo + 1
+
+        if amplitude <= LIMITE_AMPLITUDE_INTEIROS:
+            # Caminho rápido: o código é o deslocamento em relação ao menor rótulo e
+            # um bincount de cada vetor indica quais rótulos do intervalo aparecem
+            codigos_real = (y_real - minimo).astype(np.intp)
+            codigos_pred = (y_pred - minimo).astype(np.intp)
+            presentes = (np.bincount(codigos_real, minlength=amplitude)
+                         + np.bincount(codigos_pred, minlength=amplitude)) > 0
+
+            if not presentes.all():
+                # Renumera para 0..K-1 apenas os rótulos presentes
+                novo_codigo = np.cumsum(presentes) - 1
+                codigos_real = novo_codigo[codigos_real]
+                codigos_pred = novo_codigo[codigos_pred]
+
+            rotulos = (np.flatnonzero(presentes) + minimo).astype(np.result_type(y_real, y_pred))
+            return codigos_real, codigos_pred, rotulos
+
+    # Caso geral (strings, floats, inteiros muito espalhados): uma única ordenação
+    rotulos, codigos = np.unique(np.concatenate([y_real, y_pred]), return_inverse=True)
+    codigos = codigos.reshape(-1).astype(np.intp, copy=False)
+    return codigos[:len(y_real)], codigos[len(y_real):], rotulos
+
+
+def matriz_confusao(y_real, y_pred):
+    """
+    Calcula a matriz de confusão (linhas = real, colunas = previsto) com um único bincount.
+
+    Retorna:
+    - tuple: (cm, rotulos), com `cm` de formato (K, K) na ordem de `rotulos`, a mesma
+      de sklearn.metrics.confusion_matrix.
+    """
+    codigos_real, codigos_pred, rotulos = codificar_rotulos(y_real, y_pred)
+    k = len(rotulos)
+
+    cm = np.bincount(codigos_real * k + codigos_pred, minlength=k * k).reshape(k, k)
+    return cm, rotulos
+
+
+def matriz_confusao_lote(y_real, y_pred):
+    """
+    Matrizes de confusão de vários modelos avaliados sobre o mesmo `y_real`.
+
+    Parâmetros:
+    - y_real (array-like): Rótulos reais (vetor de n valores).
+    - y_pred (array-like): Matriz (n_modelos, n) com os rótulos previstos por cada modelo.
+
+    Retorna:
+    - tuple: (cms, rotulos), com `cms` de formato (n_modelos, K, K). Os rótulos são
+      codificados uma única vez para todos os modelos e, enquanto couber em
+      LIMITE_MATRIZES_LOTE posições, todas as matrizes saem de um único bincount.
+    """
+    y_real = _vetor(y_real)
+    y_pred = np.asarray(y_pred)
+    if y_pred.ndim != 2 or len(y_pred) == 0:
+        raise ValueError(f"y_pred deve ter formato (n_modelos, n); recebido {y_pred.shape}.")
+    if y_pred.shape[1] != len(y_real):
+        raise ValueError(
+            f"y_real e y_pred têm tamanhos diferentes: {len(y_real)} e {y_pred.shape[1]}.")
+
+    modelos = len(y_pred)
+    codigos_real, codigos_pred, rotulos = _codificar(y_real, _vetor(y_pred.ravel()))
+    codigos_pred = codigos_pred.reshape(modelos, -1)
+    k = len(rotulos)
+
+    # Posição na matriz de cada modelo: o termo de y_real é o mesmo para todos
+    posicao_real = codigos_real * k
+    if modelos * k * k <= LIMITE_MATRIZES_LOTE:
+        deslocamento = (np.arange(modelos, dtype=np.intp) * (k * k))[:, None]
+        indices = deslocamento + posicao_real + codigos_pred
+        cms = np.bincount(indices.ravel(), minlength=modelos * k * k).reshape(modelos, k, k)
+    else:
+        cms = np.stack([np.bincount(posicao_real + codigos, minlength=k * k).reshape(k, k)
+                        for codigos in codigos_pred])
+
+    return cms, rotulos
+
+
+def combinar_matrizes(cm, rotulos, outra, outros_rotulos):
+    """
+    Soma duas matrizes de confusão calculadas sobre partes diferentes dos dados,
+    cujos rótulos podem ser diferentes.
+
+    Retorna:
+    - tuple: (cm, rotulos) com a soma, na união ordenada dos rótulos.
+    """
+    if np.array_equal(rotulos, outros_rotulos):
+        return cm + outra, rotulos
+
+    # Reposiciona as duas matrizes na união ordenada dos rótulos
+    uniao = np.union1d(rotulos, outros_rotulos)
+    matriz = np.zeros((len(uniao), len(uniao)), dtype=np.int64)
+    posicoes = np.searchsorted(uniao, rotulos)
+    matriz[np.ix_(posicoes, posicoes)] += cm
+    posicoes = np.searchsorted(uniao, outros_rotulos)
+    matriz[np.ix_(posicoes, posicoes)] += outra
+    return matriz, uniao
+
+
+def _dividir(numerador, denominador):
+    """
+    Divisão elemento a elemento que resulta em 0 quando o denominador é 0
+    (equivalente a `zero_division` do scikit-learn).
+    """
+    numerador = np.asarray(numerador, dtype=np.float64)
+    denominador = np.asarray(denominador, dtype=np.float64)
+    resultado = np.zeros(np.broadcast(numerador, denominador).shape)
+    np.divide(numerador, denominador, out=resultado, where=denominador != 0)
+    return resultado
+
+
+def metricas_matriz_confusao(cm, rotulos, rotulo_positivo=1):
+    """
+    Deriva todas as métricas de classificação da matriz de confusão.
+
+    Parâmetros:
+    - cm (np.ndarray): Matriz de confusão (K, K) de matriz_confusao.
+    - rotulos (np.ndarray): Rótulos na ordem das linhas/colunas de `cm`.
+    - rotulo_positivo: Rótulo da classe positiva da média binária.
+
+    Retorna:
+    - dict: Acurácia, VP/VN/FP/FN (da submatriz 2×2 das duas primeiras classes),
+      arrays por classe (precision, recall, f1, suporte) e as médias binária,
+      macro, micro e ponderada.
+    """
+    cm = np.asarray(cm)
+    total = cm.sum()
+
+    # Por classe: verdadeiros positivos, previstos (colunas) e reais (linhas)
+    vp_classe = np.diag(cm)
+    previstos = cm.sum(axis=0)
+    suporte = cm.sum(axis=1)
+
+    precision_classe = _dividir(vp_classe, previstos)
+    recall_classe = _dividir(vp_classe, suporte)
+    f1_classe = _dividir(2 * vp_classe, previstos + suporte)
+
+    metricas = {
+        'acuracia': _dividir(vp_classe.sum(), total)[()],
+        'precision_classe': precision_classe,
+        'recall_classe': recall_classe,
+        'f1_classe': f1_classe,
+        'suporte': suporte,
+    }
+
+    # Médias macro (simples), micro (contagens somadas) e ponderada (pelo suporte)
+    metricas['precision_macro'] = precision_classe.mean() if len(rotulos) else 0.0
+    metricas['recall_macro'] = recall_classe.mean() if len(rotulos) else 0.0
+    metricas['f1_macro'] = f1_classe.mean() if len(rotulos) else 0.0
+
+    metricas['precision_micro'] = _dividir(vp_classe.sum(), previstos.sum())[()]
+    metricas['recall_micro'] = _dividir(vp_classe.sum(), suporte.sum())[()]
+    metricas['f1_micro'] = _dividir(2 * vp_classe.sum(), previstos.sum() + suporte.sum())[()]
+
+    pesos = _dividir(suporte, suporte.sum())
+    metricas['precision_ponderada'] = (precision_classe * pesos).sum()
+    metricas['recall_ponderada'] = (recall_classe * pesos).sum()
+    metricas['f1_ponderada'] = (f1_classe * pesos).sum()
+
+    # Média binária: métricas da classe positiva (só definida para até 2 rótulos)
+    posicao = np.flatnonzero(rotulos == rotulo_positivo)
+    if len(rotulos) <= 2 and len(posicao):
+        metricas['precision_binaria'] = precision_classe[posicao[0]]
+        metricas['recall_binaria'] = recall_classe[posicao[0]]
+        metricas['f1_binaria'] = f1_classe[posicao[0]]
+
+    # VP, VN, FP e FN da submatriz das duas primeiras classes (classe 1 como positiva)
+    if cm.shape[0] >= 2:
+        metricas['VP'] = cm[1, 1]
+        metricas['VN'] = cm[0, 0]
+        metricas['FP'] = cm[0, 1]
+        metricas['FN'] = cm[1, 0]
+
+    return metricas
+
+
+def metricas_por_classe(cm):
+    """
+    Métricas um-contra-todos de cada classe, calculadas de uma vez a partir da
+    matriz de confusão K×K completa.
+
+    Para a classe k: VP = cm[k, k], FP = coluna k sem VP, FN = linha k sem VP e
+    VN = total - VP - FP - FN. Todas as taxas são arrays de tamanho K (na ordem
+    dos rótulos) com os nomes usados nas métricas globais de Classification;
+    denominadores nulos resultam em 0.
+    """
+    cm = np.asarray(cm)
+    total = cm.sum()
+
+    vp = np.diag(cm)
+    fp = cm.sum(axis=0) - vp
+    fn = cm.sum(axis=1) - vp
+    vn = total - vp - fp - fn
+
+    tpr = _dividir(vp, vp + fn)
+    especificidade = _dividir(vn, vn + fp)
+
+    return {
+        'Suporte': vp + fn,
+        'VP': vp,
+        'FP': fp,
+        'FN': fn,
+        'VN': vn,
+        'Precision': _dividir(vp, vp + fp),
+        'Recall': tpr,
+        'Especificidade': especificidade,
+        'F1_score': _dividir(2 * vp, 2 * vp + fp + fn),
+        'Taxa_falsa_descoberta(FDR)': _dividir(fp, fp + vp),
+        'Valor_preditivo_negativo(NPU)': _dividir(vn, vn + fn),
+        'Prevalencia': _dividir(vp + fp, total),
+        'Taxa_falsa_Omissao(for)': _dividir(fn, fn + vn),
+        'Sensibilidade(TPR)': tpr,
+        'Taxa_falso_negativo': _dividir(fn, fn + vp),
+        'Taxa_falso_positivo': _dividir(fp, fp + vn),
+        'Teste_razao_verossimilhanca_negativa(LR-)': _dividir(1 - tpr, especificidade),
+        'Teste_razao_verossimilhanca_positiva(LR+)': _dividir(tpr, 1 - especificidade),
+    }
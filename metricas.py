@@ -0,0 +1,199 @@
+import math
+import numbers
+
+import numpy as np
+
+from artefatos import carregar_artefatos
+from matriz_confusao import matriz_confusao, metricas_por_classe
+from serializacao import decodificar_array
+
+
+def criar_tabela_metricas(conn):
+    """
+    Cria a tabela METRICAS no arquivo conectado.
+
+    Cada métrica de cada execução fica em uma linha (id, metrica, valor), ao lado
+    do JSON completo da coluna `dados`. Com o índice por (metrica, id), médias,
+    mínimos, máximos e rankings por `controle_de_versao` são calculados pelo
+    próprio SQLite, sem carregar e decodificar o JSON de cada execução.
+    """
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS METRICAS (
+            id INTEGER,
+            metrica TEXT,
+            valor REAL,
+            PRIMARY KEY (id, metrica)
+        ) WITHOUT ROWID
+    ''')
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_metricas_metrica ON METRICAS (metrica, id)")
+
+
+def linhas_metricas(id_execucao, metricas):
+    """
+    Converte o dicionário de métricas de uma execução em tuplas (id, metrica, valor).
+
+    Apenas valores numéricos são considerados; NaN e infinitos são gravados como NULL.
+    """
+    linhas = []
+    for nome, valor in metricas.items():
+        if isinstance(valor, bool) or not isinstance(valor, numbers.Real):
+            continue
+        valor = float(valor)
+        linhas.append((id_execucao, nome, valor if math.isfinite(valor) else None))
+    return linhas
+
+
+def gravar_metricas(conn, linhas):
+    """
+    Grava as tuplas (id, metrica, valor) na tabela METRICAS (sem fazer commit).
+    """
+    conn.executemany(
+        "INSERT OR REPLACE INTO METRICAS (id, metrica, valor) VALUES (?, ?, ?)", linhas)
+
+
+def remover_metricas_orfas(conn, tabela):
+    """
+    Remove as métricas (globais, por classe e intervalos) de execuções que não existem mais
+    em `tabela` (sem fazer commit).
+    """
+    conn.execute(
+        f"DELETE FROM METRICAS WHERE id NOT IN (SELECT id FROM {tabela})")
+    conn.execute(
+        f"DELETE FROM METRICAS_CLASSE WHERE id NOT IN (SELECT id FROM {tabela})")
+    conn.execute(
+        f"DELETE FROM INTERVALOS_METRICAS WHERE id NOT IN (SELECT id FROM {tabela})")
+
+
+# -------------------------------------Métricas por classe-------------------------------------------------------------------------------
+
+def criar_tabela_metricas_classe(conn):
+    """
+    Cria a tabela METRICAS_CLASSE no arquivo conectado.
+
+    Cada métrica um-contra-todos de cada classe de uma execução de classificação
+    fica em uma linha (id, ordem, classe, metrica, valor); `ordem` é a posição da
+    classe nos rótulos ordenados e `classe` o rótulo como texto. A chave primária
+    começa por `id`, então o painel lê a tabela de uma execução sem recalcular nada.
+    """
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS METRICAS_CLASSE (
+            id INTEGER,
+            ordem INTEGER,
+            classe TEXT,
+            metrica TEXT,
+            valor REAL,
+            PRIMARY KEY (id, metrica, ordem)
+        ) WITHOUT ROWID
+    ''')
+
+
+def linhas_metricas_classe(id_execucao, rotulos, metricas):
+    """
+    Converte os arrays de métricas por classe (ver matriz_confusao.metricas_por_classe)
+    em tuplas (id, ordem, classe, metrica, valor); NaN e infinitos são gravados como NULL.
+    """
+    classes = [str(rotulo) for rotulo in rotulos]
+    linhas = []
+    for nome, valores in metricas.items():
+        valores = np.asarray(valores, dtype=np.float64)
+        valores = np.where(np.isfinite(valores), valores, np.nan).tolist()
+        linhas.extend(
+            (id_execucao, ordem, classe, nome, None if math.isnan(valor) else valor)
+            for ordem, (classe, valor) in enumerate(zip(classes, valores)))
+    return linhas
+
+
+def gravar_metricas_classe(conn, linhas):
+    """
+    Grava as tuplas (id, ordem, classe, metrica, valor) na tabela METRICAS_CLASSE (sem fazer commit).
+    """
+    conn.executemany(
+        "INSERT OR REPLACE INTO METRICAS_CLASSE (id, ordem, classe, metrica, valor) VALUES (?, ?, ?, ?, ?)",
+        linhas)
+
+
+def preencher_metricas_classe(conn, tabela='CLASSIFICACAO'):
+    """
+    Calcula as métricas por classe das execuções de `tabela` que ainda não as
+    têm (execuções gravadas antes da tabela METRICAS_CLASSE ou importadas de
+    bancos antigos), a partir dos artefatos y_test e y_pred (sem fazer commit).
+
+    Retorna:
+    - int: Número de execuções preenchidas.
+    """
+    ids = [id_execucao for (id_execucao,) in conn.execute(f'''
+        SELECT id FROM {tabela}
+        WHERE id NOT IN (SELECT DISTINCT id FROM METRICAS_CLASSE)
+    ''').fetchall()]
+
+    preenchidas = 0
+    for id_execucao in ids:
+        artefatos = carregar_artefatos(conn, id_execucao, ['y_test', 'y_pred'])
+        y_test = decodificar_array(artefatos.get('y_test'))
+        y_pred = decodificar_array(artefatos.get('y_pred'))
+        if y_test is None or y_pred is None or len(y_test) != len(y_pred):
+            continue
+
+        cm, rotulos = matriz_confusao(y_test, y_pred)
+        gravar_metricas_classe(
+            conn, linhas_metricas_classe(id_execucao, rotulos, metricas_por_classe(cm)))
+        preenchidas += 1
+
+    return preenchidas
+
+
+# -------------------------------------Intervalos das métricas---------------------------------------------------------------------------
+
+def criar_tabela_intervalos_metricas(conn):
+    """
+    Cria a tabela INTERVALOS_METRICAS no arquivo conectado.
+
+    Cada linha guarda a média, o desvio padrão e o intervalo de confiança
+    [inferior, superior] de uma métrica de uma execução, calculados por um
+    `metodo` (ex.: 't' para a distribuição t sobre os folds de uma validação
+    cruzada) com `n` valores e nível de confiança `nivel`. O painel lê os
+    agregados prontos, sem recalcular nada na renderização.
+    """
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS INTERVALOS_METRICAS (
+            id INTEGER,
+            metrica TEXT,
+            metodo TEXT,
+            nivel REAL,
+            n INTEGER,
+            media REAL,
+            desvio REAL,
+            inferior REAL,
+            superior REAL,
+            PRIMARY KEY (id, metrica, metodo)
+        ) WITHOUT ROWID
+    ''')
+
+
+def linhas_intervalos(id_execucao, intervalos, metodo):
+    """
+    Converte {metrica: {'nivel', 'n', 'media', 'desvio', 'inferior', 'superior'}} em
+    tuplas da tabela INTERVALOS_METRICAS; NaN e infinitos são gravados como NULL.
+    """
+    def valor(numero):
+        if numero is None:
+            return None
+        numero = float(numero)
+        return numero if math.isfinite(numero) else None
+
+    return [(id_execucao, nome, metodo, valor(intervalo['nivel']), int(intervalo['n']),
+             valor(intervalo['media']), valor(intervalo['desvio']),
+             valor(intervalo['inferior']), valor(intervalo['superior']))
+            for nome, intervalo in intervalos.items()]
+
+
+def gravar_intervalos(conn, linhas):
+    """
+    Grava as tuplas (id, metrica, metodo, nivel, n, media, desvio, inferior, superior)
+    na tabela INTERVALOS_METRICAS (sem fazer commit).
+    """
+    conn.executemany(
+        "INSERT OR REPLACE INTO INTERVALOS_METRICAS "
+        "(id, metrica, metodo, nivel, n, media, desvio, inferior, superior) "
+        "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", linhas)
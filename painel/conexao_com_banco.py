@@ -1,365 +1,425 @@
 import pandas as pd
-import sqlite3
 import json
+import sys
+import os
+import threading
+from collections import OrderedDict
 
+# Adiciona a raiz do repositório ao sys.path para reaproveitar os módulos do logger
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
-class Consulta:
-    def __init__(self):
-        pass
-
-    def consultar_metricas_cl(self, id_atual=None, commit_id=None, endereco=None):
-        # Conectando ao banco de dados SQLite
-        conn = sqlite3.connect(
-            '../dados/banco_de_dados_classificacao/classificacao.db')
-        cursor = conn.cursor()
+from serializacao import decodificar_array
+from artefatos import carregar_artefatos, chaves_artefatos, ler_artefatos, remover_artefatos_orfaos
+from armazenamento import TABELAS, conectar_banco
+from gerenciador_conexao import GerenciadorConexao
+from metricas import remover_metricas_orfas
+from sketch_quantis import SketchKLL
+from simplificacao_curvas import MAX_PONTOS_CURVAS, simplificar_curvas_classificacao
+from series_painel import COLUNAS_PAINEL, localizar_serie
 
-        # Montando a consulta SQL dinamicamente
-        query = 'SELECT dados FROM CLASSIFICACAO WHERE 1=1'
-        params = []
-
-        if id_atual is not None:
-            query += ' AND id = ?'
-            params.append(id_atual)
 
-        if commit_id is not None:
-            query += ' AND id_commit = ?'
-            params.append(commit_id)
+class Consulta:
 
-        if endereco is not None:
-            query += ' AND controle_de_versao = ?'
-            params.append(endereco)
+    # Conexões persistentes com o banco único (uma por thread), compartilhadas por
+    # todas as instâncias: as páginas do painel não abrem e fecham o arquivo a cada consulta.
+    _gerenciador = GerenciadorConexao()
 
-        # Executando a consulta com os parâmetros passados
-        cursor.execute(query, params)
-
-        # Recuperando os resultados
-        modelos = cursor.fetchall()
-
-        # Convertendo os resultados para um DataFrame
-        if modelos:
-            # Como 'dados' é retornado como texto JSON, vamos carregar e expandir
-            # Converte a string JSON em um dicionário e cria um DataFrame com esses dados
-            # Convertendo JSON para dicionário
-            dados_json = [json.loads(modelo[0]) for modelo in modelos]
-            # Criando DataFrame com as chaves como colunas
-            df = pd.DataFrame(dados_json)
-            # print(df)  # Exibindo o DataFrame
-        else:
-            print("Nenhum modelo encontrado.")
+    # Arrays já decodificados, por chave do artefato (hash do conteúdo). O cache é
+    # compartilhado por todas as instâncias, então um y_test usado por vários
+    # modelos é lido e decodificado uma única vez.
+    _cache_arrays = OrderedDict()
+    _trava_cache = threading.Lock()
+    LIMITE_CACHE_BYTES = 256 * 1024 * 1024
 
-        # Fechando a conexão
-        conn.close()
+    def __init__(self, caminho_banco=None):
+        """
+        Parâmetros:
+        - caminho_banco (str): Caminho do banco único; None para usar a variável de ambiente
+          PAINEL_LOGS_BANCO ou o padrão `dados/experimentos.db` (ver armazenamento.caminho_banco).
+        """
+        self.caminho_banco = caminho_banco
 
-        return df  # Retornando o DataFrame
+    def _conectar(self):
+        """
+        Retorna a conexão persistente com o banco único. Na primeira conexão do
+        processo o esquema é criado ou migrado e os bancos antigos (um arquivo por
+        tipo) são importados (ver armazenamento.conectar_banco).
+        """
+        return conectar_banco(self.caminho_banco, self._gerenciador)
 
-    def consultar_modelos_cl(self, id_atual=None, commit_id=None, endereco=None):
-        # Conectando ao banco de dados SQLite
-        conn = sqlite3.connect(
-            '../dados/banco_de_dados_classificacao/classificacao.db')
-        cursor = conn.cursor()
+    @staticmethod
+    def _filtrar(query, params, tipo=None, id_atual=None, commit_id=None, endereco=None, incluir_folds=False):
+        """
+        Acrescenta à consulta os filtros informados sobre a tabela EXECUCOES (alias `e`).
 
-        # Montando a consulta SQL dinamicamente
-        query = '''
-            SELECT id, id_commit, controle_de_versao, data, hora
-            FROM CLASSIFICACAO 
-            WHERE 1=1
-        '''
-        params = []
+        Os folds de uma validação cruzada (execuções com `id_pai`) só entram com
+        `incluir_folds` ou quando o `id_atual` é informado; nas listagens e nos
+        agregados do painel a validação cruzada aparece apenas pela execução pai.
+        """
+        if not incluir_folds and id_atual is None:
+            query += ' AND e.id_pai IS NULL'
+        if tipo is not None:
+            query += ' AND e.tipo = ?'
+            params.append(tipo)
 
         if id_atual is not None:
-            query += ' AND id = ?'
+            query += ' AND e.id = ?'
             params.append(id_atual)
 
         if commit_id is not None:
-            query += ' AND id_commit = ?'
+            query += ' AND e.id_commit = ?'
             params.append(commit_id)
 
         if endereco is not None:
-            query += ' AND controle_de_versao = ?'
+            query += ' AND e.controle_de_versao = ?'
             params.append(endereco)
 
-        # Executando a consulta com os parâmetros passados
-        cursor.execute(query, params)
+        return query, params
 
-        # Recuperando os resultados
-        modelos = cursor.fetchall()
+    def _carregar_arrays(self, conn, id_atual, nomes):
+        """
+        Retorna {nome: np.ndarray ou None} com os artefatos da execução, usando o
+        cache de arrays decodificados (os arrays retornados são somente leitura).
+        """
+        chaves = chaves_artefatos(conn, id_atual, nomes)
 
-        # Convertendo os resultados para um DataFrame
-        if modelos:
-            # Criando um DataFrame a partir dos dados retornados
-            df = pd.DataFrame(modelos, columns=[
-                              "id", "commit_id", "controle_de_versao", "data", "hora"])
+        with self._trava_cache:
+            arrays = {chave: self._cache_arrays[chave]
+                      for chave in chaves.values() if chave in self._cache_arrays}
 
-            # Convertendo os campos de data e hora para o formato adequado
-            # df['data_atual'] = pd.to_datetime(
-            #     # Formato de data
-            #     df['data_atual'], errors='coerce').dt.strftime('%Y-%m-%d')
-            # df['hora_atual'] = pd.to_datetime(
-            #     # Formato de hora
-            #     df['hora_atual'], errors='coerce').dt.strftime('%H:%M:%S')
+        # Só lê e decodifica os artefatos que ainda não estão no cache
+        faltando = [chave for chave in chaves.values() if chave not in arrays]
+        lidos = {chave: decodificar_array(dados)
+                 for chave, dados in ler_artefatos(conn, faltando).items()}
+        arrays.update(lidos)
 
-        else:
-            print("Nenhum modelo encontrado.")
+        with self._trava_cache:
+            self._cache_arrays.update(lidos)
+            for chave in arrays:
+                if chave in self._cache_arrays:
+                    self._cache_arrays.move_to_end(chave)
+
+            # Remove os arrays usados há mais tempo até caber no limite
+            total = sum(array.nbytes for array in self._cache_arrays.values())
+            while total > self.LIMITE_CACHE_BYTES and len(self._cache_arrays) > 1:
+                _, array = self._cache_arrays.popitem(last=False)
+                total -= array.nbytes
 
-        # Fechando a conexão
-        conn.close()
+        return {nome: arrays.get(chaves.get(nome)) for nome in nomes}
 
-        return df  # Retorna o DataFrame
+# --------------------------------------Consultas de todos os tipos----------------------------------------------------------------------
 
-    def consultar_valores_cl(self, id_atual=None, commit_id=None, endereco=None):
+    def consultar_execucoes(self, tipo=None, id_atual=None, commit_id=None, endereco=None):
         """
-        Consulta os dados da tabela CLASSIFICACAO e retorna como um dicionário.
+        Retorna um DataFrame (id, tipo, commit_id, controle_de_versao, data, hora, criado_em)
+        com as execuções de todos os tipos (ou só do `tipo` informado), do mais antigo ao
+        mais recente, em uma única consulta à tabela EXECUCOES.
         """
-        # Conectando ao banco de dados SQLite
-        conn = sqlite3.connect(
-            '../dados/banco_de_dados_classificacao/classificacao.db')
-        cursor = conn.cursor()
-
-        # Montando a consulta SQL dinamicamente
-        query = '''
-            SELECT id, id_commit, controle_de_versao, data, hora, y_test,y_pred,fpr,tpr,thresholds_roc, precision, recall, thresholds,avg_precision
-            FROM CLASSIFICACAO
+        query, params = self._filtrar('''
+            SELECT e.id, e.tipo, e.id_commit, e.controle_de_versao, e.data, e.hora, e.criado_em
+            FROM EXECUCOES e
             WHERE 1=1
-        '''
-        params = []
+        ''', [], tipo, id_atual, commit_id, endereco)
 
-        if id_atual is not None:
-            query += ' AND id = ?'
-            params.append(id_atual)
+        # IDs crescem com o momento de criação: ordena do mais antigo ao mais recente
+        query += ' ORDER BY e.id'
 
-        if commit_id is not None:
-            query += ' AND id_commit = ?'
-            params.append(commit_id)
+        return pd.DataFrame(self._conectar().execute(query, params).fetchall(),
+                            columns=["id", "tipo", "commit_id", "controle_de_versao", "data", "hora", "criado_em"])
 
-        if endereco is not None:
-            query += ' AND controle_de_versao = ?'
-            params.append(endereco)
+    def consultar_historico_metrica(self, metrica, tipo=None, commit_id=None, endereco=None):
+        """
+        Valores de uma métrica por execução, do mais antigo ao mais recente,
+        lidos da tabela METRICAS (sem decodificar o JSON da coluna `dados`).
 
-        # Executando a consulta com os parâmetros passados
-        cursor.execute(query, params)
-
-        # Recuperando os resultados
-        modelos = cursor.fetchall()
-
-        # Convertendo os resultados para um dicionário
-        if modelos:
-            colunas = ["id", "commit_id",
-                       "controle_de_versao", "data", "hora", "y_test", "y_pred", "fpr", "tpr", "thresholds_roc", "precision", "recall", "thresholds", "avg_precision"]
-            resultado = []
-            for modelo in modelos:
-                modelo_dict = {colunas[i]: modelo[i]
-                               for i in range(len(colunas))}
-                resultado.append(modelo_dict)
-        else:
-            print("Nenhum modelo encontrado.")
-            resultado = []
+        Retorna um DataFrame (id, tipo, commit_id, controle_de_versao, valor); com
+        `tipo` None, inclui as execuções de todos os tipos que gravaram a métrica.
+        """
+        query, params = self._filtrar('''
+            SELECT e.id, e.tipo, e.id_commit, e.controle_de_versao, m.valor
+            FROM EXECUCOES e
+            JOIN METRICAS m ON m.id = e.id AND m.metrica = ?
+            WHERE 1=1
+        ''', [metrica], tipo, None, commit_id, endereco)
 
-        # Fechando a conexão
-        conn.close()
+        query += ' ORDER BY e.id'
 
-        return resultado  # Retorna uma lista de dicionários
+        return pd.DataFrame(self._conectar().execute(query, params).fetchall(),
+                            columns=["id", "tipo", "commit_id", "controle_de_versao", "valor"])
 
-    def deletar_dados_cl(self, id_atual=None, commit_id=None, endereco=None):
+    def consultar_resumo_metrica(self, metrica, tipo=None, commit_id=None, top=None, maior_melhor=True):
+        """
+        Quantidade de execuções, média, mínimo e máximo de uma métrica por tipo e
+        `controle_de_versao`, calculados pelo SQLite e ordenados pela média
+        (as `top` melhores versões, se informado).
+        """
+        query, params = self._filtrar('''
+            SELECT e.tipo,
+                   e.controle_de_versao,
+                   COUNT(m.valor) AS execucoes,
+                   AVG(m.valor) AS media,
+                   MIN(m.valor) AS minimo,
+                   MAX(m.valor) AS maximo
+            FROM METRICAS m
+            JOIN EXECUCOES e ON e.id = m.id
+            WHERE m.metrica = ?
+        ''', [metrica], tipo, None, commit_id)
+
+        query += f' GROUP BY e.tipo, e.controle_de_versao ORDER BY media {"DESC" if maior_melhor else "ASC"}'
+
+        if top is not None:
+            query += ' LIMIT ?'
+            params.append(int(top))
+
+        return pd.DataFrame(self._conectar().execute(query, params).fetchall(),
+                            columns=["tipo", "controle_de_versao", "execucoes", "media", "minimo", "maximo"])
+
+    def consultar_melhores_execucoes(self, metrica, n=3, tipo=None, commit_id=None, maior_melhor=True):
         """
-        Deleta registros da tabela CLASSIFICACAO com base nos critérios fornecidos.
+        As `n` melhores execuções de cada tipo e `controle_de_versao` segundo uma métrica.
+        """
+        filtro, params = self._filtrar('', [metrica], tipo, None, commit_id)
+        params.append(int(n))
+
+        query = f'''
+            SELECT tipo, controle_de_versao, posicao, id, commit_id, valor
+            FROM (
+                SELECT e.tipo, e.controle_de_versao, e.id, e.id_commit AS commit_id, m.valor,
+                       ROW_NUMBER() OVER (
+                           PARTITION BY e.tipo, e.controle_de_versao
+                           ORDER BY m.valor {"DESC" if maior_melhor else "ASC"}
+                       ) AS posicao
+                FROM METRICAS m
+                JOIN EXECUCOES e ON e.id = m.id
+                WHERE m.metrica = ? AND m.valor IS NOT NULL{filtro}
+            )
+            WHERE posicao <= ?
+            ORDER BY tipo, controle_de_versao, posicao
+        '''
 
-        Parâmetros:
-            id_atual (int): ID do registro a ser deletado.
-            commit_id (str): Commit ID do registro a ser deletado.
-            endereco (str): Endereço do controle de versão do registro a ser deletado.
+        return pd.DataFrame(self._conectar().execute(query, params).fetchall(),
+                            columns=["tipo", "controle_de_versao", "posicao", "id", "commit_id", "valor"])
 
-        Retorna:
-            int: Número de registros deletados.
+    def consultar_intervalos(self, id_atual, metodo=None):
         """
-        # Conectando ao banco de dados SQLite
-        conn = sqlite3.connect(
-            '../dados/banco_de_dados_classificacao/classificacao.db')
-        cursor = conn.cursor()
+        Agregados gravados na tabela INTERVALOS_METRICAS para uma execução (ex.: a
+        execução pai de uma validação cruzada, metodo 't').
 
-        # Montando a consulta SQL dinamicamente
-        query = 'DELETE FROM CLASSIFICACAO WHERE 1=1'
-        params = []
+        Retorna um DataFrame (metrica, metodo, nivel, n, media, desvio, inferior, superior),
+        vazio quando a execução não tem agregados.
+        """
+        query = '''
+            SELECT metrica, metodo, nivel, n, media, desvio, inferior, superior
+            FROM INTERVALOS_METRICAS
+            WHERE id = ?
+        '''
+        params = [id_atual]
+        if metodo is not None:
+            query += ' AND metodo = ?'
+            params.append(metodo)
 
-        if id_atual is not None:
-            query += ' AND id = ?'
-            params.append(id_atual)
+        return pd.DataFrame(self._conectar().execute(query, params).fetchall(),
+                            columns=["metrica", "metodo", "nivel", "n", "media", "desvio", "inferior", "superior"])
 
-        if commit_id is not None:
-            query += ' AND id_commit = ?'
-            params.append(commit_id)
+    def consultar_metricas_folds(self, id_pai):
+        """
+        Métricas de cada fold de uma validação cruzada, lidas da tabela METRICAS:
+        um DataFrame com as colunas id e fold e uma coluna por métrica.
+        """
+        linhas = self._conectar().execute('''
+            SELECT e.id, e.fold, m.metrica, m.valor
+            FROM EXECUCOES e
+            JOIN METRICAS m ON m.id = e.id
+            WHERE e.id_pai = ?
+            ORDER BY e.fold
+        ''', [id_pai]).fetchall()
+
+        df = pd.DataFrame(linhas, columns=["id", "fold", "metrica", "valor"])
+        if df.empty:
+            return pd.DataFrame(columns=["id", "fold"])
+
+        df = df.pivot(index=["fold", "id"], columns="metrica", values="valor")
+        df.columns.name = None
+        return df.reset_index()[["id", "fold", *df.columns]]
+
+# --------------------------------------Consultas por tipo-------------------------------------------------------------------------------
+
+    def _consultar_metricas(self, tipo, id_atual=None, commit_id=None, endereco=None):
+        query, params = self._filtrar(f'''
+            SELECT d.dados
+            FROM EXECUCOES e
+            JOIN {TABELAS[tipo]} d ON d.id = e.id
+            WHERE 1=1
+        ''', [], tipo, id_atual, commit_id, endereco)
 
-        if endereco is not None:
-            query += ' AND controle_de_versao = ?'
-            params.append(endereco)
+        # IDs crescem com o momento de criação: ordena do mais antigo ao mais recente
+        query += ' ORDER BY e.id'
 
-        # Executando a consulta
-        cursor.execute(query, params)
-        registros_deletados = cursor.rowcount  # Obtendo o número de registros deletados
+        modelos = self._conectar().execute(query, params).fetchall()
 
-        # Salvando as mudanças e fechando a conexão
-        conn.commit()
-        conn.close()
+        if not modelos:
+            print("Nenhum modelo encontrado.")
+            return pd.DataFrame()
 
-        print('Registro deletado {registros_deletados}')
+        # Como 'dados' é retornado como texto JSON, cada linha vira um dicionário
+        # e as chaves viram as colunas do DataFrame (séries temporais gravadas só
+        # com a decomposição não têm métricas)
+        return pd.DataFrame([json.loads(modelo[0]) for modelo in modelos if modelo[0] is not None])
 
+    def _consultar_modelos(self, tipo, id_atual=None, commit_id=None, endereco=None):
+        df = self.consultar_execucoes(tipo, id_atual, commit_id, endereco)
 
-# --------------------------------------Regression-----------------------------------------------------------------------------------------
+        if df.empty:
+            print("Nenhum modelo encontrado.")
 
-    def consultar_metricas_re(self, id_atual=None, commit_id=None, endereco=None):
-        # Conectando ao banco de dados SQLite
-        conn = sqlite3.connect(
-            '../dados/banco_de_dados_regressao/regressao.db')
-        cursor = conn.cursor()
+        return df[["id", "commit_id", "controle_de_versao", "data", "hora"]]
 
-        # Montando a consulta SQL dinamicamente
-        query = 'SELECT dados FROM REGRESSAO     WHERE 1=1'
-        params = []
+    def _consultar_valores(self, tipo, nomes, colunas_detalhe=(), id_atual=None, commit_id=None, endereco=None):
+        """
+        Lista de dicionários com as colunas da execução, as colunas de detalhe
+        informadas e os artefatos `nomes` como np.ndarray (None quando não foram gravados).
+        """
+        conn = self._conectar()
 
-        if id_atual is not None:
-            query += ' AND id = ?'
-            params.append(id_atual)
+        lista = ''.join(f', d.{coluna}' for coluna in colunas_detalhe)
+        query, params = self._filtrar(f'''
+            SELECT e.id, e.id_commit, e.controle_de_versao, e.data, e.hora{lista}
+            FROM EXECUCOES e
+            JOIN {TABELAS[tipo]} d ON d.id = e.id
+            WHERE 1=1
+        ''', [], tipo, id_atual, commit_id, endereco)
 
-        if commit_id is not None:
-            query += ' AND id_commit = ?'
-            params.append(commit_id)
+        query += ' ORDER BY e.id'
 
-        if endereco is not None:
-            query += ' AND controle_de_versao = ?'
-            params.append(endereco)
+        modelos = conn.execute(query, params).fetchall()
 
-        # Executando a consulta com os parâmetros passados
-        cursor.execute(query, params)
-
-        # Recuperando os resultados
-        modelos = cursor.fetchall()
-
-        # Convertendo os resultados para um DataFrame
-        if modelos:
-            # Como 'dados' é retornado como texto JSON, vamos carregar e expandir
-            # Converte a string JSON em um dicionário e cria um DataFrame com esses dados
-            # Convertendo JSON para dicionário
-            dados_json = [json.loads(modelo[0]) for modelo in modelos]
-            # Criando DataFrame com as chaves como colunas
-            df = pd.DataFrame(dados_json)
-            # print(df)  # Exibindo o DataFrame
-        else:
+        if not modelos:
             print("Nenhum modelo encontrado.")
+            return []
 
-        # Fechando a conexão
-        conn.close()
-
-        return df  # Retornando o DataFrame
+        colunas = ["id", "commit_id", "controle_de_versao", "data", "hora", *colunas_detalhe]
+        resultado = []
+        for modelo in modelos:
+            modelo_dict = dict(zip(colunas, modelo))
+            modelo_dict.update(self._carregar_arrays(conn, modelo_dict['id'], nomes))
+            resultado.append(modelo_dict)
 
-    def consultar_modelos_re(self, id_atual=None, commit_id=None, endereco=None):
-        # Conectando ao banco de dados SQLite
-        conn = sqlite3.connect(
-            '../dados/banco_de_dados_regressao/regressao.db')
-        cursor = conn.cursor()
-
-        # Montando a consulta SQL dinamicamente
-        query = '''
-                SELECT id, id_commit, controle_de_versao, data, hora
-                FROM REGRESSAO 
-                WHERE 1=1
-            '''
-        params = []
+        return resultado  # Retorna uma lista de dicionários
 
-        if id_atual is not None:
-            query += ' AND id = ?'
-            params.append(id_atual)
+    def _deletar_dados(self, tipo, id_atual=None, commit_id=None, endereco=None):
+        """
+        Deleta as execuções do tipo que atendem aos critérios (linhas de EXECUCOES e
+        da tabela de detalhes) e os artefatos e métricas que ficaram sem execução.
 
-        if commit_id is not None:
-            query += ' AND id_commit = ?'
-            params.append(commit_id)
+        Retorna:
+            int: Número de registros deletados.
+        """
+        conn = self._conectar()
 
-        if endereco is not None:
-            query += ' AND controle_de_versao = ?'
-            params.append(endereco)
+        selecao, params = self._filtrar(
+            'SELECT e.id FROM EXECUCOES e WHERE 1=1', [], tipo, id_atual, commit_id, endereco,
+            incluir_folds=True)
 
-        # Executando a consulta com os parâmetros passados
-        cursor.execute(query, params)
+        # As execuções selecionadas e os seus folds (filhos pela coluna id_pai)
+        selecao = f'SELECT id FROM EXECUCOES WHERE id IN ({selecao}) OR id_pai IN ({selecao})'
+        params = params * 2
 
-        # Recuperando os resultados
-        modelos = cursor.fetchall()
+        # O bloco with faz o commit (ou o rollback) de todas as remoções juntas
+        with conn:
+            conn.execute(f'DELETE FROM {TABELAS[tipo]} WHERE id IN ({selecao})', params)
+            registros_deletados = conn.execute(
+                f'DELETE FROM EXECUCOES WHERE id IN ({selecao})', params).rowcount
 
-        # Convertendo os resultados para um DataFrame
-        if modelos:
-            # Criando um DataFrame a partir dos dados retornados
-            df = pd.DataFrame(modelos, columns=[
-                "id", "commit_id", "controle_de_versao", "data", "hora"])
+            # Remove os artefatos (y_test, y_pred, curvas, séries) e as métricas que ficaram sem execução
+            remover_artefatos_orfaos(conn, 'EXECUCOES')
+            remover_metricas_orfas(conn, 'EXECUCOES')
 
-            # Convertendo os campos de data e hora para o formato adequado
-            # df['data_atual'] = pd.to_datetime(
-            #     # Formato de data
-            #     df['data_atual'], errors='coerce').dt.strftime('%Y-%m-%d')
-            # df['hora_atual'] = pd.to_datetime(
-            #     # Formato de hora
-            #     df['hora_atual'], errors='coerce').dt.strftime('%H:%M:%S')
+        print(f'Registro deletado {registros_deletados}')
 
-        else:
-            print("Nenhum modelo encontrado.")
+        return registros_deletados
 
-        # Fechando a conexão
-        conn.close()
+# --------------------------------------Classification--------------------------------------------------------------------------------------
 
-        return df  # Retorna o DataFrame
+    def consultar_metricas_cl(self, id_atual=None, commit_id=None, endereco=None):
+        return self._consultar_metricas('Classificacao', id_atual, commit_id, endereco)
 
-    def consultar_valores_re(self, id_atual=None, commit_id=None, endereco=None):
+    def consultar_historico_metrica_cl(self, metrica, commit_id=None, endereco=None):
         """
-            Consulta os dados da tabela REGRESSAO e retorna como um dicionário.
-            """
-        # Conectando ao banco de dados SQLite
-        conn = sqlite3.connect(
-            '../dados/banco_de_dados_regressao/regressao.db')
-        cursor = conn.cursor()
+        Retorna um DataFrame (id, commit_id, controle_de_versao, valor) com o valor
+        da métrica em cada execução de classificação, do mais antigo ao mais recente.
+        """
+        return self.consultar_historico_metrica(
+            metrica, 'Classificacao', commit_id, endereco).drop(columns='tipo')
 
-        # Montando a consulta SQL dinamicamente
-        query = '''
-                SELECT id, id_commit, controle_de_versao, data, hora, y_test, y_pred
-                FROM REGRESSAO
-                WHERE 1=1
-            '''
-        params = []
+    def consultar_resumo_metrica_cl(self, metrica, commit_id=None, top=None, maior_melhor=True):
+        """
+        Retorna um DataFrame com execucoes, media, minimo e maximo da métrica por
+        controle_de_versao, ordenado pela média (as `top` melhores versões, se informado).
+        """
+        return self.consultar_resumo_metrica(
+            metrica, 'Classificacao', commit_id, top, maior_melhor).drop(columns='tipo')
 
-        if id_atual is not None:
-            query += ' AND id = ?'
-            params.append(id_atual)
+    def consultar_melhores_execucoes_cl(self, metrica, n=3, commit_id=None, maior_melhor=True):
+        """
+        Retorna as `n` melhores execuções de cada controle_de_versao segundo a métrica.
+        """
+        return self.consultar_melhores_execucoes(
+            metrica, n, 'Classificacao', commit_id, maior_melhor).drop(columns='tipo')
 
-        if commit_id is not None:
-            query += ' AND id_commit = ?'
-            params.append(commit_id)
+    def consultar_metricas_classe_cl(self, id_atual=None, commit_id=None, endereco=None):
+        """
+        Retorna um DataFrame com uma linha por execução e classe (id, classe e uma
+        coluna por métrica um-contra-todos), lido da tabela METRICAS_CLASSE já
+        calculada no salvamento, com as classes na ordem dos rótulos.
+        """
+        query, params = self._filtrar('''
+            SELECT e.id, c.ordem, c.classe, c.metrica, c.valor
+            FROM EXECUCOES e
+            JOIN METRICAS_CLASSE c ON c.id = e.id
+            WHERE 1=1
+        ''', [], 'Classificacao', id_atual, commit_id, endereco)
 
-        if endereco is not None:
-            query += ' AND controle_de_versao = ?'
-            params.append(endereco)
+        linhas = pd.DataFrame(self._conectar().execute(query, params).fetchall(),
+                              columns=["id", "ordem", "classe", "metrica", "valor"])
 
-        # Executando a consulta com os parâmetros passados
-        cursor.execute(query, params)
-
-        # Recuperando os resultados
-        modelos = cursor.fetchall()
-
-        # Convertendo os resultados para um dicionário
-        if modelos:
-            colunas = ["id", "commit_id",
-                       "controle_de_versao", "data", "hora", "y_test", "y_pred"]
-            resultado = []
-            for modelo in modelos:
-                modelo_dict = {colunas[i]: modelo[i]
-                               for i in range(len(colunas))}
-                resultado.append(modelo_dict)
-        else:
+        if linhas.empty:
             print("Nenhum modelo encontrado.")
-            resultado = []
+            return pd.DataFrame(columns=["id", "classe"])
 
-        # Fechando a conexão
-        conn.close()
+        df = linhas.pivot(index=["id", "ordem", "classe"], columns="metrica", values="valor")
+        df.columns.name = None
+        return df.reset_index().drop(columns="ordem")
 
-        return resultado  # Retorna uma lista de dicionários
+    def consultar_modelos_cl(self, id_atual=None, commit_id=None, endereco=None):
+        return self._consultar_modelos('Classificacao', id_atual, commit_id, endereco)
 
-    def deletar_dados_re(self, id_atual=None, commit_id=None, endereco=None):
+    def consultar_valores_cl(self, id_atual=None, commit_id=None, endereco=None, max_pontos_curvas=MAX_PONTOS_CURVAS):
+        """
+        Consulta as execuções de classificação e retorna uma lista de dicionários.
+
+        `y_test`, `y_pred` e as curvas (incluindo F1 e custo por limiar, alinhados com
+        `thresholds`) são lidos da tabela ARTEFATOS apenas aqui,
+        quando um gráfico precisa deles, e retornados como np.ndarray (None quando
+        não foram gravados), tanto para registros gravados em formato binário
+        quanto para registros antigos em JSON. Curvas com mais de `max_pontos_curvas`
+        pontos são simplificadas (ver simplificacao_curvas.py); None as retorna completas.
+        """
+        nomes = ["y_test", "y_pred", "fpr", "tpr", "thresholds_roc", "precision", "recall", "thresholds",
+                 "f1_limiares", "custo_limiares"]
+        valores = self._consultar_valores(
+            'Classificacao', nomes, ["avg_precision"], id_atual, commit_id, endereco)
+
+        if max_pontos_curvas is not None:
+            # Curvas gravadas completas (registros antigos ou max_pontos_curvas=None no
+            # logger) também chegam aos gráficos com tamanho limitado
+            valores = [{**registro, **simplificar_curvas_classificacao(
+                {nome: registro.get(nome) for nome in nomes[2:]}, max_pontos_curvas)}
+                for registro in valores]
+        return valores
+
+    def deletar_dados_cl(self, id_atual=None, commit_id=None, endereco=None):
         """
-        Deleta registros da tabela CLASSIFICACAO com base nos critérios fornecidos.
+        Deleta execuções de classificação com base nos critérios fornecidos.
 
         Parâmetros:
             id_atual (int): ID do registro a ser deletado.
@@ -369,143 +429,205 @@ class Consulta:
         Retorna:
             int: Número de registros deletados.
         """
-        # Conectando ao banco de dados SQLite
-        conn = sqlite3.connect(
-            '../dados/banco_de_dados_regressao/regressao.db')
-        cursor = conn.cursor()
+        return self._deletar_dados('Classificacao', id_atual, commit_id, endereco)
 
-        # Montando a consulta SQL dinamicamente
-        query = 'DELETE FROM REGRESSAO WHERE 1=1'
-        params = []
 
-        if id_atual is not None:
-            query += ' AND id = ?'
-            params.append(id_atual)
+# --------------------------------------Regression-----------------------------------------------------------------------------------------
 
-        if commit_id is not None:
-            query += ' AND id_commit = ?'
-            params.append(commit_id)
+    def consultar_metricas_re(self, id_atual=None, commit_id=None, endereco=None):
+        return self._consultar_metricas('Regressao', id_atual, commit_id, endereco)
 
-        if endereco is not None:
-            query += ' AND controle_de_versao = ?'
-            params.append(endereco)
+    def consultar_historico_metrica_re(self, metrica, commit_id=None, endereco=None):
+        """
+        Retorna um DataFrame (id, commit_id, controle_de_versao, valor) com o valor
+        da métrica em cada execução de regressão, do mais antigo ao mais recente.
+        """
+        return self.consultar_historico_metrica(
+            metrica, 'Regressao', commit_id, endereco).drop(columns='tipo')
 
-        # Executando a consulta
-        cursor.execute(query, params)
-        registros_deletados = cursor.rowcount  # Obtendo o número de registros deletados
+    def consultar_resumo_metrica_re(self, metrica, commit_id=None, top=None, maior_melhor=True):
+        """
+        Retorna um DataFrame com execucoes, media, minimo e maximo da métrica por
+        controle_de_versao, ordenado pela média (as `top` melhores versões, se informado).
+        """
+        return self.consultar_resumo_metrica(
+            metrica, 'Regressao', commit_id, top, maior_melhor).drop(columns='tipo')
 
-        # Salvando as mudanças e fechando a conexão
-        conn.commit()
-        conn.close()
+    def consultar_melhores_execucoes_re(self, metrica, n=3, commit_id=None, maior_melhor=True):
+        """
+        Retorna as `n` melhores execuções de cada controle_de_versao segundo a métrica.
+        """
+        return self.consultar_melhores_execucoes(
+            metrica, n, 'Regressao', commit_id, maior_melhor).drop(columns='tipo')
 
-        print('Registro deletado {registros_deletados}')
+    def consultar_modelos_re(self, id_atual=None, commit_id=None, endereco=None):
+        return self._consultar_modelos('Regressao', id_atual, commit_id, endereco)
 
+    def consultar_valores_re(self, id_atual=None, commit_id=None, endereco=None):
+        """
+        Consulta as execuções de regressão e retorna uma lista de dicionários.
 
-# Series temporais
+        `y_test` e `y_pred` são lidos da tabela ARTEFATOS apenas aqui, quando um
+        gráfico precisa deles, e retornados como np.ndarray, tanto para registros
+        gravados em formato binário quanto para registros antigos em JSON.
+        """
+        return self._consultar_valores(
+            'Regressao', ['y_test', 'y_pred'], (), id_atual, commit_id, endereco)
 
+    def consultar_sketches_re(self, id_atual):
+        """
+        Sketches de quantis gravados com a execução de regressão (ver sketch_quantis.py).
 
-    def consultar_modelos_st(self, id_atual=None, commit_id=None, endereco=None):
-        # Conectando ao banco de dados SQLite
-        conn = sqlite3.connect(
-            '../dados/banco_de_dados_series_temporais/series_temporais.db')
-        cursor = conn.cursor()
+        Retorna:
+            dict: {'y_test', 'y_pred', 'residuo'} -> SketchKLL, apenas os que foram gravados
+            (execuções com `erro_quantis` ou registradas com acumuladores).
+        """
+        nomes = [f'sketch_{nome}' for nome in ('y_test', 'y_pred', 'residuo')]
+        arrays = self._carregar_arrays(self._conectar(), id_atual, nomes)
+        return {nome[len('sketch_'):]: SketchKLL.de_array(array)
+                for nome, array in arrays.items() if array is not None}
 
-        # Montando a consulta SQL dinamicamente
-        query = '''
-                SELECT id, id_commit, controle_de_versao, data, hora
-                FROM SERIES_TEMPORAIS 
-                WHERE 1=1
-            '''
-        params = []
+    def consultar_metricas_saidas_re(self, id_atual):
+        """
+        Métricas de cada saída de uma execução de regressão com várias saídas (arrays
+        `saida_<metrica>` gravados com a execução, ver Regression._calculo_metricas_saidas).
 
-        if id_atual is not None:
-            query += ' AND id = ?'
-            params.append(id_atual)
+        Retorna um DataFrame com uma linha por saída e uma coluna por métrica, vazio
+        para execuções de uma saída.
+        """
+        conn = self._conectar()
+        nomes = [nome for nome in chaves_artefatos(conn, id_atual) if nome.startswith('saida_')]
+        arrays = self._carregar_arrays(conn, id_atual, nomes)
+
+        # Colunas na ordem das métricas do registro (os artefatos vêm em ordem alfabética)
+        ordem = {nome: posicao for posicao, nome in
+                 enumerate(self._consultar_metricas('Regressao', id_atual=id_atual).columns)}
+        metricas = sorted((nome[len('saida_'):] for nome in nomes), key=lambda nome: ordem.get(nome, len(ordem)))
+        df = pd.DataFrame({nome: arrays[f'saida_{nome}'] for nome in metricas})
+        df.index.name = 'saida'
+        return df
 
-        if commit_id is not None:
-            query += ' AND id_commit = ?'
-            params.append(commit_id)
+    def deletar_dados_re(self, id_atual=None, commit_id=None, endereco=None):
+        """
+        Deleta execuções de regressão com base nos critérios fornecidos.
 
-        if endereco is not None:
-            query += ' AND controle_de_versao = ?'
-            params.append(endereco)
+        Parâmetros:
+            id_atual (int): ID do registro a ser deletado.
+            commit_id (str): Commit ID do registro a ser deletado.
+            endereco (str): Endereço do controle de versão do registro a ser deletado.
 
-        # Executando a consulta com os parâmetros passados
-        cursor.execute(query, params)
+        Retorna:
+            int: Número de registros deletados.
+        """
+        return self._deletar_dados('Regressao', id_atual, commit_id, endereco)
 
-        # Recuperando os resultados
-        modelos = cursor.fetchall()
 
-        # Convertendo os resultados para um DataFrame
-        if modelos:
-            # Criando um DataFrame a partir dos dados retornados
-            df = pd.DataFrame(modelos, columns=[
-                "id", "commit_id", "controle_de_versao", "data", "hora"])
+# Series temporais
 
-            # Convertendo os campos de data e hora para o formato adequado
-            # df['data_atual'] = pd.to_datetime(
-            #     # Formato de data
-            #     df['data_atual'], errors='coerce').dt.strftime('%Y-%m-%d')
-            # df['hora_atual'] = pd.to_datetime(
-            #     # Formato de hora
-            #     df['hora_atual'], errors='coerce').dt.strftime('%H:%M:%S')
 
-        else:
-            print("Nenhum modelo encontrado.")
+    def consultar_modelos_st(self, id_atual=None, commit_id=None, endereco=None):
+        return self._consultar_modelos('Series_Temporais', id_atual, commit_id, endereco)
 
-        # Fechando a conexão
-        conn.close()
+    def consultar_metricas_st(self, id_atual=None, commit_id=None, endereco=None):
+        return self._consultar_metricas('Series_Temporais', id_atual, commit_id, endereco)
 
-        return df  # Retorna o DataFrame
+    def consultar_erros_st(self, id_atual):
+        """
+        Erros de previsão de uma execução de séries temporais (arrays gravados com a
+        execução, ver Series_Temporais._calculo_metricas_series).
 
-    def consultar_decomposicao_st(self, id_atual=None, commit_id=None, endereco=None):
+        Retorna:
+            tuple: (DataFrame com uma linha por passo do horizonte, vazio para previsões
+            de um passo; DataFrame com uma linha por janela móvel). As colunas são as
+            métricas ('mae', 'rmse', 'vies', ...).
+        """
+        conn = self._conectar()
+        nomes = [nome for nome in chaves_artefatos(conn, id_atual)
+                 if nome.startswith(('horizonte_', 'janela_'))]
+        arrays = self._carregar_arrays(conn, id_atual, nomes)
+
+        def tabela(prefixo, indice):
+            df = pd.DataFrame({nome[len(prefixo):]: valores
+                               for nome, valores in arrays.items() if nome.startswith(prefixo)})
+            df.index.name = indice
+            return df
+
+        # O horizonte começa em 1 (previsão um passo à frente)
+        horizonte = tabela('horizonte_', 'horizonte')
+        horizonte.index += 1
+        return horizonte, tabela('janela_', 'janela')
+
+    def consultar_series_painel_st(self, id_atual):
+        """
+        Métricas de cada série de uma execução do modo painel (arrays `serie_<metrica>`
+        gravados com a execução, ver series_painel.py), sem ler os valores das séries.
 
-        # Conectando ao banco de dados SQLite
-        conn = sqlite3.connect('../dados/banco_de_dados_series_temporais/series_temporais.db')
-        cursor = conn.cursor()
+        Retorna um DataFrame com uma linha por série (índice `serie`) e uma coluna por
+        métrica, vazio para execuções de uma única série.
+        """
+        conn = self._conectar()
+        nomes = ['series_ids', *(nome for nome in chaves_artefatos(conn, id_atual) if nome.startswith('serie_'))]
+        arrays = self._carregar_arrays(conn, id_atual, nomes)
+        series = arrays.pop('series_ids')
+        if series is None:
+            return pd.DataFrame()
+
+        df = pd.DataFrame({nome[len('serie_'):]: valores for nome, valores in arrays.items()},
+                          index=pd.Index(series, name='serie'))
+        return df.astype({'n': 'int64'})
+
+    def consultar_serie_painel_st(self, id_atual, serie):
+        """
+        Valores de uma série de uma execução do modo painel, lendo apenas o bloco
+        colunar que contém a série (ver series_painel.layout_colunar).
 
-        # Montando a consulta SQL dinamicamente
-        query = '''
-                SELECT observed, trend, seasonal, resid
-                FROM SERIES_TEMPORAIS 
-                WHERE 1=1
-            '''
-        params = []
+        Retorna um DataFrame com as colunas 'tempos', 'y_real' e 'y_pred', vazio se a
+        série não existir na execução.
+        """
+        conn = self._conectar()
+        indice = self._carregar_arrays(conn, id_atual, ['series_ids', 'series_posicoes'])
+        if indice['series_ids'] is None:
+            return pd.DataFrame()
 
-        if id_atual is not None:
-            query += ' AND id = ?'
-            params.append(id_atual)
+        posicao = localizar_serie(indice['series_ids'], indice['series_posicoes'], serie)
+        if posicao is None:
+            print(f"Série {serie} não encontrada.")
+            return pd.DataFrame()
 
-        if commit_id is not None:
-            query += ' AND id_commit = ?'
-            params.append(commit_id)
+        # Os blocos ficam no cache de arrays: séries vizinhas não são lidas de novo
+        bloco, inicio, fim = posicao
+        arrays = self._carregar_arrays(conn, id_atual, [f'painel_{nome}_{bloco}' for nome, _ in COLUNAS_PAINEL])
+        return pd.DataFrame({nome: arrays[f'painel_{nome}_{bloco}'][inicio:fim] for nome, _ in COLUNAS_PAINEL})
 
-        if endereco is not None:
-            query += ' AND controle_de_versao = ?'
-            params.append(endereco)
+    def consultar_decomposicao_st(self, id_atual=None, commit_id=None, endereco=None):
+
+        conn = self._conectar()
 
-        # Executando a consulta com os parâmetros passados
-        cursor.execute(query, params)
+        query, params = self._filtrar(
+            'SELECT e.id FROM EXECUCOES e WHERE 1=1', [], 'Series_Temporais', id_atual, commit_id, endereco)
 
-        # Recuperando os resultados
-        modelos = cursor.fetchall()
+        # IDs crescem com o momento de criação: ordena do mais antigo ao mais recente
+        query += ' ORDER BY e.id'
 
-        # Fechando a conexão com o banco
-        conn.close()
+        # Recuperando o primeiro resultado
+        modelo = conn.execute(query, params).fetchone()
 
         # Convertendo os resultados para DataFrame
-        if modelos:
-            df = pd.DataFrame(modelos, columns=['observed', 'trend', 'seasonal', 'resid'])
+        if modelo:
+
+            # As séries ficam na tabela ARTEFATOS e são lidas apenas para a execução exibida
+            artefatos = carregar_artefatos(
+                conn, modelo[0], ['observed', 'trend', 'seasonal', 'resid'])
 
             # Função para converter JSON em Series pandas
             def json_para_serie(json_str):
                 try:
                     if not json_str or json_str == "null":
                         return pd.Series(dtype=float)
-                    
+
                     # Tenta carregar o JSON
                     data = json.loads(json_str)
-                    
+
                     # Verifica se as chaves necessárias existem
                     if 'values' in data and 'index' in data:
                         return pd.Series(data['values'], index=data['index'])
@@ -518,10 +640,10 @@ class Consulta:
 
             # Criando um dicionário de séries individuais
             series_dict = {
-                'observed': json_para_serie(df['observed'].iloc[0]),
-                'trend': json_para_serie(df['trend'].iloc[0]),
-                'seasonal': json_para_serie(df['seasonal'].iloc[0]),
-                'resid': json_para_serie(df['resid'].iloc[0])
+                'observed': json_para_serie(artefatos.get('observed')),
+                'trend': json_para_serie(artefatos.get('trend')),
+                'seasonal': json_para_serie(artefatos.get('seasonal')),
+                'resid': json_para_serie(artefatos.get('resid'))
             }
 
             # Combinando as séries em um único DataFrame
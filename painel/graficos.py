@@ -309,6 +309,69 @@ class Graficos:
         # Mostrar o gráfico
         return fig
 
+    def curva_limiares(self, limiares, f1, custo):
+        """
+        F1 e custo esperado por amostra em função do limiar de decisão (curvas
+        gravadas no salvamento, ver limiares.py), com os limiares ótimos marcados.
+        """
+        fig = go.Figure()
+
+        fig.add_scatter(x=limiares, y=f1, mode='lines', name='F1',
+                        line=dict(color='darkorange', width=2))
+        fig.add_scatter(x=limiares, y=custo, mode='lines', name='Custo por amostra',
+                        line=dict(color='steelblue', width=2))
+
+        # Limiares de maior F1 e de menor custo
+        fig.add_vline(x=limiares[np.argmax(f1)], line=dict(color='darkorange', dash='dash'))
+        fig.add_vline(x=limiares[np.argmin(custo)], line=dict(color='steelblue', dash='dash'))
+
+        fig.update_layout(
+            title='<b>F1 e custo por limiar</b>',
+            xaxis_title='Limiar de decisão',  # Título do eixo x
+            yaxis_title='Valor',  # Título do eixo y
+            legend_title='Curva',  # Título da legenda
+            margin=dict(l=50, r=50, t=50, b=50),  # Definindo as margens
+            # Exibir grade no eixo y
+            yaxis=dict(showgrid=True, zeroline=False),
+            width=1300,  # Largura do gráfico
+            height=500  # Altura do gráfico
+        )
+
+        return fig
+
+    def intervalos_metricas(self, intervalos):
+        """
+        Média e intervalo de confiança de cada métrica (DataFrame de
+        Consulta.consultar_intervalos), como barras de erro assimétricas.
+        """
+        fig = go.Figure()
+
+        fig.add_scatter(
+            x=intervalos['media'],
+            y=intervalos['metrica'],
+            mode='markers',
+            marker=dict(color='darkorange', size=9),
+            error_x=dict(
+                type='data',
+                symmetric=False,
+                array=intervalos['superior'] - intervalos['media'],
+                arrayminus=intervalos['media'] - intervalos['inferior'],
+            ),
+            name=f"IC {intervalos['nivel'].iloc[0]:.0%}",
+        )
+
+        fig.update_layout(
+            xaxis_title='Valor',  # Título do eixo x
+            yaxis_title='Métrica',  # Título do eixo y
+            margin=dict(l=50, r=50, t=50, b=50),  # Definindo as margens
+            # Exibir grade no eixo x
+            xaxis=dict(showgrid=True, zeroline=False),
+            width=1300,  # Largura do gráfico
+            height=max(300, 30 * len(intervalos))  # Altura proporcional ao número de métricas
+        )
+
+        return fig
+
     def barra_gradiente(self, dados):
         """
         Cria um gráfico de barras com gradiente de cores e personalizações.
@@ -656,6 +719,59 @@ class Graficos:
         # Exibindo o gráfico
         return fig
 
+    def outline_sketch(self, sketches, titulo):
+        """
+        Box plots desenhados a partir de sketches de quantis (SketchKLL), para execuções
+        gravadas sem y_test e y_pred: quartis, limites de 1.5 IQR e a porcentagem de
+        outliers são aproximados pelo sketch, e os outliers não são desenhados um a um.
+        """
+        cores = {'y_test': 'royalblue', 'y_pred': 'orange', 'residuo': 'forestgreen'}
+
+        fig = go.Figure()
+        linhas_titulo = []
+        for nome, sketch in sketches.items():
+            resumo = sketch.resumo_boxplot()
+
+            # Box plot com as estatísticas já calculadas (sem os valores)
+            fig.add_trace(go.Box(
+                name=nome,
+                q1=[resumo['q1']],
+                median=[resumo['mediana']],
+                q3=[resumo['q3']],
+                lowerfence=[resumo['limite_inferior']],
+                upperfence=[resumo['limite_superior']],
+                marker=dict(color=cores.get(nome, 'royalblue')),
+                whiskerwidth=0.7,  # Largura dos bigodes ajustada
+            ))
+
+            # Mínimo e máximo (exatos) como pontos quando estão fora dos limites
+            extremos = [valor for valor in (resumo['minimo'], resumo['maximo'])
+                        if valor < resumo['limite_inferior'] or valor > resumo['limite_superior']]
+            if extremos:
+                fig.add_trace(go.Scatter(
+                    x=[nome] * len(extremos),
+                    y=extremos,
+                    mode='markers+text',
+                    text=[f'{valor:.2f}' for valor in extremos],
+                    textposition='top right',
+                    marker=dict(color='red', size=12, symbol='circle'),
+                ))
+
+            outliers = resumo['porcentagem_outliers']
+            linhas_titulo.append(f'{nome} IQR: {100 - outliers:.2f}% | Outliers: {outliers:.2f}%')
+
+        # Adicionando título e rótulos
+        fig.update_layout(
+            title=f'{titulo} (aproximado): <br>' + ' <br>'.join(linhas_titulo),
+            yaxis_title='Valor',
+            xaxis_title='Tipos de Dados',
+            template='plotly_white',
+            showlegend=False,
+        )
+
+        # Exibindo o gráfico
+        return fig
+
     import matplotlib.pyplot as plt
 
     def plot_decomposicao(self, decomposicao, title):
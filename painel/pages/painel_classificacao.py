@@ -6,7 +6,6 @@ import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
 from graficos import Graficos
-import ast
 from streamlit_extras.switch_page_button import switch_page
 
 import sys
@@ -82,6 +81,9 @@ df_metricas = dados.consultar_metricas_cl(
     # Retorna as metricas
     commit_id=str(df_filtrado.iloc[0, 1]), endereco=str(df_filtrado.iloc[0, 2]))
 
+# Execuções multiclasse não têm 'Prevalencia' global (apenas por classe)
+metricas_gerais = [metrica for metrica in metricas_gerais if metrica in df_metricas.columns]
+
 with aba2:
     id_metric = df_filtrado['commit_id'].iloc[0]  # Obtendo o valor desejado
     id_data = df_filtrado['data'].iloc[0]
@@ -342,6 +344,27 @@ with aba2:
                 unsafe_allow_html=True
             )
 
+    # Métricas um-contra-todos de cada classe, gravadas no salvamento (sem recálculo)
+    st.subheader("Métricas por classe", divider=True)
+    df_metricas_classe = dados.consultar_metricas_classe_cl(
+        id_atual=int(df_filtrado['id'].iloc[0]))
+    st.dataframe(df_metricas_classe.drop(columns='id').set_index('classe'))
+
+    # Validação cruzada: agregados e métricas dos folds gravados no salvamento (sem reagregar)
+    df_intervalos = dados.consultar_intervalos(int(df_filtrado['id'].iloc[0]), metodo='t')
+    if not df_intervalos.empty:
+        st.subheader("Validação cruzada", divider=True)
+        st.dataframe(df_intervalos.drop(columns='metodo').set_index('metrica'))
+        st.dataframe(dados.consultar_metricas_folds(
+            int(df_filtrado['id'].iloc[0])).drop(columns='id').set_index('fold'))
+
+    # Intervalos de confiança bootstrap gravados com a execução
+    df_bootstrap = dados.consultar_intervalos(int(df_filtrado['id'].iloc[0]), metodo='bootstrap')
+    if not df_bootstrap.empty:
+        st.subheader("Intervalos de confiança (bootstrap)", divider=True)
+        st.plotly_chart(graficos.intervalos_metricas(df_bootstrap))
+        st.dataframe(df_bootstrap.drop(columns='metodo').set_index('metrica'))
+
 with aba3:
     # st.title('Painel de regressão')
     col1, col2 = st.columns(2)
@@ -386,10 +409,12 @@ with aba3:
 
     id_metrica = st.selectbox('ID, Modelos', metricas_gerais)
 
-    df_agrupado_metrica = dados.consultar_metricas_cl(endereco=id_selecionado)
+    # Histórico da métrica lido da tabela METRICAS (sem carregar as demais métricas)
+    df_historico_metrica = dados.consultar_historico_metrica_cl(
+        id_metrica, endereco=id_selecionado)
 
     st.plotly_chart(graficos.grafico_linha_detalhada(
-        id_metrica, df_agrupado_metrica.index, df_agrupado_metrica[id_metrica].values))
+        id_metrica, df_historico_metrica.index, df_historico_metrica['valor'].values))
 
 # ----------------------------------------------------------------
 
@@ -398,37 +423,32 @@ with aba3:
         id_atual=int(df_filtrado.iloc[0, 0]), commit_id=str(df_filtrado.iloc[0, 1]))
 
     # Verificação se 'fpr' e 'tpr' estão presentes e não são nulos
+    # (as curvas já chegam como np.ndarray, lidas da tabela ARTEFATOS)
     fpr = df_valores[0].get('fpr')
     tpr = df_valores[0].get('tpr')
 
-    if fpr and tpr:  # Verifica se ambos não são None ou vazios
-        try:
-            # Convertendo a string para uma lista real
-            fpr = ast.literal_eval(fpr)
-            # Convertendo a string para uma lista real
-            tpr = ast.literal_eval(tpr)
-            st.plotly_chart(graficos.curva_roc(
-                fpr, tpr))  # Exibe o gráfico
-        except (ValueError, SyntaxError) as e:
-            st.error(f"Erro ao converter valores para lista: {e}")
+    if fpr is not None and tpr is not None and len(fpr) and len(tpr):  # Verifica se ambos não são None ou vazios
+        st.plotly_chart(graficos.curva_roc(
+            fpr, tpr))  # Exibe o gráfico
     else:
         st.error("Valores de fpr ou tpr estão ausentes.")
 
     precision = df_valores[0].get('precision')
     recall = df_valores[0].get('recall')
     avg_precision = df_valores[0].get('avg_precision')
+    # avg_precision é opcional no salvamento
+    avg_precision = float(avg_precision) if avg_precision is not None else float('nan')
 
-    if precision and recall:  # Verifica se ambos não são None ou vazios
-        try:
-            # Convertendo a string para uma lista real
-            precision = ast.literal_eval(precision)
-            # Convertendo a string para uma lista real
-            recall = ast.literal_eval(recall)
-            # Convertendo a string para um tipo real
-            avg_precision = ast.literal_eval(avg_precision)
-            st.plotly_chart(graficos.curva_precision_recall(
-                precision, recall, avg_precision))  # Exibe o gráfico
-        except (ValueError, SyntaxError) as e:
-            st.error(f"Erro ao converter valores para lista: {e}")
+    if precision is not None and recall is not None and len(precision) and len(recall):  # Verifica se ambos não são None ou vazios
+        st.plotly_chart(graficos.curva_precision_recall(
+            precision, recall, avg_precision))  # Exibe o gráfico
     else:
         st.error("Valores de precision ou recall estão ausentes.")
+
+    # F1 e custo por limiar, gravados quando o modelo recebeu os scores
+    limiares = df_valores[0].get('thresholds')
+    f1_limiares = df_valores[0].get('f1_limiares')
+    custo_limiares = df_valores[0].get('custo_limiares')
+
+    if limiares is not None and f1_limiares is not None and custo_limiares is not None:
+        st.plotly_chart(graficos.curva_limiares(limiares, f1_limiares, custo_limiares))
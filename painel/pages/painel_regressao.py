@@ -6,7 +6,6 @@ import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
 from graficos import Graficos
-import ast
 from streamlit_extras.switch_page_button import switch_page
 import numpy as np
 
@@ -74,18 +73,31 @@ with aba1:
     valores = dados.consultar_valores_re(
         id_atual=id_atual, commit_id=commit_id)
 
-    # Convertendo a string para uma lista real
-    y_test = ast.literal_eval(valores[0]['y_test'])
-    # Convertendo a string para uma lista real
-    y_pred = ast.literal_eval(valores[0]['y_pred'])
+    # y_test e y_pred já chegam como np.ndarray
+    y_test = valores[0]['y_test']
+    y_pred = valores[0]['y_pred']
 
-    df = pd.DataFrame({
-        'y_test': y_test,
-        'y_pred': y_pred
-    })
+    # Execuções registradas com acumuladores (dados em blocos) não têm os arrays
+    arrays_gravados = y_test is not None and y_pred is not None
 
-    st.plotly_chart(graficos.grafico_linha(
-        df, 'Comparação entre Valores Reais e Previstos'))
+    # Modelos com várias saídas: os gráficos mostram uma saída por vez
+    if arrays_gravados and y_test.ndim == 2 and y_test.shape[1] > 1:
+        saida = st.selectbox('Saída', range(y_test.shape[1]))
+        y_test = y_test[:, saida]
+        y_pred = y_pred[:, saida]
+        valores[0] = {**valores[0], 'y_test': y_test, 'y_pred': y_pred}
+
+    if arrays_gravados:
+        df = pd.DataFrame({
+            'y_test': y_test,
+            'y_pred': y_pred
+        })
+
+        st.plotly_chart(graficos.grafico_linha(
+            df, 'Comparação entre Valores Reais e Previstos'))
+    else:
+        st.info("Execução registrada sem y_test e y_pred (métricas acumuladas em blocos "
+                "ou médias dos folds de uma validação cruzada).")
 
     st.page_link("./painel_principal.py",
                  label="Voltar para o Painel Principal")
@@ -360,6 +372,29 @@ with aba2:
 
             # ------------------------------
 
+    # Validação cruzada: agregados e métricas dos folds gravados no salvamento (sem reagregar)
+    df_intervalos = dados.consultar_intervalos(int(df_filtrado['id'].iloc[0]), metodo='t')
+    if not df_intervalos.empty:
+        st.subheader("Validação cruzada", divider=True)
+        st.dataframe(df_intervalos.drop(columns='metodo').set_index('metrica'))
+        st.dataframe(dados.consultar_metricas_folds(
+            int(df_filtrado['id'].iloc[0])).drop(columns='id').set_index('fold'))
+
+    # Métricas de cada saída (modelos com várias saídas), gravadas como arrays
+    df_saidas = dados.consultar_metricas_saidas_re(int(df_filtrado['id'].iloc[0]))
+    if not df_saidas.empty:
+        st.subheader("Métricas por saída", divider=True)
+        metrica_saida = st.selectbox('Métrica por saída', df_saidas.columns)
+        st.bar_chart(df_saidas[metrica_saida])
+        st.dataframe(df_saidas)
+
+    # Intervalos de confiança bootstrap gravados com a execução
+    df_bootstrap = dados.consultar_intervalos(int(df_filtrado['id'].iloc[0]), metodo='bootstrap')
+    if not df_bootstrap.empty:
+        st.subheader("Intervalos de confiança (bootstrap)", divider=True)
+        st.plotly_chart(graficos.intervalos_metricas(df_bootstrap))
+        st.dataframe(df_bootstrap.drop(columns='metodo').set_index('metrica'))
+
 with aba3:
     # st.title('Painel de regressão')
     col1, col2 = st.columns(2)
@@ -430,30 +465,39 @@ with aba3:
 
     id_metrica = st.selectbox('ID, Modelos', metricas_gerais)
 
-    df_agrupado_metrica = dados.consultar_metricas_re(endereco=id_selecionado)
+    # Histórico da métrica lido da tabela METRICAS (sem carregar as demais métricas)
+    df_historico_metrica = dados.consultar_historico_metrica_re(
+        id_metrica, endereco=id_selecionado)
 
     st.plotly_chart(graficos.grafico_linha_detalhada(
-        id_metrica, df_agrupado_metrica.index, df_agrupado_metrica[id_metrica].values))
+        id_metrica, df_historico_metrica.index, df_historico_metrica['valor'].values))
 
 # ----------------------------------------------------------------
-    listas = ['y_test', 'y_pred', 'Resíduos']
+    if arrays_gravados:
+        listas = ['y_test', 'y_pred', 'Resíduos']
 
-    classificar_lista = st.selectbox('Escolha o tipo', listas)
+        classificar_lista = st.selectbox('Escolha o tipo', listas)
 
-    if 'y_test' in classificar_lista or 'y_pred' in classificar_lista:
-        valores_da_lista = ast.literal_eval(valores[0][classificar_lista])
-    else:
-        # Calculando os erros (resíduos)
-        y_test = ast.literal_eval(valores[0]['y_test'])
-        y_pred = ast.literal_eval(valores[0]['y_pred'])
-        # Calculando os erros (resíduos)
-        valores_da_lista = np.array(y_test) - np.array(y_pred)
+        if 'y_test' in classificar_lista or 'y_pred' in classificar_lista:
+            valores_da_lista = valores[0][classificar_lista]
+        else:
+            # Calculando os erros (resíduos)
+            valores_da_lista = y_test - y_pred
 
-    st.plotly_chart(graficos.distribuicao_normal(
-        classificar_lista, valores_da_lista))
+        st.plotly_chart(graficos.distribuicao_normal(
+            classificar_lista, valores_da_lista))
 
-    y_test = ast.literal_eval(valores[0]['y_test'])
-    y_pred = ast.literal_eval(valores[0]['y_pred'])
-    st.plotly_chart(graficos.outline(y_test, y_pred))  # Gráfico
+        st.plotly_chart(graficos.outline(y_test, y_pred))  # Gráfico
 
-    st.plotly_chart(graficos.outline_residuo(y_test, y_pred))  # Gráfico
+        st.plotly_chart(graficos.outline_residuo(y_test, y_pred))  # Gráfico
+    else:
+        # Sem os arrays, os box plots vêm dos sketches de quantis gravados com a execução
+        sketches = dados.consultar_sketches_re(id_atual)
+        if sketches:
+            valores_sketches = {nome: sketch for nome, sketch in sketches.items() if nome != 'residuo'}
+            if valores_sketches:
+                st.plotly_chart(graficos.outline_sketch(
+                    valores_sketches, 'Distribuição dos Valores'))  # Gráfico
+            if 'residuo' in sketches:
+                st.plotly_chart(graficos.outline_sketch(
+                    {'residuo': sketches['residuo']}, 'Distribuição dos Resíduos'))  # Gráfico
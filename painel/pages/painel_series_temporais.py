@@ -59,7 +59,42 @@ if not df_filtrado.empty:
 #     commit_id=str(df_filtrado.iloc[0, 1]), endereco=str(df_filtrado.iloc[0, 2]))
 
 with aba2:
-    st.title('Ola mundo!')
+    # Métricas de previsão (MASE, sMAPE, WAPE, viés...) gravadas com a execução
+    df_metricas = dados.consultar_metricas_st(id_atual=id_atual)
+    if df_metricas.empty:
+        st.info('Execução gravada apenas com a decomposição, sem métricas de previsão.')
+    else:
+        st.subheader("Métricas de previsão", divider=True)
+        colunas = st.columns(6)
+        for coluna, metrica in zip(colunas, ['mae', 'rmse', 'mase', 'smape', 'wape', 'vies']):
+            coluna.metric(metrica.upper(), f"{df_metricas[metrica].iloc[0]:.4f}")
+        st.dataframe(df_metricas)
+
+        df_horizonte, df_janela = dados.consultar_erros_st(id_atual)
+
+        # Erros em janelas móveis: degradação do modelo ao longo da série
+        if not df_janela.empty:
+            st.subheader("Erros em janelas móveis", divider=True)
+            metrica_janela = st.selectbox('Métrica da janela', df_janela.columns)
+            st.line_chart(df_janela[metrica_janela])
+
+        # Modo painel: métricas de cada série e os valores apenas da série escolhida
+        df_series = dados.consultar_series_painel_st(id_atual)
+        if not df_series.empty:
+            st.subheader(f"Séries ({len(df_series)})", divider=True)
+            metrica_serie = st.selectbox('Ordenar por', df_series.columns.drop('n'))
+            df_series = df_series.sort_values(metrica_serie, ascending=False)
+            st.dataframe(df_series)
+
+            serie = st.selectbox('Série', df_series.index)
+            df_serie = dados.consultar_serie_painel_st(id_atual, serie)
+            st.line_chart(df_serie.set_index('tempos')[['y_real', 'y_pred']])
+
+        if not df_horizonte.empty:
+            st.subheader("Erros por horizonte", divider=True)
+            metrica_horizonte = st.selectbox('Métrica por horizonte', df_horizonte.columns)
+            st.bar_chart(df_horizonte[metrica_horizonte])
+            st.dataframe(df_horizonte)
 
 with aba3:
     df_decomposicao = dados.consultar_decomposicao_st(
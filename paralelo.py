@@ -0,0 +1,313 @@
+"""
+Cálculo das métricas e do resumo estatístico de arrays grandes em várias threads.
+
+As reduções do numpy (somas, ordenações, bincount) liberam o GIL, de modo que
+partes diferentes dos arrays podem ser processadas ao mesmo tempo em um
+ThreadPoolExecutor, sem copiar os dados para outros processos:
+
+- cada thread recebe uma faixa contígua de posições e calcula as somas dos erros
+  (ver residuos.somas_residuos) ou a matriz de confusão da faixa, além dos
+  momentos (e, com `erro_quantis`, dos sketches) de y_real e y_pred em um
+  AcumuladorResumo; as faixas são combinadas com os mesmos `merge` usados pelos
+  acumuladores (ver acumuladores.py);
+- mediana, quartis e moda exatos vêm de uma ordenação paralela por amostragem:
+  cada thread ordena a sua faixa, os separadores são escolhidos por amostras das
+  faixas ordenadas e cada thread ordena os valores de um intervalo de valores.
+  Os valores iguais a um separador são divididos pela posição, para que dados
+  com poucos valores distintos (como rótulos de classificação) também fiquem
+  em segmentos de tamanhos parecidos. Os segmentos resultantes, em ordem, formam
+  o array ordenado completo, do qual saem os percentis (com a interpolação
+  linear do np.percentile) e a moda (o menor valor mais frequente, como
+  scipy.stats.mode), sem juntar os segmentos.
+
+Os resultados são os de Statistic.summary e Regression/Classification: iguais
+nas estatísticas de ordem e na matriz de confusão, e a menos de arredondamento
+nas somas e nos momentos. Arrays com NaN têm as estatísticas de ordem calculadas
+como no cálculo serial.
+"""
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from estastistica import TAMANHO_BLOCO_RESUMO, AcumuladorResumo, Statistic
+from matriz_confusao import combinar_matrizes, matriz_confusao
+from residuos import metricas_somas, somas_residuos
+
+
+# Abaixo desta quantidade de valores, as métricas são calculadas sem threads
+LIMITE_PARALELO_THREADS = 1 << 21
+
+# Amostras de cada faixa ordenada usadas na escolha dos separadores da ordenação
+AMOSTRAS_POR_FAIXA = 64
+
+
+def numero_threads(threads, n):
+    """
+    Threads usadas para `n` valores: `threads` (None para o número de CPUs), ou 1
+    (cálculo serial) para arrays menores que LIMITE_PARALELO_THREADS.
+    """
+    if threads is None:
+        threads = os.cpu_count() or 1
+    if n < LIMITE_PARALELO_THREADS:
+        return 1
+    return max(1, int(threads))
+
+
+def _faixas(n, quantidade):
+    limites = np.linspace(0, n, quantidade + 1).astype(np.int64)
+    return list(zip(limites[:-1].tolist(), limites[1:].tolist()))
+
+
+def _resumo_faixa(y_real, y_pred, inicio, fim, erro_quantis):
+    """
+    Momentos (e sketches) de uma faixa, em blocos de TAMANHO_BLOCO_RESUMO valores.
+    """
+    resumo = AcumuladorResumo(erro_quantis)
+    for bloco in range(inicio, fim, TAMANHO_BLOCO_RESUMO):
+        limite = min(bloco + TAMANHO_BLOCO_RESUMO, fim)
+        resumo.update(y_real[bloco:limite], y_pred[bloco:limite])
+    return resumo
+
+
+def _combinar_resumos(resumos):
+    resumo = resumos[0]
+    for outro in resumos[1:]:
+        resumo.merge(outro)
+    return resumo
+
+
+# ----------------------------------------------Estatísticas de ordem--------------------------------------------------------------
+
+def ordenar_paralelo(valores, executor, partes):
+    """
+    Ordena `valores` em `partes` segmentos consecutivos do array ordenado.
+
+    Os cortes ficam nos separadores (valores amostrados das faixas ordenadas); os
+    valores iguais a um separador são divididos pela posição, de modo que o corte
+    fique o mais perto possível de uma divisão em partes iguais. Um mesmo valor
+    pode, então, aparecer no fim de um segmento e no início do seguinte.
+
+    Retorna:
+    - list[np.ndarray]: Segmentos ordenados cuja concatenação é np.sort(valores), ou
+      None se houver NaN.
+    """
+    faixas = _faixas(len(valores), partes)
+    ordenados = list(executor.map(lambda faixa: np.sort(valores[faixa[0]:faixa[1]]), faixas))
+    if valores.dtype.kind in 'fc' and any(len(parte) and np.isnan(parte[-1]) for parte in ordenados):
+        return None
+
+    # Separadores: valores igualmente espaçados na união das amostras das faixas
+    amostras = np.sort(np.concatenate([
+        parte[np.linspace(0, len(parte) - 1, AMOSTRAS_POR_FAIXA).astype(np.int64)]
+        for parte in ordenados if len(parte)]))
+    separadores = amostras[np.arange(1, partes) * len(amostras) // partes]
+
+    # (faixa, separador): valores menores que o separador e iguais a ele em cada faixa
+    menores = np.array([np.searchsorted(parte, separadores, side='left') for parte in ordenados])
+    iguais = np.array([np.searchsorted(parte, separadores, side='right') for parte in ordenados]) - menores
+
+    # Quantos valores iguais a cada separador ficam antes do corte (para chegar a
+    # j * n / partes valores), tirados das faixas em ordem
+    alvos = np.arange(1, partes) * len(valores) // partes
+    antes = np.clip(alvos - menores.sum(axis=0), 0, iguais.sum(axis=0))
+    iguais_anteriores = np.cumsum(iguais, axis=0) - iguais
+    meio = menores + np.clip(antes - iguais_anteriores, 0, iguais)
+    cortes = [np.concatenate([[0], corte, [len(parte)]]) for parte, corte in zip(ordenados, meio)]
+
+    def ordenar_intervalo(j):
+        # Valores entre os cortes j - 1 e j de todas as faixas
+        segmento = np.concatenate([parte[corte[j]:corte[j + 1]] for parte, corte in zip(ordenados, cortes)])
+        segmento.sort()
+        return segmento
+
+    return list(executor.map(ordenar_intervalo, range(partes)))
+
+
+def _repeticoes_segmento(segmento):
+    """
+    Repetições de um segmento ordenado: a primeira e a última (que podem continuar
+    nos segmentos vizinhos) e a mais longa entre as demais (a de menor valor, em
+    caso de empate), cada uma como (valor, contagem).
+
+    Retorna:
+    - tuple: (primeira, meio, ultima), com `meio` None se houver até duas
+      repetições e `ultima` None se o segmento tiver um único valor; None para um
+      segmento vazio.
+    """
+    if len(segmento) == 0:
+        return None
+    inicios = np.flatnonzero(np.concatenate([[True], segmento[1:] != segmento[:-1]]))
+    contagens = np.diff(np.append(inicios, len(segmento)))
+    primeira = (segmento[0], int(contagens[0]))
+    if len(inicios) == 1:
+        return primeira, None, None
+    meio = None
+    if len(inicios) > 2:
+        posicao = 1 + int(np.argmax(contagens[1:-1]))
+        meio = (segmento[inicios[posicao]], int(contagens[posicao]))
+    return primeira, meio, (segmento[inicios[-1]], int(contagens[-1]))
+
+
+def _moda_segmentos(repeticoes):
+    """
+    Menor valor mais frequente dos segmentos, a partir de _repeticoes_segmento de
+    cada um, em ordem; as repetições que passam de um segmento ao seguinte são somadas.
+    """
+    moda, contagem_maxima = None, 0
+    aberta = None   # Última repetição vista, que pode continuar no próximo segmento
+
+    def fechar(repeticao):
+        nonlocal moda, contagem_maxima
+        if repeticao is not None and repeticao[1] > contagem_maxima:
+            moda, contagem_maxima = repeticao
+
+    for repeticoes_segmento in repeticoes:
+        if repeticoes_segmento is None:
+            continue
+        primeira, meio, ultima = repeticoes_segmento
+        if aberta is not None and aberta[0] == primeira[0]:
+            primeira = (primeira[0], primeira[1] + aberta[1])
+        else:
+            fechar(aberta)
+        if ultima is None:
+            aberta = primeira
+            continue
+        fechar(primeira)
+        fechar(meio)
+        aberta = ultima
+    fechar(aberta)
+    return moda
+
+
+def estatisticas_ordem(segmentos, executor):
+    """
+    Mediana, quartis e moda a partir dos segmentos de ordenar_paralelo, com os
+    mesmos valores de np.median, np.percentile e scipy.stats.mode.
+    """
+    tamanhos = np.array([len(segmento) for segmento in segmentos])
+    inicios = np.concatenate([[0], np.cumsum(tamanhos)[:-1]])
+    n = int(tamanhos.sum())
+
+    def valores(posicoes):
+        # Segmento de cada posição (o último que começa antes dela; os vazios são pulados)
+        indices = np.searchsorted(inicios, posicoes, side='right') - 1
+        return np.array([segmentos[j][p - inicios[j]] for j, p in zip(indices, posicoes)])
+
+    # Percentis pela interpolação linear de np.percentile (mesma fórmula de _lerp)
+    virtuais = (n - 1) * (np.array([25.0, 50.0, 75.0]) / 100)
+    anteriores = np.floor(virtuais).astype(np.int64)
+    proximos = np.minimum(anteriores + 1, n - 1)
+    gama = virtuais - anteriores
+    a, b = valores(anteriores), valores(proximos)
+    diferenca = b - a
+    percentis = np.add(a, diferenca * gama, dtype=np.float64)
+    np.subtract(b, diferenca * (1 - gama), out=percentis, where=gama >= 0.5, casting='unsafe')
+
+    # Mediana como em np.median: média do(s) valor(es) central(is)
+    centrais = [n // 2 - 1, n // 2] if n % 2 == 0 else [(n - 1) // 2]
+    mediana = np.mean(valores(centrais))
+
+    # Moda: valores iguais podem estar no fim de um segmento e no início dos seguintes
+    moda = _moda_segmentos(list(executor.map(_repeticoes_segmento, segmentos)))
+
+    return {'mediana': mediana, 'moda': moda, 'Q1': percentis[0], 'Q2': percentis[1], 'Q3': percentis[2]}
+
+
+def _estatisticas(valores, momentos, sufixo, executor, partes):
+    """
+    Estatísticas com as chaves de Statistic.estatisticas: ordem exata pela ordenação
+    paralela e média, desvio, assimetria e curtose pelos momentos combinados.
+    """
+    segmentos = ordenar_paralelo(valores, executor, partes)
+    if segmentos is None:
+        # Com NaN, os valores (NaN) são os do cálculo serial
+        return Statistic.estatisticas(valores, sufixo)
+
+    ordem = estatisticas_ordem(segmentos, executor)
+    momentos = momentos.finalize()
+    return {f'media_{sufixo}': momentos['media'],
+            f'mediana_{sufixo}': ordem['mediana'],
+            f'moda_{sufixo}': ordem['moda'],
+            f'desvio_padrao_{sufixo}': momentos['desvio_padrao'],
+            f'Q1_{sufixo}': ordem['Q1'],
+            f'Q2_{sufixo}': ordem['Q2'],
+            f'Q3_{sufixo}': ordem['Q3'],
+            f'skewness_{sufixo}': momentos['skewness'],
+            f'kurtosis_{sufixo}': momentos['kurtosis']}
+
+
+def _resumo(y_real, y_pred, resumo, erro_quantis, executor, threads):
+    """
+    Resumo com as chaves de Statistic.summary a partir do AcumuladorResumo combinado.
+    """
+    if erro_quantis is not None:
+        # Modo aproximado: sketches combinados das faixas
+        return resumo.finalize()
+
+    real = _estatisticas(y_real, resumo.momentos_real, 'real', executor, threads)
+    pred = _estatisticas(y_pred, resumo.momentos_pred, 'pred', executor, threads)
+    return Statistic.resumo_diferencas(real, pred)
+
+
+# ----------------------------------------------Avaliação--------------------------------------------------------------------------
+
+def avaliar_regressao_paralelo(y_real, y_pred, threads, erro_quantis=None, dtype=np.float64):
+    """
+    Métricas de Regression e resumo estatístico calculados em `threads` threads.
+
+    Retorna:
+    - tuple: (metricas, resumo, sketches), com as chaves de metricas_residuos e de
+      Statistic.summary; `sketches` é vazio sem `erro_quantis`.
+    """
+    y_real = np.asarray(y_real).ravel()
+    y_pred = np.asarray(y_pred).ravel()
+    n = len(y_real)
+    if n == 0 or len(y_pred) != n:
+        raise ValueError(f"y_real e y_pred devem ter o mesmo tamanho, não nulo: {n} e {len(y_pred)}.")
+
+    def avaliar_faixa(faixa):
+        inicio, fim = faixa
+        somas = somas_residuos(y_real[inicio:fim], y_pred[inicio:fim], dtype)
+        return somas, _resumo_faixa(y_real, y_pred, inicio, fim, erro_quantis)
+
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        parciais = list(executor.map(avaliar_faixa, _faixas(n, threads)))
+        resumo = _combinar_resumos([parcial for _, parcial in parciais])
+
+        # SST é a soma dos quadrados dos desvios de y_real (o momento m2), como nos acumuladores
+        somas = {nome: sum(parcial[nome] for parcial, _ in parciais) for nome in ('sse', 'sae', 'sre')}
+        metricas = metricas_somas(n, somas['sse'], somas['sae'], somas['sre'], resumo.momentos_real.m2)
+
+        return metricas, _resumo(y_real, y_pred, resumo, erro_quantis, executor, threads), resumo.sketches
+
+
+def avaliar_classificacao_paralelo(y_real, y_pred, threads, erro_quantis=None):
+    """
+    Matriz de confusão e resumo estatístico de rótulos numéricos calculados em
+    `threads` threads.
+
+    Retorna:
+    - tuple: ((cm, rotulos), resumo, sketches), com a matriz de matriz_confusao e o
+      resumo de Statistic.summary.
+    """
+    y_real = np.asarray(y_real).ravel()
+    y_pred = np.asarray(y_pred).ravel()
+    n = len(y_real)
+    if n == 0 or len(y_pred) != n:
+        raise ValueError(f"y_real e y_pred devem ter o mesmo tamanho, não nulo: {n} e {len(y_pred)}.")
+
+    def avaliar_faixa(faixa):
+        inicio, fim = faixa
+        matriz = matriz_confusao(y_real[inicio:fim], y_pred[inicio:fim])
+        return matriz, _resumo_faixa(y_real, y_pred, inicio, fim, erro_quantis)
+
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        parciais = list(executor.map(avaliar_faixa, _faixas(n, threads)))
+        resumo = _combinar_resumos([parcial for _, parcial in parciais])
+
+        cm, rotulos = parciais[0][0]
+        for (outra, outros_rotulos), _ in parciais[1:]:
+            cm, rotulos = combinar_matrizes(cm, rotulos, outra, outros_rotulos)
+
+        return (cm, rotulos), _resumo(y_real, y_pred, resumo, erro_quantis, executor, threads), resumo.sketches
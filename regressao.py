@@ -4,6 +4,8 @@ import os
 import pandas as pd
 import numpy as np
 from estastistica import Statistic
+from paralelo import avaliar_regressao_paralelo, numero_threads
+from residuos import agregar_saidas, metricas_residuos, metricas_saidas
 
 
 class Regression(Statistic):
@@ -11,9 +13,20 @@ class Regression(Statistic):
         Inicializa a classe Regression, que herda da classe Statistic.
 
         Parâmetros:
-        - y_real: Valores reais das variáveis dependentes.
-        - y_pred: Valores previstos pelo modelo de regressão.
+        - y_real: Valores reais das variáveis dependentes; com várias saídas, um array
+          (n_amostras, n_saidas) (ver _calculo_metricas_saidas).
+        - y_pred: Valores previstos pelo modelo de regressão (mesmo formato de y_real).
         - X_real: Variáveis independentes (features) usadas no modelo.
+        - acumulador: AcumuladorRegressao (ver acumuladores.py) usado no lugar de
+          y_real e y_pred quando os dados foram processados em blocos.
+        - erro_quantis: Se informado (ex.: 0.01), o resumo estatístico usa sketches de
+          quantis em uma passagem (mediana, quartis e moda aproximados, ver Statistic).
+        - dtype: Tipo dos buffers dos resíduos (np.float64 ou np.float32, que usa metade
+          da memória); as somas são sempre acumuladas em float64.
+        - metricas_calculadas, resumo_real: Métricas do modelo e estatísticas de y_real já
+          calculadas na avaliação em lote (ver avaliar_lote).
+        - threads: Threads usadas com arrays grandes (ver paralelo.py); None para o número
+          de CPUs e 1 para o cálculo serial.
 
         Métodos:
             __init__(self, y_real, y_pred, X_real):
@@ -28,14 +41,26 @@ class Regression(Statistic):
                 Retorna o dicionário de métricas de regressão.
     """
 
-    def __init__(self, y_real, y_pred):
+    def __init__(self, y_real=None, y_pred=None, acumulador=None, erro_quantis=None, dtype=np.float64,
+                 metricas_calculadas=None, resumo_real=None, threads=1):
 
         # Passa os argumentos para a classe pai
-        super().__init__(y_real, y_pred)
+        super().__init__(y_real, y_pred, erro_quantis, resumo_real)
 
         self.y_real = y_real
         self.y_pred = y_pred
 
+        # Sem os arrays, as métricas vêm de um AcumuladorRegressao (ver acumuladores.py)
+        self.acumulador = acumulador
+        self.dtype = dtype
+        self.metricas_calculadas = metricas_calculadas
+        self.threads = threads
+
+        # Modelo com várias saídas: arrays (n_amostras, n_saidas)
+        self.multi_saida = np.ndim(y_real) == 2 and np.shape(y_real)[1] > 1
+        # Métricas e estatísticas de cada saída ({nome: array com um valor por saída})
+        self.metricas_saidas = {}
+
         # Inicializa um dicionário para armazenar as métricas
         self.metricas = {}
         self.metricas_regressao = {}
@@ -74,8 +99,9 @@ class Regression(Statistic):
         COMO FUNCIONA:
         --------------
         Os valores reais (`y_real`) e previstos (`y_pred`) são utilizados para 
-        calcular métricas padrão de avaliação em regressão. O método armazena os 
-        resultados no dicionário `self.metricas` para uso posterior.
+        calcular métricas padrão de avaliação em regressão. O resíduo é calculado
+        uma única vez (ver residuos.py) e o método armazena os resultados no
+        dicionário `self.metricas` para uso posterior.
 
         EXEMPLO DE SAÍDA:
         -----------------
@@ -101,51 +127,95 @@ class Regression(Statistic):
         `self.metricas_regressao`.
         """
 
-        # Mean Squared Error (MSE) - Erro Quadrático Médio
-        mse = np.mean((self.y_real - self.y_pred) ** 2)
-
-        # Root Mean Squared Error (RMSE) - Raiz do Erro Quadrático Médio
-        rmse = np.sqrt(np.mean((self.y_real - self.y_pred) ** 2))
-
-        # Mean Absolute Error (MAE) - Erro Absoluto Médio
-        mae = np.mean(np.abs(self.y_real - self.y_pred))
-
-        # Erro Relativo Médio (MRE), que é uma métrica que expressa o erro médio em termos relativos, ou seja, em percentual, considerando a diferença entre os valores reais e previstos em relação aos valores reais.
-        mre = np.mean(np.abs((self.y_real - self.y_pred) /
-                      (self.y_real + 1e-10))) * 100
-
-        # Mean Absolute Percentage Error (MAPE) - Erro Percentual Absoluto Médio
-        mape = np.mean(np.abs((self.y_real - self.y_pred) /
-                       (self.y_real + 1e-10))) * 100
-
-        # Explained Variance Score - Pontuação de Variância Explicada
-        mean_y_real = np.mean(self.y_real)
-        total_variance = np.sum((self.y_real - mean_y_real) ** 2)
-        error_variance = np.sum((self.y_real - self.y_pred) ** 2)
-        evs = 1 - (error_variance / total_variance)
-
-        # R-squared (R²) - Coeficiente de Determinação
-        sst = np.sum((self.y_real - mean_y_real) ** 2)
-        sse = np.sum((self.y_real - self.y_pred) ** 2)
-        r_squared = 1 - (sse / sst)
-
-        # Adjusted R-squared - R² Ajustado
-        n = len(self.y_real)  # Número de amostras
-
-        # Armazenar as métricas no dicionário
-        self.metricas = {
-            'mse': mse,
-            'rmse': rmse,
-            'mae': mae,
-            'mre': mre,
-            'mape': mape,
-            'evs': evs,
-            'r_squared': r_squared,
-        }
+        if self.acumulador is not None:
+            # Métricas e resumo calculados a partir das somas acumuladas bloco a bloco
+            self.metricas = self.acumulador.metricas()
+            self.metricas_regressao = {**self.metricas, **self.acumulador.resumo()}
+            self.sketches = self.acumulador.sketches
+            return
+
+        if self.multi_saida:
+            self._calculo_metricas_saidas()
+            return
+
+        # Resíduos calculados uma única vez, em blocos e em buffers reaproveitados; todas
+        # as métricas (MSE, RMSE, MAE, MRE, MAPE, EVS e R²) são derivadas das somas
+        # SSE, SAE, SRE e SST (ver residuos.py)
+        threads = numero_threads(self.threads, np.size(self.y_real))
+        if self.metricas_calculadas is not None:
+            # Avaliação em lote: métricas já calculadas para todos os modelos de uma vez
+            self.metricas = self.metricas_calculadas
+        elif threads > 1 and self.resumo_real is None:
+            # Somas, momentos e estatísticas de ordem calculados por faixas em várias threads
+            self.metricas, resultado, self.sketches = avaliar_regressao_paralelo(
+                self.y_real, self.y_pred, threads, self.erro_quantis, self.dtype)
+            self.metricas_regressao = {**self.metricas, **resultado}
+            return
+        else:
+            self.metricas = metricas_residuos(self.y_real, self.y_pred, self.dtype)
 
         resultado = self.summary()
         self.metricas_regressao = {**self.metricas, **resultado}
 
+    def _calculo_metricas_saidas(self):
+        """
+        Calcula as métricas de um modelo com várias saídas em uma única passagem
+        vetorizada ao longo do eixo 0 (ver residuos.somas_saidas), sem um objeto
+        por saída.
+
+        `self.metricas_saidas` guarda as métricas de erro e o resumo estatístico de
+        cada saída (arrays de n_saidas valores). `self.metricas` tem a média uniforme
+        de cada métrica de erro (mesmas chaves das execuções de uma saída) e a média
+        ponderada pela variância de y_real de cada saída (chaves terminadas em
+        '_ponderada'), e `self.metricas_regressao` acrescenta a média uniforme de cada
+        estatística do resumo e 'n_saidas'. O resumo é sempre exato (`erro_quantis`
+        não se aplica).
+        """
+        y_real = np.asarray(self.y_real)
+        y_pred = np.asarray(self.y_pred)
+        if y_pred.shape != y_real.shape:
+            raise ValueError(
+                f"y_real e y_pred devem ter o mesmo formato (n, n_saidas): {y_real.shape} e {y_pred.shape}.")
+
+        erros = metricas_saidas(y_real, y_pred, self.dtype)
+        resumo = self.resumo_diferencas(self.estatisticas(y_real, 'real'), self.estatisticas(y_pred, 'pred'))
+        self.metricas_saidas = {**erros, **resumo}
+
+        # Pesos da média ponderada: variância de y_real em cada saída
+        self.metricas = agregar_saidas(erros, resumo['desvio_padrao_real'] ** 2)
+        self.metricas_regressao = {**self.metricas,
+                                   **{nome: np.mean(valores) for nome, valores in resumo.items()},
+                                   'n_saidas': y_real.shape[1]}
+
+    @classmethod
+    def avaliar_lote(cls, y_real, y_pred, erro_quantis=None, dtype=np.float64):
+        """
+        Avalia vários modelos sobre o mesmo `y_real` de uma só vez.
+
+        Parâmetros:
+        - y_real: Valores reais (vetor de n valores).
+        - y_pred: Matriz (n_modelos, n) com as previsões de cada modelo.
+
+        Os erros de todos os modelos são calculados em uma única passagem vetorizada
+        (ver residuos.py) e as estatísticas de `y_real` do resumo são calculadas uma
+        vez e compartilhadas (no modo aproximado, com `erro_quantis`, cada modelo faz
+        a sua passagem única).
+
+        Retorna:
+        - list[Regression]: Um objeto por linha de `y_pred`.
+        """
+        y_pred = np.asarray(y_pred)
+        if y_pred.ndim != 2 or len(y_pred) == 0:
+            raise ValueError(f"y_pred deve ter formato (n_modelos, n); recebido {y_pred.shape}.")
+
+        metricas = metricas_residuos(y_real, y_pred, dtype)
+        resumo_real = cls.estatisticas(y_real, 'real') if erro_quantis is None else None
+
+        return [cls(y_real, previsao, erro_quantis=erro_quantis, dtype=dtype,
+                    metricas_calculadas={nome: valores[i] for nome, valores in metricas.items()},
+                    resumo_real=resumo_real)
+                for i, previsao in enumerate(y_pred)]
+
     @property
     def regression_result(self):
         """
@@ -0,0 +1,242 @@
+"""
+Métricas de regressão a partir de uma única passagem sobre os resíduos.
+
+O resíduo `y_real - y_pred` é calculado uma única vez por bloco, em um buffer
+reaproveitado; o erro quadrático e o relativo usam um segundo buffer, e o erro
+absoluto é obtido no próprio buffer do resíduo (np.abs com `out=`). Só existem
+dois arrays temporários do tamanho de um bloco, qualquer que seja o tamanho dos
+dados, e os blocos cabem no cache do processador. Uma matriz de previsões
+(n_modelos, n) é avaliada na mesma passagem, com os buffers em duas dimensões.
+
+Todas as métricas (MSE, RMSE, MAE, MRE, MAPE, EVS e R²) são derivadas das somas
+SSE, SAE, SRE e SST, com os mesmos valores do cálculo anterior de Regression.
+Com `dtype=np.float32`, os buffers ocupam metade da memória; as somas são sempre
+acumuladas em float64.
+
+Modelos com várias saídas (arrays (n, n_saidas)) têm as somas de cada saída
+calculadas na mesma passagem, ao longo do eixo 0 (ver somas_saidas), e as
+métricas por saída resumidas em médias uniforme e ponderada pela variância de
+y_real (ver agregar_saidas).
+"""
+import numpy as np
+
+
+# Quantidade de valores processados por vez (dois buffers de 2 MB em float64)
+TAMANHO_BLOCO = 1 << 18
+
+# Somado a y_real no denominador do erro relativo, como no cálculo original
+EPSILON_RELATIVO = 1e-10
+
+
+def somas_residuos(y_real, y_pred, dtype=np.float64, media_real=None, tamanho_bloco=TAMANHO_BLOCO):
+    """
+    Calcula, em uma passagem por blocos, as somas usadas nas métricas de regressão.
+
+    Parâmetros:
+    - y_real (array-like): Valores reais (vetor de n valores).
+    - y_pred (array-like): Valores previstos, um vetor de n valores ou uma matriz
+      (n_modelos, n) com as previsões de vários modelos para o mesmo `y_real`.
+    - dtype: Tipo dos buffers (np.float64 ou np.float32).
+    - media_real (float): Média de `y_real`; se informada, também calcula SST.
+
+    Retorna:
+    - dict: 'n', 'sse' (soma dos quadrados dos resíduos), 'sae' (soma dos resíduos
+      absolutos), 'sre' (soma dos erros relativos absolutos) e, com `media_real`,
+      'sst' (soma dos quadrados dos desvios de y_real). Com uma matriz de previsões,
+      'sse', 'sae' e 'sre' são arrays com um valor por modelo.
+    """
+    y_real = np.asarray(y_real).ravel()
+    y_pred = np.asarray(y_pred)
+    # Matriz (n_modelos, n); uma coluna (n, 1) continua sendo um único vetor de previsões
+    lote = y_pred.ndim == 2 and y_pred.shape != (len(y_real), 1)
+    previsoes = y_pred if lote else y_pred.ravel()[None, :]
+    if previsoes.shape[1] != len(y_real):
+        raise ValueError(
+            f"y_real e y_pred têm tamanhos diferentes: {len(y_real)} e {previsoes.shape[1]}.")
+
+    n = len(y_real)
+    modelos = len(previsoes)
+
+    # Com vários modelos, o bloco é dividido entre eles para manter o tamanho dos buffers
+    tamanho_bloco = max(1024, tamanho_bloco // max(modelos, 1))
+    tamanho = min(n, tamanho_bloco)
+    residuo = np.empty((modelos, tamanho), dtype=dtype)
+    auxiliar = np.empty((modelos, tamanho), dtype=dtype)
+    # Termos que dependem só de y_real (denominador do erro relativo e desvios para
+    # SST) são calculados uma vez por bloco, não uma vez por modelo
+    termo_real = np.empty(tamanho, dtype=dtype)
+
+    sse = np.zeros(modelos)
+    sae = np.zeros(modelos)
+    sre = np.zeros(modelos)
+    sst = 0.0
+    for inicio in range(0, n, tamanho_bloco):
+        real = y_real[inicio:inicio + tamanho_bloco]
+        m = len(real)
+        r = residuo[:, :m]
+        a = auxiliar[:, :m]
+        t = termo_real[:m]
+
+        # Resíduo (uma subtração) e erro quadrático
+        np.subtract(real, previsoes[:, inicio:inicio + m], out=r, dtype=dtype)
+        np.multiply(r, r, out=a)
+        sse += a.sum(axis=1, dtype=np.float64)
+
+        # Erro absoluto no próprio buffer do resíduo
+        np.abs(r, out=r)
+        sae += r.sum(axis=1, dtype=np.float64)
+
+        # Erro relativo: |y_real - y_pred| / |y_real + epsilon|
+        np.add(real, EPSILON_RELATIVO, out=t, dtype=dtype)
+        np.abs(t, out=t)
+        np.divide(r, t, out=a)
+        sre += a.sum(axis=1, dtype=np.float64)
+
+        if media_real is not None:
+            np.subtract(real, media_real, out=t, dtype=dtype)
+            np.multiply(t, t, out=t)
+            sst += t.sum(dtype=np.float64)
+
+    if not lote:
+        sse, sae, sre = sse[0], sae[0], sre[0]
+
+    somas = {'n': n, 'sse': sse, 'sae': sae, 'sre': sre}
+    if media_real is not None:
+        somas['sst'] = np.float64(sst)
+    return somas
+
+
+def metricas_somas(n, sse, sae, sre, sst):
+    """
+    Deriva as métricas de Regression das somas (também usadas por AcumuladorRegressao).
+    """
+    mse = np.float64(sse) / n
+    mre = np.float64(sre) / n * 100
+
+    # EVS e R² têm a mesma expressão no cálculo de Regression (1 - SSE/SST)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        r_squared = 1 - np.float64(sse) / np.float64(sst)
+
+    return {
+        'mse': mse,
+        'rmse': np.sqrt(mse),
+        'mae': np.float64(sae) / n,
+        'mre': mre,
+        'mape': mre,
+        'evs': r_squared,
+        'r_squared': r_squared,
+    }
+
+
+def metricas_residuos(y_real, y_pred, dtype=np.float64):
+    """
+    Métricas de regressão (MSE, RMSE, MAE, MRE, MAPE, EVS e R²) com os resíduos
+    calculados uma única vez. Com `y_pred` de formato (n_modelos, n), cada métrica
+    é um array com um valor por modelo (média e SST de y_real calculados uma vez).
+    """
+    y_real = np.asarray(y_real).ravel()
+    if len(y_real) == 0:
+        raise ValueError("y_real e y_pred estão vazios.")
+
+    media_real = np.mean(y_real, dtype=np.float64)
+    somas = somas_residuos(y_real, y_pred, dtype, media_real)
+    return metricas_somas(somas['n'], somas['sse'], somas['sae'], somas['sre'], somas['sst'])
+
+
+def somas_saidas(y_real, y_pred, dtype=np.float64, media_real=None, tamanho_bloco=TAMANHO_BLOCO):
+    """
+    Somas de somas_residuos de cada saída de um modelo com várias saídas, em uma
+    passagem por blocos de linhas.
+
+    Parâmetros:
+    - y_real, y_pred (array-like): Arrays (n, n_saidas) com os valores reais e previstos.
+    - media_real (np.ndarray): Média de cada coluna de `y_real`; se informada, também calcula SST.
+
+    Retorna:
+    - dict: 'n' e 'sse', 'sae', 'sre' (e 'sst') com um valor por saída.
+    """
+    y_real = np.asarray(y_real)
+    y_pred = np.asarray(y_pred)
+    if y_real.ndim != 2 or y_real.shape != y_pred.shape:
+        raise ValueError(
+            f"y_real e y_pred devem ter o mesmo formato (n, n_saidas): {y_real.shape} e {y_pred.shape}.")
+
+    n, saidas = y_real.shape
+    # O bloco é dividido entre as saídas para manter o tamanho dos buffers
+    linhas = max(1, tamanho_bloco // saidas)
+    tamanho = min(n, linhas)
+    residuo = np.empty((tamanho, saidas), dtype=dtype)
+    auxiliar = np.empty((tamanho, saidas), dtype=dtype)
+    termo_real = np.empty((tamanho, saidas), dtype=dtype)
+
+    sse = np.zeros(saidas)
+    sae = np.zeros(saidas)
+    sre = np.zeros(saidas)
+    sst = np.zeros(saidas)
+    for inicio in range(0, n, linhas):
+        real = y_real[inicio:inicio + linhas]
+        m = len(real)
+        r = residuo[:m]
+        a = auxiliar[:m]
+        t = termo_real[:m]
+
+        # Mesmas operações de somas_residuos, com as somas ao longo do eixo 0
+        np.subtract(real, y_pred[inicio:inicio + m], out=r, dtype=dtype)
+        np.multiply(r, r, out=a)
+        sse += a.sum(axis=0, dtype=np.float64)
+
+        np.abs(r, out=r)
+        sae += r.sum(axis=0, dtype=np.float64)
+
+        np.add(real, EPSILON_RELATIVO, out=t, dtype=dtype)
+        np.abs(t, out=t)
+        np.divide(r, t, out=a)
+        sre += a.sum(axis=0, dtype=np.float64)
+
+        if media_real is not None:
+            np.subtract(real, media_real, out=t, dtype=dtype)
+            np.multiply(t, t, out=t)
+            sst += t.sum(axis=0, dtype=np.float64)
+
+    somas = {'n': n, 'sse': sse, 'sae': sae, 'sre': sre}
+    if media_real is not None:
+        somas['sst'] = sst
+    return somas
+
+
+def metricas_saidas(y_real, y_pred, dtype=np.float64):
+    """
+    Métricas de metricas_residuos de cada saída de arrays (n, n_saidas): cada
+    métrica é um array com um valor por saída.
+    """
+    y_real = np.asarray(y_real)
+    if len(y_real) == 0:
+        raise ValueError("y_real e y_pred estão vazios.")
+
+    media_real = np.mean(y_real, axis=0, dtype=np.float64)
+    somas = somas_saidas(y_real, y_pred, dtype, media_real)
+    return metricas_somas(somas['n'], somas['sse'], somas['sae'], somas['sre'], somas['sst'])
+
+
+def agregar_saidas(metricas, pesos):
+    """
+    Agrega as métricas por saída (ver metricas_saidas).
+
+    Parâmetros:
+    - metricas (dict): {metrica: array com um valor por saída}.
+    - pesos (np.ndarray): Peso de cada saída (a variância de y_real, como
+      multioutput='variance_weighted' do scikit-learn).
+
+    Retorna:
+    - dict: {metrica: média uniforme} (multioutput='uniform_average') seguido de
+      {metrica_ponderada: média ponderada por `pesos`}; saídas com peso nulo ou
+      métrica não finita ficam fora da média ponderada.
+    """
+    pesos = np.asarray(pesos, dtype=np.float64)
+    agregadas = {nome: np.mean(valores) for nome, valores in metricas.items()}
+    for nome, valores in metricas.items():
+        valores = np.asarray(valores, dtype=np.float64)
+        validas = np.isfinite(valores) & (pesos > 0)
+        agregadas[f'{nome}_ponderada'] = np.average(valores[validas], weights=pesos[validas]) \
+            if validas.any() else np.nan
+    return agregadas
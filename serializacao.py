@@ -0,0 +1,93 @@
+import json
+import struct
+import zlib
+
+import numpy as np
+
+
+# Identificador dos valores gravados no formato binário
+ASSINATURA = b'NPAB'
+VERSAO = 1
+
+# Bits do campo de opções do cabeçalho
+COMPRIMIDO = 0x01
+
+
+def codificar_array(valores, comprimir=False, nivel=6):
+    """
+    Converte um array em bytes para armazenamento em coluna BLOB do SQLite.
+
+    Formato (little-endian):
+        assinatura 'NPAB' | versão (1 byte) | opções (1 byte)
+        | tamanho do dtype (1 byte) | dtype (ex.: '<f8')
+        | número de dimensões (1 byte) | shape (uint64 por dimensão)
+        | dados brutos do array (opcionalmente comprimidos com zlib)
+
+    Parâmetros:
+    - valores (array-like): Valores a serem codificados.
+    - comprimir (bool): Se True, comprime os dados com zlib.
+    - nivel (int): Nível de compressão do zlib (1 a 9).
+
+    Retorna:
+    - bytes: Valor pronto para ser gravado no banco, ou None se `valores` for None.
+      Arrays de objetos (ex.: listas mistas) não têm representação binária e
+      continuam sendo gravados como texto JSON.
+    """
+    if valores is None:
+        return None
+
+    array = np.asarray(valores)
+    if array.dtype.kind == 'O':
+        return json.dumps(array.tolist())
+
+    # Garante a ordem de bytes little-endian e memória contígua
+    array = np.ascontiguousarray(
+        array.astype(array.dtype.newbyteorder('<'), copy=False))
+
+    dtype = array.dtype.str.encode('ascii')
+    cabecalho = ASSINATURA + struct.pack(
+        '<BBB', VERSAO, COMPRIMIDO if comprimir else 0, len(dtype))
+    cabecalho += dtype + struct.pack(f'<B{array.ndim}Q', array.ndim, *array.shape)
+
+    dados = array.tobytes()
+    if comprimir:
+        dados = zlib.compress(dados, nivel)
+
+    return cabecalho + dados
+
+
+def decodificar_array(valor):
+    """
+    Converte um valor lido do banco de volta para um np.ndarray.
+
+    Aceita tanto o formato binário gerado por `codificar_array` quanto o texto
+    JSON usado nas versões anteriores (ex.: '[1, 0, 1]').
+
+    Retorna:
+    - np.ndarray, ou None se o valor for None.
+    """
+    if valor is None:
+        return None
+
+    if isinstance(valor, (bytes, bytearray, memoryview)):
+        valor = bytes(valor)
+        if valor[:4] == ASSINATURA:
+            versao, opcoes, tamanho_dtype = struct.unpack_from('<BBB', valor, 4)
+            posicao = 7
+            dtype = np.dtype(valor[posicao:posicao + tamanho_dtype].decode('ascii'))
+            posicao += tamanho_dtype
+            ndim = valor[posicao]
+            posicao += 1
+            shape = struct.unpack_from(f'<{ndim}Q', valor, posicao)
+            posicao += 8 * ndim
+
+            dados = memoryview(valor)[posicao:]
+            if opcoes & COMPRIMIDO:
+                dados = zlib.decompress(dados)
+
+            return np.frombuffer(dados, dtype=dtype).reshape(shape)
+
+        valor = valor.decode('utf-8')
+
+    # Valores antigos gravados como texto JSON
+    return np.asarray(json.loads(valor))
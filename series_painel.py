@@ -0,0 +1,209 @@
+"""
+Avaliação de previsões de muitas séries temporais em uma única execução (dados em
+painel, ex.: uma série por produto).
+
+A entrada é um DataFrame longo, com uma linha por (série, instante) e as colunas
+do identificador da série, do instante, do valor real e do previsto. As linhas são
+ordenadas por série e instante, e as métricas de todas as séries são calculadas
+de uma vez com `np.bincount` sobre o código de cada série (um groupby vetorizado,
+sem laço por série), com as mesmas definições de Series_Temporais.
+
+Os valores são gravados em formato colunar (ver layout_colunar): as séries
+ordenadas são divididas em blocos de cerca de TAMANHO_BLOCO_PAINEL pontos, e cada
+coluna (instantes, y_real e y_pred) de cada bloco é um artefato comprimido. Um
+índice com o bloco e as posições de cada série permite ao painel ler uma série
+descomprimindo apenas o bloco dela, sem carregar as demais.
+"""
+import numpy as np
+import pandas as pd
+
+from series_temporais import erros_pontos, metricas_previsao
+
+
+# Pontos (aproximados) de cada bloco colunar; uma série nunca é dividida entre blocos
+TAMANHO_BLOCO_PAINEL = 1 << 16
+
+# Colunas gravadas por bloco: (nome do artefato, atributo de PainelSeries)
+COLUNAS_PAINEL = (('tempos', 'tempos'), ('y_real', 'y_real'), ('y_pred', 'y_pred'))
+
+
+class PainelSeries():
+    """
+        Métricas de previsão de cada série de um DataFrame longo e os agregados da
+        execução.
+
+        Parâmetros:
+        - dados (pd.DataFrame): Uma linha por (série, instante).
+        - coluna_serie, coluna_tempo, coluna_real, coluna_pred (str): Colunas com o
+          identificador da série, o instante, o valor real e o previsto.
+        - sazonalidade: Período da previsão ingênua sazonal usada na escala do MASE
+          de cada série (calculada sobre o y_real da própria série).
+
+        Atributos:
+        - series: Identificadores das séries, em ordem crescente.
+        - inicios, fins: Posições de cada série nos arrays ordenados `tempos`,
+          `y_real` e `y_pred`.
+        - metricas_por_serie: {nome: array com um valor por série}.
+        - metricas_series: Métricas de todos os pontos, com o MASE médio das séries.
+        """
+
+    def __init__(self, dados, coluna_serie='series_id', coluna_tempo='timestamp', coluna_real='y_real',
+                 coluna_pred='y_pred', sazonalidade=1):
+
+        faltando = [coluna for coluna in (coluna_serie, coluna_tempo, coluna_real, coluna_pred)
+                    if coluna not in dados.columns]
+        if faltando:
+            raise ValueError(f"Colunas ausentes no DataFrame do painel: {faltando}.")
+        if len(dados) == 0:
+            raise ValueError("O DataFrame do painel está vazio.")
+
+        tempos = dados[coluna_tempo]
+        if isinstance(tempos.dtype, pd.DatetimeTZDtype):
+            # Instantes com fuso horário são gravados em UTC
+            tempos = tempos.dt.tz_convert(None)
+
+        # Código 0..S-1 de cada série, na ordem crescente dos identificadores
+        codigos, series = pd.factorize(dados[coluna_serie], sort=True)
+        series = np.asarray(series)
+        if series.dtype.kind == 'O':
+            series = series.astype(str)
+
+        tempos = np.asarray(tempos)
+        ordem = np.lexsort((tempos, codigos))
+        self.codigos = codigos[ordem]
+        self.tempos = tempos[ordem]
+        self.y_real = np.asarray(dados[coluna_real], dtype=np.float64)[ordem]
+        self.y_pred = np.asarray(dados[coluna_pred], dtype=np.float64)[ordem]
+
+        self.series = series
+        self.sazonalidade = int(sazonalidade)
+        contagens = np.bincount(self.codigos, minlength=len(series))
+        self.fins = np.cumsum(contagens)
+        self.inicios = self.fins - contagens
+
+        self.metricas_por_serie = {}
+        self.metricas_series = {}
+
+        self._calculo_metricas_painel()
+
+    def _somar(self, valores, validos):
+        """
+        Soma dos valores válidos de cada série.
+        """
+        return np.bincount(self.codigos[validos], weights=valores[validos], minlength=len(self.series))
+
+    def _escalas(self):
+        """
+        Escala do MASE de cada série: erro absoluto médio da previsão ingênua sazonal
+        sobre o y_real da série (pares de instantes da mesma série, sem NaN).
+        """
+        m = self.sazonalidade
+        diferencas = np.abs(self.y_real[m:] - self.y_real[:-m])
+        validos = (self.codigos[m:] == self.codigos[:-m]) & ~np.isnan(diferencas)
+        codigos = self.codigos[m:][validos]
+        somas = np.bincount(codigos, weights=diferencas[validos], minlength=len(self.series))
+        contagens = np.bincount(codigos, minlength=len(self.series))
+        with np.errstate(invalid='ignore', divide='ignore'):
+            escalas = somas / contagens
+        return np.where(escalas > 0, escalas, np.nan)
+
+    def _calculo_metricas_painel(self):
+        """
+        Calcula as métricas de cada série (MAE, RMSE, MASE, sMAPE, WAPE e viés, com
+        as definições de series_temporais.metricas_previsao) e as da execução.
+        """
+        erro, absoluto, smape = erros_pontos(self.y_real, self.y_pred)
+        validos = ~np.isnan(erro)
+        n = np.bincount(self.codigos[validos], minlength=len(self.series))
+
+        with np.errstate(invalid='ignore', divide='ignore'):
+            mae = self._somar(absoluto, validos) / n
+            soma_real = self._somar(np.abs(self.y_real), validos)
+            self.metricas_por_serie = {
+                'n': n.astype(np.float64),
+                'mae': mae,
+                'rmse': np.sqrt(self._somar(np.square(erro), validos) / n),
+                'mase': mae / self._escalas(),
+                'smape': 100 * self._somar(smape, validos) / n,
+                'wape': np.where(soma_real > 0, 100 * self._somar(absoluto, validos) / soma_real, np.nan),
+                'vies': self._somar(erro, validos) / n,
+            }
+
+        # Métricas de todos os pontos; o MASE da execução é a média dos MASE das séries
+        mase = self.metricas_por_serie['mase']
+        self.metricas_series = {
+            **metricas_previsao(self.y_real, self.y_pred, np.nan),
+            'mase': np.mean(mase[np.isfinite(mase)]) if np.isfinite(mase).any() else np.nan,
+            'n_series': len(self.series),
+            'sazonalidade': self.sazonalidade,
+        }
+
+    def tabela_series(self):
+        """
+        Retorna um DataFrame com as métricas de cada série (índice `serie`).
+        """
+        df = pd.DataFrame(self.metricas_por_serie, index=pd.Index(self.series, name='serie'))
+        return df.astype({'n': np.int64})
+
+    @property
+    def series_result(self):
+        """
+        Método getter para acessar as métricas de previsão
+        """
+        return self.metricas_series
+
+    def get_metric(self, metric_name):
+        """
+        Método para acessar uma métrica específica.
+        """
+        return self.metricas_series.get(metric_name, "Métrica não encontrada")
+
+    def report(self):
+        """
+        Método para gerar um relatório das métricas de previsão, retorna um Dataframe.
+        """
+        dados = self.metricas_series
+        df = pd.DataFrame(list(dados.items()), columns=['Nome', 'Valor'])
+        return df
+
+
+def layout_colunar(painel, tamanho_bloco=TAMANHO_BLOCO_PAINEL):
+    """
+    Divide as séries ordenadas de `painel` em blocos colunares.
+
+    Cada série fica no bloco em que começa; um bloco termina no fim da sua última
+    série, então pode passar de `tamanho_bloco` pontos em até uma série.
+
+    Retorna:
+    - dict: {nome do artefato: array}, com 'series_ids', 'series_posicoes' (bloco,
+      início e fim de cada série dentro do bloco) e as colunas
+      'painel_<coluna>_<bloco>' de COLUNAS_PAINEL.
+    """
+    # Blocos numerados sem lacunas
+    _, blocos = np.unique(painel.inicios // tamanho_bloco, return_inverse=True)
+    primeiras = np.flatnonzero(np.concatenate([[True], blocos[1:] != blocos[:-1]]))
+    inicio_bloco = painel.inicios[primeiras]
+    fim_bloco = painel.fins[np.append(primeiras[1:], len(blocos)) - 1]
+
+    deslocamento = inicio_bloco[blocos]
+    arrays = {
+        'series_ids': painel.series,
+        'series_posicoes': np.column_stack(
+            [blocos, painel.inicios - deslocamento, painel.fins - deslocamento]).astype(np.int64),
+    }
+    for bloco, (inicio, fim) in enumerate(zip(inicio_bloco.tolist(), fim_bloco.tolist())):
+        for nome, atributo in COLUNAS_PAINEL:
+            arrays[f'painel_{nome}_{bloco}'] = getattr(painel, atributo)[inicio:fim]
+    return arrays
+
+
+def localizar_serie(series_ids, posicoes, serie):
+    """
+    Bloco e posições (início, fim) de `serie` no índice gravado por layout_colunar,
+    ou None se a série não existir.
+    """
+    indice = int(np.searchsorted(series_ids, serie))
+    if indice == len(series_ids) or series_ids[indice] != serie:
+        return None
+    bloco, inicio, fim = posicoes[indice].tolist()
+    return bloco, inicio, fim
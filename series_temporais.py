@@ -1,163 +1,365 @@
-
+"""
+Métricas de avaliação de previsões de séries temporais.
+
+Além dos erros globais (MAE, RMSE, MASE, sMAPE, WAPE e viés), são calculados:
+
+- os erros por horizonte, quando as previsões são uma matriz (n_origens, horizonte)
+  com a previsão feita em cada origem para os `horizonte` passos seguintes (NaN
+  onde o valor real ainda não existe);
+- as séries de erros em janelas móveis de `janela` pontos (ou origens), que
+  mostram a degradação do modelo ao longo do tempo.
+
+As janelas móveis não usam laços em Python: a soma de cada janela é a diferença
+de duas somas acumuladas (np.cumsum), em O(n) qualquer que seja a janela. As
+somas acumuladas são reiniciadas a cada bloco de TAMANHO_BLOCO_JANELA valores,
+de modo que o erro de arredondamento da diferença não cresce com o tamanho da
+série. Valores NaN são ignorados (a janela usa apenas os valores válidos).
+"""
 from scipy import stats
 import os
 import pandas as pd
 import numpy as np
 from statsmodels.tsa.seasonal import seasonal_decompose
 
-class Series_Temporais():
-    """
-        Inicializa a classe com os dados reais, previsão e índice temporal.
 
-        Parâmetros:
-        - y_real: Valores reais da série temporal.
-        - y_pred: Valores previstos para a série temporal.
-        - time_index: Índice temporal associado à série (e.g., datas ou períodos).
-        """
+# Tamanho mínimo dos blocos das somas acumuladas das janelas móveis
+TAMANHO_BLOCO_JANELA = 1 << 16
 
-    def __init__(self, y_real, y_pred, tipo):
-        
-        
-        
-        self.tipo = tipo
-        self.y_real = y_real
-        self.y_pred = y_pred
+# Janela móvel usada quando não informada (limitada ao tamanho da série)
+JANELA_PADRAO = 30
 
 
-        # Inicializa um dicionário para armazenar as métricas
-        # self.decomposicao = {}
-        
-        # A series temporais é para classifição ou regressão?
-        
-        if self.tipo == 'cl':
-            # Instancia Classification
-            self.modelo = Classification(
-                kwargs.get('y_real'), kwargs.get(
-                    'y_pred')
-            )
-            self.modelo.metricas_classificacao
-            
-
-        elif self.tipo == 're':
-            # Instancia Regression
-            self.modelo = Regression(
-                kwargs.get('y_real'), kwargs.get(
-                    'y_pred')
-            )
-            self.modelo.metricas_regressao
-        
-        
-        #self.metricas_regressao = {}
-        # self.metricas_classificao = {}
+def somas_janela(valores, janela):
+    """
+    Soma de cada janela de `janela` valores consecutivos, por diferenças de somas
+    acumuladas em blocos (equivalente a sliding_window_view(valores, janela).sum(1)).
 
-        # Inicializa um dicionário para armazenar resultados estastístico
-        #self.resultado = {}
+    Retorna:
+    - np.ndarray: n - janela + 1 somas, a i-ésima de valores[i:i + janela].
+    """
+    valores = np.asarray(valores)
+    n = len(valores)
+    bloco = max(janela, TAMANHO_BLOCO_JANELA)
+    blocos = n // bloco + 1
+    tipo = np.result_type(valores.dtype, np.float64)
 
-        # Chama a função de cálculo das métricas de regressão
-        #self._calculo_metricas_regressao()
-        
-        # Frequências de Tempo:
-        # 'A' ou 'Y': Anual (1 vez por ano)
-        # 'Q': Trimestral (4 vezes por ano)
-        # 'M': Mensal (12 vezes por ano)
-        # 'W': Semanal (52 vezes por ano)
-        # 'D': Diário (uma vez por dia)
-        # 'B': Dias úteis (não inclui fins de semana)
-        # 'H': Horário (uma vez por hora)
-        # 'T' ou 'min': Minuto (uma vez por minuto)
-        # 'S': Segundo (uma vez por segundo)
-        # 'L' ou 'ms': Milissegundo (milésimos de segundo, 1/1.000 de segundo)
-        # 'U': Microsegundo (1/1.000.000 de segundo)
-        # 'N': Nanosegundo (1/1.000.000.000 de segundo)
-        
-        # Mensal com Padrão Anual:
-        # Period: 12
-        # Frequência: 'M' (mensal)
-        # Exemplo: Dados mensais com um padrão sazonal anual, como vendas mensais ao longo de vários anos.
-        # Semanal com Padrão Anual:
-
-        # Period: 52
-        # Frequência: 'W' (semanal)
-        # Exemplo: Dados semanais com um padrão sazonal anual, como temperatura média semanal ao longo de vários anos.
-        # Diário com Padrão Semanal:
-
-        # Period: 7
-        # Frequência: 'D' (diário)
-        # Exemplo: Dados diários com sazonalidade semanal, como o fluxo de tráfego em um site durante uma semana.
-        # Diário com Padrão Anual:
-
-        # Period: 365
-        # Frequência: 'D' (diário)
-        # Exemplo: Dados diários com sazonalidade anual, como temperatura diária ao longo de vários anos.
-        # Horário com Padrão Diário:
-
-        # Period: 24
-        # Frequência: 'H' (horária)
-        # Exemplo: Dados horárias com sazonalidade diária, como consumo de energia ao longo de um dia.
-        # Minuto com Padrão Horário:
-
-        # Period: 60
-        # Frequência: 'T' ou 'min' (minuto)
-        # Exemplo: Dados por minuto com sazonalidade horária, como quantidade de acessos em um site por minuto ao longo de uma hora.
-        # Milissegundos com Padrão de Segundo:
-
-        # Period: 1000
-        # Frequência: 'L' (milissegundo)
-        # Exemplo: Dados milissegundo a milissegundo com um padrão sazonal diário.
-        # Microsegundos com Padrão de Milissegundo:
-
-        # Period: 1000000
-        # Frequência: 'U' (microsegundo)
-        # Exemplo: Dados com alta frequência temporal, como medições de sistemas de controle de precisão.
-
-    # @property
-    # def series_result(self):
-    #     """
-    #     Método getter para acessar as métricas de regressão
-    #     """
-    #     return self.decomposicao  # Retorna o dicionário de métricas de regressao
+    completo = np.zeros((blocos, bloco), dtype=tipo)
+    completo.ravel()[:n] = valores
 
-    # def get_metric(self, metric_name):
-    #     """
-    #     Método para acessar uma métrica específica.
-    #     """
-    #     return self.decomposicao.get(metric_name, "Métrica não encontrada")
+    # Soma acumulada exclusiva dentro de cada bloco (zero no início de cada bloco)
+    acumuladas = np.empty_like(completo)
+    acumuladas[:, 0] = 0
+    np.cumsum(completo[:, :-1], axis=1, out=acumuladas[:, 1:])
+    totais = acumuladas[:, -1] + completo[:, -1]
+    acumuladas = acumuladas.ravel()
 
-    # def report(self):
-    #     """
-    #     Método para gerar um relatório das métricas de regressão, retorna um Dataframe.
-    #     """
-    #     dados = self.decomposicao
-    #     df = pd.DataFrame(list(dados.items()), columns=['Nome', 'Valor'])
-    #     return df
+    somas = np.empty(blocos * bloco, dtype=tipo)
+    np.subtract(acumuladas[janela:n + 1], acumuladas[:n - janela + 1], out=somas[:n - janela + 1])
 
+    # Como a janela não é maior que o bloco, ela termina no mesmo bloco ou no
+    # seguinte: as que começam nas últimas `janela` posições de um bloco recebem o total dele
+    somas.reshape(blocos, bloco)[:, bloco - janela:] += totais[:, None]
+    return somas[:n - janela + 1]
 
 
+def media_janela(valores, janela):
+    """
+    Média dos valores válidos (não NaN) de cada janela móvel; NaN nas janelas sem
+    valores válidos.
+    """
+    valores = np.asarray(valores, dtype=np.float64)
+    validos = ~np.isnan(valores)
+    if validos.all():
+        return somas_janela(valores, janela) / janela
 
+    somas = somas_janela(np.where(validos, valores, 0.0), janela)
+    contagens = somas_janela(validos, janela)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return np.where(contagens > 0, somas / contagens, np.nan)
 
 
+def escala_sazonal(y_treino, sazonalidade=1):
+    """
+    Escala do MASE: erro absoluto médio da previsão ingênua sazonal (y[t - sazonalidade])
+    na série de treino. NaN se a série for curta demais ou a escala for zero.
+    """
+    y_treino = np.asarray(y_treino, dtype=np.float64).ravel()
+    if len(y_treino) <= sazonalidade:
+        return np.nan
+    escala = np.nanmean(np.abs(y_treino[sazonalidade:] - y_treino[:-sazonalidade]))
+    return escala if escala > 0 else np.nan
 
 
+def erros_pontos(y_real, y_pred):
+    """
+    Erro (y_pred - y_real), erro absoluto e termo do sMAPE de cada ponto; pares com
+    NaN ficam com NaN em todos.
+    """
+    erro = y_pred - y_real
+    absoluto = np.abs(erro)
+    denominador = np.abs(y_real) + np.abs(y_pred)
+    # Real e previsto iguais a zero: previsão perfeita, termo zero
+    with np.errstate(invalid='ignore', divide='ignore'):
+        smape = np.where(denominador > 0, 2 * absoluto / denominador, np.where(np.isnan(erro), np.nan, 0.0))
+    return erro, absoluto, smape
 
 
+def metricas_previsao(y_real, y_pred, escala):
+    """
+    Métricas globais de previsão sobre os pares válidos (sem NaN).
 
+    Retorna:
+    - dict: 'mae', 'rmse', 'mase' (MAE / `escala`), 'smape' e 'wape' (em %), 'vies'
+      (erro médio y_pred - y_real; positivo quando o modelo superestima) e 'n'.
+    """
+    erro, absoluto, smape = erros_pontos(y_real, y_pred)
+    validos = ~np.isnan(erro)
+    n = int(validos.sum())
+    if n == 0:
+        raise ValueError("y_real e y_pred não têm nenhum par de valores válidos.")
+
+    erro, absoluto, smape = erro[validos], absoluto[validos], smape[validos]
+    soma_real = np.abs(y_real[validos]).sum()
+    mae = absoluto.mean()
+    return {
+        'mae': mae,
+        'rmse': np.sqrt(np.square(erro).mean()),
+        'mase': mae / escala,
+        'smape': 100 * smape.mean(),
+        'wape': 100 * absoluto.sum() / soma_real if soma_real > 0 else np.nan,
+        'vies': erro.mean(),
+        'n': n,
+    }
+
+
+def erros_por_horizonte(y_real, y_pred, escala):
+    """
+    Erros de cada passo do horizonte de previsões (n_origens, horizonte), ao longo
+    do eixo das origens e ignorando os NaN.
 
+    Retorna:
+    - dict: {nome: array com um valor por horizonte} para 'mae', 'rmse', 'mase',
+      'smape', 'vies' e 'n'.
+    """
+    erro, absoluto, smape = erros_pontos(y_real, y_pred)
+    validos = ~np.isnan(erro)
+    n = validos.sum(axis=0)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mae = np.where(validos, absoluto, 0).sum(axis=0) / n
+        return {
+            'mae': mae,
+            'rmse': np.sqrt(np.where(validos, np.square(erro), 0).sum(axis=0) / n),
+            'mase': mae / escala,
+            'smape': 100 * np.where(validos, smape, 0).sum(axis=0) / n,
+            'vies': np.where(validos, erro, 0).sum(axis=0) / n,
+            'n': n.astype(np.float64),
+        }
+
+
+def erros_janela(y_real, y_pred, janela):
+    """
+    Séries de erros em janelas móveis de `janela` pontos; com previsões
+    (n_origens, horizonte), o erro de cada origem é a média dos seus horizontes.
+
+    Retorna:
+    - dict: {nome: array com n - janela + 1 valores} para 'mae', 'rmse' e 'vies'.
+    """
+    erro = y_pred - y_real
+    if erro.ndim == 2:
+        # Erros médios de cada origem (NaN nas origens sem nenhum valor real)
+        validos = (~np.isnan(erro)).sum(axis=1)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            quadratico = np.where(validos > 0, np.nansum(np.square(erro), axis=1) / validos, np.nan)
+            absoluto = np.where(validos > 0, np.nansum(np.abs(erro), axis=1) / validos, np.nan)
+            erro = np.where(validos > 0, np.nansum(erro, axis=1) / validos, np.nan)
+    else:
+        quadratico, absoluto = np.square(erro), np.abs(erro)
+
+    return {
+        'mae': media_janela(absoluto, janela),
+        'rmse': np.sqrt(media_janela(quadratico, janela)),
+        'vies': media_janela(erro, janela),
+    }
 
 
+class Series_Temporais():
+    """
+        Inicializa a classe com os dados reais e as previsões da série temporal e
+        calcula as métricas de previsão.
 
+        Parâmetros:
+        - y_real: Valores reais da série temporal: um vetor (previsões de um passo) ou
+          uma matriz (n_origens, horizonte) com os valores reais de cada previsão, NaN
+          onde o valor ainda não existe.
+        - y_pred: Valores previstos para a série temporal (mesmo formato de y_real).
+        - y_treino: Série usada no treino; define a escala do MASE (erro da previsão
+          ingênua sazonal). Se não informada, a escala vem de y_real (da primeira
+          coluna, com previsões por horizonte).
+        - sazonalidade: Período da previsão ingênua sazonal do MASE (1 = ingênua,
+          ver os períodos usuais de cada frequência abaixo).
+        - janela: Pontos (ou origens) de cada janela móvel dos erros; limitada ao
+          tamanho da série. Se não informada, usa JANELA_PADRAO.
+
+        Métodos:
+            series_result:
+                Retorna o dicionário de métricas de previsão.
+            get_metric(self, metric_name):
+                Retorna o valor de uma métrica específica.
+            report(self):
+                Retorna um DataFrame com as métricas de previsão.
+        """
 
+    def __init__(self, y_real, y_pred, y_treino=None, sazonalidade=1, janela=None):
 
+        self.y_real = y_real
+        self.y_pred = y_pred
 
+        real = np.asarray(y_real, dtype=np.float64)
+        pred = np.asarray(y_pred, dtype=np.float64)
+        if real.shape != pred.shape or real.ndim not in (1, 2) or real.size == 0:
+            raise ValueError(
+                f"y_real e y_pred devem ser vetores ou matrizes (n_origens, horizonte) de mesmo formato: "
+                f"{real.shape} e {pred.shape}.")
+        # Matriz com uma coluna: previsões de um passo
+        if real.ndim == 2 and real.shape[1] == 1:
+            real, pred = real.ravel(), pred.ravel()
 
+        self.sazonalidade = int(sazonalidade)
+        self.horizonte = real.shape[1] if real.ndim == 2 else 1
+        self.janela = min(int(janela or JANELA_PADRAO), len(real))
 
+        if y_treino is None:
+            y_treino = real[:, 0] if real.ndim == 2 else real
+        self.escala = escala_sazonal(y_treino, self.sazonalidade)
 
+        # Métricas globais, por horizonte ({nome: array}) e em janelas móveis ({nome: array})
+        self.metricas_series = {}
+        self.erros_horizonte = {}
+        self.erros_janela = {}
 
+        self._calculo_metricas_series(real, pred)
 
+    def _calculo_metricas_series(self, real, pred):
+        """
+        Calcula as métricas de avaliação das previsões.
+
+        MÉTRICAS CALCULADAS:
+        --------------------
+        - MAE e RMSE: Erros absoluto médio e quadrático médio (raiz).
+        - MASE: MAE dividido pelo erro da previsão ingênua sazonal no treino; abaixo
+        de 1, o modelo é melhor que repetir o valor de `sazonalidade` passos antes.
+        - sMAPE: Erro percentual absoluto simétrico (0 a 200%), 2|e| / (|y| + |ŷ|).
+        - WAPE: Soma dos erros absolutos dividida pela soma dos valores reais (%),
+        estável com valores reais próximos de zero.
+        - Viés: Erro médio (y_pred - y_real); positivo quando o modelo superestima.
+
+        Com previsões (n_origens, horizonte), as métricas de cada passo ficam em
+        `self.erros_horizonte`; as séries de MAE, RMSE e viés em janelas móveis de
+        `self.janela` pontos (ou origens) ficam em `self.erros_janela`.
+        """
+        self.metricas_series = {
+            **metricas_previsao(real, pred, self.escala),
+            'horizonte': self.horizonte,
+            'sazonalidade': self.sazonalidade,
+            'janela': self.janela,
+        }
 
+        if real.ndim == 2:
+            self.erros_horizonte = erros_por_horizonte(real, pred, self.escala)
 
+        self.erros_janela = erros_janela(real, pred, self.janela)
 
+    @staticmethod
+    def decompor(serie, sazonalidade, modelo='additive'):
+        """
+        Decompõe a série (pd.Series) com seasonal_decompose, no formato aceito por
+        salvando_relatorio ('observed', 'trend', 'seasonal' e 'resid').
+        """
+        decomposicao = seasonal_decompose(serie, model=modelo, period=sazonalidade)
+        return {
+            'observed': decomposicao.observed,
+            'trend': decomposicao.trend,
+            'seasonal': decomposicao.seasonal,
+            'resid': decomposicao.resid,
+        }
+
+    @property
+    def series_result(self):
+        """
+        Método getter para acessar as métricas de previsão
+        """
+        return self.metricas_series  # Retorna o dicionário de métricas de previsão
 
+    def get_metric(self, metric_name):
+        """
+        Método para acessar uma métrica específica.
+        """
+        return self.metricas_series.get(metric_name, "Métrica não encontrada")
 
+    def report(self):
+        """
+        Método para gerar um relatório das métricas de previsão, retorna um Dataframe.
+        """
+        dados = self.metricas_series
+        df = pd.DataFrame(list(dados.items()), columns=['Nome', 'Valor'])
+        return df
+
+
+# Sazonalidade (`sazonalidade`, o `period` de seasonal_decompose) usual de cada frequência:
+#
+# Frequências de Tempo:
+# 'A' ou 'Y': Anual (1 vez por ano)
+# 'Q': Trimestral (4 vezes por ano)
+# 'M': Mensal (12 vezes por ano)
+# 'W': Semanal (52 vezes por ano)
+# 'D': Diário (uma vez por dia)
+# 'B': Dias úteis (não inclui fins de semana)
+# 'H': Horário (uma vez por hora)
+# 'T' ou 'min': Minuto (uma vez por minuto)
+# 'S': Segundo (uma vez por segundo)
+# 'L' ou 'ms': Milissegundo (milésimos de segundo, 1/1.000 de segundo)
+# 'U': Microsegundo (1/1.000.000 de segundo)
+# 'N': Nanosegundo (1/1.000.000.000 de segundo)
+
+# Mensal com Padrão Anual:
+# Period: 12
+# Frequência: 'M' (mensal)
+# Exemplo: Dados mensais com um padrão sazonal anual, como vendas mensais ao longo de vários anos.
+# Semanal com Padrão Anual:
+
+# Period: 52
+# Frequência: 'W' (semanal)
+# Exemplo: Dados semanais com um padrão sazonal anual, como temperatura média semanal ao longo de vários anos.
+# Diário com Padrão Semanal:
+
+# Period: 7
+# Frequência: 'D' (diário)
+# Exemplo: Dados diários com sazonalidade semanal, como o fluxo de tráfego em um site durante uma semana.
+# Diário com Padrão Anual:
+
+# Period: 365
+# Frequência: 'D' (diário)
+# Exemplo: Dados diários com sazonalidade anual, como temperatura diária ao longo de vários anos.
+# Horário com Padrão Diário:
+
+# Period: 24
+# Frequência: 'H' (horária)
+# Exemplo: Dados horárias com sazonalidade diária, como consumo de energia ao longo de um dia.
+# Minuto com Padrão Horário:
+
+# Period: 60
+# Frequência: 'T' ou 'min' (minuto)
+# Exemplo: Dados por minuto com sazonalidade horária, como quantidade de acessos em um site por minuto ao longo de uma hora.
+# Milissegundos com Padrão de Segundo:
+
+# Period: 1000
+# Frequência: 'L' (milissegundo)
+# Exemplo: Dados milissegundo a milissegundo com um padrão sazonal diário.
+# Microsegundos com Padrão de Milissegundo:
+
+# Period: 1000000
+# Frequência: 'U' (microsegundo)
+# Exemplo: Dados com alta frequência temporal, como medições de sistemas de controle de precisão.
 
 
 # def _calculo_metricas_regressao(self):
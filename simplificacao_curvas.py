@@ -0,0 +1,164 @@
+"""
+Simplificação das curvas de classificação antes da gravação.
+
+Com milhões de scores distintos, as curvas ROC e Precision-Recall têm quase o
+mesmo tamanho dos dados. Aqui cada curva é reduzida a no máximo `max_pontos`
+pontos por uma versão gulosa do Ramer–Douglas–Peucker: começando pela corda entre
+as extremidades, o segmento cujo ponto interno está mais distante da corda é
+dividido nesse ponto, até que a diferença de área (a AUC, pela regra do trapézio)
+em relação à curva original fique abaixo de `tolerancia_area` ou até atingir o
+limite de pontos. As extremidades são sempre mantidas e as curvas com até
+`max_pontos` pontos são gravadas sem alteração, de modo que o tamanho gravado e
+o enviado aos gráficos não depende do tamanho do conjunto de dados.
+"""
+import heapq
+
+import numpy as np
+
+
+# Limite padrão de pontos por curva gravada
+MAX_PONTOS_CURVAS = 2000
+
+# Diferença máxima padrão de área (AUC) entre a curva simplificada e a original
+TOLERANCIA_AUC = 1e-4
+
+
+def _segmento(x, y, inicio, fim):
+    """
+    Ponto interno mais distante da corda (inicio, fim) e diferença de área entre o
+    trecho original e a corda.
+
+    Retorna:
+    - tuple: (distancia, indice do ponto mais distante, diferenca de area).
+    """
+    if fim - inicio < 2:
+        return 0.0, inicio, 0.0
+
+    xs = x[inicio:fim + 1]
+    ys = y[inicio:fim + 1]
+    dx = xs[-1] - xs[0]
+    dy = ys[-1] - ys[0]
+    comprimento = np.hypot(dx, dy)
+
+    # Distância perpendicular à corda (ou ao ponto inicial, se a corda for degenerada)
+    if comprimento > 0:
+        distancias = np.abs(dx * (ys[1:-1] - ys[0]) - dy * (xs[1:-1] - xs[0])) / comprimento
+    else:
+        distancias = np.hypot(xs[1:-1] - xs[0], ys[1:-1] - ys[0])
+    posicao = int(np.argmax(distancias))
+
+    # Área (trapézios) do trecho original menos a área sob a corda
+    area_trecho = np.sum(np.diff(xs) * (ys[1:] + ys[:-1])) / 2
+    area_corda = dx * (ys[0] + ys[-1]) / 2
+    return float(distancias[posicao]), inicio + 1 + posicao, float(area_trecho - area_corda)
+
+
+def simplificar_curva(x, y, max_pontos=MAX_PONTOS_CURVAS, tolerancia_area=TOLERANCIA_AUC):
+    """
+    Índices dos pontos mantidos de uma curva (x, y).
+
+    Parâmetros:
+    - x, y (array-like): Coordenadas da curva, na ordem em que é desenhada.
+    - max_pontos (int): Número máximo de pontos mantidos.
+    - tolerancia_area (float): Diferença de área aceita em relação à curva original.
+
+    Retorna:
+    - np.ndarray: Índices ordenados dos pontos mantidos (todos, se a curva já tiver
+      até `max_pontos` pontos ou valores não finitos).
+    """
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    n = len(x)
+    if n <= max(max_pontos, 2) or not (np.isfinite(x).all() and np.isfinite(y).all()):
+        return np.arange(n)
+
+    mantidos = [0, n - 1]
+    distancia, ponto, area = _segmento(x, y, 0, n - 1)
+    erro_area = abs(area)
+    # Fila de prioridade pelo ponto mais distante de cada segmento
+    fila = [(-distancia, 0, n - 1, ponto, area)]
+
+    while fila and len(mantidos) < max_pontos and erro_area > tolerancia_area:
+        distancia, inicio, fim, ponto, area = heapq.heappop(fila)
+        if distancia == 0:
+            # Segmento sem ponto interno fora da corda (não reduz o erro)
+            continue
+
+        mantidos.append(ponto)
+        erro_area -= abs(area)
+        for a, b in ((inicio, ponto), (ponto, fim)):
+            distancia_nova, ponto_novo, area_nova = _segmento(x, y, a, b)
+            erro_area += abs(area_nova)
+            if b - a >= 2:
+                heapq.heappush(fila, (-distancia_nova, a, b, ponto_novo, area_nova))
+
+    return np.sort(np.array(mantidos))
+
+
+def _normalizar(valores):
+    """
+    Escala os valores para [0, 1], para que a distância à corda pese x e y igualmente.
+    """
+    valores = np.asarray(valores, dtype=np.float64)
+    finitos = valores[np.isfinite(valores)]
+    if len(finitos) == 0:
+        return valores
+    amplitude = finitos.max() - finitos.min()
+    return (valores - finitos.min()) / amplitude if amplitude > 0 else valores - finitos.min()
+
+
+def simplificar_curvas_classificacao(curvas, max_pontos=MAX_PONTOS_CURVAS, tolerancia_auc=TOLERANCIA_AUC):
+    """
+    Simplifica as curvas gravadas por ExperimentLogger._linha_classificacao.
+
+    Parâmetros:
+    - curvas (dict): 'fpr', 'tpr' e 'thresholds_roc' (formato de roc_curve);
+      'precision', 'recall' e 'thresholds' (formato de precision_recall_curve); e
+      'f1_limiares' e 'custo_limiares' (alinhados com 'thresholds'). Valores None
+      são mantidos como None.
+
+    A curva ROC e a Precision-Recall são simplificadas separadamente, com os
+    limiares acompanhando os pontos mantidos. Os limiares da Precision-Recall
+    mantêm também os pontos necessários para as curvas de F1 e custo (incluindo o
+    F1 máximo e o custo mínimo).
+
+    Retorna:
+    - dict: As mesmas chaves, com arrays de no máximo `max_pontos` pontos por curva
+      (até 3 * `max_pontos` nas curvas por limiar).
+    """
+    curvas = dict(curvas)
+
+    fpr, tpr = curvas.get('fpr'), curvas.get('tpr')
+    if fpr is not None and tpr is not None and len(fpr) == len(tpr):
+        indices = simplificar_curva(fpr, tpr, max_pontos, tolerancia_auc)
+        for nome in ('fpr', 'tpr', 'thresholds_roc'):
+            if curvas.get(nome) is not None and len(curvas[nome]) == len(fpr):
+                curvas[nome] = np.asarray(curvas[nome])[indices]
+
+    precision, recall = curvas.get('precision'), curvas.get('recall')
+    if precision is not None and recall is not None and len(precision) == len(recall):
+        indices = simplificar_curva(recall, precision, max_pontos, tolerancia_auc)
+        limiares = curvas.get('thresholds')
+        alinhados = limiares is not None and len(limiares) == len(precision) - 1
+
+        if alinhados:
+            # Pontos das curvas por limiar (o último ponto da Precision-Recall não tem limiar)
+            eixo = _normalizar(limiares)
+            for nome in ('f1_limiares', 'custo_limiares'):
+                valores = curvas.get(nome)
+                if valores is not None and len(valores) == len(limiares) and len(limiares) > max_pontos:
+                    valores_normalizados = _normalizar(valores)
+                    extremo = np.nanargmax(valores) if nome == 'f1_limiares' else np.nanargmin(valores)
+                    indices = np.union1d(indices, simplificar_curva(
+                        eixo, valores_normalizados, max_pontos, tolerancia_auc))
+                    indices = np.union1d(indices, [extremo])
+
+        for nome in ('precision', 'recall'):
+            curvas[nome] = np.asarray(curvas[nome])[indices]
+        if alinhados:
+            indices_limiares = indices[indices < len(limiares)]
+            for nome in ('thresholds', 'f1_limiares', 'custo_limiares'):
+                if curvas.get(nome) is not None and len(curvas[nome]) == len(limiares):
+                    curvas[nome] = np.asarray(curvas[nome])[indices_limiares]
+
+    return curvas
@@ -0,0 +1,241 @@
+"""
+Sketch de quantis KLL (Karnin, Lang e Liberty) para resumos aproximados.
+
+O sketch guarda no máximo algumas vezes `k` valores, organizados em níveis: um
+valor do nível h representa 2**h valores originais. Quando um nível enche, ele é
+ordenado e metade dos valores (os de posição par ou ímpar, sorteada) sobe para o
+nível seguinte. O erro de rank é da ordem de 1.7 / k, independente da
+quantidade de valores, e dois sketches podem ser combinados com `merge`, o que
+permite resumir blocos ou processos separadamente.
+
+Blocos grandes são inseridos de uma vez: o bloco é dividido em pedaços de `k`
+valores, ordenados juntos (np.sort em um array 2D) e compactados em paralelo,
+então o custo é O(n log k) em vez de uma ordenação completa.
+"""
+import math
+
+import numpy as np
+
+
+# Constante da relação entre k e o erro de rank (erro ≈ CONSTANTE_ERRO / k)
+CONSTANTE_ERRO = 1.7
+
+# Fator de redução da capacidade dos níveis mais baixos e capacidade mínima de um nível
+FATOR_CAPACIDADE = 2 / 3
+CAPACIDADE_MINIMA = 8
+
+
+class SketchKLL:
+
+    def __init__(self, k=None, erro=0.01, semente=None):
+        """
+        Parâmetros:
+        - k (int): Tamanho do sketch; se None, é calculado a partir de `erro`.
+        - erro (float): Erro de rank desejado (ex.: 0.01 = quantis com erro de ~1% no rank).
+        - semente (int): Semente do sorteio das compactações, para resultados reproduzíveis.
+        """
+        if k is None:
+            k = math.ceil(CONSTANTE_ERRO / erro)
+        # k par, para que as compactações em blocos promovam exatamente metade dos valores
+        self.k = max(CAPACIDADE_MINIMA, int(k) + int(k) % 2)
+        self.n = 0
+        self.minimo = np.inf
+        self.maximo = -np.inf
+        self.niveis = [np.empty(0)]
+        self._rng = np.random.default_rng(semente)
+
+    @property
+    def erro(self):
+        """
+        Erro de rank aproximado do sketch.
+        """
+        return CONSTANTE_ERRO / self.k
+
+    def _capacidade(self, nivel):
+        altura = len(self.niveis)
+        return max(CAPACIDADE_MINIMA,
+                   math.ceil(self.k * FATOR_CAPACIDADE ** (altura - 1 - nivel)))
+
+    def _adicionar(self, nivel, valores):
+        while len(self.niveis) <= nivel:
+            self.niveis.append(np.empty(0))
+        self.niveis[nivel] = np.concatenate([self.niveis[nivel], valores])
+
+    def update(self, valores):
+        """
+        Adiciona um bloco de valores (NaN são ignorados).
+        """
+        valores = np.asarray(valores, dtype=np.float64).ravel()
+        valores = valores[~np.isnan(valores)]
+        if len(valores) == 0:
+            return self
+
+        self.n += len(valores)
+        self.minimo = min(self.minimo, valores.min())
+        self.maximo = max(self.maximo, valores.max())
+
+        # Blocos grandes: compacta pedaços de k valores de uma vez, subindo de nível
+        # até sobrar uma quantidade que caiba nos níveis
+        nivel = 0
+        while len(valores) > 2 * self.k:
+            inteiros = len(valores) - len(valores) % self.k
+            self._adicionar(nivel, valores[inteiros:])
+
+            pedacos = np.sort(valores[:inteiros].reshape(-1, self.k), axis=1)
+            deslocamentos = self._rng.integers(0, 2, len(pedacos))[:, None]
+            posicoes = deslocamentos + 2 * np.arange(self.k // 2)[None, :]
+            valores = np.take_along_axis(pedacos, posicoes, axis=1).ravel()
+            nivel += 1
+
+        self._adicionar(nivel, valores)
+        self._comprimir()
+        return self
+
+    def _comprimir(self):
+        nivel = 0
+        while nivel < len(self.niveis):
+            itens = self.niveis[nivel]
+            if len(itens) > self._capacidade(nivel):
+                itens = np.sort(itens)
+
+                # Com quantidade ímpar, um valor sorteado fica no nível atual
+                sobra = np.empty(0)
+                if len(itens) % 2:
+                    posicao = self._rng.integers(len(itens))
+                    sobra = itens[posicao:posicao + 1]
+                    itens = np.delete(itens, posicao)
+
+                deslocamento = self._rng.integers(0, 2)
+                self.niveis[nivel] = sobra
+                self._adicionar(nivel + 1, itens[deslocamento::2])
+            nivel += 1
+
+    def merge(self, outro):
+        """
+        Combina outro sketch neste (o resultado resume a união dos valores).
+        """
+        if outro.n == 0:
+            return self
+
+        self.n += outro.n
+        self.minimo = min(self.minimo, outro.minimo)
+        self.maximo = max(self.maximo, outro.maximo)
+        for nivel, itens in enumerate(outro.niveis):
+            self._adicionar(nivel, itens)
+        self._comprimir()
+        return self
+
+    def _itens_pesos(self):
+        """
+        Valores do sketch ordenados e o peso (quantidade de valores representados) de cada um.
+        """
+        itens = np.concatenate(self.niveis)
+        pesos = np.concatenate([np.full(len(valores), 2.0 ** nivel)
+                                for nivel, valores in enumerate(self.niveis)])
+        ordem = np.argsort(itens, kind='stable')
+        return itens[ordem], pesos[ordem]
+
+    def quantis(self, qs):
+        """
+        Quantis aproximados (q entre 0 e 1); q=0 e q=1 retornam o mínimo e o máximo exatos.
+        """
+        qs = np.asarray(qs, dtype=np.float64)
+        if self.n == 0:
+            return np.full(qs.shape, np.nan)
+
+        itens, pesos = self._itens_pesos()
+        acumulado = np.cumsum(pesos)
+        posicoes = np.searchsorted(acumulado, qs * acumulado[-1], side='left')
+        resultado = itens[np.clip(posicoes, 0, len(itens) - 1)]
+        resultado = np.where(qs <= 0, self.minimo, resultado)
+        return np.where(qs >= 1, self.maximo, resultado)
+
+    def quantil(self, q):
+        return float(self.quantis([q])[0])
+
+    def ranks(self, valores):
+        """
+        Fração aproximada dos valores menores ou iguais a cada valor informado.
+        """
+        valores = np.asarray(valores, dtype=np.float64)
+        if self.n == 0:
+            return np.full(valores.shape, np.nan)
+
+        itens, pesos = self._itens_pesos()
+        acumulado = np.concatenate([[0.0], np.cumsum(pesos)])
+        return acumulado[np.searchsorted(itens, valores, side='right')] / acumulado[-1]
+
+    def moda(self):
+        """
+        Moda aproximada. Se o sketch tiver valores repetidos (dados discretos), é o
+        valor de maior peso; para dados contínuos, é o centro do intervalo mais
+        denso de um histograma ponderado com largura de Freedman-Diaconis.
+        """
+        if self.n == 0:
+            return np.nan
+
+        itens, pesos = self._itens_pesos()
+        unicos, inverso = np.unique(itens, return_inverse=True)
+        contagens = np.bincount(inverso, weights=pesos)
+
+        if len(unicos) <= len(itens) // 2 or len(unicos) == 1:
+            return float(unicos[np.argmax(contagens)])
+
+        q1, q3 = self.quantis([0.25, 0.75])
+        largura = 2 * (q3 - q1) / len(itens) ** (1 / 3)
+        if not largura > 0:
+            return float(unicos[np.argmax(contagens)])
+
+        intervalos = max(1, min(int(np.ceil((self.maximo - self.minimo) / largura)), 10_000))
+        histograma, bordas = np.histogram(itens, bins=intervalos, weights=pesos,
+                                          range=(self.minimo, self.maximo))
+        mais_denso = np.argmax(histograma)
+        return float((bordas[mais_denso] + bordas[mais_denso + 1]) / 2)
+
+    def resumo_boxplot(self):
+        """
+        Valores usados em um boxplot (mínimo, Q1, mediana, Q3, máximo e limites de
+        1.5 IQR), calculados apenas a partir do sketch.
+        """
+        minimo, q1, mediana, q3, maximo = (float(q) for q in self.quantis([0, 0.25, 0.5, 0.75, 1]))
+        iqr = q3 - q1
+        limite_inferior = max(minimo, q1 - 1.5 * iqr)
+        limite_superior = min(maximo, q3 + 1.5 * iqr)
+
+        # Fração fora dos limites: abaixo do inferior ou acima do superior
+        abaixo, ate_superior = self.ranks([np.nextafter(limite_inferior, -np.inf), limite_superior])
+        return {
+            'minimo': minimo,
+            'q1': q1,
+            'mediana': mediana,
+            'q3': q3,
+            'maximo': maximo,
+            'limite_inferior': limite_inferior,
+            'limite_superior': limite_superior,
+            'porcentagem_outliers': float(abaixo + 1 - ate_superior) * 100,
+        }
+
+    def para_array(self):
+        """
+        Representa o sketch em um único array float64, para gravação com
+        serializacao.codificar_array: [k, n, mínimo, máximo, quantidade de níveis,
+        tamanho de cada nível..., valores de todos os níveis...].
+        """
+        cabecalho = [self.k, self.n, self.minimo, self.maximo, len(self.niveis)]
+        tamanhos = [len(itens) for itens in self.niveis]
+        return np.concatenate([np.array(cabecalho + tamanhos, dtype=np.float64), *self.niveis])
+
+    @classmethod
+    def de_array(cls, array):
+        """
+        Reconstrói um sketch gravado com `para_array`.
+        """
+        array = np.asarray(array, dtype=np.float64)
+        sketch = cls(k=int(array[0]))
+        sketch.n = int(array[1])
+        sketch.minimo, sketch.maximo = float(array[2]), float(array[3])
+        altura = int(array[4])
+        tamanhos = array[5:5 + altura].astype(np.int64)
+        limites = np.cumsum(np.concatenate([[5 + altura], tamanhos]))
+        sketch.niveis = [array[inicio:fim].copy() for inicio, fim in zip(limites[:-1], limites[1:])]
+        return sketch
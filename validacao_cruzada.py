@@ -0,0 +1,117 @@
+"""
+Avaliação dos folds de uma validação cruzada e agregados das métricas.
+
+As previsões de cada fold (ex.: produzidas em um ProcessPoolExecutor) são
+avaliadas em paralelo, em processos separados, e as métricas de todos os folds
+são resumidas em média, desvio padrão e intervalo de confiança pela
+distribuição t. O ExperimentLogger grava os folds e os agregados em uma única
+transação, sob uma execução pai (ver ExperimentLogger.salvando_validacao_cruzada).
+"""
+import math
+import numbers
+import os
+from concurrent.futures import Future, ProcessPoolExecutor
+
+import numpy as np
+from scipy import stats
+
+from classificacao import Classification
+from regressao import Regression
+
+
+# Método gravado na coluna `metodo` de INTERVALOS_METRICAS para os agregados dos folds
+METODO_FOLDS = 't'
+
+
+def normalizar_fold(fold):
+    """
+    Converte um fold em dicionário com 'y_real' e 'y_pred' (e as chaves opcionais
+    'scores' e de curvas da classificação). Aceita dicionários, tuplas (y_real, y_pred) e
+    Futures que resultem em um deles.
+    """
+    if isinstance(fold, Future):
+        fold = fold.result()
+    if isinstance(fold, dict):
+        return fold
+    y_real, y_pred = fold
+    return {'y_real': y_real, 'y_pred': y_pred}
+
+
+def avaliar_fold(tipo, y_real, y_pred, erro_quantis=None, scores=None):
+    """
+    Calcula as métricas de um fold (função de módulo, para rodar em outro processo).
+    Na classificação, os `scores` opcionais produzem as curvas de limiar do fold.
+    """
+    if tipo == 'Classificacao':
+        return Classification(y_real, y_pred, erro_quantis=erro_quantis, scores=scores)
+    elif tipo == 'Regressao':
+        return Regression(y_real, y_pred, erro_quantis=erro_quantis)
+    raise ValueError(
+        "A validação cruzada está disponível apenas para 'Classificacao' e 'Regressao'."
+    )
+
+
+def avaliar_folds(tipo, folds, erro_quantis=None, max_workers=None):
+    """
+    Avalia todos os folds, em paralelo quando há mais de um processo disponível.
+
+    Parâmetros:
+    - folds (list[dict]): Folds normalizados (ver normalizar_fold).
+    - max_workers (int): Processos usados; None para min(folds, CPUs) e 1 para avaliar
+      no próprio processo.
+
+    Retorna:
+    - list: Um Classification ou Regression por fold, na ordem de `folds`.
+    """
+    if max_workers is None:
+        max_workers = min(len(folds), os.cpu_count() or 1)
+
+    argumentos = ([tipo] * len(folds), [fold['y_real'] for fold in folds],
+                  [fold['y_pred'] for fold in folds], [erro_quantis] * len(folds),
+                  [fold.get('scores') for fold in folds])
+
+    if max_workers <= 1 or len(folds) <= 1:
+        return list(map(avaliar_fold, *argumentos))
+
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        return list(executor.map(avaliar_fold, *argumentos))
+
+
+def agregar_folds(metricas_folds, nivel=0.95):
+    """
+    Média, desvio padrão amostral e intervalo de confiança (distribuição t com
+    n - 1 graus de liberdade) de cada métrica numérica dos folds.
+
+    Parâmetros:
+    - metricas_folds (list[dict]): Dicionário de métricas de cada fold.
+    - nivel (float): Nível de confiança do intervalo.
+
+    Retorna:
+    - dict: {metrica: {'nivel', 'n', 'media', 'desvio', 'inferior', 'superior'}}, na
+      ordem das métricas do primeiro fold. Valores ausentes ou não finitos são ignorados.
+    """
+    nomes = list(dict.fromkeys(nome for metricas in metricas_folds for nome in metricas))
+
+    intervalos = {}
+    for nome in nomes:
+        valores = [metricas.get(nome) for metricas in metricas_folds]
+        valores = np.array([float(valor) for valor in valores
+                            if isinstance(valor, numbers.Real) and not isinstance(valor, bool)
+                            and math.isfinite(valor)])
+        if len(valores) == 0:
+            continue
+
+        media = valores.mean()
+        desvio = valores.std(ddof=1) if len(valores) > 1 else np.nan
+        margem = stats.t.ppf((1 + nivel) / 2, len(valores) - 1) * desvio / np.sqrt(len(valores)) \
+            if len(valores) > 1 else np.nan
+
+        intervalos[nome] = {
+            'nivel': nivel,
+            'n': len(valores),
+            'media': media,
+            'desvio': desvio,
+            'inferior': media - margem,
+            'superior': media + margem,
+        }
+    return intervalos